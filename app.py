@@ -4,6 +4,7 @@ import matplotlib.pyplot as plt
 import plotly.graph_objects as go
 import pandas as pd
 import time
+import asyncio
 from PIL import Image
 import io
 import base64
@@ -1566,7 +1567,7 @@ elif page == "Performance Metrics":
     """)
     
     # Create tabs for different metrics
-    tab1, tab2, tab3 = st.tabs(["Efficiency Metrics", "Accuracy Metrics", "Resource Utilization"])
+    tab1, tab2, tab3, tab4 = st.tabs(["Efficiency Metrics", "Accuracy Metrics", "Resource Utilization", "Recorded History"])
     
     with tab1:
         st.subheader("Efficiency Improvements")
@@ -1730,6 +1731,45 @@ elif page == "Performance Metrics":
             st.metric("Payback Period", "4.2 months")
             st.metric("Quality Improvement", "17 points")
 
+    with tab4:
+        st.subheader("Recorded Agent Performance")
+        st.write("""
+        Per-agent HITL rate and mean confidence computed from the orchestrator's interaction history.
+        """)
+        
+        # Keep one orchestrator per session so its history accumulates across runs
+        if "orchestrator" not in st.session_state:
+            from orchestrator.main import Orchestrator
+            st.session_state.orchestrator = Orchestrator()
+        history_manager = st.session_state.orchestrator.history_manager
+        
+        if st.button("Run Sample Workflow"):
+            with st.spinner("Processing sample request..."):
+                asyncio.run(st.session_state.orchestrator.process_request({
+                    "request_id": f"metrics-{int(time.time())}",
+                    "data_source": "sales_data",
+                    "analysis_type": "sales"
+                }))
+        
+        window_minutes = st.slider("Time window (minutes)", 5, 24 * 60, 60)
+        agent_stats = history_manager.aggregate_by_agent(start=time.time() - window_minutes * 60)
+        
+        if agent_stats:
+            stats_df = pd.DataFrame.from_dict(agent_stats, orient="index")
+            stats_df.index.name = "Agent"
+            st.dataframe(stats_df)
+            
+            fig = go.Figure(data=[
+                go.Bar(name='Mean Confidence', x=list(agent_stats.keys()),
+                       y=[s["mean_confidence"] or 0 for s in agent_stats.values()]),
+                go.Bar(name='HITL Rate (%)', x=list(agent_stats.keys()),
+                       y=[(s["hitl_rate"] or 0) * 100 for s in agent_stats.values()])
+            ])
+            fig.update_layout(barmode='group', height=400, xaxis_title="Agent")
+            st.plotly_chart(fig)
+        else:
+            st.info("No workflow history recorded in this window yet. Run a sample workflow to populate it.")
+
 # Add footer
 st.markdown("---")
 st.markdown("© 2023 Human-in-the-Loop Intelligent Orchestration System | All Rights Reserved")
\ No newline at end of file
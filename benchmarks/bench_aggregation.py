@@ -0,0 +1,85 @@
+"""
+Benchmark the columnar aggregation engine against dict-of-lists grouping.
+
+The baseline reproduces the previous ``_analyze_sales_data``, which built
+three ``defaultdict(list)`` groupings and recomputed ``quantity * price`` in
+every comprehension.
+
+Usage:
+    python benchmarks/bench_aggregation.py [records]
+"""
+
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from orchestrator.agents.statistical_analysis_agent import StatisticalAnalysisAgent
+
+def legacy_sales_analysis(data):
+    total_sales = sum(item.get("quantity", 0) * item.get("price", 0) for item in data)
+    groupings = {}
+    for field in ("product_id", "region", "date"):
+        groups = defaultdict(list)
+        for item in data:
+            groups[item.get(field, "unknown")].append(item)
+        groupings[field] = {
+            key: sum(item.get("quantity", 0) * item.get("price", 0) for item in items)
+            for key, items in groups.items()
+        }
+    return {
+        "total_sales": total_sales,
+        "sales_by_product": groupings["product_id"],
+        "sales_by_region": groupings["region"],
+        "sales_trend": groupings["date"],
+        "sample_size": len(data)
+    }
+
+def make_sales(count):
+    rng = random.Random(42)
+    regions = ["North", "South", "East", "West"]
+    return [
+        {
+            "id": i,
+            "product_id": f"P{rng.randrange(500):03d}",
+            "quantity": rng.randrange(1, 10),
+            "price": round(rng.uniform(5, 100), 2),
+            "date": f"2023-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}",
+            "region": regions[rng.randrange(4)]
+        }
+        for i in range(count)
+    ]
+
+def main():
+    logging.disable(logging.CRITICAL)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    data = make_sales(count)
+    agent = StatisticalAnalysisAgent()
+    
+    start = time.perf_counter()
+    legacy = legacy_sales_analysis(data)
+    legacy_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    columnar = asyncio.run(agent._analyze_sales_data(data))
+    columnar_time = time.perf_counter() - start
+    
+    max_error = max(
+        abs(legacy[key][group] - columnar[key][group])
+        for key in ("sales_by_product", "sales_by_region", "sales_trend")
+        for group in legacy[key]
+    )
+    
+    print(f"records: {count:,}")
+    print(f"defaultdict grouping: {legacy_time:.2f} s")
+    print(f"columnar engine:      {columnar_time:.2f} s")
+    print(f"speed-up:             {legacy_time / columnar_time:.1f}x")
+    print(f"max group difference: {max_error:.2e}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
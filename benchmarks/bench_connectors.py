@@ -0,0 +1,103 @@
+"""
+Benchmark streaming reads through the CSV, JSONL and SQLite connectors.
+
+The same sales records are written in each format and streamed back in
+batches; each connector's own rows/s and bytes/s figures are reported.
+Parquet is included when pyarrow is installed.
+
+Usage:
+    python benchmarks/bench_connectors.py [records] [batch_size]
+"""
+
+import asyncio
+import csv
+import json
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from orchestrator.data.connectors import create_connector, pq
+
+FIELDS = ["id", "product_id", "quantity", "price", "date", "region"]
+
+def make_sales(count):
+    rng = random.Random(42)
+    regions = ["North", "South", "East", "West"]
+    for i in range(count):
+        yield {
+            "id": i,
+            "product_id": f"P{rng.randrange(500):03d}",
+            "quantity": rng.randrange(1, 10),
+            "price": round(rng.uniform(5, 100), 2),
+            "date": f"2023-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}",
+            "region": regions[rng.randrange(4)]
+        }
+
+def write_sources(directory, count):
+    sources = {}
+    path = os.path.join(directory, "sales.csv")
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(make_sales(count))
+    sources["csv"] = path
+    
+    path = os.path.join(directory, "sales.jsonl")
+    with open(path, "w") as f:
+        f.writelines(json.dumps(record) + "\n" for record in make_sales(count))
+    sources["jsonl"] = path
+    
+    path = os.path.join(directory, "sales.db")
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE sales (id INTEGER, product_id TEXT, quantity INTEGER, price REAL, date TEXT, region TEXT)")
+    connection.executemany(
+        "INSERT INTO sales VALUES (:id, :product_id, :quantity, :price, :date, :region)", make_sales(count)
+    )
+    connection.commit()
+    connection.close()
+    sources["sqlite"] = {"location": path, "table": "sales"}
+    
+    if pq is not None:
+        import pyarrow as pa
+        path = os.path.join(directory, "sales.parquet")
+        pq.write_table(pa.Table.from_pylist(list(make_sales(count))), path)
+        sources["parquet"] = path
+    return sources
+
+async def stream(connector):
+    largest = 0
+    async for batch in connector.batches():
+        largest = max(largest, len(batch))
+    return largest
+
+def main():
+    logging.disable(logging.CRITICAL)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    
+    print(f"records:    {count:,}")
+    print(f"batch size: {batch_size:,}")
+    if pq is None:
+        print("parquet:    skipped (pyarrow not installed)")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        sources = write_sources(directory, count)
+        for name, spec in sources.items():
+            connector = create_connector(spec, batch_size)
+            start = time.perf_counter()
+            largest = asyncio.run(stream(connector))
+            elapsed = time.perf_counter() - start
+            stats = connector.stats
+            print(
+                f"{name:>8}: {elapsed:6.2f} s  {stats.rows_per_second:10,.0f} rows/s  "
+                f"{stats.bytes_per_second / 1e6:7.1f} MB/s  largest batch {largest:,}"
+            )
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
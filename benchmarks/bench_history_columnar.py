@@ -0,0 +1,77 @@
+"""
+Benchmark memory use and window queries of the columnar HistoryManager.
+
+Compares a list of entry dictionaries with ISO timestamps (the previous
+representation) against the columnar ring for the same entries.
+
+Usage:
+    python benchmarks/bench_history_columnar.py [entries]
+"""
+
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from orchestrator.state.history_manager import HistoryManager
+
+AGENTS = ["data_extraction", "statistical_analysis", "visualization"]
+TASKS = ["extract_data", "analyze_data", "create_visualizations"]
+
+def make_entry(i, base):
+    return {
+        "agent": AGENTS[i % 3],
+        "task": TASKS[i % 3],
+        "confidence_score": 70.0 + (i % 30),
+        "hitl_triggered": i % 7 == 0,
+        "timestamp": datetime.fromtimestamp(base + i * 0.01).isoformat()
+    }
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    obj = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, current, elapsed
+
+def main():
+    logging.disable(logging.CRITICAL)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    base = time.time() - count * 0.01
+    
+    def build_dicts():
+        return [make_entry(i, base) for i in range(count)]
+    
+    def build_columnar():
+        manager = HistoryManager({"max_history_size": count})
+        for i in range(count):
+            manager.add_entry(make_entry(i, base))
+        return manager
+    
+    dicts, dict_bytes, dict_time = measure(build_dicts)
+    del dicts
+    manager, col_bytes, col_time = measure(build_columnar)
+    
+    window_start = base + count * 0.01 * 0.9
+    start = time.perf_counter()
+    stats = manager.aggregate_by_agent(start=window_start)
+    aggregate_ms = (time.perf_counter() - start) * 1000
+    
+    start = time.perf_counter()
+    entries = manager.query(start=window_start, agent="visualization", limit=100)
+    query_ms = (time.perf_counter() - start) * 1000
+    
+    print(f"entries: {count:,}")
+    print(f"list of dicts: {dict_bytes / 1e6:8.1f} MB  (build {dict_time:.2f} s)")
+    print(f"columnar ring: {col_bytes / 1e6:8.1f} MB  (build {col_time:.2f} s)")
+    print(f"aggregate_by_agent over last 10%: {aggregate_ms:.1f} ms -> {len(stats)} agents")
+    print(f"query(start, agent, limit=100):   {query_ms:.2f} ms -> {len(entries)} entries")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""
+Benchmark HistoryManager at a 1M-entry capacity.
+
+Compares the ring buffer against the previous list-based implementation,
+which copied the whole list on every add once the cap was reached and
+scanned the whole history for type-filtered queries.
+
+Usage:
+    python benchmarks/bench_history_manager.py [capacity]
+"""
+
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from orchestrator.state.history_manager import HistoryManager
+
+class ListHistory:
+    """The previous list-based history, kept here as a baseline."""
+    
+    def __init__(self, max_history_size):
+        self.history = []
+        self.max_history_size = max_history_size
+    
+    def add_entry(self, entry):
+        self.history.append(entry)
+        if len(self.history) > self.max_history_size:
+            self.history = self.history[-self.max_history_size:]
+    
+    def get_entries(self, entry_type=None, limit=None, reverse=True):
+        if entry_type:
+            entries = [e for e in self.history if e.get("type") == entry_type]
+        else:
+            entries = self.history.copy()
+        if reverse:
+            entries = entries[::-1]
+        if limit is not None:
+            entries = entries[:limit]
+        return entries
+
+def make_entry(i):
+    return {"type": "hitl_request" if i % 50 == 0 else None, "agent": "agent", "timestamp": i}
+
+def bench(history, capacity, overflow_adds):
+    for i in range(capacity):
+        history.add_entry(make_entry(i))
+    
+    start = time.perf_counter()
+    for i in range(overflow_adds):
+        history.add_entry(make_entry(capacity + i))
+    add_us = (time.perf_counter() - start) / overflow_adds * 1e6
+    
+    start = time.perf_counter()
+    for _ in range(10):
+        history.get_entries("hitl_request", limit=10)
+    query_us = (time.perf_counter() - start) / 10 * 1e6
+    
+    return add_us, query_us
+
+def main():
+    logging.disable(logging.CRITICAL)
+    capacity = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    
+    ring_add, ring_query = bench(HistoryManager({"max_history_size": capacity}), capacity, 100_000)
+    list_add, list_query = bench(ListHistory(capacity), capacity, 20)
+    
+    print(f"capacity: {capacity:,}")
+    print(f"{'':16}{'add at cap (us)':>18}{'get_entries(type, 10) (us)':>30}")
+    print(f"{'list baseline':16}{list_add:>18.1f}{list_query:>30.1f}")
+    print(f"{'ring buffer':16}{ring_add:>18.2f}{ring_query:>30.1f}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,94 @@
+"""
+Benchmark memory-mapped columnar extraction against dict-per-row loading.
+
+A sales CSV is written once, then loaded and analyzed in a fresh process
+per mode, so each reports its own peak RSS:
+
+- rows: the CSV connector materializes one dictionary per row
+- mmap: the file is mapped and parsed into typed columns, which the
+  analysis aggregates without building rows
+
+Usage:
+    python benchmarks/bench_mmap_extraction.py [records]
+"""
+
+import asyncio
+import csv
+import json
+import logging
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+FIELDS = ["id", "product_id", "customer_id", "quantity", "price", "date", "region"]
+
+def write_sales(path, count):
+    rng = random.Random(42)
+    regions = ["North", "South", "East", "West"]
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDS)
+        for i in range(count):
+            writer.writerow([
+                i,
+                f"P{rng.randrange(500):03d}",
+                rng.randrange(50000),
+                rng.randrange(1, 10),
+                round(rng.uniform(5, 100), 2),
+                f"2023-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}",
+                regions[rng.randrange(4)]
+            ])
+
+def run_mode(mode, path):
+    """Load and analyze the file in this process and print the measurements as JSON."""
+    from orchestrator.agents.statistical_analysis_agent import StatisticalAnalysisAgent
+    from orchestrator.data.connectors import CSVConnector
+    from orchestrator.data.mmap_reader import read_mapped
+    
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if mode == "rows":
+        data = asyncio.run(CSVConnector(path, batch_size=50000).read_all())
+    else:
+        mapped, data = read_mapped(path)
+    extracted = time.perf_counter()
+    results = asyncio.run(StatisticalAnalysisAgent()._analyze_sales_data(data))
+    analyzed = time.perf_counter()
+    print(json.dumps({
+        "extract": extracted - start,
+        "analyze": analyzed - extracted,
+        "peak_mb": (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline) / 1024,
+        "total_sales": results["total_sales"]
+    }))
+
+def main():
+    logging.disable(logging.CRITICAL)
+    if len(sys.argv) > 2 and sys.argv[1] in ("rows", "mmap"):
+        run_mode(sys.argv[1], sys.argv[2])
+        return
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sales.csv")
+        write_sales(path, count)
+        print(f"records:   {count:,}")
+        print(f"file size: {os.path.getsize(path) / 1e6:.1f} MB")
+        
+        for mode in ("rows", "mmap"):
+            output = subprocess.run(
+                [sys.executable, __file__, mode, path], check=True, capture_output=True, text=True
+            ).stdout
+            measured = json.loads(output.strip().splitlines()[-1])
+            print(
+                f"{mode:>5}: extract {measured['extract']:6.2f} s  analyze {measured['analyze']:6.2f} s  "
+                f"peak RSS +{measured['peak_mb']:7.1f} MB  total sales {measured['total_sales']:,.2f}"
+            )
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,84 @@
+"""
+Benchmark partitioned sales analysis across 1, 2, 4, 8 and 16 processes.
+
+Each run partitions the records, analyzes the partitions in a process pool
+and merges the partial aggregates; the merged exact aggregates are checked
+to be identical to the single-process ones (merged sketches are
+approximate and depend on the split). Speed-up is bounded by the number
+of CPUs reported at the top of the output and by the cost of pickling the
+partitions to the workers.
+
+The analysis agent is then run with one and with two processes, timed,
+and its exact results, which also cover the columnar single-process path,
+are checked to be identical; the sketches are built per partition and
+merged, so they are approximate as above.
+
+Usage:
+    python benchmarks/bench_parallel_analysis.py [records]
+"""
+
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from orchestrator.agents.statistical_analysis_agent import StatisticalAnalysisAgent
+from orchestrator.analysis.parallel import analyze_partitioned
+
+def make_sales(count):
+    rng = random.Random(42)
+    regions = ["North", "South", "East", "West"]
+    return [
+        {
+            "id": i,
+            "product_id": f"P{rng.randrange(500):03d}",
+            "quantity": rng.randrange(1, 10),
+            "price": round(rng.uniform(5, 100), 2),
+            "date": f"2023-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}",
+            "region": regions[rng.randrange(4)]
+        }
+        for i in range(count)
+    ]
+
+def main():
+    logging.disable(logging.CRITICAL)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    data = make_sales(count)
+    
+    print(f"records: {count:,}")
+    print(f"cpus:    {os.cpu_count()}")
+    
+    baseline = None
+    for processes in (1, 2, 4, 8, 16):
+        start = time.perf_counter()
+        result = analyze_partitioned(data, processes=processes, kind="sales").result()
+        result.pop("approximate_statistics")
+        elapsed = time.perf_counter() - start
+        
+        if baseline is None:
+            baseline = (elapsed, result)
+        identical = result == baseline[1]
+        print(
+            f"{processes:2d} processes: {elapsed:6.2f} s  "
+            f"speed-up {baseline[0] / elapsed:4.1f}x  identical: {identical}"
+        )
+    
+    extraction_result = {"data": data, "metadata": {"record_count": count}}
+    results = []
+    for processes in (1, 2):
+        agent = StatisticalAnalysisAgent({"analysis_processes": processes, "parallel_min_records": 0})
+        start = time.perf_counter()
+        result = asyncio.run(agent.analyze_data(extraction_result))["analysis_results"]
+        # Less the simulated processing time of the agent
+        elapsed = time.perf_counter() - start - 2
+        agent.shutdown()
+        results.append(result)
+        print(f"agent, {processes} process{'es' if processes > 1 else ''}: {elapsed:6.2f} s")
+    print(f"agent, 1 and 2 processes identical: {results[0] == results[1]}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
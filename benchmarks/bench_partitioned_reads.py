@@ -0,0 +1,100 @@
+"""
+Benchmark serial and range-partitioned reads of a SQLite table.
+
+A sales table with an integer primary key is written once, then streamed
+through the SQLite connector three ways:
+
+- serial: one query on one pooled connection
+- ordered: the key range split into partitions read concurrently, batches
+  yielded in key order
+- unordered: the same partitions, batches yielded as soon as they are read
+
+Each mode reports rows/s, time to the first batch and the connections the
+shared pool opened. The SQLite module releases the GIL while stepping
+through rows, so partitions overlap their reads with each other and with
+the consumer; building the row dictionaries still needs the GIL, which
+bounds the gain on few cores.
+
+Usage:
+    python benchmarks/bench_partitioned_reads.py [records] [partitions] [batch_size]
+"""
+
+import asyncio
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from orchestrator.data.connectors import SQLiteConnector
+from orchestrator.data.pool import close_pools
+
+CHUNK = 100_000
+
+def write_sales(path, count):
+    rng = random.Random(42)
+    regions = ["North", "South", "East", "West"]
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE sales (id INTEGER PRIMARY KEY, product_id TEXT, quantity INTEGER, price REAL, date TEXT, region TEXT)"
+    )
+    for start in range(0, count, CHUNK):
+        connection.executemany("INSERT INTO sales VALUES (?, ?, ?, ?, ?, ?)", [
+            (
+                i,
+                f"P{rng.randrange(500):03d}",
+                rng.randrange(1, 10),
+                round(rng.uniform(5, 100), 2),
+                f"2023-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}",
+                regions[rng.randrange(4)]
+            )
+            for i in range(start, min(start + CHUNK, count))
+        ])
+    connection.commit()
+    connection.close()
+
+async def stream(connector):
+    start = time.perf_counter()
+    first = None
+    rows = 0
+    async for batch in connector.batches():
+        if first is None:
+            first = time.perf_counter() - start
+        rows += len(batch)
+    return rows, first, time.perf_counter() - start
+
+def main():
+    logging.disable(logging.CRITICAL)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    partitions = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    batch_size = int(sys.argv[3]) if len(sys.argv) > 3 else 50_000
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sales.db")
+        start = time.perf_counter()
+        write_sales(path, count)
+        print(f"records: {count:,} ({os.path.getsize(path) / 1e6:.0f} MB, written in {time.perf_counter() - start:.1f} s)")
+        print(f"partitions: {partitions}, batch size: {batch_size:,}, cores: {os.cpu_count()}")
+        
+        modes = {
+            "serial": {},
+            "ordered": {"partition_column": "id", "partitions": partitions, "ordered": True},
+            "unordered": {"partition_column": "id", "partitions": partitions, "ordered": False}
+        }
+        for mode, options in modes.items():
+            connector = SQLiteConnector(
+                path, batch_size=batch_size, table="sales", pool_size=partitions, **options
+            )
+            rows, first, elapsed = asyncio.run(stream(connector))
+            print(
+                f"{mode:>9}: {rows:,} rows in {elapsed:6.2f} s  {rows / elapsed:10,.0f} rows/s  "
+                f"first batch {first * 1000:7.1f} ms  connections opened {connector.pool.created}"
+            )
+        close_pools()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,100 @@
+"""
+Benchmark the memory and analysis time of record lists and RecordBatch.
+
+Sales records are generated in chunks and held either as a list of
+dictionaries or as a RecordBatch built chunk by chunk. Each mode runs in a
+fresh process and reports the resident memory held by the data, scaled to
+one million rows, and the time of the sales analysis over it.
+
+Usage:
+    python benchmarks/bench_record_batch.py [records]
+"""
+
+import asyncio
+import gc
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+CHUNK = 100_000
+
+def make_sales(start, count, rng):
+    regions = ["North", "South", "East", "West"]
+    return [
+        {
+            "id": i,
+            "product_id": f"P{rng.randrange(500):03d}",
+            "customer_id": rng.randrange(50000),
+            "quantity": rng.randrange(1, 10),
+            "price": round(rng.uniform(5, 100), 2),
+            "date": f"2023-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}",
+            "region": regions[rng.randrange(4)]
+        }
+        for i in range(start, start + count)
+    ]
+
+def resident_bytes():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+def run_mode(mode, count):
+    """Build and analyze the data in this process and print the measurements as JSON."""
+    from orchestrator.agents.statistical_analysis_agent import StatisticalAnalysisAgent
+    from orchestrator.data.record_batch import RecordBatch
+    
+    rng = random.Random(42)
+    gc.collect()
+    baseline = resident_bytes()
+    start = time.perf_counter()
+    if mode == "records":
+        data = []
+        for offset in range(0, count, CHUNK):
+            data.extend(make_sales(offset, min(CHUNK, count - offset), rng))
+    else:
+        data = RecordBatch.concat([
+            RecordBatch.from_records(make_sales(offset, min(CHUNK, count - offset), rng))
+            for offset in range(0, count, CHUNK)
+        ])
+    built = time.perf_counter()
+    gc.collect()
+    held = resident_bytes() - baseline
+    
+    results = asyncio.run(StatisticalAnalysisAgent()._analyze_sales_data(data))
+    analyzed = time.perf_counter()
+    print(json.dumps({
+        "build": built - start,
+        "analyze": analyzed - built,
+        "held_mb_per_million": held / 1e6 * 1_000_000 / count,
+        "nbytes_mb_per_million": data.nbytes / 1e6 * 1_000_000 / count if mode == "batch" else None,
+        "total_sales": results["total_sales"]
+    }))
+
+def main():
+    logging.disable(logging.CRITICAL)
+    if len(sys.argv) > 2 and sys.argv[1] in ("records", "batch"):
+        run_mode(sys.argv[1], int(sys.argv[2]))
+        return
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"records: {count:,}")
+    
+    for mode in ("records", "batch"):
+        output = subprocess.run(
+            [sys.executable, __file__, mode, str(count)], check=True, capture_output=True, text=True
+        ).stdout
+        measured = json.loads(output.strip().splitlines()[-1])
+        buffers = measured["nbytes_mb_per_million"]
+        print(
+            f"{mode:>8}: {measured['held_mb_per_million']:7.1f} MB per 1M rows"
+            + (f" ({buffers:.1f} MB in column buffers)" if buffers is not None else "")
+            + f"  build {measured['build']:5.2f} s  analyze {measured['analyze']:5.2f} s"
+            f"  total sales {measured['total_sales']:,.2f}"
+        )
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
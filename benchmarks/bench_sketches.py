@@ -0,0 +1,74 @@
+"""
+Benchmark the sketches against exact statistics.
+
+Compares accuracy, retained memory and time of KLL quantiles, HyperLogLog
+distinct counts and Count-Min heavy hitters with sorting, sets and exact
+counters, on data split into partitions whose sketches are merged.
+
+Usage:
+    python benchmarks/bench_sketches.py [values] [partitions]
+"""
+
+import logging
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from orchestrator.analysis.sketches import HyperLogLog, KLLSketch, TopK
+
+def main():
+    logging.disable(logging.CRITICAL)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    partitions = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    rng = random.Random(42)
+    values = [rng.lognormvariate(3.0, 1.0) for _ in range(count)]
+    customers = [rng.randrange(count // 4) for _ in range(count)]
+    # Zipf-distributed product popularity
+    products = rng.choices([f"P{i}" for i in range(5000)], weights=[1 / (i + 1) for i in range(5000)], k=count)
+    size = -(-count // partitions)
+    
+    start = time.perf_counter()
+    ordered = sorted(values)
+    exact_quantiles = [ordered[int(q * (count - 1))] for q in (0.5, 0.9, 0.99)]
+    exact_distinct = len(set(customers))
+    exact_top = Counter(products).most_common(10)
+    exact_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    kll, hll, top = KLLSketch(), HyperLogLog(), TopK()
+    for offset in range(0, count, size):
+        part_kll, part_hll, part_top = KLLSketch(seed=offset), HyperLogLog(), TopK()
+        part_kll.update_many(values[offset:offset + size])
+        part_hll.add_many(customers[offset:offset + size])
+        part_top.add_many(products[offset:offset + size])
+        kll.merge(part_kll)
+        hll.merge(part_hll)
+        top.merge(part_top)
+    sketch_time = time.perf_counter() - start
+    
+    estimates = kll.quantiles([0.5, 0.9, 0.99])
+    rank_errors = [
+        abs(sum(1 for v in ordered if v <= estimate) / count - q)
+        for q, estimate in zip((0.5, 0.9, 0.99), estimates)
+    ] if count <= 2_000_000 else []
+    retained = sum(len(level) for level in kll.levels)
+    
+    print(f"values: {count:,} in {partitions} merged partitions")
+    print(f"exact (sort, set, Counter): {exact_time:6.2f} s, holds all {count:,} values")
+    print(f"sketches:                   {sketch_time:6.2f} s, KLL keeps {retained:,} values, "
+          f"HLL {len(hll.registers):,} bytes, Count-Min {top.sketch.width * top.sketch.depth * 8:,} bytes")
+    print(f"quantiles p50/p90/p99: exact {[round(v, 2) for v in exact_quantiles]} "
+          f"sketch {[round(v, 2) for v in estimates]}")
+    if rank_errors:
+        print(f"max rank error: {max(rank_errors):.4f}")
+    print(f"distinct customers: exact {exact_distinct:,} sketch {hll.count():,} "
+          f"({abs(hll.count() - exact_distinct) / exact_distinct:.2%} error)")
+    found = [item for item, _ in top.top()]
+    print(f"top-10 products recovered: {sum(1 for item, _ in exact_top if item in found)}/10")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,55 @@
+"""
+Benchmark state-mutation throughput with the shared clock service.
+
+The baseline re-creates the previous behaviour, where every mutation did a
+function-local ``from datetime import datetime`` and formatted
+``datetime.now().isoformat()``, often twice.
+
+Usage:
+    python benchmarks/bench_state_mutations.py [iterations]
+"""
+
+import logging
+import os
+import sys
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from orchestrator.state.context_store import ContextStore
+from orchestrator.state.history_manager import HistoryManager
+from orchestrator.state.workflow_state_manager import WorkflowStateManager
+
+def legacy_timestamp(*args):
+    from datetime import datetime
+    return datetime.now().isoformat()
+
+def run(iterations):
+    manager = WorkflowStateManager(ContextStore())
+    history = HistoryManager({"max_history_size": iterations})
+    workflow_id = manager.create_workflow({"request_id": "bench"})
+    
+    start = time.perf_counter()
+    for i in range(iterations):
+        manager.update_workflow(workflow_id, {"status": "running"})
+        history.add_entry({"agent": "analysis", "task": "analyze_data", "confidence_score": 90.0})
+    elapsed = time.perf_counter() - start
+    return iterations / elapsed
+
+def main():
+    logging.disable(logging.CRITICAL)
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    
+    with mock.patch.object(WorkflowStateManager, "_get_timestamp", legacy_timestamp), \
+            mock.patch.object(HistoryManager, "get_timestamp", legacy_timestamp):
+        before = run(iterations)
+    after = run(iterations)
+    
+    print(f"mutations (update_workflow + add_entry): {iterations:,}")
+    print(f"datetime.now().isoformat(): {before:>12,.0f} ops/s")
+    print(f"shared clock:               {after:>12,.0f} ops/s")
+    print(f"speed-up:                   {after / before:>12.2f}x")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
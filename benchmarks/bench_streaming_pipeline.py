@@ -0,0 +1,133 @@
+"""
+Benchmark the streaming workflow against the step-by-step one on a large source.
+
+A SQLite sales table is processed by the Orchestrator three ways, each in
+a fresh process so that peak memory is measured per mode:
+
+- materialized: the extraction reads every row into a batch, which the
+  analysis receives once the extraction has been reviewed
+- sequential: the extraction hands over its batch iterator, which the
+  analysis pulls once the extraction has been reviewed; reading and
+  analyzing alternate
+- streaming: extraction and analysis run together, through a bounded
+  channel; reading overlaps with analyzing, and the first partial result
+  is published after the first batch
+
+Each mode reports the time to the first (partial or final) analysis
+result, the total time of the workflow and the peak resident memory of
+its process. Streaming also reports the channel's largest depth and how
+long the producer waited on the full channel.
+
+Usage:
+    python benchmarks/bench_streaming_pipeline.py [records] [queue size]
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import random
+import resource
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+CHUNK = 100_000
+
+def write_sales(path, count):
+    rng = random.Random(42)
+    regions = ["North", "South", "East", "West"]
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE sales (id INTEGER PRIMARY KEY, customer_id INTEGER, product_id TEXT, quantity INTEGER, "
+        "price REAL, date TEXT, region TEXT)"
+    )
+    for start in range(0, count, CHUNK):
+        connection.executemany("INSERT INTO sales VALUES (?, ?, ?, ?, ?, ?, ?)", [
+            (
+                i,
+                rng.randrange(20000),
+                f"P{rng.randrange(500):03d}",
+                rng.randrange(1, 10),
+                round(rng.uniform(5, 100), 2),
+                f"2023-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}",
+                regions[rng.randrange(4)]
+            )
+            for i in range(start, min(start + CHUNK, count))
+        ])
+    connection.commit()
+    connection.close()
+
+def run_mode(mode, path, queue_size):
+    logging.disable(logging.CRITICAL)
+    from orchestrator.data.pool import close_pools
+    from orchestrator.main import Orchestrator
+    
+    orchestrator = Orchestrator({"stream_queue_size": queue_size})
+    request = {
+        "request_id": f"bench-{mode}",
+        "connector": {"location": path, "table": "sales"},
+        "analysis_type": "sales",
+        "batch_size": 20000,
+        "materialize": mode == "materialized",
+        "streaming": mode == "streaming"
+    }
+    
+    # Time the analysis result of the step-by-step modes as it completes
+    analyzed = []
+    analysis_agent = orchestrator.agents["statistical_analysis"]
+    execute_task = analysis_agent.execute_task
+    
+    async def timed_task(task_name, task_input):
+        result = await execute_task(task_name, task_input)
+        analyzed.append(time.perf_counter())
+        return result
+    
+    analysis_agent.execute_task = timed_task
+    start = time.perf_counter()
+    result = asyncio.run(orchestrator.process_request(request))
+    total = time.perf_counter() - start
+    close_pools()
+    
+    pipeline = result["extraction_result"]["metadata"].get("pipeline")
+    first_result = pipeline["time_to_first_result_seconds"] if pipeline else analyzed[0] - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    return {
+        "first_result": first_result,
+        "total": total,
+        "peak_rss": peak,
+        "pipeline": pipeline
+    }
+
+def main():
+    logging.disable(logging.CRITICAL)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    queue_size = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sales.db")
+        write_sales(path, count)
+        print(f"records: {count:,} ({os.path.getsize(path) / 1e6:.0f} MB), queue size {queue_size}")
+        
+        context = multiprocessing.get_context("spawn")
+        for mode in ("materialized", "sequential", "streaming"):
+            with context.Pool(1) as pool:
+                stats = pool.apply(run_mode, (mode, path, queue_size))
+            line = (
+                f"{mode:>12}: first result {stats['first_result']:7.3f} s  total {stats['total']:7.3f} s  "
+                f"peak RSS {stats['peak_rss'] / 1e6:7.1f} MB"
+            )
+            pipeline = stats["pipeline"]
+            if pipeline:
+                line += (
+                    f"  batches {pipeline['batches']}  max depth {pipeline['max_depth']}  "
+                    f"producer wait {pipeline['producer_wait_seconds']:.3f} s  "
+                    f"peak buffered {pipeline['peak_buffered_bytes'] / 1e6:.1f} MB"
+                )
+            print(line)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,85 @@
+"""
+Benchmark TF-IDF mini-batch k-means topic clustering.
+
+Reports tokenization, clustering time and corpus memory, then simulates a
+daily append of 1% new documents to show the corpus cache only tokenizing
+the new ones.
+
+Usage:
+    python benchmarks/bench_text_clustering.py [documents] [clusters]
+"""
+
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from orchestrator.analysis.text_clustering import CorpusCache, TextCorpus, cluster_texts
+
+THEMES = [
+    ["delivery", "late", "shipping", "package", "courier", "tracking", "arrived"],
+    ["price", "expensive", "cost", "discount", "value", "refund", "charge"],
+    ["app", "crash", "login", "screen", "update", "button", "slow"],
+    ["support", "agent", "call", "waited", "rude", "helpful", "email"],
+    ["quality", "broken", "material", "durable", "cheap", "stitching", "fabric"]
+]
+FILLER = ["really", "very", "today", "again", "order", "item", "product", "great", "bad", "okay"]
+
+def make_texts(count, seed=42):
+    rng = random.Random(seed)
+    texts = []
+    for i in range(count):
+        theme = THEMES[rng.randrange(len(THEMES))]
+        words = [rng.choice(theme) for _ in range(6)] + [rng.choice(FILLER) for _ in range(6)]
+        rng.shuffle(words)
+        texts.append(" ".join(words))
+    return texts
+
+def corpus_bytes(corpus):
+    return sum(
+        len(buffer) * buffer.itemsize
+        for buffer in (corpus.indptr, corpus.indices, corpus.counts, corpus.document_frequency)
+    )
+
+def main():
+    logging.disable(logging.CRITICAL)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    clusters = int(sys.argv[2]) if len(sys.argv) > 2 else len(THEMES)
+    texts = make_texts(count)
+    
+    start = time.perf_counter()
+    corpus = TextCorpus()
+    corpus.add(texts)
+    tokenize_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    result = cluster_texts(texts, clusters, corpus=corpus)
+    cluster_time = time.perf_counter() - start
+    
+    print(f"documents: {count:,}  clusters: {clusters}  vocabulary: {len(corpus.terms):,}")
+    print(f"tokenize:  {tokenize_time:7.2f} s")
+    print(f"cluster:   {cluster_time:7.2f} s  ({count / cluster_time:,.0f} docs/s)")
+    print(f"corpus:    {corpus_bytes(corpus) / 1e6:7.1f} MB in CSR arrays "
+          f"(dense float64 matrix would be {count * len(corpus.terms) * 8 / 1e6:,.0f} MB)")
+    for topic in result["topics"]:
+        print(f"  {topic['name']:<40} {result['labels'].count(result['topics'].index(topic)):>9,}")
+    
+    appended = texts + make_texts(max(count // 100, 1), seed=7)
+    with tempfile.TemporaryDirectory() as directory:
+        cache = CorpusCache(directory)
+        cache.load("feedback", texts)
+        start = time.perf_counter()
+        cache.load("feedback", appended)
+        cached_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    TextCorpus().add(appended)
+    rebuild_time = time.perf_counter() - start
+    print(f"daily 1% append: cached {cached_time:.2f} s vs re-tokenize {rebuild_time:.2f} s")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
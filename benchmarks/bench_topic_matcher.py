@@ -0,0 +1,77 @@
+"""
+Benchmark the compiled keyword matcher against per-keyword substring scans.
+
+The baseline reproduces the previous ``cluster_topics`` loop, which
+lowercased each text once per keyword of every topic. It is too slow to run
+on the full corpus, so it is timed on a sample and extrapolated; both are
+checked to assign the sample identically.
+
+Usage:
+    python benchmarks/bench_topic_matcher.py [texts] [topics]
+"""
+
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from orchestrator.analysis.topic_matcher import KeywordMatcher
+
+def legacy_assign(texts, topics):
+    assigned = []
+    for text in texts:
+        scores = []
+        for topic in topics:
+            score = sum(1 for keyword in topic["keywords"] if keyword.lower() in text.lower())
+            scores.append((topic["name"], score))
+        assigned.append(max(scores, key=lambda x: x[1])[0] if scores else "Uncategorized")
+    distribution = {
+        topic["name"]: sum(1 for name in assigned if name == topic["name"]) for topic in topics
+    }
+    return assigned, distribution
+
+def make_corpus(texts, topics):
+    rng = random.Random(42)
+    syllables = ["ka", "lo", "mi", "ne", "tu", "ra", "so", "vi", "de", "po", "shi", "gu"]
+    vocabulary = list({
+        "".join(rng.choice(syllables) for _ in range(rng.randrange(2, 5))) for _ in range(20000)
+    })
+    topic_list = [
+        {"name": f"Topic {i}", "keywords": rng.sample(vocabulary, 6)} for i in range(topics)
+    ]
+    # Zipf-like word frequencies, as in natural text
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+    words = rng.choices(vocabulary, weights=weights, k=texts * 15)
+    corpus = [" ".join(words[i * 15:(i + 1) * 15]).capitalize() + "." for i in range(texts)]
+    return corpus, topic_list
+
+def main():
+    logging.disable(logging.CRITICAL)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    topics = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    corpus, topic_list = make_corpus(count, topics)
+    sample = corpus[:min(count, 5000)]
+    
+    start = time.perf_counter()
+    legacy, _ = legacy_assign(sample, topic_list)
+    legacy_time = (time.perf_counter() - start) * count / len(sample)
+    
+    start = time.perf_counter()
+    matcher = KeywordMatcher(topic_list)
+    assigned = matcher.assign_all(corpus)
+    distribution = matcher.distribution(assigned)
+    matcher_time = time.perf_counter() - start
+    
+    identical = [matcher.names[i] for i in assigned[:len(sample)]] == legacy
+    print(f"texts: {count:,}  topics: {topics}  keywords: {topics * 6:,}")
+    print(f"substring scans:  {legacy_time:8.2f} s (extrapolated from {len(sample):,} texts)")
+    print(f"compiled matcher: {matcher_time:8.2f} s")
+    print(f"speed-up:         {legacy_time / matcher_time:8.1f}x")
+    print(f"identical assignments on sample: {identical}")
+    print(f"topics with documents: {sum(1 for n in distribution.values() if n)}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
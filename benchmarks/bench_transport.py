@@ -0,0 +1,106 @@
+"""
+Benchmark the transport format against pickle and JSON for an extraction result.
+
+An extraction result of sales records is serialized and deserialized as a
+stage in another process would receive it:
+
+- json: the records as a JSON array of objects
+- pickle records: the records as a pickled list of dictionaries
+- pickle batch: the columnar record batch, pickled
+- transport <codec>: the payload with the batch as a transport frame,
+  for every codec available here (zstd and LZ4 when installed, zlib, none);
+  decoded with ``copy=False`` (columns are views of the payload) and with
+  ``copy=True``
+
+Each method reports the payload size, and the time and throughput (in
+rows/s) to serialize and to deserialize. Deserialized records are checked
+against the originals.
+
+Usage:
+    python benchmarks/bench_transport.py [records] [repeats]
+"""
+
+import json
+import logging
+import os
+import pickle
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from orchestrator.data.record_batch import RecordBatch
+from orchestrator.data.transport import available_codecs, decode_payload, encode_payload
+
+def make_records(count):
+    rng = random.Random(42)
+    regions = ["North", "South", "East", "West"]
+    return [
+        {
+            "id": i,
+            "customer_id": rng.randrange(20000),
+            "product_id": f"P{rng.randrange(500):03d}",
+            "quantity": rng.randrange(1, 10),
+            "price": round(rng.uniform(5, 100), 2),
+            "date": f"2023-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}",
+            "region": regions[rng.randrange(4)]
+        }
+        for i in range(count)
+    ]
+
+def best_time(function, repeats):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+def main():
+    logging.disable(logging.CRITICAL)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    
+    records = make_records(count)
+    batch = RecordBatch.from_records(records)
+    metadata = {"source": "sales", "record_count": count}
+    print(f"records: {count:,}, batch columns {batch.nbytes / 1e6:.1f} MB, codecs: {', '.join(available_codecs())}")
+    
+    methods = {
+        "json": (
+            lambda: json.dumps({"data": records, "metadata": metadata}).encode("utf-8"),
+            [("", lambda data: json.loads(data)["data"])]
+        ),
+        "pickle records": (
+            lambda: pickle.dumps({"data": records, "metadata": metadata}, protocol=pickle.HIGHEST_PROTOCOL),
+            [("", lambda data: pickle.loads(data)["data"])]
+        ),
+        "pickle batch": (
+            lambda: pickle.dumps({"data": batch, "metadata": metadata}, protocol=pickle.HIGHEST_PROTOCOL),
+            [("", lambda data: pickle.loads(data)["data"])]
+        )
+    }
+    for codec in available_codecs():
+        methods[f"transport {codec}"] = (
+            lambda codec=codec: encode_payload({"data": batch, "metadata": metadata}, codec),
+            [
+                (" (view)", lambda data: decode_payload(data)["data"]),
+                (" (copy)", lambda data: decode_payload(data, copy=True)["data"])
+            ]
+        )
+    
+    for name, (serialize, deserializers) in methods.items():
+        data, encode_time = best_time(serialize, repeats)
+        for label, deserialize in deserializers:
+            decoded, decode_time = best_time(lambda: deserialize(data), repeats)
+            same = decoded[:1000] == records[:1000] if isinstance(decoded, list) else decoded[:1000].to_records() == records[:1000]
+            print(
+                f"{name + label:>24}: {len(data) / 1e6:7.1f} MB  "
+                f"serialize {encode_time:6.3f} s ({count / encode_time:12,.0f} rows/s)  "
+                f"deserialize {decode_time:6.3f} s ({count / decode_time:14,.0f} rows/s)  same: {same}"
+            )
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -6,6 +6,9 @@ import logging
 from abc import ABC, abstractmethod
 from typing import Dict, Any, List, Optional
 
+from orchestrator.utils import clock
+from orchestrator.utils.process_pool import ProcessPool
+
 logger = logging.getLogger(__name__)
 
 class Agent(ABC):
@@ -24,6 +27,15 @@ class Agent(ABC):
         self.name = name or self.__class__.__name__
         self.config = config or {}
         self.supported_tasks = self._get_supported_tasks()
+        self.cpu_bound_tasks = set(self._get_cpu_bound_tasks())
+        
+        # CPU-bound tasks run in worker processes when task_processes > 0
+        self.process_pool: Optional[ProcessPool] = None
+        if self.config.get("task_processes", 0) > 0:
+            self.process_pool = ProcessPool(
+                self.config["task_processes"],
+                self.config.get("shared_memory_min_bytes", 1 << 20)
+            )
         logger.info("Agent %s initialized with %d supported tasks", self.name, len(self.supported_tasks))
     
     @abstractmethod
@@ -36,6 +48,15 @@ class Agent(ABC):
         """
         pass
     
+    def _get_cpu_bound_tasks(self) -> List[str]:
+        """
+        Get the tasks that are CPU-bound and may run in a worker process.
+        
+        Returns:
+            List of task names
+        """
+        return []
+    
     async def execute_task(self, task_name: str, task_input: Dict[str, Any]) -> Dict[str, Any]:
         """
         Execute a task with the given input.
@@ -43,10 +64,10 @@ class Agent(ABC):
         Args:
             task_name: Name of the task to execute
             task_input: Input data for the task
-            
+        
         Returns:
             The result of the task execution
-            
+        
         Raises:
             ValueError: If the task is not supported by this agent
         """
@@ -55,11 +76,50 @@ class Agent(ABC):
         
         logger.info("Agent %s executing task %s", self.name, task_name)
         
-        # Get the task method
-        task_method = getattr(self, task_name)
-        
-        # Execute the task
-        result = await task_method(task_input)
+        if self._should_offload(task_name, task_input):
+            # Keep the event loop free for other workflows
+            logger.info("Agent %s running task %s in a worker process", self.name, task_name)
+            result = await self.process_pool.run_task(type(self), self.config, task_name, task_input)
+        else:
+            # Get the task method
+            task_method = getattr(self, task_name)
+            
+            # Execute the task
+            result = await task_method(task_input)
         
         logger.info("Agent %s completed task %s", self.name, task_name)
-        return result
\ No newline at end of file
+        return result
+    
+    def _should_offload(self, task_name: str, task_input: Dict[str, Any]) -> bool:
+        """
+        Decide whether a task runs in the process pool.
+        
+        Streamed inputs stay in process, and so do inputs too small to be
+        worth sending to a worker.
+        
+        Args:
+            task_name: Name of the task
+            task_input: Input data for the task
+        
+        Returns:
+            True if the task should run in a worker process
+        """
+        if self.process_pool is None or task_name not in self.cpu_bound_tasks:
+            return False
+        if task_input.get("batches") is not None:
+            return False
+        return len(task_input.get("data") or ()) >= self.config.get("process_min_records", 10000)
+    
+    def shutdown(self) -> None:
+        """Stop the worker processes of the agent's process pool, if any."""
+        if self.process_pool is not None:
+            self.process_pool.shutdown()
+    
+    def _get_timestamp(self) -> clock.Timestamp:
+        """
+        Get the current timestamp.
+        
+        Returns:
+            Current timestamp, an ISO 8601 string that also carries epoch seconds
+        """
+        return clock.now()
\ No newline at end of file
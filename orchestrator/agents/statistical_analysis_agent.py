@@ -4,11 +4,23 @@ Statistical Analysis Agent for analyzing data and generating insights.
 
 import logging
 import asyncio
+import functools
 import random
-from typing import Dict, Any, List, Optional
-from collections import defaultdict
+from typing import Dict, Any, Callable, List, Optional, Sequence, Tuple, Union, AsyncIterator, Iterable
 
 from orchestrator.agents.base_agent import Agent
+from orchestrator.analysis.aggregation import ColumnarFrame, column_sum, count_sentiment
+from orchestrator.analysis.anomaly import AnomalyDetector, StreamingAnomalyDetector
+from orchestrator.analysis.incremental import AnalysisCache, analyze_incremental
+from orchestrator.analysis.online import OnlineAnalysis, create_online_analysis
+from orchestrator.analysis.parallel import analyze_partitioned
+from orchestrator.analysis.schema import get_schema_registry
+from orchestrator.analysis.sketches import SketchSummary
+from orchestrator.analysis.text_clustering import CorpusCache, cluster_texts
+from orchestrator.analysis.topic_matcher import KeywordMatcher
+from orchestrator.data.query_plan import QueryPlan
+from orchestrator.data.record_batch import RecordBatch
+from orchestrator.utils.process_pool import ProcessPool
 
 logger = logging.getLogger(__name__)
 
@@ -23,8 +35,24 @@ class StatisticalAnalysisAgent(Agent):
         
         Args:
             config: Configuration dictionary for the agent
+        
+        Raises:
+            ValueError: If incremental analysis runs in worker processes
+                without an analysis cache directory
         """
         super().__init__("StatisticalAnalysisAgent", config)
+        self.schemas = get_schema_registry()
+        # Sketch-based "approximate_statistics" cost a pass over every row
+        self.approximate_statistics = bool(self.config.get("approximate_statistics", False))
+        # Workers for partitioned analyses, started on first use
+        self.partition_pool: Optional[ProcessPool] = None
+        self.analysis_cache: Optional[AnalysisCache] = None
+        if self.config.get("incremental_analysis"):
+            # Each worker analyzes with its own agent, so offloaded analyses
+            # only reuse partitions through a cache on disk
+            if self.process_pool is not None and not self.config.get("analysis_cache_dir"):
+                raise ValueError("Incremental analysis with task_processes > 0 requires analysis_cache_dir")
+            self.analysis_cache = AnalysisCache(self.config.get("analysis_cache_dir"))
     
     def _get_supported_tasks(self) -> List[str]:
         """
@@ -35,86 +63,226 @@ class StatisticalAnalysisAgent(Agent):
         """
         return ["analyze_data", "detect_anomalies", "generate_insights", "cluster_topics"]
     
+    def _get_cpu_bound_tasks(self) -> List[str]:
+        """
+        Get the tasks that are CPU-bound and may run in a worker process.
+        
+        Returns:
+            List of task names
+        """
+        return ["analyze_data", "detect_anomalies", "cluster_topics"]
+    
+    def shutdown(self) -> None:
+        """Stop the worker processes of the agent's process pools, if any."""
+        super().shutdown()
+        if self.partition_pool is not None:
+            self.partition_pool.shutdown()
+            self.partition_pool = None
+    
     async def analyze_data(self, extraction_result: Dict[str, Any]) -> Dict[str, Any]:
         """
         Analyze the extracted data to generate statistical insights.
         
         Args:
             extraction_result: Result from the data extraction agent
-            
+        
         Returns:
             Analysis results
         """
+        # Batches from a streaming extraction are analyzed incrementally
+        if extraction_result.get("batches") is not None:
+            return await self.analyze_stream(
+                extraction_result["batches"],
+                extraction_result.get("metadata", {}),
+                on_partial=extraction_result.get("on_partial_result"),
+                partial_every=self.config.get("partial_result_every", 10)
+            )
+        
         data = extraction_result.get("data", [])
         logger.info("Analyzing data with %d records", len(data))
         
         # Simulate analysis
         await asyncio.sleep(2)  # Simulate processing time
         
-        # Determine the type of data and perform appropriate analysis
-        if any("feedback" in item for item in data if isinstance(item, dict)):
+        source_metadata = extraction_result.get("metadata", {})
+        schema = self.schemas.resolve(data, source_metadata)
+        incremental = None
+        
+        processes = self.config.get("analysis_processes", 1)
+        if self.analysis_cache is not None and source_metadata.get("source"):
+            # Re-analyze only the partitions that changed since the last run;
+            # fingerprints from the source only apply to the same partitioning
+            partition_field = self.config.get("analysis_partition_field", "date")
+            fingerprints = None
+            if source_metadata.get("partition_field", partition_field) == partition_field:
+                fingerprints = source_metadata.get("partition_fingerprints")
+            # Extracts of different plans hold different rows and columns
+            source = str(source_metadata["source"])
+            if source_metadata.get("query_plan"):
+                source = f"{source}#{QueryPlan.from_dict(source_metadata['query_plan']).digest()}"
+            loop = asyncio.get_running_loop()
+            analysis, incremental = await loop.run_in_executor(
+                None,
+                functools.partial(
+                    analyze_incremental,
+                    self.analysis_cache,
+                    source,
+                    data,
+                    schema.kind,
+                    partition_field=partition_field,
+                    bucket=self.config.get("analysis_partition_bucket", "day"),
+                    fingerprints=fingerprints,
+                    sketches=self.approximate_statistics
+                )
+            )
+            analysis_results = analysis.result()
+        # Large datasets can be split across processes and the partial
+        # aggregates merged. Sums are exact, so they match a single process
+        # whatever the split; each partition builds its own sketches, which
+        # are merged like the sums and stay within their error bounds.
+        elif processes > 1 and len(data) >= self.config.get("parallel_min_records", 100000):
+            if self.partition_pool is None:
+                self.partition_pool = ProcessPool(processes)
+            loop = asyncio.get_running_loop()
+            analysis = await loop.run_in_executor(
+                None,
+                functools.partial(
+                    analyze_partitioned,
+                    # Partitions are sent to the workers as columns
+                    data if isinstance(data, RecordBatch) else RecordBatch.from_records(data),
+                    processes,
+                    schema.kind,
+                    executor=self.partition_pool.executor(),
+                    sketches=self.approximate_statistics
+                )
+            )
+            analysis_results = analysis.result()
+        # Perform the analysis for the type of data; the columns of a
+        # RecordBatch are aggregated without building rows
+        elif schema.kind == "feedback":
             analysis_results = await self._analyze_feedback_data(data)
-        elif any("product_id" in item for item in data if isinstance(item, dict)):
+        elif schema.kind == "sales":
             analysis_results = await self._analyze_sales_data(data)
         else:
             analysis_results = await self._analyze_generic_data(data)
         
+        metadata = {
+            "source_metadata": source_metadata,
+            "analysis_timestamp": self._get_timestamp(),
+            "analysis_methods": ["descriptive_statistics", "trend_analysis", "pattern_recognition"],
+            "schema": schema.to_dict()
+        }
+        if incremental is not None:
+            metadata["incremental"] = incremental
+        
         return {
             "analysis_results": analysis_results,
-            "metadata": {
-                "source_metadata": extraction_result.get("metadata", {}),
-                "analysis_timestamp": self._get_timestamp(),
-                "analysis_methods": ["descriptive_statistics", "trend_analysis", "pattern_recognition"]
-            }
+            "metadata": metadata
         }
     
-    async def detect_anomalies(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    async def analyze_stream(
+        self,
+        batches: Union[AsyncIterator[List[Dict[str, Any]]], Iterable[List[Dict[str, Any]]]],
+        source_metadata: Optional[Dict[str, Any]] = None,
+        analysis: Optional[OnlineAnalysis] = None,
+        on_partial: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        partial_every: int = 10
+    ) -> Dict[str, Any]:
         """
-        Detect anomalies in the data.
+        Analyze record batches as they arrive, in constant memory.
         
         Args:
-            data: Data to analyze for anomalies
-            
+            batches: Async iterator (or iterable) of record batches
+            source_metadata: Metadata of the extraction that produced the batches
+            analysis: Optional online analysis to fold batches into; pass one in
+                to read intermediate results with its ``result()`` method while
+                the stream is being consumed. By default the kind is detected
+                from the first batch.
+            on_partial: Optional callback given the results so far, with the
+                records and batches they cover, after the first batch and then
+                every ``partial_every`` batches
+            partial_every: Batches between partial results
+        
         Returns:
-            Detected anomalies
+            Analysis results with the same schema as analyze_data
         """
-        logger.info("Detecting anomalies in data")
-        
-        # Simulate anomaly detection
-        await asyncio.sleep(1.5)
-        
-        # In a real implementation, this would use statistical methods to detect anomalies
-        # For demonstration, we'll randomly flag some items as anomalies
-        items = data.get("data", [])
-        anomalies = []
-        
-        for item in items:
-            if random.random() < 0.2:  # 20% chance of being flagged as anomaly
-                anomalies.append({
-                    "item": item,
-                    "anomaly_score": random.uniform(0.7, 0.95),
-                    "reason": random.choice([
-                        "Outlier value detected",
-                        "Unusual pattern",
-                        "Statistical deviation",
-                        "Inconsistent with historical data"
-                    ])
+        logger.info("Analyzing streamed data")
+        schema = None
+        
+        async for batch in _iterate_batches(batches):
+            if analysis is None:
+                schema = self.schemas.resolve(batch, source_metadata)
+                analysis = create_online_analysis(schema.kind, self.approximate_statistics)
+            analysis.update(batch)
+            if on_partial is not None and (analysis.batch_count - 1) % max(partial_every, 1) == 0:
+                on_partial({
+                    "analysis_results": analysis.result(),
+                    "records": analysis.record_count,
+                    "batches": analysis.batch_count
                 })
+            # Let other workflows run between batches
+            await asyncio.sleep(0)
+        
+        if analysis is None:
+            analysis = create_online_analysis("generic", self.approximate_statistics)
+        
+        logger.info(
+            "Analyzed %d records in %d batches",
+            analysis.record_count, analysis.batch_count
+        )
+        
+        metadata = {
+            "source_metadata": source_metadata or {},
+            "analysis_timestamp": self._get_timestamp(),
+            "analysis_methods": ["descriptive_statistics", "trend_analysis", "streaming_aggregation"],
+            "batches_processed": analysis.batch_count
+        }
+        if schema is not None:
+            metadata["schema"] = schema.to_dict()
         
         return {
-            "anomalies": anomalies,
-            "anomaly_count": len(anomalies),
-            "total_items": len(items),
-            "anomaly_percentage": len(anomalies) / len(items) if items else 0
+            "analysis_results": analysis.result(),
+            "metadata": metadata
         }
     
+    async def detect_anomalies(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Detect anomalies in the data.
+        
+        Records are checked with robust z-scores, IQR fences and per-group
+        robust z-scores (by region, product or category), and the daily totals
+        with a rolling-window deviation test. Batches from a streaming
+        extraction are scored incrementally.
+        
+        Args:
+            data: Data to analyze for anomalies, with "data" records or
+                "batches", and an optional "detector_config"
+        
+        Returns:
+            Detected anomalies
+        """
+        logger.info("Detecting anomalies in data")
+        config = {**self.config.get("anomaly_detection", {}), **data.get("detector_config", {})}
+        
+        if data.get("batches") is not None:
+            detector = StreamingAnomalyDetector(config)
+            anomalies = []
+            async for batch in _iterate_batches(data["batches"]):
+                anomalies.extend(detector.update(batch))
+                await asyncio.sleep(0)
+            return {"anomalies": anomalies, **detector.summary()}
+        
+        # Detection is CPU-bound; keep the event loop responsive
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, AnomalyDetector(config).detect, data.get("data", []))
+    
     async def generate_insights(self, analysis_results: Dict[str, Any]) -> Dict[str, Any]:
         """
         Generate business insights from analysis results.
         
         Args:
             analysis_results: Results of data analysis
-            
+        
         Returns:
             Generated insights
         """
@@ -146,28 +314,82 @@ class StatisticalAnalysisAgent(Agent):
         """
         Cluster text data into topics.
         
+        By default topics are discovered with TF-IDF and mini-batch k-means
+        (``n_clusters`` topics, 5 unless configured). When a topic vocabulary
+        is given in "topics", or "method" is "keywords", documents are
+        assigned to the best-matching topic by keyword instead.
+        
         Args:
-            text_data: Text data to cluster
-            
+            text_data: Text data to cluster, with optional "topics", "method",
+                "n_clusters" and "corpus_key" (reuses the tokenized corpus
+                cached under that key when a corpus_cache_dir is configured)
+        
         Returns:
             Topic clusters
         """
         logger.info("Clustering text data into topics")
         
-        # Simulate topic clustering
-        await asyncio.sleep(2.2)
-        
-        # In a real implementation, this would use NLP techniques like LDA or BERTopic
         items = text_data.get("data", [])
         
-        # Extract text fields
+        # Extract text fields; a batch's text column is read directly
         texts = []
-        for item in items:
-            if isinstance(item, dict) and "feedback" in item:
-                texts.append(item["feedback"])
+        if isinstance(items, RecordBatch):
+            texts = [text for text in items.columns.get("feedback", ()) if text is not None]
+        else:
+            for item in items:
+                if isinstance(item, dict) and "feedback" in item:
+                    texts.append(item["feedback"])
+        
+        if text_data.get("topics") or text_data.get("method") == "keywords":
+            return self._match_topics(texts, text_data.get("topics"))
+        
+        n_clusters = text_data.get("n_clusters", self.config.get("topic_clusters", 5))
+        # Loading the corpus and clustering read files and are CPU-bound;
+        # keep the event loop responsive
+        loop = asyncio.get_running_loop()
+        corpus = None
+        if self.config.get("corpus_cache_dir") and text_data.get("corpus_key"):
+            cache = CorpusCache(self.config["corpus_cache_dir"])
+            corpus = await loop.run_in_executor(None, functools.partial(cache.load, text_data["corpus_key"], texts))
+        
+        clustering = await loop.run_in_executor(
+            None, functools.partial(cluster_texts, texts, n_clusters, corpus=corpus)
+        )
+        
+        topics = clustering["topics"]
+        topic_assignments = [
+            {
+                "document_id": i,
+                "text": text,
+                "assigned_topic": topics[label]["name"] if label >= 0 else "Uncategorized",
+                "confidence": similarity
+            }
+            for i, (text, label, similarity) in enumerate(
+                zip(texts, clustering["labels"], clustering["similarities"])
+            )
+        ]
+        distribution = {topic["name"]: 0 for topic in topics}
+        for assignment in topic_assignments:
+            distribution[assignment["assigned_topic"]] = distribution.get(assignment["assigned_topic"], 0) + 1
+        
+        return {
+            "topics": topics,
+            "assignments": topic_assignments,
+            "topic_distribution": distribution
+        }
+    
+    def _match_topics(self, texts: List[str], topics: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Assign texts to the best-matching topic of a keyword vocabulary.
         
-        # Generate sample topics
-        sample_topics = [
+        Args:
+            texts: Texts to assign
+            topics: Topics with "name" and "keywords"; sample topics by default
+        
+        Returns:
+            Topic clusters
+        """
+        sample_topics = topics or [
             {"name": "Product Quality", "keywords": ["quality", "product", "good", "great", "excellent", "poor"]},
             {"name": "Customer Service", "keywords": ["service", "customer", "support", "help", "responsive"]},
             {"name": "Pricing", "keywords": ["price", "expensive", "cheap", "cost", "worth"]},
@@ -175,180 +397,141 @@ class StatisticalAnalysisAgent(Agent):
             {"name": "User Experience", "keywords": ["website", "app", "navigate", "easy", "difficult", "interface"]}
         ]
         
-        # Assign documents to topics (in a real system, this would be done using NLP)
-        topic_assignments = []
-        for i, text in enumerate(texts):
-            # Simple keyword matching for demonstration
-            scores = []
-            for topic in sample_topics:
-                score = sum(1 for keyword in topic["keywords"] if keyword.lower() in text.lower())
-                scores.append((topic["name"], score))
-            
-            # Assign to highest scoring topic
-            assigned_topic = max(scores, key=lambda x: x[1])[0] if scores else "Uncategorized"
-            
-            topic_assignments.append({
+        # Score every topic in one pass per document
+        matcher = KeywordMatcher(sample_topics)
+        assigned = matcher.assign_all(texts)
+        
+        topic_assignments = [
+            {
                 "document_id": i,
                 "text": text,
-                "assigned_topic": assigned_topic,
+                "assigned_topic": matcher.names[index] if index >= 0 else "Uncategorized",
                 "confidence": random.uniform(0.7, 0.95)
-            })
+            }
+            for i, (text, index) in enumerate(zip(texts, assigned))
+        ]
         
         return {
             "topics": sample_topics,
             "assignments": topic_assignments,
-            "topic_distribution": {
-                topic["name"]: sum(1 for a in topic_assignments if a["assigned_topic"] == topic["name"])
-                for topic in sample_topics
-            }
+            "topic_distribution": matcher.distribution(assigned)
         }
     
-    async def _analyze_feedback_data(self, data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    async def _analyze_feedback_data(self, data: Union[Sequence[Any], ColumnarFrame]) -> Dict[str, Any]:
         """
         Analyze customer feedback data.
         
         Args:
-            data: Customer feedback data
-            
+            data: Customer feedback records or columns
+        
         Returns:
             Analysis results
         """
+        frame, ratings = _analysis_columns("feedback", data, self.approximate_statistics)
+        
         # Calculate sentiment distribution
-        ratings = [item.get("rating", 0) for item in data]
+        positive, neutral, negative = count_sentiment(ratings)
         sentiment_distribution = {
-            "positive": sum(1 for r in ratings if r >= 4) / len(ratings) if ratings else 0,
-            "neutral": sum(1 for r in ratings if r == 3) / len(ratings) if ratings else 0,
-            "negative": sum(1 for r in ratings if r <= 2) / len(ratings) if ratings else 0
+            "positive": positive / len(frame) if len(frame) else 0,
+            "neutral": neutral / len(frame) if len(frame) else 0,
+            "negative": negative / len(frame) if len(frame) else 0
         }
         
         # Calculate average rating
-        avg_rating = sum(ratings) / len(ratings) if ratings else 0
-        
-        # Group by date
-        from collections import defaultdict
-        date_groups = defaultdict(list)
-        for item in data:
-            date = item.get("date", "unknown")
-            date_groups[date].append(item)
+        avg_rating = column_sum(ratings) / len(frame) if len(frame) else 0
         
         # Calculate trend over time
-        trend_data = {
-            date: sum(item.get("rating", 0) for item in items) / len(items) if items else 0
-            for date, items in date_groups.items()
-        }
+        trend_data = frame.group_mean("date", ratings)
         
-        return {
+        results = {
             "sentiment_distribution": sentiment_distribution,
             "average_rating": avg_rating,
             "rating_trend": trend_data,
-            "sample_size": len(data)
+            "sample_size": len(frame)
         }
+        if self.approximate_statistics:
+            # Rating quantiles, distinct customers and most-reviewed products
+            results["approximate_statistics"] = _summarize_sketches("feedback", frame, ratings)
+        return results
     
-    async def _analyze_sales_data(self, data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    async def _analyze_sales_data(self, data: Union[Sequence[Any], ColumnarFrame]) -> Dict[str, Any]:
         """
         Analyze sales data.
         
         Args:
-            data: Sales data
-            
+            data: Sales records or columns
+        
         Returns:
             Analysis results
         """
-        # Calculate total sales
-        total_sales = sum(item.get("quantity", 0) * item.get("price", 0) for item in data)
-        
-        # Group by product
-        from collections import defaultdict
-        product_groups = defaultdict(list)
-        for item in data:
-            product_id = item.get("product_id", "unknown")
-            product_groups[product_id].append(item)
-        
-        # Calculate sales by product
-        sales_by_product = {
-            product_id: sum(item.get("quantity", 0) * item.get("price", 0) for item in items)
-            for product_id, items in product_groups.items()
-        }
-        
-        # Group by region
-        region_groups = defaultdict(list)
-        for item in data:
-            region = item.get("region", "unknown")
-            region_groups[region].append(item)
-        
-        # Calculate sales by region
-        sales_by_region = {
-            region: sum(item.get("quantity", 0) * item.get("price", 0) for item in items)
-            for region, items in region_groups.items()
-        }
-        
-        # Group by date
-        date_groups = defaultdict(list)
-        for item in data:
-            date = item.get("date", "unknown")
-            date_groups[date].append(item)
-        
-        # Calculate trend over time
-        trend_data = {
-            date: sum(item.get("quantity", 0) * item.get("price", 0) for item in items)
-            for date, items in date_groups.items()
-        }
-        
-        return {
-            "total_sales": total_sales,
-            "sales_by_product": sales_by_product,
-            "sales_by_region": sales_by_region,
-            "sales_trend": trend_data,
-            "sample_size": len(data)
+        # Compute revenue once and reuse it for every grouping
+        frame, revenue = _analysis_columns("sales", data, self.approximate_statistics)
+        
+        results = {
+            "total_sales": column_sum(revenue),
+            "sales_by_product": frame.group_sum("product_id", revenue),
+            "sales_by_region": frame.group_sum("region", revenue),
+            "sales_trend": frame.group_sum("date", revenue),
+            "sample_size": len(frame)
         }
+        if self.approximate_statistics:
+            # Revenue quantiles, distinct products and customers, top products
+            results["approximate_statistics"] = _summarize_sketches("sales", frame, revenue)
+        return results
     
-    async def _analyze_generic_data(self, data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    async def _analyze_generic_data(self, data: Union[Sequence[Any], ColumnarFrame]) -> Dict[str, Any]:
         """
         Analyze generic data.
         
         Args:
-            data: Generic data
-            
+            data: Generic records or columns
+        
         Returns:
             Analysis results
         """
-        # Extract numeric values
-        values = []
-        for item in data:
-            if isinstance(item, dict) and "value" in item:
-                values.append(item["value"])
+        frame, values = _analysis_columns("generic", data, self.approximate_statistics)
         
         # Calculate basic statistics
-        avg_value = sum(values) / len(values) if values else 0
+        avg_value = column_sum(values) / len(values) if values else 0
         min_value = min(values) if values else 0
         max_value = max(values) if values else 0
         
         # Group by category if available
-        category_groups = defaultdict(list)
-        for item in data:
-            if isinstance(item, dict) and "category" in item:
-                category = item["category"]
-                category_groups[category].append(item)
+        categorized = [
+            (category, 0 if value is None or value != value else value)
+            for category, value in zip(frame.columns["category"], frame.columns["value"])
+            if category is not None
+        ]
+        category_frame = ColumnarFrame({
+            "category": [category for category, _ in categorized],
+            "value": [value for _, value in categorized]
+        }, len(categorized))
         
         # Calculate statistics by category
         category_stats = {
             category: {
-                "count": len(items),
-                "avg_value": sum(item.get("value", 0) for item in items) / len(items) if items else 0,
-                "min_value": min(item.get("value", 0) for item in items) if items else 0,
-                "max_value": max(item.get("value", 0) for item in items) if items else 0
+                "count": stats["count"],
+                "avg_value": stats["sum"] / stats["count"],
+                "min_value": stats["min"],
+                "max_value": stats["max"]
             }
-            for category, items in category_groups.items()
+            for category, stats in category_frame.group_stats(
+                "category", category_frame.numeric("value")
+            ).items()
         }
         
-        return {
+        results = {
             "average_value": avg_value,
             "min_value": min_value,
             "max_value": max_value,
             "value_range": max_value - min_value if values else 0,
             "category_statistics": category_stats,
-            "sample_size": len(data)
+            "sample_size": len(frame)
         }
+        if self.approximate_statistics:
+            # Value quantiles, distinct and most frequent categories
+            results["approximate_statistics"] = _summarize_sketches("generic", frame, values)
+        return results
     
     def _generate_feedback_insights(self, results: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
@@ -356,7 +539,7 @@ class StatisticalAnalysisAgent(Agent):
         
         Args:
             results: Feedback analysis results
-            
+        
         Returns:
             List of insights
         """
@@ -413,7 +596,7 @@ class StatisticalAnalysisAgent(Agent):
         
         Args:
             results: Sales analysis results
-            
+        
         Returns:
             List of insights
         """
@@ -476,7 +659,7 @@ class StatisticalAnalysisAgent(Agent):
         
         Args:
             results: Generic analysis results
-            
+        
         Returns:
             List of insights
         """
@@ -507,13 +690,98 @@ class StatisticalAnalysisAgent(Agent):
                 })
         
         return insights
+
+# Columns each analysis kind reads, with the value of rows that lack them
+_ANALYSIS_FIELDS = {
+    "feedback": {"rating": 0, "date": "unknown", "customer_id": None, "product_id": None},
+    "sales": {
+        "quantity": 0,
+        "price": 0,
+        "product_id": "unknown",
+        "region": "unknown",
+        "date": "unknown",
+        "customer_id": None
+    },
+    "generic": {"value": None, "category": None}
+}
+
+# Fields only the sketches read
+_SKETCH_FIELDS = {"feedback": ("customer_id", "product_id"), "sales": ("customer_id",), "generic": ()}
+
+def _analysis_columns(
+    kind: str,
+    data: Union[Sequence[Any], ColumnarFrame],
+    sketches: bool = True
+) -> Tuple[ColumnarFrame, Sequence[Any]]:
+    """
+    Get the columns of an analysis and the values it summarizes.
     
-    def _get_timestamp(self) -> str:
-        """
-        Get the current timestamp as a string.
-        
-        Returns:
-            Current timestamp string
-        """
-        from datetime import datetime
-        return datetime.now().isoformat()
\ No newline at end of file
+    Args:
+        kind: Analysis kind ("feedback", "sales" or "generic")
+        data: Records or columns
+        sketches: Whether to include the fields only the sketches read
+    
+    Returns:
+        Tuple of (frame, values): the ratings, the revenue per row, or the
+        values that are not missing
+    """
+    fields = _ANALYSIS_FIELDS[kind]
+    if not sketches:
+        fields = {field: default for field, default in fields.items() if field not in _SKETCH_FIELDS[kind]}
+    frame = _as_frame(data, fields)
+    if kind == "feedback":
+        return frame, frame.numeric("rating")
+    if kind == "sales":
+        return frame, frame.product("quantity", "price")
+    # NaN marks a missing value in a typed column
+    return frame, [value for value in frame.columns["value"] if value is not None and value == value]
+
+def _summarize_sketches(kind: str, frame: ColumnarFrame, values: Sequence[Any]) -> Dict[str, Any]:
+    """
+    Summarize the values and columns of an analysis with sketches.
+    
+    Args:
+        kind: Analysis kind
+        frame: Columns of the analysis
+        values: Values the analysis summarizes
+    
+    Returns:
+        Approximate statistics
+    """
+    sketches = SketchSummary(kind)
+    sketches.update_columns(values, frame.columns)
+    return sketches.result()
+
+def _as_frame(data: Union[Sequence[Any], ColumnarFrame], fields: Dict[str, Any]) -> ColumnarFrame:
+    """
+    Get the columns of records, or complete the columns of a frame.
+    
+    Args:
+        data: Record dictionaries or a frame
+        fields: Mapping of field name to the default for rows that lack it
+    
+    Returns:
+        Frame with every field
+    """
+    if isinstance(data, ColumnarFrame):
+        return data.ensure_columns(fields)
+    return ColumnarFrame.from_records(data, fields)
+
+async def _iterate_batches(
+    batches: Union[AsyncIterator[List[Dict[str, Any]]], Iterable[List[Dict[str, Any]]]]
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Iterate over record batches from an async iterator or a plain iterable.
+    
+    Args:
+        batches: Async iterator or iterable of record batches
+    
+    Returns:
+        Async iterator over the batches
+    """
+    if hasattr(batches, "__aiter__"):
+        async for batch in batches:
+            yield batch
+    else:
+        for batch in batches:
+            yield batch
\ No newline at end of file
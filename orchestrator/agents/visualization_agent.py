@@ -9,6 +9,7 @@ import io
 from typing import Dict, Any, List, Optional
 
 from orchestrator.agents.base_agent import Agent
+from orchestrator.analysis.schema import get_schema_registry
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +26,7 @@ class VisualizationAgent(Agent):
             config: Configuration dictionary for the agent
         """
         super().__init__("VisualizationAgent", config)
+        self.schemas = get_schema_registry()
     
     def _get_supported_tasks(self) -> List[str]:
         """
@@ -51,10 +53,15 @@ class VisualizationAgent(Agent):
         # Simulate visualization creation
         await asyncio.sleep(1.5)  # Simulate processing time
         
-        # Determine the type of data and create appropriate visualizations
-        if "sentiment_distribution" in results:
+        # Use the schema detected during analysis; fall back to the result
+        # fields for results that do not carry one
+        schema = self.schemas.for_result(analysis_result.get("metadata", {}))
+        kind = schema.kind if schema is not None else None
+        
+        # Create the visualizations for the type of data
+        if kind == "feedback" or kind is None and "sentiment_distribution" in results:
             visualizations = await self._create_feedback_visualizations(results)
-        elif "sales_by_region" in results:
+        elif kind == "sales" or kind is None and "sales_by_region" in results:
             visualizations = await self._create_sales_visualizations(results)
         else:
             visualizations = await self._create_generic_visualizations(results)
@@ -334,14 +341,4 @@ class VisualizationAgent(Agent):
                 }
             })
         
-        return visualizations
-    
-    def _get_timestamp(self) -> str:
-        """
-        Get the current timestamp as a string.
-        
-        Returns:
-            Current timestamp string
-        """
-        from datetime import datetime
-        return datetime.now().isoformat()
\ No newline at end of file
+        return visualizations
\ No newline at end of file
@@ -0,0 +1,509 @@
+"""
+Columnar aggregation engine for statistical analysis.
+"""
+
+import array
+import logging
+import math
+from typing import Dict, Any, List, Optional, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency
+    np = None
+
+logger = logging.getLogger(__name__)
+
+class DictionaryColumn:
+    """
+    Dictionary-encoded column: an integer code per row and the distinct values.
+    
+    Codes number the values in order of first appearance, so the column is
+    already factorized for group-by aggregates.
+    """
+    
+    def __init__(self, codes: Sequence[int], categories: List[Any]):
+        """
+        Initialize the column.
+        
+        Args:
+            codes: Code per row, indexing ``categories``
+            categories: Distinct values in order of first appearance
+        """
+        self.codes = codes
+        self.categories = categories
+    
+    def __len__(self) -> int:
+        return len(self.codes)
+    
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            # Renumber so the slice's codes are again in order of first appearance
+            remap: Dict[int, int] = {}
+            codes = array.array("i", [remap.setdefault(code, len(remap)) for code in self.codes[index]])
+            return DictionaryColumn(codes, [self.categories[code] for code in remap])
+        return self.categories[self.codes[index]]
+    
+    def __iter__(self):
+        return map(self.categories.__getitem__, self.codes)
+
+class ColumnarFrame:
+    """
+    Column-oriented copy of a list of records, or columns read from a file.
+    
+    Each field is pulled out of the records exactly once. Group-by
+    aggregates then work on integer group codes: with numpy they are single
+    ``bincount`` calls, without it they are one tight loop per aggregate.
+    Sums are exact, so they match the mergeable states of the online
+    analyses however those were partitioned.
+    Groups are reported in order of first appearance, matching the order a
+    ``defaultdict`` grouping would produce.
+    """
+    
+    def __init__(self, columns: Dict[str, Sequence[Any]], length: int):
+        """
+        Initialize the frame.
+        
+        Args:
+            columns: Mapping of field name to column values
+            length: Number of rows
+        """
+        self.columns = columns
+        self.length = length
+        self._factorized: Dict[str, Tuple[Sequence[int], List[Any]]] = {}
+    
+    @classmethod
+    def from_records(cls, records: Sequence[Any], fields: Dict[str, Any]) -> "ColumnarFrame":
+        """
+        Build a frame from row dictionaries.
+        
+        Args:
+            records: Row dictionaries; non-dictionary rows count as rows with
+                every field missing. A batch with a ``frame()`` method, such as
+                a ``RecordBatch``, shares its columns instead.
+            fields: Mapping of field name to the default used when a row lacks it
+        
+        Returns:
+            Columnar frame
+        """
+        # Columnar batches hand over their columns without building rows
+        to_frame = getattr(records, "frame", None)
+        if callable(to_frame):
+            return to_frame().ensure_columns(fields)
+        
+        rows = [r if isinstance(r, dict) else {} for r in records]
+        columns = {
+            field: [row.get(field, default) for row in rows]
+            for field, default in fields.items()
+        }
+        return cls(columns, len(rows))
+    
+    def __len__(self) -> int:
+        return self.length
+    
+    def ensure_columns(self, fields: Dict[str, Any]) -> "ColumnarFrame":
+        """
+        Add a constant column for every field the frame lacks.
+        
+        Args:
+            fields: Mapping of field name to the value of its missing rows
+        
+        Returns:
+            This frame
+        """
+        for field, default in fields.items():
+            if field not in self.columns:
+                self.columns[field] = [default] * self.length
+        return self
+    
+    def numeric(self, field: str) -> Sequence[Any]:
+        """
+        Get a column as numbers, as a float array when numpy is available.
+        
+        Args:
+            field: Field name
+        
+        Returns:
+            Numeric column
+        """
+        values = self.columns[field]
+        if np is not None and not isinstance(values, np.ndarray):
+            values = self.columns[field] = np.asarray(values, dtype=np.float64)
+        return values
+    
+    def product(self, left: str, right: str) -> Sequence[Any]:
+        """
+        Multiply two numeric columns element-wise.
+        
+        Args:
+            left: First field name
+            right: Second field name
+        
+        Returns:
+            Column of products
+        """
+        if np is not None:
+            return self.numeric(left) * self.numeric(right)
+        return [a * b for a, b in zip(self.columns[left], self.columns[right])]
+    
+    def factorize(self, field: str) -> Tuple[Sequence[int], List[Any]]:
+        """
+        Encode a column as integer group codes.
+        
+        Args:
+            field: Field name
+        
+        Returns:
+            Tuple of (codes per row, distinct values in order of first appearance)
+        """
+        if field not in self._factorized:
+            column = self.columns[field]
+            if isinstance(column, DictionaryColumn):
+                codes = np.asarray(column.codes) if np is not None else column.codes
+                self._factorized[field] = (codes, column.categories)
+            else:
+                self._factorized[field] = factorize(column)
+        return self._factorized[field]
+    
+    def group_sum(self, field: str, values: Sequence[Any]) -> Dict[Any, Any]:
+        """
+        Sum values per distinct value of a key column.
+        
+        Args:
+            field: Key field name
+            values: Values to sum, aligned with the rows
+        
+        Returns:
+            Dictionary mapping group key to sum
+        """
+        codes, keys = self.factorize(field)
+        return dict(zip(keys, group_sums(codes, values, len(keys))))
+    
+    def group_mean(self, field: str, values: Sequence[Any]) -> Dict[Any, float]:
+        """
+        Average values per distinct value of a key column.
+        
+        Args:
+            field: Key field name
+            values: Values to average, aligned with the rows
+        
+        Returns:
+            Dictionary mapping group key to mean
+        """
+        codes, keys = self.factorize(field)
+        sums = group_sums(codes, values, len(keys))
+        counts = group_counts(codes, len(keys))
+        return {key: total / count for key, total, count in zip(keys, sums, counts)}
+    
+    def group_stats(self, field: str, values: Sequence[Any]) -> Dict[Any, Dict[str, Any]]:
+        """
+        Compute count, mean, min and max of values per distinct key.
+        
+        Args:
+            field: Key field name
+            values: Values to summarize, aligned with the rows
+        
+        Returns:
+            Dictionary mapping group key to its statistics
+        """
+        codes, keys = self.factorize(field)
+        n = len(keys)
+        sums = group_sums(codes, values, n)
+        counts = group_counts(codes, n)
+        minimums, maximums = group_extrema(codes, values, n)
+        return {
+            key: {"count": count, "sum": total, "min": low, "max": high}
+            for key, total, count, low, high in zip(keys, sums, counts, minimums, maximums)
+        }
+
+def column_sum(values: Sequence[Any]) -> float:
+    """
+    Sum a column without rounding error.
+    
+    The sum is correctly rounded, as the ``ExactSum`` of the online
+    analyses is, so it does not depend on the order of the values.
+    
+    Args:
+        values: Column values
+    
+    Returns:
+        Sum of the values
+    """
+    if np is not None and len(values):
+        limbs = _limbs(values)
+        if limbs is not None:
+            weights, exponent = limbs
+            return _combine_limbs([limb.sum() for limb in weights], exponent)
+    return math.fsum(values)
+
+# Bits per limb of the exact sums: a sum of limbs stays an integer below
+# 2**53, which float64 adds exactly, for up to 2**29 rows
+_LIMB_BITS = 24
+
+# Largest exponent range of the values summed through limbs
+_MAX_EXPONENT_SPAN = 128
+
+def _limbs(values: Sequence[Any]) -> Optional[Tuple[List[Any], int]]:
+    """
+    Split float values into integer limbs that float64 sums add exactly.
+    
+    Each value is an integer of at most 53 bits times a power of two. Scaled
+    to the smallest of those powers, the values are integers, which are cut
+    into limbs of ``_LIMB_BITS`` bits; summing each limb with numpy and then
+    adding the limb sums as Python integers gives the exact sum, so the
+    correctly rounded result costs a few vectorized passes instead of a
+    ``math.fsum`` over Python floats.
+    
+    Args:
+        values: Column values
+    
+    Returns:
+        Tuple of (signed limb arrays, lowest limb first; exponent of the
+        lowest bit), or None if a value is not finite or the magnitudes
+        are too far apart
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if not np.isfinite(values).all():
+        return None
+    mantissas, exponents = np.frexp(values)
+    nonzero = mantissas != 0
+    if not nonzero.any():
+        return [np.zeros(len(values))], 0
+    low = int(exponents[nonzero].min())
+    span = int(exponents[nonzero].max()) - low
+    if span > _MAX_EXPONENT_SPAN or low - 53 < -1000:
+        return None
+    
+    integers = (np.abs(mantissas) * 2.0 ** 53).astype(np.uint64)
+    shifts = np.where(nonzero, exponents - low, 0)
+    mask = np.uint64((1 << _LIMB_BITS) - 1)
+    starts = range(0, 53 + span, _LIMB_BITS)
+    if 53 + span <= 64:
+        # The scaled integers fit in 64 bits
+        scaled = integers << shifts.astype(np.uint64)
+        limbs = [((scaled >> np.uint64(start)) & mask).astype(np.float64) for start in starts]
+    else:
+        limbs = []
+        for start in starts:
+            # Bits [start, start + _LIMB_BITS) of each integer shifted left by its shift
+            offset = start - shifts.astype(np.int64)
+            right = integers >> np.clip(offset, 0, 63).astype(np.uint64)
+            left = integers << np.clip(-offset, 0, _LIMB_BITS).astype(np.uint64)
+            limbs.append((np.where(offset >= 0, right, left) & mask).astype(np.float64))
+    negative = mantissas < 0
+    if negative.any():
+        for limb in limbs:
+            np.negative(limb, out=limb, where=negative)
+    return limbs, low - 53
+
+def _combine_limbs(limb_sums: Sequence[float], exponent: int) -> float:
+    """
+    Add the sums of limbs into a correctly rounded float.
+    
+    Args:
+        limb_sums: Sum of each limb, lowest limb first
+        exponent: Exponent of the lowest bit
+    
+    Returns:
+        Sum of the values the limbs came from
+    """
+    total = sum(int(limb_sum) << (_LIMB_BITS * index) for index, limb_sum in enumerate(limb_sums))
+    return math.ldexp(float(total), exponent)
+
+def count_sentiment(ratings: Sequence[Any]) -> Tuple[int, int, int]:
+    """
+    Count positive (>= 4), neutral (3) and negative (<= 2) ratings in one pass.
+    
+    Args:
+        ratings: Rating per row
+    
+    Returns:
+        Tuple of (positive, neutral, negative) counts
+    """
+    if np is not None and isinstance(ratings, np.ndarray):
+        return (
+            int(np.count_nonzero(ratings >= 4)),
+            int(np.count_nonzero(ratings == 3)),
+            int(np.count_nonzero(ratings <= 2))
+        )
+    
+    positive = neutral = negative = 0
+    for rating in ratings:
+        if rating >= 4:
+            positive += 1
+        elif rating == 3:
+            neutral += 1
+        elif rating <= 2:
+            negative += 1
+    return positive, neutral, negative
+
+def _typed_array(values: Sequence[Any]) -> Optional[Any]:
+    """
+    View a typed column as a numpy array.
+    
+    Args:
+        values: Column values
+    
+    Returns:
+        numpy array, or None for a list, whose element types are only known
+        by checking every element
+    """
+    if isinstance(values, np.ndarray):
+        return values
+    if isinstance(values, (array.array, memoryview)):
+        return np.asarray(values)
+    return None
+
+# Rows hashed at a time, so a block of characters stays in cache while
+# every character position is mixed in
+_HASH_CHUNK = 1 << 16
+# Rows compared at a time when checking string hashes for collisions
+_VERIFY_CHUNK = 1 << 20
+
+def _unique_strings(strings: Any) -> Tuple[Any, Any]:
+    """
+    Find the distinct values of a numpy string array by hashing them.
+    
+    Sorting strings is several times slower than sorting integers, so each
+    string's fixed-width characters are hashed (FNV-1a) and the hashes are
+    made unique instead. Every string is then compared with the first
+    string of its hash; on a collision the strings themselves are sorted.
+    
+    Args:
+        strings: numpy array of kind "U"
+    
+    Returns:
+        Tuple of (index of the first row of each distinct value, index of
+        each row's distinct value), as ``np.unique`` returns them
+    """
+    strings = np.ascontiguousarray(strings).ravel()
+    width = strings.dtype.itemsize // 4
+    characters = strings.view(np.uint32).reshape(len(strings), width)
+    hashes = np.full(len(strings), 0xcbf29ce484222325, dtype=np.uint64)
+    prime = np.uint64(0x100000001b3)
+    for start in range(0, len(strings), _HASH_CHUNK):
+        block = characters[start:start + _HASH_CHUNK]
+        block_hashes = hashes[start:start + _HASH_CHUNK]
+        for column in range(width):
+            block_hashes ^= block[:, column]
+            block_hashes *= prime
+    _, first_index, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+    inverse = inverse.ravel()
+    
+    firsts = strings[first_index]
+    for start in range(0, len(strings), _VERIFY_CHUNK):
+        stop = start + _VERIFY_CHUNK
+        if not np.array_equal(strings[start:stop], firsts[inverse[start:stop]]):
+            _, first_index, inverse = np.unique(strings, return_index=True, return_inverse=True)
+            return first_index, inverse.ravel()
+    return first_index, inverse
+
+def factorize(values: Sequence[Any]) -> Tuple[Sequence[int], List[Any]]:
+    """
+    Encode values as integer codes in order of first appearance.
+    
+    Args:
+        values: Values to encode
+    
+    Returns:
+        Tuple of (codes, distinct values)
+    """
+    # np.unique keeps the values of a typed column. A list may mix types
+    # that numpy would coerce to one, and a dictionary encodes it faster.
+    typed = _typed_array(values) if np is not None and len(values) else None
+    if typed is not None and typed.dtype.kind in "biufU":
+        if typed.dtype.kind == "U":
+            first_index, inverse = _unique_strings(typed)
+            uniques = typed[first_index]
+        else:
+            uniques, first_index, inverse = np.unique(typed, return_index=True, return_inverse=True)
+        # np.unique sorts; renumber groups by first appearance instead
+        order = np.argsort(first_index, kind="stable")
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        return rank[inverse.ravel()], [uniques[i].item() for i in order]
+    
+    # dict.fromkeys keeps the first of equal keys in order of appearance
+    index: Dict[Any, int] = dict.fromkeys(values)
+    for code, value in enumerate(index):
+        index[value] = code
+    codes = list(map(index.__getitem__, values))
+    if np is not None:
+        return np.asarray(codes, dtype=np.intp), list(index)
+    return codes, list(index)
+
+def group_sums(codes: Sequence[int], values: Sequence[Any], n: int) -> List[float]:
+    """
+    Sum values per group code without rounding error.
+    
+    Args:
+        codes: Group code per row
+        values: Value per row
+        n: Number of groups
+    
+    Returns:
+        List of correctly rounded sums indexed by group code
+    """
+    if np is not None and isinstance(codes, np.ndarray):
+        limbs = _limbs(values) if len(values) else None
+        if limbs is not None:
+            weights, exponent = limbs
+            limb_sums = [np.bincount(codes, weights=limb, minlength=n).tolist() for limb in weights]
+            return [_combine_limbs(sums, exponent) for sums in zip(*limb_sums)]
+        # Non-finite values, or magnitudes too far apart for a few limbs
+        groups = np.split(np.asarray(values, dtype=np.float64)[np.argsort(codes, kind="stable")],
+                          np.cumsum(np.bincount(codes, minlength=n))[:-1])
+        return [math.fsum(group.tolist()) for group in groups]
+    
+    groups: List[List[Any]] = [[] for _ in range(n)]
+    for code, value in zip(codes, values):
+        groups[code].append(value)
+    return [math.fsum(group) for group in groups]
+
+def group_counts(codes: Sequence[int], n: int) -> List[int]:
+    """
+    Count rows per group code.
+    
+    Args:
+        codes: Group code per row
+        n: Number of groups
+    
+    Returns:
+        List of counts indexed by group code
+    """
+    if np is not None and isinstance(codes, np.ndarray):
+        return np.bincount(codes, minlength=n).tolist()
+    
+    counts = [0] * n
+    for code in codes:
+        counts[code] += 1
+    return counts
+
+def group_extrema(codes: Sequence[int], values: Sequence[Any], n: int) -> Tuple[List[Any], List[Any]]:
+    """
+    Find the minimum and maximum value per group code.
+    
+    Args:
+        codes: Group code per row
+        values: Value per row
+        n: Number of groups
+    
+    Returns:
+        Tuple of (minimums, maximums) indexed by group code
+    """
+    if np is not None and isinstance(codes, np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        minimums = np.full(n, np.inf)
+        maximums = np.full(n, -np.inf)
+        np.minimum.at(minimums, codes, values)
+        np.maximum.at(maximums, codes, values)
+        return minimums.tolist(), maximums.tolist()
+    
+    minimums: List[Optional[Any]] = [None] * n
+    maximums: List[Optional[Any]] = [None] * n
+    for code, value in zip(codes, values):
+        if minimums[code] is None or value < minimums[code]:
+            minimums[code] = value
+        if maximums[code] is None or value > maximums[code]:
+            maximums[code] = value
+    return minimums, maximums
\ No newline at end of file
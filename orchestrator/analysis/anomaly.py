@@ -0,0 +1,783 @@
+"""
+Anomaly detection over columnar data.
+
+Detectors:
+    - Robust z-score: distance from the median in units of the median
+      absolute deviation (MAD), flagged above 3.5 (Iglewicz and Hoaglin).
+    - IQR: values outside the Tukey fences Q1 - 1.5 IQR and Q3 + 1.5 IQR.
+    - Rolling deviation: daily totals that deviate from the mean of the
+      preceding days by more than three standard deviations.
+    - Group outliers: robust z-scores computed within each group (region,
+      product, ...), which catch values that are only unusual for their group.
+
+With numpy every detector is a handful of array operations; without it the
+same statistics are computed with sorted lists.
+"""
+
+import logging
+import math
+import random
+from collections import defaultdict
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency
+    np = None
+
+from orchestrator.analysis.aggregation import ColumnarFrame, factorize, group_counts, group_sums
+
+logger = logging.getLogger(__name__)
+
+# Scale factors that make MAD and mean absolute deviation consistent with
+# the standard deviation of normally distributed data
+_MAD_SCALE = 1.4826
+_MEAN_AD_SCALE = 1.253314
+
+DEFAULT_CONFIG = {
+    "value_field": None,
+    "group_fields": None,
+    "date_field": "date",
+    "zscore_threshold": 3.5,
+    "iqr_multiplier": 1.5,
+    "rolling_window": 7,
+    "rolling_threshold": 3.0,
+    "rolling_min_periods": 3,
+    "min_group_size": 30
+}
+
+_VALUE_FIELDS = ("value", "revenue", "rating", "amount")
+_GROUP_FIELDS = ("region", "product_id", "category")
+
+def quantiles(values: Sequence[float], qs: Sequence[float]) -> List[float]:
+    """
+    Compute quantiles with linear interpolation (numpy's default method).
+    
+    Args:
+        values: Values
+        qs: Quantiles between 0 and 1
+    
+    Returns:
+        Quantile values, in the order of ``qs``
+    """
+    if not len(values):
+        return [math.nan] * len(qs)
+    if np is not None:
+        return np.quantile(np.asarray(values, dtype=np.float64), qs).tolist()
+    
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    result = []
+    for q in qs:
+        position = q * last
+        low = int(position)
+        high = min(low + 1, last)
+        result.append(ordered[low] + (ordered[high] - ordered[low]) * (position - low))
+    return result
+
+def robust_scale(values: Sequence[float]) -> Tuple[float, float]:
+    """
+    Compute the median and a robust estimate of the standard deviation.
+    
+    The scale is 1.4826 MAD; when more than half the values are equal (MAD
+    is zero) it falls back to 1.2533 times the mean absolute deviation.
+    
+    Args:
+        values: Values
+    
+    Returns:
+        Tuple of (center, scale); the scale is 0 for constant data
+    """
+    if not len(values):
+        return math.nan, 0.0
+    if np is not None:
+        array = np.asarray(values, dtype=np.float64)
+        center = float(np.median(array))
+        deviations = np.abs(array - center)
+        mad = float(np.median(deviations))
+        mean_ad = float(deviations.mean())
+    else:
+        center = quantiles(values, [0.5])[0]
+        deviations = [abs(value - center) for value in values]
+        mad = quantiles(deviations, [0.5])[0]
+        mean_ad = sum(deviations) / len(deviations)
+    
+    if mad > 0:
+        return center, _MAD_SCALE * mad
+    return center, _MEAN_AD_SCALE * mean_ad
+
+def group_robust_scale(
+    codes: Sequence[int],
+    values: Sequence[float],
+    n: int,
+    order: Optional[Any] = None
+) -> Tuple[Sequence[float], Sequence[float]]:
+    """
+    Compute ``robust_scale`` within each group.
+    
+    Args:
+        codes: Group code per value (every code below ``n`` must occur)
+        values: Values
+        n: Number of groups
+        order: Optional ``np.argsort(values)``, shared when several group
+            fields are scaled over the same values
+    
+    Returns:
+        Tuple of (centers, scales) indexed by group code
+    """
+    if np is not None and isinstance(codes, np.ndarray):
+        array = np.asarray(values, dtype=np.float64)
+        counts = np.bincount(codes, minlength=n)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        low = starts + (counts - 1) // 2
+        high = starts + counts // 2
+        
+        # A stable sort by group of the rows in value order puts each group's
+        # values in a contiguous sorted run, so medians are read off at the
+        # middle positions; numpy radix-sorts 16-bit codes
+        if n <= np.iinfo(np.int16).max:
+            codes = codes.astype(np.int16)
+        if order is None:
+            order = np.argsort(array)
+        ordered = array[order[np.argsort(codes[order], kind="stable")]]
+        centers = (ordered[low] + ordered[high]) / 2
+        deviations = np.abs(array - centers[codes])
+        order = np.argsort(deviations)
+        ordered = deviations[order[np.argsort(codes[order], kind="stable")]]
+        mads = (ordered[low] + ordered[high]) / 2
+        mean_ads = np.bincount(codes, weights=deviations, minlength=n) / counts
+        return centers, np.where(mads > 0, _MAD_SCALE * mads, _MEAN_AD_SCALE * mean_ads)
+    
+    groups = [[] for _ in range(n)]
+    for code, value in zip(codes, values):
+        groups[code].append(value)
+    scales = [robust_scale(group) for group in groups]
+    return [center for center, _ in scales], [scale for _, scale in scales]
+
+def zscores(values: Sequence[float], centers: Any, scales: Any, codes: Optional[Sequence[int]] = None) -> Sequence[float]:
+    """
+    Standardize values, optionally with a center and scale per group.
+    
+    Values whose scale is 0 get a z-score of 0.
+    
+    Args:
+        values: Values
+        centers: Center, or centers indexed by group code
+        scales: Scale, or scales indexed by group code
+        codes: Optional group code per value
+    
+    Returns:
+        Signed z-score per value
+    """
+    if np is not None:
+        array = np.asarray(values, dtype=np.float64)
+        if codes is not None:
+            codes = np.asarray(codes)
+            centers = np.asarray(centers, dtype=np.float64)[codes]
+            scales = np.asarray(scales, dtype=np.float64)[codes]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(scales > 0, (array - centers) / scales, 0.0)
+    
+    if codes is None:
+        return [(value - centers) / scales if scales > 0 else 0.0 for value in values]
+    return [
+        (value - centers[code]) / scales[code] if scales[code] > 0 else 0.0
+        for value, code in zip(values, codes)
+    ]
+
+def iqr_fences(values: Sequence[float], multiplier: float = 1.5) -> Tuple[float, float, float]:
+    """
+    Compute Tukey fences.
+    
+    Args:
+        values: Values
+        multiplier: IQR multiplier
+    
+    Returns:
+        Tuple of (lower fence, upper fence, IQR)
+    """
+    q1, q3 = quantiles(values, [0.25, 0.75])
+    iqr = q3 - q1
+    return q1 - multiplier * iqr, q3 + multiplier * iqr, iqr
+
+def rolling_deviation(
+    totals: Dict[Any, float],
+    window: int = 7,
+    threshold: float = 3.0,
+    min_periods: int = 3
+) -> List[Dict[str, Any]]:
+    """
+    Flag periods whose total deviates from the trailing window.
+    
+    Each period is compared with the mean and standard deviation of the
+    ``window`` periods before it; periods are ordered by key, which suits
+    ISO dates. The deviation is computed in two passes over the window
+    rather than from a running sum of squares, which cancels badly when
+    totals are large and close together.
+    
+    Args:
+        totals: Total per period
+        window: Number of preceding periods to compare with
+        threshold: Number of standard deviations that counts as anomalous
+        min_periods: Minimum number of preceding periods before flagging
+    
+    Returns:
+        List of anomalous periods with their value, expected value and z-score
+    """
+    keys = sorted(totals, key=str)
+    series = [totals[key] for key in keys]
+    anomalies = []
+    for i, value in enumerate(series):
+        size = min(i, window)
+        if size >= min_periods:
+            preceding = series[i - size:i]
+            mean = math.fsum(preceding) / size
+            std = math.sqrt(math.fsum((x - mean) ** 2 for x in preceding) / size)
+            if std > 0 and abs(value - mean) > threshold * std:
+                anomalies.append({
+                    "period": keys[i],
+                    "value": value,
+                    "expected": mean,
+                    "zscore": (value - mean) / std
+                })
+    return anomalies
+
+def anomaly_score(zscore: float) -> float:
+    """
+    Map a z-score magnitude to a score between 0 and 1.
+    
+    Args:
+        zscore: Z-score
+    
+    Returns:
+        Anomaly score
+    """
+    magnitude = abs(zscore)
+    return magnitude / (magnitude + 1)
+
+class AnomalyDetector:
+    """
+    Detector that combines the robust z-score, IQR, group and rolling detectors.
+    """
+    
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the Anomaly Detector.
+        
+        Args:
+            config: Configuration overriding DEFAULT_CONFIG
+        """
+        self.config = {**DEFAULT_CONFIG, **(config or {})}
+    
+    def detect(self, records: Sequence[Any]) -> Dict[str, Any]:
+        """
+        Detect anomalous records and periods.
+        
+        Args:
+            records: Record dictionaries
+        
+        Returns:
+            Anomalies with item, score and reason, per-period anomalies and
+            per-detector counts
+        """
+        frame, value_field, group_fields = self._columns(records)
+        if value_field is None:
+            return self._result([], len(records), [], [], {}, None)
+        return self.detect_columns(frame.columns, value_field, group_fields, records)
+    
+    def detect_columns(
+        self,
+        columns: Dict[str, Sequence[Any]],
+        value_field: str,
+        group_fields: Sequence[str] = (),
+        records: Optional[Sequence[Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Detect anomalies in data that is already columnar.
+        
+        Args:
+            columns: Mapping of field name to column values (lists or arrays)
+            value_field: Numeric field to examine
+            group_fields: Fields to find per-group outliers in
+            records: Optional records aligned with the columns, reported as
+                the anomalous items; by default items are rebuilt from the columns
+        
+        Returns:
+            Detection result, as for ``detect``
+        """
+        values = columns[value_field]
+        total = len(values)
+        rows, values = _valid(values)
+        # Every group field is scaled over the same values, so they are sorted once
+        order = np.argsort(values) if np is not None and group_fields else None
+        groups = {}
+        for field in group_fields:
+            codes, keys = factorize(_take(columns[field], rows))
+            centers, scales = group_robust_scale(codes, values, len(keys), order)
+            # Groups too small for a stable median are not scored
+            small = [count < self.config["min_group_size"] for count in group_counts(codes, len(keys))]
+            if np is not None:
+                scales = np.where(small, 0.0, scales)
+            else:
+                scales = [0.0 if is_small else scale for scale, is_small in zip(scales, small)]
+            groups[field] = (codes, keys, centers, scales)
+        
+        center, scale = robust_scale(values)
+        lower, upper, _ = iqr_fences(values, self.config["iqr_multiplier"])
+        flagged, counts = self._score(values, center, scale, lower, upper, groups)
+        
+        periods = []
+        date_field = self.config["date_field"]
+        if date_field in columns:
+            codes, keys = factorize(_take(columns[date_field], rows))
+            totals = dict(zip(keys, group_sums(codes, values, len(keys))))
+            periods = rolling_deviation(
+                totals,
+                self.config["rolling_window"],
+                self.config["rolling_threshold"],
+                self.config["rolling_min_periods"]
+            )
+        counts["rolling_deviation"] = len(periods)
+        
+        flagged_rows = _select(rows, [i for i, _, _ in flagged])
+        if records is None:
+            items = _rows_as_dicts(columns, flagged_rows)
+        else:
+            items = [records[row] for row in flagged_rows]
+        scored = [(score, reasons) for _, score, reasons in flagged]
+        return self._result(items, total, scored, periods, counts, value_field)
+    
+    def _columns(self, records: Sequence[Any]) -> Tuple[ColumnarFrame, Optional[str], List[str]]:
+        """
+        Pick the value and group fields and build their columns.
+        
+        Args:
+            records: Record dictionaries
+        
+        Returns:
+            Tuple of (frame, value field or None, group fields); the value
+            field is "revenue" for sales records with quantity and price
+        """
+        sample = next((r for r in records if isinstance(r, dict)), {})
+        group_fields = self.config["group_fields"]
+        if group_fields is None:
+            group_fields = [field for field in _GROUP_FIELDS if field in sample]
+        fields = {field: None for field in group_fields}
+        fields[self.config["date_field"]] = None
+        
+        value_field = self.config["value_field"]
+        if value_field is None and "quantity" in sample and "price" in sample:
+            frame = ColumnarFrame.from_records(records, {**fields, "quantity": 0, "price": 0})
+            frame.columns["revenue"] = frame.product("quantity", "price")
+            return frame, "revenue", group_fields
+        if value_field is None:
+            value_field = next((field for field in _VALUE_FIELDS if field in sample), None)
+        if value_field is not None:
+            fields[value_field] = None
+        return ColumnarFrame.from_records(records, fields), value_field, group_fields
+    
+    def _score(
+        self,
+        values: Sequence[float],
+        center: float,
+        scale: float,
+        lower: float,
+        upper: float,
+        groups: Dict[str, Tuple[Any, ...]]
+    ) -> Tuple[List[Tuple[int, float, List[str]]], Dict[str, int]]:
+        """
+        Score values against reference statistics and explain the flagged ones.
+        
+        Args:
+            values: Values
+            center: Overall median
+            scale: Overall robust scale
+            lower: Lower IQR fence
+            upper: Upper IQR fence
+            groups: Group field -> (codes, keys, centers, scales)
+        
+        Returns:
+            Tuple of (flagged (index, score, reasons) tuples, per-detector counts)
+        """
+        threshold = self.config["zscore_threshold"]
+        overall = zscores(values, center, scale)
+        group_z = {
+            field: zscores(values, centers, scales, codes)
+            for field, (codes, _, centers, scales) in groups.items()
+        }
+        
+        if np is not None:
+            array = np.asarray(values, dtype=np.float64)
+            masks = {
+                "robust_zscore": np.abs(overall) > threshold,
+                "iqr": (array < lower) | (array > upper)
+            }
+            for field, z in group_z.items():
+                masks[f"group:{field}"] = np.abs(z) > threshold
+            combined = np.zeros(len(array), dtype=bool)
+            for mask in masks.values():
+                combined |= mask
+            candidates = np.flatnonzero(combined)
+            counts = {name: int(np.count_nonzero(mask)) for name, mask in masks.items()}
+        else:
+            candidates = [
+                i for i, value in enumerate(values)
+                if abs(overall[i]) > threshold or value < lower or value > upper
+                or any(abs(z[i]) > threshold for z in group_z.values())
+            ]
+            counts = {"robust_zscore": 0, "iqr": 0}
+            counts.update({f"group:{field}": 0 for field in group_z})
+        
+        # Gather the candidates' statistics as lists up front, so the loop
+        # below only formats reasons
+        candidate_values = _select(values, candidates)
+        candidate_z = _select(overall, candidates)
+        candidate_groups = {
+            field: (_select(codes, candidates), keys, _select(group_z[field], candidates))
+            for field, (codes, keys, _, _) in groups.items()
+        }
+        if np is not None:
+            candidate_values = candidate_values.tolist()
+            candidate_z = candidate_z.tolist()
+            candidate_groups = {
+                field: (codes.tolist(), keys, z.tolist())
+                for field, (codes, keys, z) in candidate_groups.items()
+            }
+        
+        flagged = []
+        for position, i in enumerate(candidates):
+            value = candidate_values[position]
+            z = candidate_z[position]
+            reasons = []
+            strongest = 0.0
+            if abs(z) > threshold:
+                reasons.append(f"Outlier value detected (robust z-score {z:.1f})")
+                strongest = abs(z)
+            if value < lower or value > upper:
+                reasons.append("Outside interquartile range")
+                strongest = max(strongest, abs(z))
+            for field, (codes, keys, z_values) in candidate_groups.items():
+                gz = z_values[position]
+                if abs(gz) > threshold:
+                    reasons.append(f"Unusual for {field} {keys[codes[position]]} (z-score {gz:.1f})")
+                    strongest = max(strongest, abs(gz))
+            if np is None:
+                counts["robust_zscore"] += abs(z) > threshold
+                counts["iqr"] += value < lower or value > upper
+                for field in group_z:
+                    counts[f"group:{field}"] += abs(group_z[field][i]) > threshold
+            flagged.append((int(i), anomaly_score(strongest), reasons))
+        return flagged, counts
+    
+    def _result(
+        self,
+        items: List[Any],
+        total: int,
+        scored: List[Tuple[float, List[str]]],
+        periods: List[Dict[str, Any]],
+        counts: Dict[str, int],
+        value_field: Optional[str]
+    ) -> Dict[str, Any]:
+        """
+        Build the detection result.
+        
+        Args:
+            items: Anomalous records
+            total: Number of records examined
+            scored: (score, reasons) tuple per anomalous record
+            periods: Anomalous periods
+            counts: Per-detector counts
+            value_field: Field that was examined
+        
+        Returns:
+            Detection result
+        """
+        return {
+            "anomalies": [
+                {"item": item, "anomaly_score": score, "reason": "; ".join(reasons)}
+                for item, (score, reasons) in zip(items, scored)
+            ],
+            "anomaly_count": len(items),
+            "total_items": total,
+            "anomaly_percentage": len(items) / total if total else 0,
+            "period_anomalies": periods,
+            "detector_counts": counts,
+            "value_field": value_field
+        }
+
+class StreamingAnomalyDetector(AnomalyDetector):
+    """
+    Anomaly detector for record batches that arrive over time.
+    
+    Reference statistics come from a fixed-size uniform sample (reservoir)
+    of all values seen so far, overall and per group, so memory stays
+    bounded. Each batch is added to the sample and then scored against it.
+    Daily totals are accumulated across batches for the rolling detector.
+    """
+    
+    def __init__(self, config: Optional[Dict[str, Any]] = None, sample_size: int = 10000, seed: int = 0):
+        """
+        Initialize the Streaming Anomaly Detector.
+        
+        Args:
+            config: Configuration overriding DEFAULT_CONFIG
+            sample_size: Size of the overall reservoir; group reservoirs hold
+                a tenth of it
+            seed: Seed for reservoir sampling
+        """
+        super().__init__(config)
+        self.sample_size = sample_size
+        self.group_sample_size = max(sample_size // 10, 1)
+        self.total_items = 0
+        self.anomaly_count = 0
+        self.detector_counts = defaultdict(int)
+        self.period_totals = defaultdict(float)
+        self.value_field = None
+        self._random = np.random.default_rng(seed) if np is not None else random.Random(seed)
+        self._sample = _Reservoir(sample_size, self._random)
+        self._group_samples: Dict[str, Dict[Any, "_Reservoir"]] = defaultdict(dict)
+    
+    def update(self, batch: Sequence[Any]) -> List[Dict[str, Any]]:
+        """
+        Score a batch of records.
+        
+        Args:
+            batch: Record dictionaries
+        
+        Returns:
+            Anomalies found in the batch
+        """
+        self.total_items += len(batch)
+        frame, value_field, group_fields = self._columns(batch)
+        if value_field is None:
+            return []
+        self.value_field = value_field
+        
+        rows, values = _valid(frame.columns[value_field])
+        self._sample.extend(values)
+        center, scale = robust_scale(self._sample.values)
+        lower, upper, _ = iqr_fences(self._sample.values, self.config["iqr_multiplier"])
+        
+        groups = {}
+        for field in group_fields:
+            codes, keys = factorize(_take(frame.columns[field], rows))
+            samples = self._group_samples[field]
+            reservoirs = []
+            for key, group_values in zip(keys, _split_by_code(codes, values, len(keys))):
+                sample = samples.get(key)
+                if sample is None:
+                    sample = samples[key] = _Reservoir(self.group_sample_size, self._random)
+                sample.extend(group_values)
+                reservoirs.append(sample)
+            groups[field] = (codes, keys) + self._sample_scales(reservoirs)
+        
+        flagged, counts = self._score(values, center, scale, lower, upper, groups)
+        for name, count in counts.items():
+            self.detector_counts[name] += count
+        self.anomaly_count += len(flagged)
+        
+        date_field = self.config["date_field"]
+        if date_field in frame.columns:
+            codes, keys = factorize(_take(frame.columns[date_field], rows))
+            for date, value in zip(keys, group_sums(codes, values, len(keys))):
+                self.period_totals[date] += value
+        
+        return [
+            {"item": batch[row], "anomaly_score": score, "reason": "; ".join(reasons)}
+            for row, (_, score, reasons) in zip(_select(rows, [i for i, _, _ in flagged]), flagged)
+        ]
+    
+    def _sample_scales(self, reservoirs: List["_Reservoir"]) -> Tuple[Sequence[float], Sequence[float]]:
+        """
+        Compute the center and scale of each group's reservoir.
+        
+        Args:
+            reservoirs: Reservoir per group code
+        
+        Returns:
+            Tuple of (centers, scales) indexed by group code; groups with
+            fewer than ``min_group_size`` values seen get a scale of 0
+        """
+        small = [sample.seen < self.config["min_group_size"] for sample in reservoirs]
+        if np is None or not reservoirs:
+            scales = [(0.0, 0.0) if is_small else robust_scale(sample.values) for sample, is_small in zip(reservoirs, small)]
+            return [c for c, _ in scales], [s for _, s in scales]
+        
+        # Scale all groups in one pass over the concatenated samples
+        sizes = [len(sample.values) for sample in reservoirs]
+        codes = np.repeat(np.arange(len(reservoirs)), sizes)
+        centers, scales = group_robust_scale(codes, np.concatenate([sample.values for sample in reservoirs]), len(reservoirs))
+        return centers, np.where(small, 0.0, scales)
+    
+    def period_anomalies(self) -> List[Dict[str, Any]]:
+        """
+        Run the rolling detector over the daily totals seen so far.
+        
+        Returns:
+            Anomalous periods
+        """
+        return rolling_deviation(
+            self.period_totals,
+            self.config["rolling_window"],
+            self.config["rolling_threshold"],
+            self.config["rolling_min_periods"]
+        )
+    
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize detection so far.
+        
+        Returns:
+            Counts and period anomalies, without the per-item anomalies
+            already returned by ``update``
+        """
+        periods = self.period_anomalies()
+        return {
+            "anomaly_count": self.anomaly_count,
+            "total_items": self.total_items,
+            "anomaly_percentage": self.anomaly_count / self.total_items if self.total_items else 0,
+            "period_anomalies": periods,
+            "detector_counts": {**self.detector_counts, "rolling_deviation": len(periods)},
+            "value_field": self.value_field
+        }
+
+class _Reservoir:
+    """
+    Uniform fixed-size sample of a stream (Algorithm R).
+    
+    With numpy the sample is an array and a batch is added with one random
+    draw per value; ``rng`` is then a ``np.random.Generator``.
+    """
+    
+    def __init__(self, size: int, rng: Any):
+        self.size = size
+        self.seen = 0
+        self.values: Sequence[float] = np.empty(0) if np is not None else []
+        self._random = rng
+    
+    def extend(self, values: Sequence[float]) -> None:
+        if np is not None:
+            self._extend_array(np.asarray(values, dtype=np.float64))
+            return
+        for value in values:
+            self.seen += 1
+            if len(self.values) < self.size:
+                self.values.append(float(value))
+            else:
+                slot = self._random.randrange(self.seen)
+                if slot < self.size:
+                    self.values[slot] = float(value)
+    
+    def _extend_array(self, values: Any) -> None:
+        free = max(self.size - len(self.values), 0)
+        if free:
+            self.values = np.concatenate((self.values, values[:free]))
+        rest = values[free:]
+        if len(rest):
+            # The k-th value seen replaces a random slot below k, if that
+            # slot is inside the sample; a later value replacing the same
+            # slot wins, so only the last write to each slot is kept
+            seen = np.arange(self.seen + free + 1, self.seen + len(values) + 1)
+            slots = self._random.integers(0, seen)
+            kept = np.flatnonzero(slots < self.size)
+            slots, last = np.unique(slots[kept][::-1], return_index=True)
+            self.values[slots] = rest[kept[::-1][last]]
+        self.seen += len(values)
+
+def _rows_as_dicts(columns: Dict[str, Sequence[Any]], rows: Sequence[int]) -> List[Dict[str, Any]]:
+    """
+    Rebuild rows of columnar data as dictionaries.
+    
+    Args:
+        columns: Mapping of field name to column values (lists or arrays)
+        rows: Row indices
+    
+    Returns:
+        One dictionary of plain Python values per row
+    """
+    selected = []
+    for column in columns.values():
+        column = _select(column, rows)
+        selected.append(column.tolist() if np is not None and isinstance(column, np.ndarray) else column)
+    return [dict(zip(columns, values)) for values in zip(*selected)]
+
+def _split_by_code(codes: Sequence[int], values: Sequence[float], n: int) -> List[Sequence[float]]:
+    """
+    Split values by group code.
+    
+    Args:
+        codes: Group code per value
+        values: Values
+        n: Number of groups
+    
+    Returns:
+        Values of each group, indexed by group code
+    """
+    if np is not None and isinstance(codes, np.ndarray):
+        order = np.argsort(codes, kind="stable")
+        bounds = np.cumsum(np.bincount(codes, minlength=n))[:-1]
+        return np.split(np.asarray(values, dtype=np.float64)[order], bounds)
+    groups = [[] for _ in range(n)]
+    for code, value in zip(codes, values):
+        groups[code].append(value)
+    return groups
+
+def _valid(values: Sequence[Any]) -> Tuple[Sequence[int], Sequence[float]]:
+    """
+    Keep the numeric, non-NaN values of a column.
+    
+    Args:
+        values: Column values
+    
+    Returns:
+        Tuple of (row indices, values) of the usable entries
+    """
+    if np is not None and isinstance(values, np.ndarray) and values.dtype.kind in "fiu":
+        rows = np.flatnonzero(~np.isnan(values))
+        if len(rows) == len(values):
+            return np.arange(len(values)), values
+        return rows, values[rows]
+    # Columns of plain numbers skip the per-value checks below
+    if np is not None and all(
+        issubclass(kind, (int, float)) and kind is not bool for kind in set(map(type, values))
+    ):
+        return _valid(np.asarray(values, dtype=np.float64))
+    
+    rows = [
+        i for i, value in enumerate(values)
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and value == value
+    ]
+    kept = [values[i] for i in rows]
+    if np is not None:
+        return np.asarray(rows, dtype=np.int64), np.asarray(kept, dtype=np.float64)
+    return rows, kept
+
+def _take(column: Sequence[Any], rows: Sequence[int]) -> Sequence[Any]:
+    """
+    Select rows of a column.
+    
+    Args:
+        column: Column values
+        rows: Row indices
+    
+    Returns:
+        Selected values
+    """
+    if len(rows) == len(column):
+        return column
+    return _select(column, rows)
+
+def _select(column: Sequence[Any], indices: Sequence[int]) -> Sequence[Any]:
+    """
+    Select entries of a column by position.
+    
+    Args:
+        column: Column values
+        indices: Positions, in the order to return them
+    
+    Returns:
+        Selected values
+    """
+    if np is not None and isinstance(column, np.ndarray):
+        return column[np.asarray(indices, dtype=np.intp)]
+    return [column[i] for i in indices]
\ No newline at end of file
@@ -0,0 +1,328 @@
+"""
+Incremental re-analysis with cached per-partition aggregates.
+
+Records of a source are partitioned (by default into days of their
+``date`` field) and each partition is fingerprinted. The aggregate state of
+every partition is cached under (source, partition, fingerprint), so a
+re-analysis only recomputes partitions that are new or whose content
+changed and merges them with the cached states. The merged state of the
+last run is cached as well: when none of its partitions changed, as with a
+daily append, the run starts from it and merges only the new partitions.
+"""
+
+import hashlib
+import json
+import logging
+import marshal
+import os
+import shutil
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+from orchestrator.analysis.online import (
+    OnlineAnalysis, analysis_from_state, create_online_analysis, detect_analysis_kind
+)
+from orchestrator.utils.serialization import strict_json_default
+
+logger = logging.getLogger(__name__)
+
+# Characters of an ISO date/time string kept per bucket
+_BUCKETS = {"day": 10, "month": 7, "year": 4}
+
+def fingerprint_records(records: Sequence[Any]) -> str:
+    """
+    Fingerprint the content of a partition.
+    
+    Records of plain values are hashed in marshal format version 2, which
+    is as fast to produce as a pickle but encodes only content: it has no
+    back-references, so equal records hash alike in every run and process
+    however they share objects. Records holding other values are hashed by
+    their repr. Equal records with their fields in a different order hash
+    differently, which only costs a needless recomputation; different
+    records never hash alike.
+    
+    Args:
+        records: Records of the partition
+    
+    Returns:
+        Hex digest that changes whenever a record is added, removed or edited
+    """
+    records = list(records)
+    try:
+        data = marshal.dumps(records, 2)
+    except ValueError:
+        data = repr(records).encode("utf-8")
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def partition_records(
+    records: Sequence[Any],
+    field: str = "date",
+    bucket: Optional[str] = "day"
+) -> Dict[str, List[Any]]:
+    """
+    Split records into partitions by a date field.
+    
+    Args:
+        records: Record dictionaries
+        field: Field holding the partition value
+        bucket: "day", "month" or "year" to truncate ISO dates, or None to
+            use the field value as is
+    
+    Returns:
+        Dictionary mapping partition key to its records, in record order
+    """
+    # Group by raw value first; there are far fewer distinct values than records
+    groups: Dict[Any, List[Any]] = {}
+    for record in records:
+        try:
+            value = record.get(field, "unknown")
+        except AttributeError:
+            value = "unknown"
+        try:
+            group = groups.get(value)
+        except TypeError:
+            value = str(value)
+            group = groups.get(value)
+        if group is None:
+            group = groups[value] = []
+        group.append(record)
+    
+    width = _BUCKETS.get(bucket) if bucket else None
+    partitions: Dict[str, List[Any]] = {}
+    for value, group in groups.items():
+        key = str(value)[:width] if width else str(value)
+        if key in partitions:
+            partitions[key].extend(group)
+        else:
+            partitions[key] = group
+    return partitions
+
+class AnalysisCache:
+    """
+    Aggregate states keyed by (source, partition), each with its content fingerprint.
+    
+    States are kept in memory and, when a directory is configured, as one
+    JSON file per partition so that a run only writes what it recomputed.
+    States holding values JSON cannot restore (e.g. dates as group keys)
+    stay in memory only.
+    
+    Sources are cache keys: callers that analyze different extracts of a
+    source, such as extracts of different query plans, key each separately.
+    """
+    
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Initialize the Analysis Cache.
+        
+        Args:
+            directory: Optional directory for persisted states
+        """
+        self.directory = directory
+        self._partitions: Dict[Tuple[str, str], Tuple[str, Dict[str, Any]]] = {}
+        self._rollups: Dict[str, Tuple[Dict[str, str], Dict[str, Any]]] = {}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    
+    def get(self, source: str, partition: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached state if the partition content has not changed.
+        
+        Args:
+            source: Data source name
+            partition: Partition key
+            fingerprint: Current fingerprint of the partition
+        
+        Returns:
+            Serialized analysis state, or None on a miss
+        """
+        entry = self._partitions.get((source, partition))
+        if entry is None:
+            stored = self._read(source, self._partition_file(partition))
+            if stored is None:
+                return None
+            entry = self._partitions[(source, partition)] = (stored["fingerprint"], stored["state"])
+        if entry[0] != fingerprint:
+            return None
+        return entry[1]
+    
+    def put(self, source: str, partition: str, fingerprint: str, state: Dict[str, Any]) -> None:
+        """
+        Store the state of a partition.
+        
+        Args:
+            source: Data source name
+            partition: Partition key
+            fingerprint: Fingerprint of the partition content
+            state: Serialized analysis state
+        """
+        self._partitions[(source, partition)] = (fingerprint, state)
+        self._write(source, self._partition_file(partition), {
+            "partition": partition, "fingerprint": fingerprint, "state": state
+        })
+    
+    def get_rollup(self, source: str) -> Optional[Tuple[Dict[str, str], Dict[str, Any]]]:
+        """
+        Get the merged state of the last analysis of a source.
+        
+        Args:
+            source: Data source name
+        
+        Returns:
+            Tuple of (fingerprint per merged partition, merged state), or None
+        """
+        if source not in self._rollups:
+            stored = self._read(source, "rollup.json")
+            if stored is None:
+                return None
+            self._rollups[source] = (stored["fingerprints"], stored["state"])
+        return self._rollups[source]
+    
+    def put_rollup(self, source: str, fingerprints: Dict[str, str], state: Dict[str, Any]) -> None:
+        """
+        Store the merged state of an analysis of a source.
+        
+        Args:
+            source: Data source name
+            fingerprints: Fingerprint of every merged partition
+            state: Serialized merged analysis state
+        """
+        self._rollups[source] = (dict(fingerprints), state)
+        self._write(source, "rollup.json", {"fingerprints": fingerprints, "state": state})
+    
+    def invalidate(self, source: str, partition: Optional[str] = None) -> None:
+        """
+        Drop cached states, e.g. when a source is rewritten in place.
+        
+        Args:
+            source: Data source name
+            partition: Partition to drop; every partition of the source by default
+        """
+        self._rollups.pop(source, None)
+        if partition is None:
+            for key in [key for key in self._partitions if key[0] == source]:
+                del self._partitions[key]
+            if self.directory:
+                shutil.rmtree(self._source_dir(source), ignore_errors=True)
+            return
+        
+        self._partitions.pop((source, partition), None)
+        if self.directory:
+            for name in (self._partition_file(partition), "rollup.json"):
+                try:
+                    os.remove(os.path.join(self._source_dir(source), name))
+                except FileNotFoundError:
+                    pass
+    
+    def _source_dir(self, source: str) -> str:
+        digest = hashlib.sha256(source.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.directory, f"analysis-{digest}")
+    
+    def _partition_file(self, partition: str) -> str:
+        return hashlib.sha256(partition.encode("utf-8")).hexdigest()[:32] + ".json"
+    
+    def _read(self, source: str, name: str) -> Optional[Dict[str, Any]]:
+        """Read a persisted entry, or None if there is none or it is unreadable."""
+        if not self.directory:
+            return None
+        path = os.path.join(self._source_dir(source), name)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable analysis cache %s: %s", path, str(e))
+            return None
+    
+    def _write(self, source: str, name: str, entry: Dict[str, Any]) -> None:
+        """Persist an entry atomically, if a directory is configured."""
+        if not self.directory:
+            return
+        try:
+            data = json.dumps(entry, default=strict_json_default)
+        except (TypeError, ValueError) as e:
+            logger.warning("Not persisting analysis cache entry %s of %s: %s", name, source, str(e))
+            return
+        directory = self._source_dir(source)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, name)
+        # Agents in several worker processes may share the directory
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+def analyze_incremental(
+    cache: AnalysisCache,
+    source: str,
+    records: Sequence[Any],
+    kind: Optional[str] = None,
+    partition_field: str = "date",
+    bucket: Optional[str] = "day",
+    fingerprints: Optional[Dict[str, str]] = None,
+    sketches: bool = True
+) -> Tuple[OnlineAnalysis, Dict[str, int]]:
+    """
+    Analyze records, recomputing only partitions that are new or changed.
+    
+    The exact aggregates do not depend on how records are partitioned or in
+    which order partitions are merged, so the result equals a full
+    re-analysis.
+    
+    Args:
+        cache: Cache of partition states
+        source: Data source name
+        records: All current records of the source
+        kind: Analysis kind; detected from the records by default
+        partition_field: Field to partition by
+        bucket: Date bucket for partition keys ("day", "month", "year" or None)
+        fingerprints: Optional fingerprint per partition supplied by the
+            source (e.g. file modification times); partitions without one are
+            fingerprinted by content
+        sketches: Whether to build the sketches behind "approximate_statistics"
+    
+    Returns:
+        Tuple of (merged analysis, counts of partitions, reused and recomputed)
+    """
+    kind = kind or detect_analysis_kind(records)
+    fingerprints = fingerprints or {}
+    partitions = partition_records(records, partition_field, bucket)
+    # States with and without sketches must not stand in for each other
+    variant = f"{kind}+sketches" if sketches else kind
+    current = {
+        key: f"{variant}:{fingerprints.get(key) or fingerprint_records(part)}"
+        for key, part in partitions.items()
+    }
+    
+    # Start from the last merged state if none of its partitions changed
+    rollup = cache.get_rollup(source)
+    if rollup is not None and all(
+        current.get(key) == fingerprint for key, fingerprint in rollup[0].items()
+    ):
+        merged = analysis_from_state(rollup[1])
+        pending = sorted(key for key in current if key not in rollup[0])
+        reused = len(rollup[0])
+    else:
+        merged = create_online_analysis(kind, sketches)
+        pending = sorted(current)
+        reused = 0
+    
+    recomputed = 0
+    for key in pending:
+        state = cache.get(source, key, current[key])
+        if state is not None:
+            merged.merge(analysis_from_state(state))
+            reused += 1
+            continue
+        
+        analysis = create_online_analysis(kind, sketches)
+        analysis.update(partitions[key])
+        cache.put(source, key, current[key], analysis.get_state())
+        merged.merge(analysis)
+        recomputed += 1
+    
+    if pending:
+        cache.put_rollup(source, current, merged.get_state())
+    logger.info(
+        "Incremental analysis of %s: %d partitions reused, %d recomputed", source, reused, recomputed
+    )
+    return merged, {"partitions": len(partitions), "reused": reused, "recomputed": recomputed}
\ No newline at end of file
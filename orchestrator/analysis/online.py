@@ -0,0 +1,667 @@
+"""
+Online (streaming) statistics for analysis over record batches.
+
+Every aggregate here is mergeable: two states built from disjoint parts of
+a dataset combine into the state of the whole, and ``get_state()`` /
+``from_state()`` turn a state into plain lists and numbers that can be
+pickled or sent as JSON to another worker. Sums are kept exactly (as
+Shewchuk partials, like ``math.fsum``), so merged results do not depend on
+how the data was partitioned.
+"""
+
+import itertools
+import logging
+import math
+from collections import defaultdict
+from typing import Dict, Any, List, Optional, Sequence
+
+from orchestrator.analysis.schema import infer_schema
+from orchestrator.analysis.sketches import SketchSummary
+
+logger = logging.getLogger(__name__)
+
+class ExactSum:
+    """
+    Sum of floats without rounding error, as a list of non-overlapping partials.
+    """
+    
+    __slots__ = ("partials",)
+    
+    def __init__(self, partials: Optional[List[float]] = None):
+        """
+        Initialize the sum.
+        
+        Args:
+            partials: Partials of an existing sum
+        """
+        self.partials = list(partials) if partials else []
+    
+    def add(self, value: float) -> None:
+        """
+        Add a value.
+        
+        Args:
+            value: Value to add
+        """
+        self.add_many((value,))
+    
+    def add_many(self, values: Sequence[float]) -> None:
+        """
+        Add several values.
+        
+        A long sequence is first reduced to a few partials with
+        ``math.fsum``, in C, and only those are added one by one.
+        
+        Args:
+            values: Values to add
+        """
+        if hasattr(values, "tolist"):
+            values = values.tolist()
+        if len(values) > len(self.partials) + 2:
+            reduced = _fsum_partials(values)
+            if reduced is not None:
+                values = reduced
+        partials = self.partials
+        for x in values:
+            i = 0
+            for y in partials:
+                if abs(x) < abs(y):
+                    x, y = y, x
+                hi = x + y
+                lo = y - (hi - x)
+                if lo:
+                    partials[i] = lo
+                    i += 1
+                x = hi
+            partials[i:] = [x]
+    
+    def merge(self, other: "ExactSum") -> None:
+        """
+        Add another sum into this one.
+        
+        Args:
+            other: Sum to merge
+        """
+        self.add_many(other.partials)
+    
+    @property
+    def value(self) -> float:
+        """Correctly rounded value of the sum."""
+        return math.fsum(self.partials)
+
+class RunningStats:
+    """
+    Running count, sum, variance, min and max.
+    
+    The mean is derived from the exact sum; the variance uses Welford's
+    algorithm and Chan's formula when merging, so it can differ in the last
+    bits between partitionings.
+    """
+    
+    def __init__(self):
+        """Initialize empty statistics."""
+        self.count = 0
+        self.total = ExactSum()
+        self.m2 = 0.0
+        self.minimum = None
+        self.maximum = None
+        self._mean = 0.0
+    
+    def update(self, value: float) -> None:
+        """
+        Add a value.
+        
+        Args:
+            value: Value to add
+        """
+        self.update_many((value,))
+    
+    def update_many(self, values: Sequence[float]) -> None:
+        """
+        Add several values.
+        
+        Args:
+            values: Values to add
+        """
+        count, mean, m2 = self.count, self._mean, self.m2
+        minimum, maximum = self.minimum, self.maximum
+        for value in values:
+            count += 1
+            delta = value - mean
+            mean += delta / count
+            m2 += delta * (value - mean)
+            if minimum is None or value < minimum:
+                minimum = value
+            if maximum is None or value > maximum:
+                maximum = value
+        self.count, self._mean, self.m2 = count, mean, m2
+        self.minimum, self.maximum = minimum, maximum
+        self.total.add_many(values)
+    
+    def merge(self, other: "RunningStats") -> None:
+        """
+        Combine statistics of another set of values into these.
+        
+        Args:
+            other: Statistics to merge
+        """
+        if not other.count:
+            return
+        if not self.count:
+            self.count, self._mean, self.m2 = other.count, other._mean, other.m2
+        else:
+            count = self.count + other.count
+            delta = other._mean - self._mean
+            self.m2 += other.m2 + delta * delta * self.count * other.count / count
+            self._mean += delta * other.count / count
+            self.count = count
+        self.total.merge(other.total)
+        if self.minimum is None or (other.minimum is not None and other.minimum < self.minimum):
+            self.minimum = other.minimum
+        if self.maximum is None or (other.maximum is not None and other.maximum > self.maximum):
+            self.maximum = other.maximum
+    
+    @property
+    def mean(self) -> float:
+        """Mean of the values seen so far."""
+        return self.total.value / self.count if self.count else 0.0
+    
+    @property
+    def variance(self) -> float:
+        """Population variance of the values seen so far."""
+        return self.m2 / self.count if self.count else 0.0
+    
+    def get_state(self) -> List[Any]:
+        """
+        Get the statistics as plain values.
+        
+        Returns:
+            Serializable state
+        """
+        return [self.count, self.total.partials, self._mean, self.m2, self.minimum, self.maximum]
+    
+    @classmethod
+    def from_state(cls, state: Sequence[Any]) -> "RunningStats":
+        """
+        Rebuild statistics from ``get_state()`` output.
+        
+        Args:
+            state: Serialized state
+        
+        Returns:
+            Running statistics
+        """
+        stats = cls()
+        stats.count, partials, stats._mean, stats.m2, stats.minimum, stats.maximum = state
+        stats.total = ExactSum(partials)
+        return stats
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Summarize the statistics.
+        
+        Returns:
+            Dictionary with count, mean, variance, min and max
+        """
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "variance": self.variance,
+            "min": self.minimum,
+            "max": self.maximum
+        }
+
+class OnlineAnalysis:
+    """
+    Base class for analyses that consume record batches incrementally.
+    
+    ``result()`` can be called at any time and returns the same schema as
+    the corresponding batch analysis in StatisticalAnalysisAgent. Groups
+    are reported in order of first appearance; merging states in partition
+    order preserves it. Everything except the sketch-based
+    "approximate_statistics" output is independent of the partitioning;
+    that output is only produced when sketches are enabled.
+    """
+    
+    kind = "generic"
+    
+    def __init__(self, sketches: bool = True):
+        """
+        Initialize empty aggregates.
+        
+        Args:
+            sketches: Whether to maintain the sketches behind "approximate_statistics"
+        """
+        self.record_count = 0
+        self.batch_count = 0
+        self.sketches: Optional[SketchSummary] = SketchSummary(self.kind) if sketches else None
+    
+    def update(self, batch: Sequence[Any]) -> None:
+        """
+        Fold a batch of records into the running aggregates.
+        
+        Args:
+            batch: Record dictionaries; non-dictionary records are counted but otherwise ignored
+        """
+        records = [r if isinstance(r, dict) else {} for r in batch]
+        self._update(records)
+        self.record_count += len(records)
+        self.batch_count += 1
+    
+    def merge(self, other: "OnlineAnalysis") -> "OnlineAnalysis":
+        """
+        Fold the aggregates of another analysis of the same kind into this one.
+        
+        Args:
+            other: Analysis over records that follow this one's
+        
+        Returns:
+            This analysis
+        
+        Raises:
+            ValueError: If the analyses are of different kinds
+        """
+        if other.kind != self.kind:
+            raise ValueError(f"Cannot merge {other.kind} analysis into {self.kind} analysis")
+        self._merge(other)
+        if self.sketches is not None and other.sketches is not None:
+            self.sketches.merge(other.sketches)
+        else:
+            # sketches missing on either side cannot describe the union
+            self.sketches = None
+        self.record_count += other.record_count
+        self.batch_count += other.batch_count
+        return self
+    
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Get the aggregates as plain lists and numbers.
+        
+        Returns:
+            Serializable state, restorable with ``analysis_from_state``
+        """
+        return {
+            "kind": self.kind,
+            "record_count": self.record_count,
+            "batch_count": self.batch_count,
+            "aggregates": self._get_state(),
+            "sketches": self.sketches.get_state() if self.sketches is not None else None
+        }
+    
+    def _update_sketches(self, values: Sequence[Any], records: List[Dict[str, Any]]) -> None:
+        """
+        Fold values and records into the sketches, if enabled.
+        
+        Args:
+            values: Analysis values of the records
+            records: Record dictionaries
+        """
+        if self.sketches is not None:
+            self.sketches.update(values, records)
+    
+    def _with_sketches(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Add the sketch summary to a result, if sketches are enabled.
+        
+        Args:
+            result: Analysis result
+        
+        Returns:
+            The result
+        """
+        if self.sketches is not None:
+            result["approximate_statistics"] = self.sketches.result()
+        return result
+    
+    def _update(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Fold records into the aggregates.
+        
+        Args:
+            records: Record dictionaries
+        """
+        raise NotImplementedError
+    
+    def _merge(self, other: "OnlineAnalysis") -> None:
+        """
+        Fold another analysis's aggregates into these.
+        
+        Args:
+            other: Analysis of the same kind
+        """
+        raise NotImplementedError
+    
+    def _get_state(self) -> Dict[str, Any]:
+        """
+        Get the subclass aggregates as plain values.
+        
+        Returns:
+            Serializable aggregates
+        """
+        raise NotImplementedError
+    
+    def _set_state(self, aggregates: Dict[str, Any]) -> None:
+        """
+        Restore the subclass aggregates from ``_get_state()`` output.
+        
+        Args:
+            aggregates: Serialized aggregates
+        """
+        raise NotImplementedError
+    
+    def result(self) -> Dict[str, Any]:
+        """
+        Get the analysis results for the records seen so far.
+        
+        Returns:
+            Analysis results
+        """
+        raise NotImplementedError
+
+class FeedbackAnalysis(OnlineAnalysis):
+    """
+    Running sentiment distribution, rating statistics and daily rating trend.
+    """
+    
+    kind = "feedback"
+    
+    def __init__(self, sketches: bool = True):
+        super().__init__(sketches)
+        self.ratings = RunningStats()
+        self.sentiment_counts = {"positive": 0, "neutral": 0, "negative": 0}
+        self.date_sums: Dict[Any, ExactSum] = {}
+        self.date_counts: Dict[Any, int] = {}
+    
+    def _update(self, records: List[Dict[str, Any]]) -> None:
+        ratings = [record.get("rating", 0) for record in records]
+        by_date = defaultdict(list)
+        positive = neutral = negative = 0
+        for record, rating in zip(records, ratings):
+            if rating >= 4:
+                positive += 1
+            elif rating == 3:
+                neutral += 1
+            elif rating <= 2:
+                negative += 1
+            by_date[record.get("date", "unknown")].append(rating)
+        
+        self.ratings.update_many(ratings)
+        self._update_sketches(ratings, records)
+        self.sentiment_counts["positive"] += positive
+        self.sentiment_counts["neutral"] += neutral
+        self.sentiment_counts["negative"] += negative
+        for date, values in by_date.items():
+            _group_sum(self.date_sums, date).add_many(values)
+            self.date_counts[date] = self.date_counts.get(date, 0) + len(values)
+    
+    def _merge(self, other: "FeedbackAnalysis") -> None:
+        self.ratings.merge(other.ratings)
+        for label, count in other.sentiment_counts.items():
+            self.sentiment_counts[label] += count
+        for date, total in other.date_sums.items():
+            _group_sum(self.date_sums, date).merge(total)
+            self.date_counts[date] = self.date_counts.get(date, 0) + other.date_counts[date]
+    
+    def _get_state(self) -> Dict[str, Any]:
+        return {
+            "ratings": self.ratings.get_state(),
+            "sentiment_counts": dict(self.sentiment_counts),
+            "dates": [
+                [date, total.partials, self.date_counts[date]] for date, total in self.date_sums.items()
+            ]
+        }
+    
+    def _set_state(self, aggregates: Dict[str, Any]) -> None:
+        self.ratings = RunningStats.from_state(aggregates["ratings"])
+        self.sentiment_counts = dict(aggregates["sentiment_counts"])
+        for date, partials, count in aggregates["dates"]:
+            self.date_sums[date] = ExactSum(partials)
+            self.date_counts[date] = count
+    
+    def result(self) -> Dict[str, Any]:
+        n = self.record_count
+        return self._with_sketches({
+            "sentiment_distribution": {
+                label: count / n if n else 0 for label, count in self.sentiment_counts.items()
+            },
+            "average_rating": self.ratings.mean if n else 0,
+            "rating_trend": {
+                date: total.value / self.date_counts[date] for date, total in self.date_sums.items()
+            },
+            "sample_size": n
+        })
+
+class SalesAnalysis(OnlineAnalysis):
+    """
+    Running total sales and sales grouped by product, region and date.
+    """
+    
+    kind = "sales"
+    
+    _GROUPS = (
+        ("sales_by_product", "product_id"),
+        ("sales_by_region", "region"),
+        ("sales_trend", "date")
+    )
+    
+    def __init__(self, sketches: bool = True):
+        super().__init__(sketches)
+        self.revenue = RunningStats()
+        self.groups: Dict[str, Dict[Any, ExactSum]] = {name: {} for name, _ in self._GROUPS}
+    
+    @property
+    def total_sales(self) -> float:
+        """Total revenue of the records seen so far."""
+        return self.revenue.total.value
+    
+    def _update(self, records: List[Dict[str, Any]]) -> None:
+        revenues = [record.get("quantity", 0) * record.get("price", 0) for record in records]
+        self.revenue.update_many(revenues)
+        self._update_sketches(revenues, records)
+        for name, field in self._GROUPS:
+            by_key = defaultdict(list)
+            for record, revenue in zip(records, revenues):
+                by_key[record.get(field, "unknown")].append(revenue)
+            sums = self.groups[name]
+            for key, values in by_key.items():
+                _group_sum(sums, key).add_many(values)
+    
+    def _merge(self, other: "SalesAnalysis") -> None:
+        self.revenue.merge(other.revenue)
+        for name, sums in other.groups.items():
+            for key, total in sums.items():
+                _group_sum(self.groups[name], key).merge(total)
+    
+    def _get_state(self) -> Dict[str, Any]:
+        state = {"revenue": self.revenue.get_state()}
+        for name, sums in self.groups.items():
+            state[name] = [[key, total.partials] for key, total in sums.items()]
+        return state
+    
+    def _set_state(self, aggregates: Dict[str, Any]) -> None:
+        self.revenue = RunningStats.from_state(aggregates["revenue"])
+        for name, _ in self._GROUPS:
+            self.groups[name] = {key: ExactSum(partials) for key, partials in aggregates[name]}
+    
+    def result(self) -> Dict[str, Any]:
+        result = {"total_sales": self.total_sales if self.record_count else 0}
+        for name, sums in self.groups.items():
+            result[name] = {key: total.value for key, total in sums.items()}
+        result["sample_size"] = self.record_count
+        return self._with_sketches(result)
+
+class GenericAnalysis(OnlineAnalysis):
+    """
+    Running value statistics overall and per category.
+    """
+    
+    kind = "generic"
+    
+    def __init__(self, sketches: bool = True):
+        super().__init__(sketches)
+        self.values = RunningStats()
+        self.categories: Dict[Any, RunningStats] = {}
+    
+    def _update(self, records: List[Dict[str, Any]]) -> None:
+        values = []
+        by_category = defaultdict(list)
+        for record in records:
+            value = record.get("value")
+            # NaN marks a missing value in a typed column
+            if value is not None and value != value:
+                value = None
+            if value is not None:
+                values.append(value)
+            category = record.get("category")
+            if category is not None:
+                by_category[category].append(0 if value is None else value)
+        
+        self.values.update_many(values)
+        self._update_sketches(values, records)
+        for category, category_values in by_category.items():
+            stats = self.categories.get(category)
+            if stats is None:
+                stats = self.categories[category] = RunningStats()
+            stats.update_many(category_values)
+    
+    def _merge(self, other: "GenericAnalysis") -> None:
+        self.values.merge(other.values)
+        for category, other_stats in other.categories.items():
+            stats = self.categories.get(category)
+            if stats is None:
+                stats = self.categories[category] = RunningStats()
+            stats.merge(other_stats)
+    
+    def _get_state(self) -> Dict[str, Any]:
+        return {
+            "values": self.values.get_state(),
+            "categories": [[category, stats.get_state()] for category, stats in self.categories.items()]
+        }
+    
+    def _set_state(self, aggregates: Dict[str, Any]) -> None:
+        self.values = RunningStats.from_state(aggregates["values"])
+        self.categories = {
+            category: RunningStats.from_state(state) for category, state in aggregates["categories"]
+        }
+    
+    def result(self) -> Dict[str, Any]:
+        has_values = self.values.count > 0
+        min_value = self.values.minimum if has_values else 0
+        max_value = self.values.maximum if has_values else 0
+        return self._with_sketches({
+            "average_value": self.values.mean if has_values else 0,
+            "min_value": min_value,
+            "max_value": max_value,
+            "value_range": max_value - min_value if has_values else 0,
+            "category_statistics": {
+                category: {
+                    "count": stats.count,
+                    "avg_value": stats.mean,
+                    "min_value": stats.minimum,
+                    "max_value": stats.maximum
+                }
+                for category, stats in self.categories.items()
+            },
+            "sample_size": self.record_count
+        })
+
+ONLINE_ANALYSES = {
+    "feedback": FeedbackAnalysis,
+    "sales": SalesAnalysis,
+    "generic": GenericAnalysis
+}
+
+def detect_analysis_kind(records: Sequence[Any]) -> str:
+    """
+    Pick the analysis kind for a batch of records from a sample of its fields.
+    
+    Args:
+        records: Record dictionaries
+    
+    Returns:
+        "feedback", "sales" or "generic"
+    """
+    return infer_schema(records).kind
+
+def create_online_analysis(kind: str, sketches: bool = True) -> OnlineAnalysis:
+    """
+    Create an empty online analysis of the given kind.
+    
+    Args:
+        kind: "feedback", "sales" or "generic"
+        sketches: Whether to maintain the sketches behind "approximate_statistics"
+    
+    Returns:
+        Online analysis
+    
+    Raises:
+        ValueError: If the kind is unknown
+    """
+    if kind not in ONLINE_ANALYSES:
+        raise ValueError(f"Unknown analysis kind: {kind}")
+    return ONLINE_ANALYSES[kind](sketches)
+
+def analysis_from_state(state: Dict[str, Any]) -> OnlineAnalysis:
+    """
+    Rebuild an online analysis from ``OnlineAnalysis.get_state()`` output.
+    
+    Args:
+        state: Serialized analysis state
+    
+    Returns:
+        Online analysis
+    
+    Raises:
+        ValueError: If the kind is unknown
+    """
+    sketches = state["sketches"]
+    analysis = create_online_analysis(state["kind"], sketches is not None)
+    analysis._set_state(state["aggregates"])
+    if sketches is not None:
+        analysis.sketches = SketchSummary.from_state(sketches)
+    analysis.record_count = state["record_count"]
+    analysis.batch_count = state["batch_count"]
+    return analysis
+
+def _fsum_partials(values: Sequence[float]) -> Optional[List[float]]:
+    """
+    Split the exact sum of values into a few floats with ``math.fsum``.
+    
+    ``math.fsum`` rounds the exact sum once; summing the values again with
+    the negated rounded sums yields the rounding error, until it is zero.
+    
+    Args:
+        values: Values to sum
+    
+    Returns:
+        Floats that add up to the exact sum, or None if a sum is not finite
+    """
+    totals: List[float] = []
+    negated: List[float] = []
+    while True:
+        try:
+            total = math.fsum(itertools.chain(values, negated))
+        except (OverflowError, ValueError):
+            return None
+        if not math.isfinite(total):
+            return None
+        if not total:
+            return totals
+        totals.append(total)
+        negated.append(-total)
+
+def _group_sum(sums: Dict[Any, ExactSum], key: Any) -> ExactSum:
+    """
+    Get the sum for a group, creating it on first use.
+    
+    Args:
+        sums: Sums by group key
+        key: Group key
+    
+    Returns:
+        Sum for the group
+    """
+    total = sums.get(key)
+    if total is None:
+        total = sums[key] = ExactSum()
+    return total
\ No newline at end of file
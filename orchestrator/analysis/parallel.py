@@ -0,0 +1,117 @@
+"""
+Partitioned analysis across a process pool.
+"""
+
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Sequence
+
+from orchestrator.analysis.online import (
+    OnlineAnalysis, analysis_from_state, create_online_analysis, detect_analysis_kind
+)
+
+logger = logging.getLogger(__name__)
+
+def partition(records: Sequence[Any], partitions: int) -> List[Sequence[Any]]:
+    """
+    Split records into contiguous, nearly equal partitions.
+    
+    Args:
+        records: Records to split
+        partitions: Number of partitions
+    
+    Returns:
+        List of non-empty partitions in record order
+    """
+    partitions = max(1, min(partitions, len(records)))
+    size, extra = divmod(len(records), partitions)
+    result = []
+    start = 0
+    for i in range(partitions):
+        end = start + size + (1 if i < extra else 0)
+        result.append(records[start:end])
+        start = end
+    return [part for part in result if len(part)]
+
+def analyze_partition(kind: str, records: Sequence[Any], sketches: bool = True) -> Dict[str, Any]:
+    """
+    Analyze one partition and return its aggregate state.
+    
+    This is the unit of work sent to pool processes (or to other worker
+    nodes); the returned state is plain data that pickles and serializes
+    to JSON.
+    
+    Args:
+        kind: Analysis kind ("feedback", "sales" or "generic")
+        records: Records of the partition
+        sketches: Whether to build the sketches behind "approximate_statistics"
+    
+    Returns:
+        Serialized analysis state
+    """
+    analysis = create_online_analysis(kind, sketches)
+    analysis.update(records)
+    return analysis.get_state()
+
+def merge_states(kind: str, states: Sequence[Dict[str, Any]], sketches: bool = True) -> OnlineAnalysis:
+    """
+    Merge partition states in partition order.
+    
+    Args:
+        kind: Analysis kind, used when there are no states
+        states: Serialized states in partition order
+        sketches: Whether the states carry sketches to merge
+    
+    Returns:
+        Merged online analysis
+    """
+    merged = create_online_analysis(kind, sketches)
+    for state in states:
+        merged.merge(analysis_from_state(state))
+    return merged
+
+def analyze_partitioned(
+    records: Sequence[Any],
+    processes: int = 1,
+    kind: Optional[str] = None,
+    partitions: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    sketches: bool = True
+) -> OnlineAnalysis:
+    """
+    Analyze records split into partitions, in parallel when asked to.
+    
+    Partition states are merged in order, so the exact aggregates are
+    identical to analyzing all records in a single process, whatever the
+    number of processes or partitions; merged sketches stay approximate.
+    
+    Each partition is pickled to its worker. Partitions of a
+    ``RecordBatch`` travel as its typed columns, which pickle an order of
+    magnitude faster than row dictionaries.
+    
+    Args:
+        records: Records to analyze
+        processes: Number of worker processes; 1 analyzes in this process
+        kind: Analysis kind; detected from the records by default
+        partitions: Number of partitions; defaults to the number of processes
+        executor: Optional executor to submit partitions to, such as a
+            long-lived ``ProcessPool.executor()``; by default a process pool
+            is started for this call only
+        sketches: Whether to build the sketches behind "approximate_statistics"
+    
+    Returns:
+        Merged online analysis
+    """
+    kind = kind or detect_analysis_kind(records)
+    parts = partition(records, partitions or processes)
+    
+    if executor is None and processes <= 1:
+        states = [analyze_partition(kind, part, sketches) for part in parts]
+    elif executor is not None:
+        states = list(executor.map(analyze_partition, [kind] * len(parts), parts, [sketches] * len(parts)))
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            states = list(pool.map(analyze_partition, [kind] * len(parts), parts, [sketches] * len(parts)))
+    
+    logger.info("Analyzed %d records in %d partitions", len(records), len(parts))
+    return merge_states(kind, states, sketches)
\ No newline at end of file
@@ -0,0 +1,379 @@
+"""
+Schema inference from a sample of records or a declared schema.
+
+A ``DataSchema`` names the fields of a data source, their value types and
+the analysis kind the data calls for. It is inferred from an evenly spaced
+sample of the records, so its cost does not grow with the dataset, or
+built from the ``schema`` entry of the extraction metadata when the source
+declares one. The ``SchemaRegistry`` caches schemas per source so that the
+analysis, visualization and validation layers share one schema object.
+"""
+
+import logging
+import re
+from collections import OrderedDict
+from itertools import islice
+from typing import Dict, Any, Iterable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Analysis kinds and the field that identifies each, in order of precedence
+KIND_FIELDS = (("feedback", "feedback"), ("sales", "product_id"))
+
+_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+def value_type(value: Any) -> str:
+    """
+    Get the schema type name of a value.
+    
+    Args:
+        value: Field value
+    
+    Returns:
+        "null", "bool", "int", "float", "date", "str" or the Python type name
+    """
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    if isinstance(value, str):
+        return "date" if _DATE.match(value) else "str"
+    return type(value).__name__
+
+def _combine_types(current: Optional[str], new: str) -> str:
+    """Widen a field type to cover a newly seen value type."""
+    if current is None or current == new:
+        return new
+    if {current, new} == {"int", "float"}:
+        return "float"
+    if {current, new} == {"date", "str"}:
+        return "str"
+    return "mixed"
+
+def kind_for_fields(fields: Iterable[str]) -> str:
+    """
+    Pick the analysis kind for a set of field names.
+    
+    Args:
+        fields: Field names
+    
+    Returns:
+        "feedback", "sales" or "generic"
+    """
+    fields = set(fields)
+    for kind, field in KIND_FIELDS:
+        if field in fields:
+            return kind
+    return "generic"
+
+def sample_records(records: Iterable[Any], size: int) -> List[Any]:
+    """
+    Take an evenly spaced sample of records.
+    
+    Args:
+        records: Records; sequences are sampled across their whole length,
+            other iterables by their first ``size`` items
+        size: Maximum sample size
+    
+    Returns:
+        Sampled records
+    """
+    if not isinstance(records, Sequence):
+        return list(islice(records, size))
+    count = len(records)
+    if count <= size:
+        return list(records)
+    step = count / size
+    return [records[int(i * step)] for i in range(size)]
+
+class DataSchema:
+    """
+    Fields, value types and analysis kind of a data source.
+    """
+    
+    def __init__(
+        self,
+        fields: Dict[str, str],
+        kind: Optional[str] = None,
+        nullable: Iterable[str] = (),
+        source: Optional[str] = None,
+        declared: bool = False,
+        sample_size: int = 0
+    ):
+        """
+        Initialize the schema.
+        
+        Args:
+            fields: Type name per field, in first-seen order
+            kind: Analysis kind; derived from the field names by default
+            nullable: Fields that may be missing or None
+            source: Data source the schema describes
+            declared: Whether the schema was declared rather than inferred
+            sample_size: Number of records the schema was inferred from
+        """
+        self.fields = dict(fields)
+        self.kind = kind or kind_for_fields(self.fields)
+        self.nullable = set(nullable)
+        self.source = source
+        self.declared = declared
+        self.sample_size = sample_size
+    
+    def has(self, field: str) -> bool:
+        """
+        Check whether the schema has a field.
+        
+        Args:
+            field: Field name
+        
+        Returns:
+            True if the field is part of the schema
+        """
+        return field in self.fields
+    
+    def fields_of_type(self, *types: str) -> List[str]:
+        """
+        Get the fields of the given types.
+        
+        Args:
+            types: Type names, e.g. "int", "float"
+        
+        Returns:
+            Field names, in schema order
+        """
+        return [field for field, field_type in self.fields.items() if field_type in types]
+    
+    def missing_fields(self, records: Iterable[Any]) -> List[str]:
+        """
+        Find required fields that some of the records lack.
+        
+        Args:
+            records: Record dictionaries, typically a sample
+        
+        Returns:
+            Required (non-nullable) field names missing from at least one record
+        """
+        required = [field for field in self.fields if field not in self.nullable]
+        missing = set()
+        for record in records:
+            if isinstance(record, dict):
+                missing.update(field for field in required if field not in record)
+            else:
+                missing.update(required)
+        return [field for field in required if field in missing]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialize the schema.
+        
+        Returns:
+            JSON-compatible dictionary
+        """
+        return {
+            "fields": dict(self.fields),
+            "kind": self.kind,
+            "nullable": sorted(self.nullable),
+            "source": self.source,
+            "declared": self.declared,
+            "sample_size": self.sample_size
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DataSchema":
+        """
+        Rebuild a schema from ``to_dict()`` output or a declared schema.
+        
+        A declared schema may give ``fields`` as a mapping of field name to
+        type or as a list of field names, and may name its ``kind``.
+        
+        Args:
+            data: Serialized or declared schema
+        
+        Returns:
+            Schema
+        """
+        fields = data.get("fields") or {}
+        if not isinstance(fields, dict):
+            fields = {field: "any" for field in fields or ()}
+        return cls(
+            fields,
+            kind=data.get("kind"),
+            nullable=data.get("nullable", ()),
+            source=data.get("source"),
+            declared=data.get("declared", True),
+            sample_size=data.get("sample_size", 0)
+        )
+
+def infer_schema(
+    records: Iterable[Any],
+    sample_size: int = 1000,
+    source: Optional[str] = None
+) -> DataSchema:
+    """
+    Infer a schema from a sample of records.
+    
+    Args:
+        records: Record dictionaries
+        sample_size: Maximum number of records to inspect
+        source: Data source the records come from
+    
+    Returns:
+        Inferred schema
+    """
+    sample = [record for record in sample_records(records, sample_size) if isinstance(record, dict)]
+    fields: Dict[str, Optional[str]] = {}
+    counts: Dict[str, int] = {}
+    nullable = set()
+    for record in sample:
+        for field, value in record.items():
+            field_type = value_type(value)
+            counts[field] = counts.get(field, 0) + 1
+            if field_type == "null":
+                nullable.add(field)
+                fields.setdefault(field, None)
+            else:
+                fields[field] = _combine_types(fields.get(field), field_type)
+    nullable.update(field for field, count in counts.items() if count < len(sample))
+    return DataSchema(
+        {field: field_type or "null" for field, field_type in fields.items()},
+        nullable=nullable,
+        source=source,
+        sample_size=len(sample)
+    )
+
+def _same_kind(schema: DataSchema, records: Iterable[Any]) -> bool:
+    """Check that the first record still calls for the schema's analysis kind."""
+    if not isinstance(records, Sequence) or not records or not isinstance(records[0], dict):
+        return True
+    return kind_for_fields(records[0]) == schema.kind
+
+class SchemaRegistry:
+    """
+    Schemas cached per data source.
+    """
+    
+    def __init__(self, sample_size: int = 1000, max_sources: int = 1000):
+        """
+        Initialize the Schema Registry.
+        
+        Args:
+            sample_size: Number of records sampled to infer a schema
+            max_sources: Maximum number of cached sources; the least
+                recently used is evicted first
+        """
+        self.sample_size = sample_size
+        self.max_sources = max_sources
+        self._schemas: "OrderedDict[str, DataSchema]" = OrderedDict()
+    
+    def resolve(
+        self,
+        records: Iterable[Any],
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> DataSchema:
+        """
+        Get the schema of extracted data.
+        
+        A schema declared in ``metadata["schema"]`` takes precedence over
+        inference. Schemas of named sources (``metadata["source"]``) are
+        cached, so records are only sampled the first time a source is seen;
+        a cached schema is only checked against the first record, and is
+        inferred again if that record calls for another analysis kind.
+        
+        Args:
+            records: Extracted records
+            metadata: Extraction metadata
+        
+        Returns:
+            Schema of the data
+        """
+        metadata = metadata or {}
+        source = metadata.get("source")
+        declared = metadata.get("schema")
+        
+        cached = self.get(source)
+        if declared is not None:
+            schema = self._declare(declared, source)
+            if cached is not None and cached.to_dict() == schema.to_dict():
+                return cached
+        elif cached is not None and (cached.declared or _same_kind(cached, records)):
+            return cached
+        elif isinstance(getattr(records, "schema", None), DataSchema):
+            # Columnar batches carry their own schema
+            schema = DataSchema.from_dict({**records.schema.to_dict(), "source": source})
+        else:
+            schema = infer_schema(records, self.sample_size, source)
+            logger.info(
+                "Inferred %s schema with %d fields from %d records",
+                schema.kind, len(schema.fields), schema.sample_size
+            )
+        
+        # Nothing to learn from an empty sample; infer again next time
+        if source is not None and (schema.declared or schema.sample_size):
+            self._schemas[str(source)] = schema
+            self._schemas.move_to_end(str(source))
+            while len(self._schemas) > self.max_sources:
+                self._schemas.popitem(last=False)
+        return schema
+    
+    def get(self, source: Optional[str]) -> Optional[DataSchema]:
+        """
+        Get the cached schema of a source.
+        
+        Args:
+            source: Data source name
+        
+        Returns:
+            Schema, or None if the source has none cached
+        """
+        if source is None or str(source) not in self._schemas:
+            return None
+        self._schemas.move_to_end(str(source))
+        return self._schemas[str(source)]
+    
+    def for_result(self, metadata: Dict[str, Any]) -> Optional[DataSchema]:
+        """
+        Get the schema of a downstream result, such as an analysis result.
+        
+        Args:
+            metadata: Result metadata with "source_metadata" and/or "schema"
+        
+        Returns:
+            The cached schema of the result's source, the schema carried in
+            the metadata, or None
+        """
+        source = (metadata.get("source_metadata") or {}).get("source")
+        schema = self.get(source)
+        if schema is None and metadata.get("schema"):
+            schema = DataSchema.from_dict(metadata["schema"])
+        return schema
+    
+    def invalidate(self, source: Optional[str] = None) -> None:
+        """
+        Drop cached schemas.
+        
+        Args:
+            source: Source to drop; every source by default
+        """
+        if source is None:
+            self._schemas.clear()
+        else:
+            self._schemas.pop(str(source), None)
+    
+    def _declare(self, declared: Dict[str, Any], source: Optional[str]) -> DataSchema:
+        schema = DataSchema.from_dict({**declared, "declared": True})
+        schema.source = source
+        return schema
+
+_registry = SchemaRegistry()
+
+def get_schema_registry() -> SchemaRegistry:
+    """
+    Get the process-wide schema registry shared by agents and validators.
+    
+    Returns:
+        Schema registry
+    """
+    return _registry
\ No newline at end of file
@@ -0,0 +1,691 @@
+"""
+Mergeable sketches for approximate statistics in bounded memory.
+
+- ``KLLSketch``: quantiles with rank error around 1.7% for k=200 (Karnin,
+  Lang and Liberty, 2016).
+- ``HyperLogLog``: distinct counts with about 1.6% relative error at
+  precision 12 (Flajolet et al., 2007).
+- ``CountMinSketch``: frequency estimates that never undercount (Cormode and
+  Muthukrishnan, 2005), and ``TopK`` heavy hitters built on it.
+
+Every sketch merges with another of the same configuration and converts to
+and from plain lists and numbers with ``get_state()`` / ``from_state()``, so
+partition results can be combined across processes or workers. Items are
+hashed with blake2b of their ``repr``, which is stable across processes
+(unlike ``hash()``); numbers are normalized first, so equal numbers of
+different types (``1``, ``1.0``, ``numpy.int64(1)``) count as one item.
+"""
+
+import hashlib
+import logging
+import math
+import random
+from array import array
+from collections import Counter
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+def stable_hash(item: Any) -> int:
+    """
+    Hash an item to 64 bits, identically in every process.
+    
+    Args:
+        item: Item to hash
+    
+    Returns:
+        64-bit hash
+    """
+    digest = hashlib.blake2b(_hash_key(item), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+def _hash_key(item: Any) -> bytes:
+    """
+    Get the bytes an item is hashed by.
+    
+    Args:
+        item: Item to hash
+    
+    Returns:
+        UTF-8 ``repr`` of the item; integral numbers are written as integers
+        and other floats as plain floats, whatever their type
+    """
+    # numpy scalars become Python numbers
+    if type(item).__module__ == "numpy" and hasattr(item, "item"):
+        item = item.item()
+    if isinstance(item, float):
+        item = int(item) if item.is_integer() else float(item)
+    elif isinstance(item, int):
+        item = int(item)
+    return repr(item).encode("utf-8")
+
+class KLLSketch:
+    """
+    Quantile sketch keeping O(k log(n / k)) values.
+    
+    Values are kept in levels; an item at level h stands for 2**h inputs.
+    When a level is full it is sorted and every other item (randomly the odd
+    or even ones) is promoted to the next level.
+    """
+    
+    def __init__(self, k: int = 200, seed: int = 0):
+        """
+        Initialize an empty sketch.
+        
+        Args:
+            k: Accuracy parameter (capacity of the top level)
+            seed: Seed for the compaction coin flips
+        """
+        self.k = k
+        self.levels: List[List[float]] = [[]]
+        self.count = 0
+        self.minimum = None
+        self.maximum = None
+        self._size = 0
+        self._random = random.Random(seed)
+        self._resize()
+    
+    def update(self, value: float) -> None:
+        """
+        Add a value.
+        
+        Args:
+            value: Value to add
+        """
+        self.update_many((value,))
+    
+    def update_many(self, values: Sequence[float]) -> None:
+        """
+        Add several values.
+        
+        Args:
+            values: Values to add
+        """
+        if not len(values):
+            return
+        low, high = min(values), max(values)
+        if self.minimum is None or low < self.minimum:
+            self.minimum = low
+        if self.maximum is None or high > self.maximum:
+            self.maximum = high
+        self.count += len(values)
+        
+        # Fill level 0 in slices up to the size limit, compacting in between
+        values = list(values)
+        position = 0
+        while position < len(values):
+            room = max(self._max_size - self._size, 1)
+            chunk = values[position:position + room]
+            self.levels[0].extend(chunk)
+            self._size += len(chunk)
+            position += len(chunk)
+            while self._size >= self._max_size:
+                self._compress()
+    
+    def merge(self, other: "KLLSketch") -> None:
+        """
+        Add the values summarized by another sketch.
+        
+        Args:
+            other: Sketch to merge
+        """
+        if not other.count:
+            return
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        self._resize()
+        for level, items in enumerate(other.levels):
+            self.levels[level].extend(items)
+        self._size += other._size
+        self.count += other.count
+        if self.minimum is None or other.minimum < self.minimum:
+            self.minimum = other.minimum
+        if self.maximum is None or other.maximum > self.maximum:
+            self.maximum = other.maximum
+        while self._size >= self._max_size:
+            self._compress()
+    
+    def quantiles(self, qs: Sequence[float]) -> List[Optional[float]]:
+        """
+        Estimate quantiles.
+        
+        Args:
+            qs: Quantiles between 0 and 1
+        
+        Returns:
+            Estimated values, None for an empty sketch
+        """
+        if not self.count:
+            return [None] * len(qs)
+        weighted = sorted(
+            (value, 1 << level) for level, items in enumerate(self.levels) for value in items
+        )
+        total = sum(weight for _, weight in weighted)
+        result = []
+        for q in qs:
+            if q <= 0:
+                result.append(self.minimum)
+                continue
+            if q >= 1:
+                result.append(self.maximum)
+                continue
+            target = q * total
+            cumulative = 0
+            estimate = weighted[-1][0]
+            for value, weight in weighted:
+                cumulative += weight
+                if cumulative >= target:
+                    estimate = value
+                    break
+            result.append(estimate)
+        return result
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate one quantile.
+        
+        Args:
+            q: Quantile between 0 and 1
+        
+        Returns:
+            Estimated value, None for an empty sketch
+        """
+        return self.quantiles([q])[0]
+    
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Get the sketch as plain values.
+        
+        Returns:
+            Serializable state
+        """
+        return {
+            "k": self.k,
+            "levels": [list(items) for items in self.levels],
+            "count": self.count,
+            "min": self.minimum,
+            "max": self.maximum
+        }
+    
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "KLLSketch":
+        """
+        Rebuild a sketch from ``get_state()`` output.
+        
+        Args:
+            state: Serialized state
+        
+        Returns:
+            Sketch
+        """
+        sketch = cls(state["k"])
+        sketch.levels = [list(items) for items in state["levels"]]
+        sketch._size = sum(len(items) for items in sketch.levels)
+        sketch._resize()
+        sketch.count = state["count"]
+        sketch.minimum = state["min"]
+        sketch.maximum = state["max"]
+        return sketch
+    
+    def _resize(self) -> None:
+        """Recompute level capacities (k at the top, shrinking by 2/3 per level below)."""
+        height = len(self.levels)
+        self._capacities = [
+            int(math.ceil(self.k * (2 / 3) ** (height - level - 1))) + 1 for level in range(height)
+        ]
+        self._max_size = sum(self._capacities)
+    
+    def _compress(self) -> None:
+        """Compact the lowest full levels until the sketch is below its size limit."""
+        for level in range(len(self.levels)):
+            items = self.levels[level]
+            if len(items) >= self._capacities[level]:
+                if level + 1 == len(self.levels):
+                    self.levels.append([])
+                    self._resize()
+                items.sort()
+                # An odd item out stays at this level so no weight is lost
+                keep = [items.pop()] if len(items) % 2 else []
+                promoted = items[self._random.randrange(2)::2]
+                self.levels[level + 1].extend(promoted)
+                self.levels[level] = keep
+                self._size -= len(items) - len(promoted)
+                if self._size < self._max_size:
+                    break
+
+class HyperLogLog:
+    """
+    Distinct-count sketch with 2**precision one-byte registers.
+    """
+    
+    def __init__(self, precision: int = 12):
+        """
+        Initialize an empty sketch.
+        
+        Args:
+            precision: Number of index bits (4 to 16)
+        """
+        if not 4 <= precision <= 16:
+            raise ValueError(f"HyperLogLog precision must be between 4 and 16, got {precision}")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+    
+    def add(self, item: Any) -> None:
+        """
+        Add an item.
+        
+        Args:
+            item: Item to count
+        """
+        self.add_hash(stable_hash(item))
+    
+    def add_many(self, items: Sequence[Any]) -> None:
+        """
+        Add several items, hashing each distinct item once.
+        
+        Args:
+            items: Items to count
+        """
+        for item in set(items):
+            self.add_hash(stable_hash(item))
+    
+    def add_hash(self, hashed: int) -> None:
+        """
+        Add an item by its 64-bit hash.
+        
+        Args:
+            hashed: Item hash from ``stable_hash``
+        """
+        bits = 64 - self.precision
+        index = hashed >> bits
+        rank = bits - (hashed & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+    
+    def merge(self, other: "HyperLogLog") -> None:
+        """
+        Add the items counted by another sketch.
+        
+        Args:
+            other: Sketch with the same precision
+        
+        Raises:
+            ValueError: If the precisions differ
+        """
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precisions")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+    
+    def count(self) -> int:
+        """
+        Estimate the number of distinct items.
+        
+        Returns:
+            Estimated distinct count
+        """
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+    
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Get the sketch as plain values.
+        
+        Returns:
+            Serializable state
+        """
+        return {"precision": self.precision, "registers": self.registers.hex()}
+    
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "HyperLogLog":
+        """
+        Rebuild a sketch from ``get_state()`` output.
+        
+        Args:
+            state: Serialized state
+        
+        Returns:
+            Sketch
+        """
+        sketch = cls(state["precision"])
+        sketch.registers = bytearray.fromhex(state["registers"])
+        return sketch
+
+class CountMinSketch:
+    """
+    Frequency sketch: ``depth`` rows of ``width`` counters.
+    """
+    
+    def __init__(self, width: int = 2048, depth: int = 4):
+        """
+        Initialize an empty sketch.
+        
+        Args:
+            width: Counters per row; the error is about total / width
+            depth: Number of rows; the error bound fails with probability e**-depth
+        """
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        self.table = [array("q", [0]) * width for _ in range(depth)]
+    
+    def add(self, item: Any, count: int = 1) -> int:
+        """
+        Add occurrences of an item.
+        
+        Args:
+            item: Item
+            count: Number of occurrences
+        
+        Returns:
+            Estimated count of the item after adding
+        """
+        estimate = None
+        for row, index in zip(self.table, self._indexes(item)):
+            row[index] += count
+            if estimate is None or row[index] < estimate:
+                estimate = row[index]
+        self.total += count
+        return estimate
+    
+    def estimate(self, item: Any) -> int:
+        """
+        Estimate the number of occurrences of an item.
+        
+        Args:
+            item: Item
+        
+        Returns:
+            Estimated count, never below the true count
+        """
+        return min(row[index] for row, index in zip(self.table, self._indexes(item)))
+    
+    def merge(self, other: "CountMinSketch") -> None:
+        """
+        Add the occurrences counted by another sketch.
+        
+        Args:
+            other: Sketch with the same width and depth
+        
+        Raises:
+            ValueError: If the dimensions differ
+        """
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Cannot merge Count-Min sketches with different dimensions")
+        for row, other_row in zip(self.table, other.table):
+            for index, count in enumerate(other_row):
+                if count:
+                    row[index] += count
+        self.total += other.total
+    
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Get the sketch as plain values.
+        
+        Returns:
+            Serializable state
+        """
+        return {
+            "width": self.width,
+            "depth": self.depth,
+            "total": self.total,
+            "table": [row.tolist() for row in self.table]
+        }
+    
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "CountMinSketch":
+        """
+        Rebuild a sketch from ``get_state()`` output.
+        
+        Args:
+            state: Serialized state
+        
+        Returns:
+            Sketch
+        """
+        sketch = cls(state["width"], state["depth"])
+        sketch.total = state["total"]
+        sketch.table = [array("q", row) for row in state["table"]]
+        return sketch
+    
+    def _indexes(self, item: Any) -> List[int]:
+        """Column per row, by double hashing one 128-bit digest."""
+        digest = hashlib.blake2b(_hash_key(item), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+class TopK:
+    """
+    Heavy hitters: the most frequent items, with Count-Min estimates.
+    
+    A bounded set of candidates is tracked next to the sketch; an item
+    replaces the weakest candidate when its estimate is higher.
+    """
+    
+    def __init__(self, k: int = 10, width: int = 2048, depth: int = 4):
+        """
+        Initialize an empty tracker.
+        
+        Args:
+            k: Number of heavy hitters to report
+            width: Count-Min width
+            depth: Count-Min depth
+        """
+        self.k = k
+        self.capacity = 4 * k
+        self.sketch = CountMinSketch(width, depth)
+        self.candidates: Dict[Any, int] = {}
+    
+    def add_many(self, items: Sequence[Any]) -> None:
+        """
+        Count items, updating the sketch once per distinct item.
+        
+        Args:
+            items: Items
+        """
+        for item, count in Counter(items).items():
+            self._offer(item, self.sketch.add(item, count))
+    
+    def merge(self, other: "TopK") -> None:
+        """
+        Add the items counted by another tracker.
+        
+        Args:
+            other: Tracker with the same sketch dimensions
+        """
+        self.sketch.merge(other.sketch)
+        for item in list(other.candidates):
+            self.candidates.setdefault(item, 0)
+        estimates = {item: self.sketch.estimate(item) for item in self.candidates}
+        self.candidates = dict(
+            sorted(estimates.items(), key=lambda pair: -pair[1])[:self.capacity]
+        )
+    
+    def top(self, n: Optional[int] = None) -> List[Tuple[Any, int]]:
+        """
+        Get the heaviest items.
+        
+        Args:
+            n: Number of items; defaults to k
+        
+        Returns:
+            List of (item, estimated count), heaviest first
+        """
+        ranked = sorted(self.candidates.items(), key=lambda pair: -pair[1])
+        return ranked[:n or self.k]
+    
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Get the tracker as plain values.
+        
+        Returns:
+            Serializable state
+        """
+        return {
+            "k": self.k,
+            "sketch": self.sketch.get_state(),
+            "candidates": [[item, count] for item, count in self.candidates.items()]
+        }
+    
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "TopK":
+        """
+        Rebuild a tracker from ``get_state()`` output.
+        
+        Args:
+            state: Serialized state
+        
+        Returns:
+            Tracker
+        """
+        sketch = CountMinSketch.from_state(state["sketch"])
+        tracker = cls(state["k"], sketch.width, sketch.depth)
+        tracker.sketch = sketch
+        tracker.candidates = {item: count for item, count in state["candidates"]}
+        return tracker
+    
+    def _offer(self, item: Any, estimate: int) -> None:
+        """Track an item if it is a candidate or beats the weakest one."""
+        candidates = self.candidates
+        if item in candidates or len(candidates) < self.capacity:
+            candidates[item] = estimate
+            return
+        weakest = min(candidates, key=candidates.get)
+        if estimate > candidates[weakest]:
+            del candidates[weakest]
+            candidates[item] = estimate
+
+# Sketch outputs per analysis kind: (quantile output, distinct outputs by
+# field, heavy-hitter output and field)
+SKETCH_OUTPUTS = {
+    "feedback": ("rating_quantiles", {"distinct_customers": "customer_id"}, ("top_products", "product_id")),
+    "sales": (
+        "revenue_quantiles",
+        {"distinct_products": "product_id", "distinct_customers": "customer_id"},
+        ("top_products", "product_id")
+    ),
+    "generic": ("value_quantiles", {"distinct_categories": "category"}, ("top_categories", "category"))
+}
+
+REPORTED_QUANTILES = (0.25, 0.5, 0.75, 0.9, 0.99)
+
+class SketchSummary:
+    """
+    The sketches behind an analysis kind's ``approximate_statistics`` output.
+    """
+    
+    def __init__(self, kind: str):
+        """
+        Initialize empty sketches.
+        
+        Args:
+            kind: Analysis kind ("feedback", "sales" or "generic")
+        """
+        self.kind = kind
+        self.quantile_output, self.distinct_outputs, (self.top_output, self.top_field) = SKETCH_OUTPUTS[kind]
+        self.quantiles = KLLSketch()
+        self.distinct = {output: HyperLogLog() for output in self.distinct_outputs}
+        self.top = TopK()
+    
+    def update(self, values: Sequence[float], records: Sequence[Any]) -> None:
+        """
+        Add a batch.
+        
+        Args:
+            values: Numeric values for the quantile sketch
+            records: Record dictionaries for distinct counts and heavy hitters
+        """
+        if hasattr(values, "tolist"):
+            values = values.tolist()
+        self.quantiles.update_many(values)
+        rows = [r for r in records if isinstance(r, dict)]
+        for output, field in self.distinct_outputs.items():
+            self.distinct[output].add_many([r[field] for r in rows if r.get(field) is not None])
+        self.top.add_many([r[self.top_field] for r in rows if r.get(self.top_field) is not None])
+    
+    def update_columns(self, values: Sequence[float], columns: Dict[str, Sequence[Any]]) -> None:
+        """
+        Add a batch held as columns.
+        
+        Args:
+            values: Numeric values for the quantile sketch
+            columns: Column values by field name; a missing column counts as
+                a field absent from every row
+        """
+        if hasattr(values, "tolist"):
+            values = values.tolist()
+        self.quantiles.update_many(values)
+        for output, field in self.distinct_outputs.items():
+            self.distinct[output].add_many([v for v in columns.get(field, ()) if v is not None])
+        self.top.add_many([v for v in columns.get(self.top_field, ()) if v is not None])
+    
+    def merge(self, other: "SketchSummary") -> None:
+        """
+        Add the sketches of another summary of the same kind.
+        
+        Args:
+            other: Summary to merge
+        """
+        self.quantiles.merge(other.quantiles)
+        for output, sketch in other.distinct.items():
+            self.distinct[output].merge(sketch)
+        self.top.merge(other.top)
+    
+    def result(self) -> Dict[str, Any]:
+        """
+        Get the approximate statistics.
+        
+        Returns:
+            Quantiles, distinct counts and heavy hitters
+        """
+        estimates = self.quantiles.quantiles(REPORTED_QUANTILES)
+        result = {
+            self.quantile_output: {
+                f"p{int(q * 100)}": estimate for q, estimate in zip(REPORTED_QUANTILES, estimates)
+            }
+        }
+        for output, sketch in self.distinct.items():
+            result[output] = sketch.count()
+        result[self.top_output] = [
+            {self.top_field: item, "estimated_count": count} for item, count in self.top.top()
+        ]
+        return result
+    
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Get the sketches as plain values.
+        
+        Returns:
+            Serializable state
+        """
+        return {
+            "kind": self.kind,
+            "quantiles": self.quantiles.get_state(),
+            "distinct": {output: sketch.get_state() for output, sketch in self.distinct.items()},
+            "top": self.top.get_state()
+        }
+    
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "SketchSummary":
+        """
+        Rebuild a summary from ``get_state()`` output.
+        
+        Args:
+            state: Serialized state
+        
+        Returns:
+            Summary
+        """
+        summary = cls(state["kind"])
+        summary.quantiles = KLLSketch.from_state(state["quantiles"])
+        summary.distinct = {
+            output: HyperLogLog.from_state(sketch) for output, sketch in state["distinct"].items()
+        }
+        summary.top = TopK.from_state(state["top"])
+        return summary
\ No newline at end of file
@@ -0,0 +1,521 @@
+"""
+TF-IDF vectorization and mini-batch k-means clustering of free text.
+
+Documents are tokenized once into a ``TextCorpus``: term counts stored in
+compressed sparse row (CSR) form in typed arrays, plus a vocabulary that
+grows as documents are added. TF-IDF vectors are derived from the counts
+on demand, so memory stays proportional to the number of tokens rather than
+documents x vocabulary. Clustering is spherical mini-batch k-means
+(Sculley, 2010) on L2-normalized vectors, so similarity is the cosine.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import random
+import re
+import struct
+import sys
+from array import array
+from collections import Counter
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+
+# Stored corpus: magic and JSON header size, the header, then the arrays' buffers
+_CORPUS_MAGIC = b"OXC1"
+_CORPUS_PREFIX = struct.Struct("<4sI")
+_CORPUS_ARRAYS = ("document_frequency", "indptr", "indices", "counts")
+
+STOP_WORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further
+had has have having he her here hers him his how i if in into is it its itself just me more
+most my no nor not now of off on once only or other our out over own same she should so some
+such than that the their them then there these they this those through to too under until up
+very was we were what when where which while who whom why will with would you your yours
+""".split())
+
+SparseVector = Tuple[List[int], List[float]]
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase terms, dropping stop words, numbers and single characters.
+    
+    Args:
+        text: Text to tokenize
+    
+    Returns:
+        List of terms
+    """
+    return [
+        token for token in _WORD.findall(text.lower())
+        if len(token) > 1 and token not in STOP_WORDS and not token.isdigit()
+    ]
+
+class TextCorpus:
+    """
+    Tokenized documents as CSR term counts with an incremental vocabulary.
+    """
+    
+    def __init__(self):
+        """Initialize an empty corpus."""
+        self.terms: List[str] = []
+        self.term_ids: Dict[str, int] = {}
+        self.document_frequency = array("i")
+        self.indptr = array("q", [0])
+        self.indices = array("i")
+        self.counts = array("i")
+        self.fingerprint = b""
+    
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+    
+    def add(self, texts: Sequence[str]) -> None:
+        """
+        Tokenize documents and append them, extending the vocabulary.
+        
+        Args:
+            texts: Documents to add
+        """
+        term_ids = self.term_ids
+        document_frequency = self.document_frequency
+        fingerprint = self.fingerprint
+        for text in texts:
+            for term, count in Counter(tokenize(text)).items():
+                term_id = term_ids.get(term)
+                if term_id is None:
+                    term_id = term_ids[term] = len(self.terms)
+                    self.terms.append(term)
+                    document_frequency.append(0)
+                document_frequency[term_id] += 1
+                self.indices.append(term_id)
+                self.counts.append(count)
+            self.indptr.append(len(self.indices))
+            fingerprint = _chain(fingerprint, text)
+        self.fingerprint = fingerprint
+    
+    def idf(self) -> List[float]:
+        """
+        Compute smoothed inverse document frequencies, ln((1 + n) / (1 + df)) + 1.
+        
+        Returns:
+            IDF per term id
+        """
+        n = len(self)
+        return [math.log((1 + n) / (1 + df)) + 1 for df in self.document_frequency]
+    
+    def select_features(self, max_features: Optional[int] = None, min_df: int = 1, max_df: float = 1.0) -> array:
+        """
+        Choose the terms used as vector dimensions.
+        
+        Args:
+            max_features: Keep at most this many terms, the most frequent first
+            min_df: Minimum number of documents a term must occur in
+            max_df: Maximum fraction of documents a term may occur in
+        
+        Returns:
+            Feature index per term id, -1 for terms that are left out
+        """
+        limit = max_df * len(self)
+        candidates = [
+            term_id for term_id, df in enumerate(self.document_frequency)
+            if df >= min_df and df <= limit
+        ]
+        if max_features is not None and len(candidates) > max_features:
+            candidates.sort(key=lambda term_id: (-self.document_frequency[term_id], term_id))
+            candidates = sorted(candidates[:max_features])
+        feature_of = array("i", [-1]) * len(self.terms)
+        for feature, term_id in enumerate(candidates):
+            feature_of[term_id] = feature
+        return feature_of
+    
+    def vector(self, document: int, idf: Sequence[float], feature_of: Sequence[int]) -> SparseVector:
+        """
+        Build the L2-normalized TF-IDF vector of a document.
+        
+        Args:
+            document: Document index
+            idf: IDF per term id
+            feature_of: Feature index per term id, from ``select_features``
+        
+        Returns:
+            Tuple of (feature indexes, weights); empty if no term is a feature
+        """
+        start, end = self.indptr[document], self.indptr[document + 1]
+        features = []
+        weights = []
+        for term_id, count in zip(self.indices[start:end], self.counts[start:end]):
+            feature = feature_of[term_id]
+            if feature >= 0:
+                features.append(feature)
+                weights.append(count * idf[term_id])
+        norm = math.sqrt(sum(w * w for w in weights))
+        if norm:
+            weights = [w / norm for w in weights]
+        return features, weights
+    
+    def matches(self, texts: Sequence[str]) -> bool:
+        """
+        Check whether this corpus holds exactly the first documents of ``texts``.
+        
+        Args:
+            texts: Documents of a possibly longer corpus
+        
+        Returns:
+            True if the corpus is a prefix of ``texts``
+        """
+        if len(self) > len(texts):
+            return False
+        fingerprint = b""
+        for text in texts[:len(self)]:
+            fingerprint = _chain(fingerprint, text)
+        return fingerprint == self.fingerprint
+    
+    def to_bytes(self) -> bytes:
+        """
+        Serialize the corpus: a JSON header with the vocabulary, followed by the typed arrays as they are.
+        
+        Returns:
+            Serialized corpus
+        """
+        header = json.dumps({
+            "byteorder": sys.byteorder,
+            "terms": self.terms,
+            "fingerprint": self.fingerprint.hex(),
+            "arrays": [
+                {"type": getattr(self, name).typecode, "size": len(getattr(self, name)) * getattr(self, name).itemsize}
+                for name in _CORPUS_ARRAYS
+            ]
+        }).encode("utf-8")
+        buffers = [getattr(self, name).tobytes() for name in _CORPUS_ARRAYS]
+        return b"".join([_CORPUS_PREFIX.pack(_CORPUS_MAGIC, len(header)), header, *buffers])
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "TextCorpus":
+        """
+        Rebuild a corpus from ``to_bytes()`` output.
+        
+        Args:
+            data: Serialized corpus
+        
+        Returns:
+            Corpus
+        
+        Raises:
+            ValueError: If the data is not a serialized corpus
+        """
+        if len(data) < _CORPUS_PREFIX.size or data[:len(_CORPUS_MAGIC)] != _CORPUS_MAGIC:
+            raise ValueError("Not a serialized corpus")
+        _, header_size = _CORPUS_PREFIX.unpack_from(data)
+        offset = _CORPUS_PREFIX.size + header_size
+        header = json.loads(data[_CORPUS_PREFIX.size:offset])
+        
+        corpus = cls()
+        corpus.terms = header["terms"]
+        corpus.term_ids = {term: term_id for term_id, term in enumerate(corpus.terms)}
+        corpus.fingerprint = bytes.fromhex(header["fingerprint"])
+        for name, spec in zip(_CORPUS_ARRAYS, header["arrays"]):
+            values = array(spec["type"])
+            values.frombytes(data[offset:offset + spec["size"]])
+            if header["byteorder"] != sys.byteorder:
+                values.byteswap()
+            setattr(corpus, name, values)
+            offset += spec["size"]
+        if (
+            offset != len(data) or len(corpus.document_frequency) != len(corpus.terms)
+            or not corpus.indptr or corpus.indptr[-1] != len(corpus.indices) or len(corpus.indices) != len(corpus.counts)
+        ):
+            raise ValueError("Truncated or inconsistent serialized corpus")
+        return corpus
+
+class CorpusCache:
+    """
+    On-disk cache of tokenized corpora, reused and extended between runs.
+    """
+    
+    def __init__(self, directory: str):
+        """
+        Initialize the Corpus Cache.
+        
+        Args:
+            directory: Directory where corpora are stored
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+    
+    def load(self, key: str, texts: Sequence[str]) -> TextCorpus:
+        """
+        Get the corpus for ``texts``, tokenizing only documents not cached yet.
+        
+        A cached corpus is reused when it holds the first documents of
+        ``texts`` (for example yesterday's feedback before today's was
+        appended); otherwise it is rebuilt. The result is written back.
+        
+        Args:
+            key: Cache key, such as the data source name
+            texts: Documents
+        
+        Returns:
+            Corpus of all documents
+        """
+        path = self._path(key)
+        corpus = None
+        if os.path.exists(path):
+            try:
+                with open(path, "rb") as f:
+                    corpus = TextCorpus.from_bytes(f.read())
+            except Exception as e:
+                logger.warning("Ignoring unreadable corpus cache %s: %s", path, str(e))
+        
+        if corpus is None or not corpus.matches(texts):
+            corpus = TextCorpus()
+        cached = len(corpus)
+        if cached < len(texts):
+            corpus.add(texts[cached:])
+            self._save(path, corpus)
+        logger.info("Corpus %s: %d cached documents, %d added", key, cached, len(texts) - cached)
+        return corpus
+    
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.directory, f"corpus-{digest}.corpus")
+    
+    def _save(self, path: str, corpus: TextCorpus) -> None:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(corpus.to_bytes())
+        os.replace(tmp_path, path)
+
+class MiniBatchKMeans:
+    """
+    Spherical mini-batch k-means over sparse, L2-normalized vectors.
+    
+    Each batch is first assigned to the centers as they stood before the
+    batch; then each document moves its center by ``c = (1 - eta) c + eta x``
+    with the center's own learning rate ``eta = 1 / count``. A center is
+    stored as a dense array times a scale factor, so the update only touches
+    the document's non-zero features. Centers are renormalized after each
+    batch.
+    """
+    
+    def __init__(self, n_clusters: int, n_features: int, seed: int = 0):
+        """
+        Initialize the clusterer.
+        
+        Args:
+            n_clusters: Number of clusters
+            n_features: Number of vector dimensions
+            seed: Random seed for initialization
+        """
+        self.n_clusters = n_clusters
+        self.n_features = n_features
+        self.centers: List[array] = []
+        self.scales: List[float] = []
+        self.counts: List[int] = []
+        self._random = random.Random(seed)
+    
+    def partial_fit(self, vectors: Sequence[SparseVector]) -> None:
+        """
+        Update the centers with a batch of vectors.
+        
+        Args:
+            vectors: Batch of sparse vectors
+        """
+        vectors = [vector for vector in vectors if vector[0]]
+        if not self.centers:
+            self._initialize(vectors)
+        
+        # Assign the whole batch before any center moves
+        clusters = [self.predict_one(vector)[0] for vector in vectors]
+        for vector, cluster in zip(vectors, clusters):
+            self.counts[cluster] += 1
+            eta = 1.0 / self.counts[cluster]
+            self.scales[cluster] *= 1.0 - eta
+            center, step = self.centers[cluster], eta / self.scales[cluster]
+            for feature, weight in zip(*vector):
+                center[feature] += step * weight
+        
+        for cluster, center in enumerate(self.centers):
+            scale = self.scales[cluster]
+            norm = scale * math.sqrt(sum(w * w for w in center))
+            if norm:
+                factor = scale / norm
+                self.centers[cluster] = array("d", (w * factor for w in center))
+                self.scales[cluster] = 1.0
+    
+    def predict_one(self, vector: SparseVector) -> Tuple[int, float]:
+        """
+        Find the most similar center.
+        
+        Args:
+            vector: Sparse vector
+        
+        Returns:
+            Tuple of (cluster index, cosine similarity); (-1, 0.0) for empty
+            vectors or before fitting
+        """
+        features, weights = vector
+        best, best_similarity = -1, 0.0
+        if not features:
+            return best, best_similarity
+        for cluster, center in enumerate(self.centers):
+            similarity = self.scales[cluster] * sum(center[f] * w for f, w in zip(features, weights))
+            if best < 0 or similarity > best_similarity:
+                best, best_similarity = cluster, similarity
+        return best, best_similarity
+    
+    def top_features(self, cluster: int, n: int) -> List[int]:
+        """
+        Get the heaviest features of a center.
+        
+        Args:
+            cluster: Cluster index
+            n: Number of features
+        
+        Returns:
+            Feature indexes, heaviest first
+        """
+        center = self.centers[cluster]
+        return sorted((f for f in range(len(center)) if center[f] > 0), key=lambda f: -center[f])[:n]
+    
+    def _initialize(self, vectors: Sequence[SparseVector]) -> None:
+        """
+        Pick initial centers from a batch with greedy k-means++ seeding.
+        
+        Each round samples a few candidates with probability proportional to
+        their squared distance from the chosen centers and keeps the one
+        that reduces the total distance most.
+        
+        Args:
+            vectors: Non-empty sparse vectors
+        """
+        if not vectors:
+            return
+        trials = 2 + int(math.log(self.n_clusters))
+        chosen = [self._random.randrange(len(vectors))]
+        # Distance to the nearest chosen center, as 1 - cosine similarity
+        distances = self._distances(vectors, chosen[0], [1.0] * len(vectors))
+        while len(chosen) < min(self.n_clusters, len(vectors)):
+            weights = [d * d for d in distances]
+            if sum(weights) <= 0:
+                break
+            best = None
+            for candidate in self._random.choices(range(len(vectors)), weights=weights, k=trials):
+                candidate_distances = self._distances(vectors, candidate, distances)
+                potential = sum(d * d for d in candidate_distances)
+                if best is None or potential < best[0]:
+                    best = (potential, candidate, candidate_distances)
+            _, candidate, distances = best
+            chosen.append(candidate)
+        
+        for index in chosen:
+            center = array("d", [0.0]) * self.n_features
+            for feature, weight in zip(*vectors[index]):
+                center[feature] = weight
+            self.centers.append(center)
+            self.scales.append(1.0)
+            self.counts.append(1)
+    
+    def _distances(self, vectors: Sequence[SparseVector], index: int, distances: List[float]) -> List[float]:
+        """
+        Update nearest-center distances with a new center.
+        
+        Args:
+            vectors: Sparse vectors
+            index: Index of the vector used as the new center
+            distances: Current distance of each vector to its nearest center
+        
+        Returns:
+            Updated distances
+        """
+        center = dict(zip(*vectors[index]))
+        return [
+            min(distance, max(1.0 - sum(center.get(f, 0.0) * w for f, w in zip(features, weights)), 0.0))
+            for distance, (features, weights) in zip(distances, vectors)
+        ]
+
+def cluster_texts(
+    texts: Sequence[str],
+    n_clusters: int = 5,
+    corpus: Optional[TextCorpus] = None,
+    max_features: Optional[int] = 20000,
+    min_df: int = 1,
+    max_df: float = 0.95,
+    batch_size: int = 1024,
+    epochs: int = 3,
+    top_terms: int = 6,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """
+    Cluster documents into topics described by their heaviest terms.
+    
+    Args:
+        texts: Documents
+        n_clusters: Number of topics
+        corpus: Tokenized corpus of ``texts``, e.g. from a CorpusCache; built
+            here when omitted
+        max_features: Maximum vocabulary size used for vectors
+        min_df: Minimum document frequency of a feature term
+        max_df: Maximum document fraction of a feature term
+        batch_size: Mini-batch size
+        epochs: Number of passes over the documents
+        top_terms: Number of keywords per topic
+        seed: Random seed
+    
+    Returns:
+        Dictionary with "topics" (name and keywords), "labels" (topic index
+        per document, -1 for documents without feature terms) and
+        "similarities" (cosine similarity to the assigned topic)
+    """
+    if corpus is None:
+        corpus = TextCorpus()
+        corpus.add(texts)
+    
+    idf = corpus.idf()
+    feature_of = corpus.select_features(max_features, min_df, max_df)
+    feature_terms = {feature: corpus.terms[term_id] for term_id, feature in enumerate(feature_of) if feature >= 0}
+    kmeans = MiniBatchKMeans(n_clusters, len(feature_terms), seed)
+    
+    rng = random.Random(seed)
+    order = list(range(len(corpus)))
+    for _ in range(epochs):
+        rng.shuffle(order)
+        for start in range(0, len(order), batch_size):
+            kmeans.partial_fit([corpus.vector(i, idf, feature_of) for i in order[start:start + batch_size]])
+    
+    labels = []
+    similarities = []
+    for i in range(len(corpus)):
+        label, similarity = kmeans.predict_one(corpus.vector(i, idf, feature_of))
+        labels.append(label)
+        similarities.append(similarity)
+    
+    topics = []
+    names = set()
+    for cluster in range(len(kmeans.centers)):
+        keywords = [feature_terms[f] for f in kmeans.top_features(cluster, top_terms)]
+        name = " / ".join(keyword.title() for keyword in keywords[:3]) or f"Topic {cluster + 1}"
+        if name in names:
+            name = f"{name} ({cluster + 1})"
+        names.add(name)
+        topics.append({"name": name, "keywords": keywords})
+    
+    return {"topics": topics, "labels": labels, "similarities": similarities}
+
+def _chain(fingerprint: bytes, text: str) -> bytes:
+    """
+    Extend a corpus fingerprint with one more document.
+    
+    Args:
+        fingerprint: Fingerprint of the documents so far
+        text: Next document
+    
+    Returns:
+        Fingerprint including the document
+    """
+    return hashlib.sha256(fingerprint + text.encode("utf-8")).digest()
\ No newline at end of file
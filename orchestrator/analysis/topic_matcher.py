@@ -0,0 +1,139 @@
+"""
+Compiled keyword matcher for assigning texts to topics.
+"""
+
+import logging
+import re
+from typing import Dict, Any, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+
+class KeywordMatcher:
+    """
+    Scores texts against every topic's keywords in one pass per text.
+    
+    A topic's score is the number of its keywords that occur in the
+    lowercased text as substrings, the same rule as ``keyword in
+    text.lower()``. A substring made only of word characters always lies
+    inside a single word of the text, so for such keywords the matcher
+    tokenizes the text once and looks each distinct word up in an index of
+    the keywords it contains. That index is filled lazily and shared across
+    texts, so a word is only ever checked against the keywords once. Other
+    keywords (with spaces or punctuation) are checked with a plain substring
+    test.
+    """
+    
+    def __init__(self, topics: Sequence[Dict[str, Any]], max_cache_size: int = 1_000_000):
+        """
+        Compile the matcher.
+        
+        Args:
+            topics: Topics with "name" and "keywords"
+            max_cache_size: Maximum number of distinct words kept in the
+                word-to-keywords index before it is reset
+        """
+        self.topics = list(topics)
+        self.names = [topic["name"] for topic in self.topics]
+        self.max_cache_size = max_cache_size
+        
+        # keyword -> topic indexes, once per occurrence in a topic
+        keyword_topics: Dict[str, List[int]] = {}
+        for index, topic in enumerate(self.topics):
+            for keyword in topic.get("keywords", []):
+                keyword_topics.setdefault(keyword.lower(), []).append(index)
+        
+        self._word_keywords = [k for k in keyword_topics if _WORD.fullmatch(k)]
+        self._other_keywords = [k for k in keyword_topics if not _WORD.fullmatch(k)]
+        self._keyword_topics = keyword_topics
+        self._word_index: Dict[str, Tuple[str, ...]] = {}
+    
+    def scores(self, text: str) -> List[int]:
+        """
+        Score a text against every topic.
+        
+        Args:
+            text: Text to score
+        
+        Returns:
+            Score per topic, in topic order
+        """
+        lowered = text.lower()
+        scores = [0] * len(self.topics)
+        for keyword in self._matched_keywords(lowered):
+            for index in self._keyword_topics[keyword]:
+                scores[index] += 1
+        return scores
+    
+    def assign(self, text: str) -> int:
+        """
+        Pick the best-scoring topic for a text.
+        
+        Ties, including all-zero scores, go to the earliest topic.
+        
+        Args:
+            text: Text to assign
+        
+        Returns:
+            Topic index, or -1 if there are no topics
+        """
+        if not self.topics:
+            return -1
+        scores = self.scores(text)
+        return scores.index(max(scores))
+    
+    def assign_all(self, texts: Sequence[str]) -> List[int]:
+        """
+        Assign many texts.
+        
+        Args:
+            texts: Texts to assign
+        
+        Returns:
+            Topic index per text
+        """
+        return [self.assign(text) for text in texts]
+    
+    def distribution(self, assignments: Sequence[int]) -> Dict[str, int]:
+        """
+        Count assignments per topic name in a single pass.
+        
+        Args:
+            assignments: Topic index per text
+        
+        Returns:
+            Dictionary mapping topic name to number of texts
+        """
+        counts = [0] * len(self.topics)
+        for index in assignments:
+            if index >= 0:
+                counts[index] += 1
+        distribution: Dict[str, int] = {}
+        for name, count in zip(self.names, counts):
+            distribution[name] = distribution.get(name, 0) + count
+        return distribution
+    
+    def _matched_keywords(self, lowered: str) -> set:
+        """
+        Find the distinct keywords that occur in a lowercased text.
+        
+        Args:
+            lowered: Lowercased text
+        
+        Returns:
+            Set of matched keywords
+        """
+        matched = set()
+        index = self._word_index
+        for word in set(_WORD.findall(lowered)):
+            keywords = index.get(word)
+            if keywords is None:
+                if len(index) >= self.max_cache_size:
+                    index.clear()
+                keywords = index[word] = tuple(k for k in self._word_keywords if k in word)
+            matched.update(keywords)
+        for keyword in self._other_keywords:
+            if keyword in lowered:
+                matched.add(keyword)
+        return matched
\ No newline at end of file
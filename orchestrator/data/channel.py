@@ -0,0 +1,172 @@
+"""
+Bounded channels of record batches between pipeline stages.
+
+In a streaming workflow the extraction and the analysis run at the same
+time: a producer task reads batches from the source and puts them in a
+``BatchChannel``, and the analysis consumes the channel as an async
+iterator. The channel holds at most ``maxsize`` batches; when it is full,
+the producer waits for the consumer to take one (backpressure), so a fast
+source never buffers more than ``maxsize`` batches in memory, and a slow
+one never keeps the consumer waiting longer than it takes to read a batch.
+
+A channel records how long each side waited on the other, its largest
+depth and the most memory its queued batches held, which show whether
+the source or the consumer limits the pipeline.
+"""
+
+import asyncio
+import logging
+import sys
+import time
+from typing import Dict, Any, AsyncIterator, Iterable, Optional, Union
+
+from orchestrator.data.record_batch import RecordBatch
+
+logger = logging.getLogger(__name__)
+
+def batch_nbytes(batch: Any) -> int:
+    """
+    Approximate the memory held by a batch.
+    
+    Args:
+        batch: Record batch, or list of record dictionaries
+    
+    Returns:
+        Size in bytes; for record lists, estimated from the first record
+    """
+    if isinstance(batch, RecordBatch):
+        return batch.nbytes
+    if not batch:
+        return sys.getsizeof(batch)
+    first = batch[0]
+    row = sys.getsizeof(first)
+    if isinstance(first, dict):
+        row += sum(sys.getsizeof(value) for value in first.values())
+    return sys.getsizeof(batch) + row * len(batch)
+
+class _End:
+    """End of a channel, with the producer's error if it failed."""
+    
+    def __init__(self, error: Optional[BaseException] = None):
+        self.error = error
+
+class BatchChannel:
+    """
+    Bounded queue of record batches from one producer to one consumer.
+    """
+    
+    def __init__(self, maxsize: int = 4, name: str = "batches"):
+        """
+        Initialize the channel.
+        
+        Args:
+            maxsize: Maximum number of batches buffered
+            name: Name of the channel, for logging
+        
+        Raises:
+            ValueError: If maxsize is less than 1
+        """
+        if maxsize < 1:
+            raise ValueError("Channel size must be at least 1")
+        self.maxsize = maxsize
+        self.name = name
+        self.batches = 0
+        self.rows = 0
+        self.max_depth = 0
+        self.buffered_bytes = 0
+        self.peak_buffered_bytes = 0
+        self.producer_wait = 0.0
+        self.consumer_wait = 0.0
+        self.first_batch_seconds: Optional[float] = None
+        self._created = time.perf_counter()
+        self._queue: "asyncio.Queue[Any]" = asyncio.Queue(maxsize)
+    
+    async def put(self, batch: Any) -> None:
+        """
+        Add a batch, waiting while the channel is full.
+        
+        Args:
+            batch: Record batch or list of records
+        """
+        size = batch_nbytes(batch)
+        start = time.perf_counter()
+        await self._queue.put((batch, size))
+        self.producer_wait += time.perf_counter() - start
+        if self.first_batch_seconds is None:
+            self.first_batch_seconds = time.perf_counter() - self._created
+        self.batches += 1
+        self.rows += len(batch)
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+        self.buffered_bytes += size
+        self.peak_buffered_bytes = max(self.peak_buffered_bytes, self.buffered_bytes)
+    
+    async def close(self, error: Optional[BaseException] = None) -> None:
+        """
+        Mark the end of the batches, waiting while the channel is full.
+        
+        Args:
+            error: Error that ended the producer, raised to the consumer
+        """
+        await self._queue.put(_End(error))
+    
+    async def fill(self, batches: Union[AsyncIterator[Any], Iterable[Any]]) -> None:
+        """
+        Put every batch of a source in the channel, then close it.
+        
+        An error of the source is passed on to the consumer. The source is
+        closed if the producer is cancelled, e.g. because the consumer failed.
+        
+        Args:
+            batches: Async iterator or iterable of batches
+        """
+        try:
+            if hasattr(batches, "__aiter__"):
+                async for batch in batches:
+                    await self.put(batch)
+            else:
+                for batch in batches:
+                    await self.put(batch)
+                    await asyncio.sleep(0)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Producer of channel %s failed: %s", self.name, str(e))
+            await self.close(e)
+            return
+        finally:
+            if hasattr(batches, "aclose"):
+                await batches.aclose()
+        await self.close()
+    
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        while True:
+            start = time.perf_counter()
+            item = await self._queue.get()
+            self.consumer_wait += time.perf_counter() - start
+            if isinstance(item, _End):
+                if item.error is not None:
+                    raise item.error
+                return
+            batch, size = item
+            self.buffered_bytes -= size
+            yield batch
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Describe the channel.
+        
+        Returns:
+            Dictionary with its size, the batches and rows passed, the
+            largest depth and buffered bytes, the seconds each side waited
+            and the seconds to the first batch
+        """
+        return {
+            "maxsize": self.maxsize,
+            "batches": self.batches,
+            "rows": self.rows,
+            "max_depth": self.max_depth,
+            "peak_buffered_bytes": self.peak_buffered_bytes,
+            "producer_wait_seconds": self.producer_wait,
+            "consumer_wait_seconds": self.consumer_wait,
+            "first_batch_seconds": self.first_batch_seconds
+        }
\ No newline at end of file
@@ -0,0 +1,678 @@
+"""
+Streaming data-source connectors.
+
+A connector reads one data source in bounded-size batches of record
+dictionaries, exposed as an async iterator. Blocking reads run in the
+default thread executor one batch at a time, so the event loop stays free
+and at most one batch is held by the connector. Every connector tracks
+rows and bytes read and reports its throughput.
+
+Database connectors share a connection pool per source and can read
+ranges of a partition column concurrently.
+
+A connector given a ``QueryPlan`` returns only the planned columns of the
+rows that meet its conditions, applied at the source where the connector
+can (see ``orchestrator.data.query_plan``).
+
+Connectors are looked up in a registry by name, by URI scheme
+(``sqlite:///path/to.db``) or by file extension, and new ones can be added
+with ``register_connector``.
+"""
+
+import asyncio
+import csv
+import io
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Dict, Any, AsyncIterator, Iterator, List, Optional, Tuple, Type, Union
+
+from orchestrator.data.pool import ConnectionPool, get_pool
+from orchestrator.data.query_plan import QueryPlan
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is an optional dependency
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+Batch = List[Dict[str, Any]]
+
+class ConnectorStats:
+    """
+    Rows and bytes read by a connector, and the time spent reading them.
+    """
+    
+    def __init__(self):
+        """Initialize the statistics."""
+        self.rows = 0
+        self.bytes = 0
+        self.batches = 0
+        self.elapsed = 0.0
+    
+    @property
+    def rows_per_second(self) -> float:
+        """Rows read per second of reading."""
+        return self.rows / self.elapsed if self.elapsed else 0.0
+    
+    @property
+    def bytes_per_second(self) -> float:
+        """Bytes read per second of reading."""
+        return self.bytes / self.elapsed if self.elapsed else 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialize the statistics.
+        
+        Returns:
+            Dictionary with rows, bytes, batches, elapsed seconds and rates
+        """
+        return {
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "batches": self.batches,
+            "elapsed_seconds": self.elapsed,
+            "rows_per_second": self.rows_per_second,
+            "bytes_per_second": self.bytes_per_second
+        }
+
+class Connector:
+    """
+    Base class for connectors that stream records from a data source.
+    
+    Subclasses implement ``_read_batches``, a blocking generator of
+    ``(records, bytes_read)`` pairs.
+    
+    With the "since_field" and "since" options, only records whose field is
+    at or above the given value are returned, for incremental extraction.
+    Connectors that can apply the condition at the source set
+    ``filters_since``; the others read everything and filter the batches.
+    
+    Likewise, with a "plan" option (a ``QueryPlan`` or its dictionary),
+    connectors that set ``pushes_down_plan`` read only the planned columns
+    and rows, and the others filter and project each batch they read.
+    """
+    
+    name = "base"
+    filters_since = False
+    pushes_down_plan = False
+    
+    def __init__(self, location: str, batch_size: int = 10000, **options: Any):
+        """
+        Initialize the connector.
+        
+        Args:
+            location: Path or URI of the data source
+            batch_size: Maximum number of records per batch
+            options: Connector-specific options
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.location = location
+        self.batch_size = batch_size
+        self.options = options
+        self.since_field: Optional[str] = options.get("since_field")
+        self.since = options.get("since")
+        plan = options.get("plan")
+        self.plan: Optional[QueryPlan] = QueryPlan.from_dict(plan) if isinstance(plan, dict) else plan
+        self.stats = ConnectorStats()
+    
+    async def batches(self) -> AsyncIterator[Batch]:
+        """
+        Stream the records of the source.
+        
+        Yields:
+            Lists of at most ``batch_size`` record dictionaries
+        """
+        async for records in self._stream(self._read_batches()):
+            yield records
+    
+    async def _stream(self, reader: Iterator[Tuple[Batch, int]]) -> AsyncIterator[Batch]:
+        """Drive a blocking batch reader in the executor, counting what it reads."""
+        loop = asyncio.get_running_loop()
+        plan = None if self.pushes_down_plan else self.plan
+        resolved = False
+        try:
+            while True:
+                start = time.perf_counter()
+                item = await loop.run_in_executor(None, next, reader, None)
+                self.stats.elapsed += time.perf_counter() - start
+                if item is None:
+                    break
+                records, size = item
+                if self.since_field is not None and not self.filters_since:
+                    records = self._filter_since(records)
+                if plan is not None and records:
+                    if not resolved:
+                        plan, resolved = plan.resolve(records[0]), True
+                    records = plan.apply_records(records)
+                self.stats.rows += len(records)
+                self.stats.bytes += size
+                self.stats.batches += 1
+                if records:
+                    yield records
+        finally:
+            reader.close()
+            logger.info(
+                "%s connector read %d rows (%d bytes) from %s: %.0f rows/s, %.0f bytes/s",
+                self.name, self.stats.rows, self.stats.bytes, self.location,
+                self.stats.rows_per_second, self.stats.bytes_per_second
+            )
+    
+    async def read_all(self) -> Batch:
+        """
+        Materialize every record of the source.
+        
+        Returns:
+            All records
+        """
+        records = []
+        async for batch in self.batches():
+            records.extend(batch)
+        return records
+    
+    def describe(self) -> Dict[str, Any]:
+        """
+        Describe the connector for extraction metadata.
+        
+        Returns:
+            Dictionary with the connector name, location, batch size and stats
+        """
+        return {
+            "connector": self.name,
+            "location": self.location,
+            "batch_size": self.batch_size,
+            "throughput": self.stats.to_dict()
+        }
+    
+    def _filter_since(self, records: Batch) -> Batch:
+        """Keep the records at or above the ``since`` value; others, and None, are dropped."""
+        field, since = self.since_field, self.since
+        kept = []
+        for record in records:
+            value = record.get(field)
+            try:
+                if value is not None and value >= since:
+                    kept.append(record)
+            except TypeError:
+                continue
+        return kept
+    
+    def _read_batches(self) -> Iterator[Tuple[Batch, int]]:
+        """
+        Read the source in batches (blocking).
+        
+        Yields:
+            Tuples of (records, bytes read for them)
+        """
+        raise NotImplementedError
+
+def _convert(value: str) -> Any:
+    """Convert a CSV field to int or float when it holds a number."""
+    if not value:
+        return None if value == "" else value
+    first = value[0]
+    if first.isdigit() or first in "+-.":
+        try:
+            return int(value)
+        except ValueError:
+            try:
+                return float(value)
+            except ValueError:
+                return value
+    return value
+
+class CSVConnector(Connector):
+    """
+    Comma-separated values with a header row.
+    
+    Options:
+        delimiter: Field delimiter (default ",")
+        encoding: File encoding (default "utf-8")
+        convert_types: Convert numeric fields to int/float and empty fields
+            to None (default True)
+    
+    With a plan, only the planned fields of a row are converted and kept.
+    """
+    
+    name = "csv"
+    pushes_down_plan = True
+    
+    def _read_batches(self) -> Iterator[Tuple[Batch, int]]:
+        convert = self.options.get("convert_types", True)
+        with open(self.location, "rb") as raw:
+            text = io.TextIOWrapper(raw, encoding=self.options.get("encoding", "utf-8"), newline="")
+            reader = csv.reader(text, delimiter=self.options.get("delimiter", ","))
+            header = next(reader, None)
+            if header is None:
+                return
+            plan = self.plan.resolve(header) if self.plan is not None else None
+            fields = None
+            if plan is not None and plan.columns is not None:
+                fields = [(header.index(column), column) for column in plan.columns]
+            filtered = plan is not None and bool(plan.filters)
+            position = 0
+            batch = []
+            for row in reader:
+                if fields is not None:
+                    record = {
+                        name: _convert(row[index]) if convert else row[index]
+                        for index, name in fields if index < len(row)
+                    }
+                else:
+                    if convert:
+                        row = [_convert(value) for value in row]
+                    record = dict(zip(header, row))
+                if filtered and not plan.matches(record):
+                    continue
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    # Position of the underlying file, read ahead by the buffer
+                    consumed = raw.tell() - position
+                    position += consumed
+                    yield batch, consumed
+                    batch = []
+            if batch:
+                yield batch, raw.tell() - position
+
+class JSONLConnector(Connector):
+    """
+    Newline-delimited JSON, one object per line.
+    """
+    
+    name = "jsonl"
+    
+    def _read_batches(self) -> Iterator[Tuple[Batch, int]]:
+        loads = json.loads
+        with open(self.location, "rb") as f:
+            batch = []
+            size = 0
+            for line in f:
+                size += len(line)
+                if line.strip():
+                    batch.append(loads(line))
+                if len(batch) >= self.batch_size:
+                    yield batch, size
+                    batch = []
+                    size = 0
+            if batch:
+                yield batch, size
+
+class ParquetConnector(Connector):
+    """
+    Apache Parquet files, read batch by batch with pyarrow.
+    
+    Options:
+        columns: Columns to read (default all, or those of the plan)
+    """
+    
+    name = "parquet"
+    pushes_down_plan = True
+    
+    def _read_batches(self) -> Iterator[Tuple[Batch, int]]:
+        if pq is None:
+            raise ImportError("The parquet connector requires pyarrow")
+        parquet_file = pq.ParquetFile(self.location)
+        columns = self.options.get("columns")
+        plan = self.plan.resolve(parquet_file.schema_arrow.names) if self.plan is not None else None
+        if columns is None and plan is not None:
+            columns = plan.columns
+        for record_batch in parquet_file.iter_batches(batch_size=self.batch_size, columns=columns):
+            records = record_batch.to_pylist()
+            if plan is not None and plan.filters:
+                records = [record for record in records if plan.matches(record)]
+            yield records, record_batch.nbytes
+
+def _value_size(value: Any) -> int:
+    """Approximate the size of a database value as stored."""
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    return 0 if value is None else 8
+
+def _bind(parameters: Union[Tuple, Dict[str, Any]], name: str, value: Any) -> Tuple[str, Union[Tuple, Dict[str, Any]]]:
+    """Add a query parameter in the style of the existing ones; returns its placeholder."""
+    if isinstance(parameters, dict):
+        return f":{name}", {**parameters, name: value}
+    return "?", (*parameters, value)
+
+# SQL operator of each plan filter operator that is spelled differently
+_SQL_OPERATORS = {"==": "=", "!=": "<>"}
+
+def _quote(identifier: str) -> str:
+    return '"{}"'.format(identifier.replace('"', '""'))
+
+class DatabaseConnector(Connector):
+    """
+    Base class for SQL database sources, read through a shared connection pool.
+    
+    Subclasses implement ``connect``, which opens a DB-API connection using
+    "?" or ":name" parameters. Connections come from the process-wide pool
+    of the source, so workflows reading the same database share at most
+    ``pool_size`` connections.
+    
+    With a "partition_column", the source is split into that many ranges
+    of the column (e.g. a primary key or a date), read concurrently, each
+    on its own pooled connection. Numeric columns are split into ranges of
+    equal width, other columns at evenly spaced distinct values; rows with
+    NULL in the column belong to the first range. Batches are yielded in
+    partition order, or as soon as they are read with "ordered" disabled.
+    
+    Bytes are the size of the values read (text and blob lengths, 8 bytes
+    per number), as drivers do not expose bytes transferred. The ``since``
+    condition and the conditions of a plan are added to the query, so an
+    index on their fields limits the read to the rows needed, and only the
+    planned columns are selected.
+    
+    Options:
+        table: Table to read
+        query: SQL query to run instead of reading a table
+        parameters: Query parameters
+        pool_size: Maximum connections to the source (default 4)
+        partition_column: Column to split concurrent reads on
+        partitions: Number of ranges read concurrently (default pool_size)
+        ordered: Yield batches in partition order (default True)
+    """
+    
+    filters_since = True
+    pushes_down_plan = True
+    
+    def connect(self) -> Any:
+        """
+        Open a new connection to the database (blocking).
+        
+        Returns:
+            DB-API connection
+        """
+        raise NotImplementedError
+    
+    @property
+    def pool(self) -> ConnectionPool:
+        """Shared connection pool of the source."""
+        return get_pool(f"{self.name}:{self.location}", self.connect, self.options.get("pool_size", 4))
+    
+    async def batches(self) -> AsyncIterator[Batch]:
+        """
+        Stream the records of the source.
+        
+        Yields:
+            Lists of at most ``batch_size`` record dictionaries
+        """
+        loop = asyncio.get_running_loop()
+        pool = self.pool
+        plan = None
+        if self.plan is not None:
+            query, parameters = self._source_query()
+            async with pool.acquire() as connection:
+                fields = await loop.run_in_executor(None, self._query_columns, connection, query, parameters)
+            plan = self.plan.resolve(fields)
+        query, parameters = self._source_query(plan)
+        if self.options.get("partition_column") is None:
+            async with pool.acquire() as connection:
+                reader = self._read_query(connection, self._project(query, plan), parameters)
+                async for records in self._stream(reader):
+                    yield records
+            return
+        
+        count = self.options.get("partitions", pool.size)
+        async with pool.acquire() as connection:
+            ranges = await loop.run_in_executor(None, self._partition_ranges, connection, query, parameters, count)
+        ranges = [(self._project(range_query, plan), range_parameters) for range_query, range_parameters in ranges]
+        
+        ordered = self.options.get("ordered", True)
+        # Each partition is read ahead by at most two batches
+        queues = [asyncio.Queue(2) for _ in ranges] if ordered else [asyncio.Queue(2 * len(ranges))]
+        done = object()
+        
+        async def read(index: int, range_query: str, range_parameters: Any) -> None:
+            queue = queues[index] if ordered else queues[0]
+            try:
+                async with pool.acquire() as connection:
+                    reader = self._read_query(connection, range_query, range_parameters)
+                    try:
+                        while True:
+                            item = await loop.run_in_executor(None, next, reader, None)
+                            if item is None:
+                                break
+                            await queue.put(item)
+                    finally:
+                        await loop.run_in_executor(None, reader.close)
+                await queue.put(done)
+            except Exception as e:
+                await queue.put(e)
+        
+        start = time.perf_counter()
+        tasks = [asyncio.ensure_future(read(index, *bounds)) for index, bounds in enumerate(ranges)]
+        try:
+            remaining = len(tasks)
+            for queue in queues:
+                while remaining:
+                    item = await queue.get()
+                    if item is done:
+                        remaining -= 1
+                        if ordered:
+                            break
+                        continue
+                    if isinstance(item, Exception):
+                        raise item
+                    records, size = item
+                    self.stats.rows += len(records)
+                    self.stats.bytes += size
+                    self.stats.batches += 1
+                    # Partitions are read concurrently: elapsed is wall-clock time
+                    self.stats.elapsed = time.perf_counter() - start
+                    yield records
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            logger.info(
+                "%s connector read %d rows (%d bytes) from %s in %d partitions: %.0f rows/s, %.0f bytes/s",
+                self.name, self.stats.rows, self.stats.bytes, self.location, len(ranges),
+                self.stats.rows_per_second, self.stats.bytes_per_second
+            )
+    
+    def describe(self) -> Dict[str, Any]:
+        """
+        Describe the connector for extraction metadata.
+        
+        Returns:
+            Dictionary with the connector name, location, batch size, stats
+            and connection pool
+        """
+        return {**super().describe(), "pool": self.pool.to_dict()}
+    
+    def _source_query(self, plan: Optional[QueryPlan] = None) -> Tuple[str, Union[Tuple, Dict[str, Any]]]:
+        """Build the query of the source, with the ``since`` condition and those of a resolved plan."""
+        query = self.options.get("query")
+        if query is None:
+            table = self.options.get("table")
+            if not table:
+                raise ValueError(f"The {self.name} connector needs a table or a query")
+            query = f"SELECT * FROM {_quote(table)}"
+        parameters = self.options.get("parameters", ())
+        conditions = []
+        if self.since_field is not None:
+            placeholder, parameters = _bind(parameters, "since_", self.since)
+            conditions.append(f"{_quote(self.since_field)} >= {placeholder}")
+        for index, (field, op, value) in enumerate(plan.filters if plan is not None else ()):
+            if op == "in":
+                placeholders = []
+                for position, item in enumerate(value):
+                    placeholder, parameters = _bind(parameters, f"filter{index}_{position}_", item)
+                    placeholders.append(placeholder)
+                conditions.append(f"{_quote(field)} IN ({', '.join(placeholders)})" if placeholders else "1 = 0")
+                continue
+            placeholder, parameters = _bind(parameters, f"filter{index}_", value)
+            conditions.append(f"{_quote(field)} {_SQL_OPERATORS.get(op, op)} {placeholder}")
+        if conditions:
+            query = f"SELECT * FROM ({query}) WHERE {' AND '.join(conditions)}"
+        return query, parameters
+    
+    def _project(self, query: str, plan: Optional[QueryPlan]) -> str:
+        """Select the columns of a resolved plan from a query."""
+        if plan is None or plan.columns is None:
+            return query
+        return f"SELECT {', '.join(_quote(column) for column in plan.columns)} FROM ({query})"
+    
+    def _query_columns(self, connection: Any, query: str, parameters: Union[Tuple, Dict[str, Any]]) -> List[str]:
+        """Get the column names of a query without reading rows (blocking)."""
+        cursor = connection.execute(f"SELECT * FROM ({query}) LIMIT 0", parameters)
+        try:
+            return [description[0] for description in cursor.description]
+        finally:
+            cursor.close()
+    
+    def _partition_ranges(
+        self,
+        connection: Any,
+        query: str,
+        parameters: Union[Tuple, Dict[str, Any]],
+        count: int
+    ) -> List[Tuple[str, Union[Tuple, Dict[str, Any]]]]:
+        """
+        Split the source into range queries on the partition column (blocking).
+        
+        Returns:
+            (query, parameters) per range, in column order
+        """
+        column = _quote(self.options["partition_column"])
+        cursor = connection.execute(f"SELECT MIN({column}), MAX({column}) FROM ({query})", parameters)
+        lowest, highest = cursor.fetchone()
+        cursor.close()
+        if lowest is None or count <= 1:
+            return [(query, parameters)]
+        
+        if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in (lowest, highest)):
+            if isinstance(lowest, int) and isinstance(highest, int):
+                edges = [lowest + (highest - lowest) * i // count for i in range(1, count)]
+            else:
+                edges = [lowest + (highest - lowest) * i / count for i in range(1, count)]
+        else:
+            cursor = connection.execute(f"SELECT DISTINCT {column} FROM ({query}) ORDER BY {column}", parameters)
+            values = [row[0] for row in cursor.fetchall() if row[0] is not None]
+            cursor.close()
+            edges = [values[len(values) * i // count] for i in range(1, count)]
+        edges = sorted(set(edge for edge in edges if edge > lowest))
+        
+        ranges = []
+        for lower, upper in zip([None] + edges, edges + [None]):
+            conditions = []
+            range_parameters = parameters
+            if lower is not None:
+                placeholder, range_parameters = _bind(range_parameters, "lower_", lower)
+                conditions.append(f"{column} >= {placeholder}")
+            if upper is not None:
+                placeholder, range_parameters = _bind(range_parameters, "upper_", upper)
+                conditions.append(f"{column} < {placeholder}")
+            condition = " AND ".join(conditions)
+            if lower is None:
+                condition = f"({condition} OR {column} IS NULL)"
+            ranges.append((f"SELECT * FROM ({query}) WHERE {condition}", range_parameters))
+        return ranges
+    
+    def _read_query(
+        self,
+        connection: Any,
+        query: str,
+        parameters: Union[Tuple, Dict[str, Any]]
+    ) -> Iterator[Tuple[Batch, int]]:
+        """Run a query on a connection and read its rows in batches (blocking)."""
+        cursor = connection.execute(query, parameters)
+        try:
+            columns = [description[0] for description in cursor.description]
+            while True:
+                rows = cursor.fetchmany(self.batch_size)
+                if not rows:
+                    break
+                size = sum(_value_size(value) for row in rows for value in row)
+                yield [dict(zip(columns, row)) for row in rows], size
+        finally:
+            cursor.close()
+
+class SQLiteConnector(DatabaseConnector):
+    """
+    A SQLite table or query, read with ``fetchmany``.
+    
+    The location is a database path, optionally as ``sqlite:///path``.
+    """
+    
+    name = "sqlite"
+    
+    def connect(self) -> sqlite3.Connection:
+        path = self.location[len("sqlite:///"):] if self.location.startswith("sqlite:///") else self.location
+        return sqlite3.connect(path, check_same_thread=False)
+
+CONNECTORS: Dict[str, Type[Connector]] = {
+    "csv": CSVConnector,
+    "jsonl": JSONLConnector,
+    "parquet": ParquetConnector,
+    "sqlite": SQLiteConnector
+}
+
+# File extensions of each connector
+_EXTENSIONS = {
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".db": "sqlite",
+    ".sqlite": "sqlite",
+    ".sqlite3": "sqlite"
+}
+
+def register_connector(name: str, connector_class: Type[Connector], extensions: Tuple[str, ...] = ()) -> None:
+    """
+    Register a connector.
+    
+    Args:
+        name: Connector name, also accepted as a URI scheme
+        connector_class: Connector class
+        extensions: File extensions (with the dot) handled by the connector
+    """
+    CONNECTORS[name] = connector_class
+    for extension in extensions:
+        _EXTENSIONS[extension.lower()] = name
+
+def resolve_connector_name(location: str) -> Optional[str]:
+    """
+    Find the connector for a location by URI scheme or file extension.
+    
+    Args:
+        location: Path or URI
+    
+    Returns:
+        Connector name, or None if no connector handles the location
+    """
+    scheme, separator, _ = location.partition("://")
+    if separator and scheme in CONNECTORS:
+        return scheme
+    return _EXTENSIONS.get(os.path.splitext(location)[1].lower())
+
+def create_connector(spec: Union[str, Dict[str, Any]], batch_size: int = 10000) -> Connector:
+    """
+    Create a connector from a location or a specification.
+    
+    Args:
+        spec: Path or URI, or a dictionary with "location", an optional
+            "type" (connector name) and connector options
+        batch_size: Default batch size
+    
+    Returns:
+        Connector
+    
+    Raises:
+        ValueError: If no connector handles the source
+    """
+    if isinstance(spec, str):
+        spec = {"location": spec}
+    options = dict(spec)
+    location = options.pop("location")
+    name = options.pop("type", None) or resolve_connector_name(location)
+    if name not in CONNECTORS:
+        raise ValueError(f"No connector for data source: {location}")
+    options.setdefault("batch_size", batch_size)
+    return CONNECTORS[name](location, **options)
\ No newline at end of file
@@ -0,0 +1,271 @@
+"""
+Cache of extraction results shared by workflows.
+
+Extracts are keyed by their source, the request parameters that shape them
+and the version of the source (the modification time and size of a local
+file or database, or a "source_version" given in the request), so a
+changed source is never served from the cache. Entries expire after a TTL
+and can be invalidated per source; invalidation hooks let other caches
+derived from an extract drop their state at the same time.
+
+Extracts are stored as compressed columnar blobs, record batch frames of
+the transport format (see ``orchestrator.data.transport``) named by the
+hash of their content, so identical extracts requested with different
+parameters share one blob. Blobs are kept in memory or, with a
+directory, on local disk next to a JSON index of the entries.
+
+Concurrent requests for an extract that is being loaded wait for that one
+load instead of starting their own.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, Any, Awaitable, Callable, List, Optional
+
+from orchestrator.data.record_batch import RecordBatch
+from orchestrator.data.transport import decode_batch, encode_batch
+from orchestrator.utils import clock
+from orchestrator.utils.serialization import json_default
+
+logger = logging.getLogger(__name__)
+
+class ExtractCache:
+    """
+    Extraction results keyed by source, parameters and source version.
+    """
+    
+    def __init__(self, directory: Optional[str] = None, ttl: Optional[float] = 300.0):
+        """
+        Initialize the Extract Cache.
+        
+        Args:
+            directory: Optional directory for blobs and their index; blobs
+                are kept in memory if unset
+            ttl: Seconds an entry stays valid, or None for no expiry
+        """
+        self.directory = directory
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.shared_loads = 0
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._blobs: Dict[str, bytes] = {}
+        self._loads: Dict[str, "asyncio.Task"] = {}
+        self._hooks: List[Callable[[Optional[str]], None]] = []
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._entries = self._read_index()
+        logger.info("ExtractCache initialized with %d entries", len(self._entries))
+    
+    @staticmethod
+    def make_key(source: str, parameters: Dict[str, Any], version: Optional[str] = None) -> str:
+        """
+        Build the cache key of an extract.
+        
+        Args:
+            source: Data source name
+            parameters: Request parameters that shape the extract
+            version: Version of the source, e.g. its modification time
+        
+        Returns:
+            Hex digest of the source, parameters and version
+        """
+        text = json.dumps([source, parameters, version], sort_keys=True, default=json_default)
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached extraction result.
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Result with the cached "data" batch and "metadata", or None on a
+            miss or if the entry expired
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry["expires"] is not None and clock.now() >= entry["expires"]:
+            self._drop(key)
+            return None
+        blob = self._read_blob(entry["digest"])
+        try:
+            data = decode_batch(blob, copy=True) if blob is not None else None
+        except ValueError as e:
+            # E.g. a blob of an earlier format, or compressed with a codec not installed here
+            logger.warning("Ignoring unreadable cached extract %s: %s", entry["digest"], str(e))
+            data = None
+        if data is None:
+            self._drop(key)
+            return None
+        return {"data": data, "metadata": entry["metadata"]}
+    
+    def put(self, key: str, source: str, result: Dict[str, Any]) -> str:
+        """
+        Store an extraction result.
+        
+        Args:
+            key: Cache key
+            source: Data source name, for invalidation
+            result: Result with "data" records or batch and "metadata"
+        
+        Returns:
+            Digest of the stored blob
+        """
+        data = result["data"]
+        if not isinstance(data, RecordBatch):
+            data = RecordBatch.from_records(data)
+        blob = encode_batch(data)
+        digest = hashlib.blake2b(blob, digest_size=16).hexdigest()
+        self._write_blob(digest, blob)
+        now = clock.now()
+        self._entries[key] = {
+            "source": source,
+            "digest": digest,
+            "created": float(now),
+            "expires": float(now) + self.ttl if self.ttl is not None else None,
+            "metadata": result.get("metadata", {})
+        }
+        self._write_index()
+        logger.debug("Cached extract of %s as %s (%d bytes)", source, digest, len(blob))
+        return digest
+    
+    async def get_or_load(
+        self,
+        key: str,
+        source: str,
+        load: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Get a cached result, or load and cache it, sharing concurrent loads.
+        
+        Args:
+            key: Cache key
+            source: Data source name
+            load: Coroutine function extracting the result on a miss
+        
+        Returns:
+            Extraction result; its metadata notes whether it was "cached"
+        """
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            logger.info("Extract cache hit for %s", source)
+            return {**cached, "metadata": {**cached["metadata"], "cached": True}}
+        
+        task = self._loads.get(key)
+        if task is None:
+            self.misses += 1
+            task = self._loads[key] = asyncio.ensure_future(self._load(key, source, load))
+        else:
+            self.shared_loads += 1
+            logger.info("Waiting for the extraction of %s in progress", source)
+        # A cancelled waiter does not cancel the load shared with the others
+        result = await asyncio.shield(task)
+        return {**result, "metadata": {**result["metadata"], "cached": False}}
+    
+    async def _load(self, key: str, source: str, load: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        try:
+            result = await load()
+            self.put(key, source, result)
+            return result
+        finally:
+            self._loads.pop(key, None)
+    
+    def add_invalidation_hook(self, hook: Callable[[Optional[str]], None]) -> None:
+        """
+        Register a function called with the source (None for all) whenever entries are invalidated.
+        
+        Args:
+            hook: Invalidation callback
+        """
+        self._hooks.append(hook)
+    
+    def invalidate(self, source: Optional[str] = None) -> None:
+        """
+        Drop cached extracts.
+        
+        Args:
+            source: Source to drop; every source by default
+        """
+        for key in [key for key, entry in self._entries.items() if source is None or entry["source"] == source]:
+            self._drop(key)
+        self._write_index()
+        logger.info("Invalidated cached extracts of %s", source or "every source")
+        for hook in self._hooks:
+            hook(source)
+    
+    def prune(self) -> int:
+        """
+        Drop expired entries.
+        
+        Returns:
+            Number of entries dropped
+        """
+        now = clock.now()
+        expired = [key for key, entry in self._entries.items() if entry["expires"] is not None and now >= entry["expires"]]
+        for key in expired:
+            self._drop(key)
+        self._write_index()
+        return len(expired)
+    
+    def _drop(self, key: str) -> None:
+        """Remove an entry, and its blob if no other entry shares it."""
+        entry = self._entries.pop(key, None)
+        if entry is None or any(other["digest"] == entry["digest"] for other in self._entries.values()):
+            return
+        self._blobs.pop(entry["digest"], None)
+        if self.directory:
+            try:
+                os.remove(self._blob_file(entry["digest"]))
+            except FileNotFoundError:
+                pass
+    
+    def _blob_file(self, digest: str) -> str:
+        return os.path.join(self.directory, f"{digest}.blob")
+    
+    def _read_blob(self, digest: str) -> Optional[bytes]:
+        if not self.directory:
+            return self._blobs.get(digest)
+        try:
+            with open(self._blob_file(digest), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+    
+    def _write_blob(self, digest: str, blob: bytes) -> None:
+        if not self.directory:
+            self._blobs[digest] = blob
+            return
+        path = self._blob_file(digest)
+        if os.path.exists(path):
+            return
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(blob)
+        os.replace(tmp_path, path)
+    
+    def _read_index(self) -> Dict[str, Dict[str, Any]]:
+        path = os.path.join(self.directory, "index.json")
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable extract cache index %s: %s", path, str(e))
+            return {}
+    
+    def _write_index(self) -> None:
+        if not self.directory:
+            return
+        path = os.path.join(self.directory, "index.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, default=json_default)
+        os.replace(tmp_path, path)
\ No newline at end of file
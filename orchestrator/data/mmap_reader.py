@@ -0,0 +1,385 @@
+"""
+Memory-mapped readers that parse files straight into typed columns.
+
+Loading a file as one dictionary per row costs hundreds of bytes per row
+in dictionaries and boxed values. These readers map the file and parse it
+into one typed buffer per column instead: ``array.array`` of machine
+integers or doubles for numbers, and dictionary-encoded codes for strings.
+The result is a ``ColumnarFrame`` that the analysis layer aggregates as
+is, without building rows.
+
+Two layouts are supported: delimited text with a header row, and
+fixed-size binary records described by ``struct`` codes. Delimited files
+are parsed in chunks of lines, so the only per-row objects are those of
+the chunk being parsed; quoted fields are not supported (use the CSV
+connector for those). With numpy, fixed-size records are not parsed at
+all: each numeric column is a strided view of the mapping, which
+therefore stays open for as long as the columns are in use.
+"""
+
+import array
+import functools
+import logging
+import mmap
+import os
+import struct
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from orchestrator.analysis.aggregation import ColumnarFrame, DictionaryColumn, factorize
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency
+    np = None
+
+logger = logging.getLogger(__name__)
+
+_NAN = float("nan")
+
+# Column type of each struct code accepted in a fixed-size record layout
+_FIXED_TYPES = {"b": "int", "h": "int", "i": "int", "q": "int", "f": "float", "d": "float", "s": "str"}
+
+# numpy dtype of each numeric struct code
+_NUMPY_CODES = {"b": "i1", "h": "i2", "i": "i4", "q": "i8", "f": "f4", "d": "f8"}
+
+class MappedFile:
+    """
+    Read-only memory mapping of a file.
+    
+    ``close()`` unmaps the file unless columns still view the mapping, in
+    which case it is unmapped when the last of them is garbage collected.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Map a file.
+        
+        Args:
+            path: File path
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        self.size = os.fstat(self._file.fileno()).st_size
+        # An empty file cannot be mapped
+        self.buffer: Any = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+        )
+    
+    @property
+    def closed(self) -> bool:
+        """Whether the file has been closed."""
+        return self._file.closed
+    
+    def close(self) -> None:
+        """Unmap and close the file."""
+        if isinstance(self.buffer, mmap.mmap) and not self.buffer.closed:
+            try:
+                self.buffer.close()
+            except BufferError:
+                logger.debug("Mapping of %s still in use", self.path)
+                return
+        self._file.close()
+    
+    def __enter__(self) -> "MappedFile":
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+def _to_floats(raw: Sequence[bytes]) -> Optional[List[float]]:
+    """Convert text to floats, empty fields to NaN; None if a value is not a number."""
+    try:
+        return list(map(float, raw))
+    except ValueError:
+        try:
+            return [float(value) if value.strip() else _NAN for value in raw]
+        except ValueError:
+            return None
+
+class _ColumnBuilder:
+    """
+    Typed buffer for one column, widened from int to float to str as values require.
+    """
+    
+    def __init__(self, column_type: str = "int", encoding: str = "utf-8"):
+        self.type = column_type
+        self.encoding = encoding
+        self.values = array.array("q" if column_type == "int" else "d")
+        self.codes = array.array("i")
+        self.index: Dict[bytes, int] = {}
+    
+    def extend(self, raw: Sequence[bytes], earlier: Callable[[], Iterable[Sequence[bytes]]]) -> None:
+        """
+        Append the raw text of some values.
+        
+        Args:
+            raw: Text of the values
+            earlier: Function giving the text of the values appended so far,
+                which are read again if the column becomes a string column
+        """
+        if self.type == "int":
+            try:
+                converted = list(map(int, raw))
+                size = len(self.values)
+                try:
+                    self.values.extend(converted)
+                    return
+                except OverflowError:
+                    del self.values[size:]
+            except ValueError:
+                pass
+        
+        if self.type != "str":
+            converted = _to_floats(raw)
+            if converted is not None:
+                if self.type == "int":
+                    self._widen("float", earlier)
+                self.values.extend(converted)
+                return
+            self._widen("str", earlier)
+        
+        self.extend_strings(raw)
+    
+    def extend_strings(self, raw: Sequence[bytes]) -> None:
+        """Append encoded strings, dictionary-encoding them."""
+        index = self.index
+        self.codes.extend([index.setdefault(value, len(index)) for value in raw])
+    
+    def _widen(self, column_type: str, earlier: Callable[[], Iterable[Sequence[bytes]]]) -> None:
+        if column_type == "float":
+            self.values = array.array("d", self.values)
+        else:
+            # Values seen so far are read again: their parsed numbers would
+            # not give back their text, e.g. "007" or an empty field
+            self.values = array.array("d")
+            for raw in earlier():
+                self.extend_strings(raw)
+        self.type = column_type
+    
+    def finish(self) -> Any:
+        """Get the column."""
+        if self.type == "str":
+            return DictionaryColumn(self.codes, [value.decode(self.encoding) for value in self.index])
+        return self.values
+
+def _delimited_chunks(
+    mapped: MappedFile,
+    start: int,
+    stop: int,
+    separator: bytes,
+    width: int,
+    chunk_size: int
+) -> Iterator[Tuple[int, List[List[bytes]]]]:
+    """
+    Split the lines of delimited text into fields, a chunk of lines at a time.
+    
+    Args:
+        mapped: Mapped file
+        start: Offset of the first line
+        stop: Offset after the last line
+        separator: Encoded field delimiter
+        width: Number of fields per row
+        chunk_size: Bytes of lines split at a time
+    
+    Returns:
+        Iterator of (offset, rows) per chunk, with the fields of each row
+    
+    Raises:
+        ValueError: If a row does not have ``width`` fields
+    """
+    data = mapped.buffer
+    position = start
+    while position < stop:
+        end = min(position + chunk_size, stop)
+        if end < stop:
+            # Cut the chunk after its last complete line
+            newline = data.rfind(b"\n", position, end)
+            if newline < 0:
+                newline = data.find(b"\n", end)
+            end = stop if newline < 0 else newline + 1
+        chunk = data[position:end]
+        
+        if b"\r" in chunk:
+            chunk = chunk.replace(b"\r", b"")
+        rows = [line.split(separator) for line in chunk.split(b"\n") if line]
+        if any(len(row) != width for row in rows):
+            raise ValueError(f"Rows of {mapped.path} must have {width} fields")
+        if rows:
+            yield position, rows
+        position = end
+
+def read_delimited(
+    mapped: MappedFile,
+    delimiter: str = ",",
+    types: Optional[Dict[str, str]] = None,
+    encoding: str = "utf-8",
+    chunk_size: int = 1 << 22
+) -> ColumnarFrame:
+    """
+    Parse delimited text with a header row into typed columns.
+    
+    Column types are found while parsing: a column is read as integers
+    until a value is not one, then as floats (empty fields becoming NaN),
+    then as dictionary-encoded strings of the text of every value, which
+    reads the column's earlier chunks again.
+    
+    Args:
+        mapped: Mapped file
+        delimiter: Field delimiter
+        types: Optional type ("int", "float" or "str") per column, e.g. to
+            keep numeric-looking identifiers as strings
+        encoding: Text encoding
+        chunk_size: Bytes of lines parsed at a time
+    
+    Returns:
+        Frame of the file's columns
+    
+    Raises:
+        ValueError: If a row does not have one field per header column
+    """
+    data = mapped.buffer
+    size = mapped.size
+    separator = delimiter.encode(encoding)
+    types = types or {}
+    
+    header_end = data.find(b"\n")
+    if header_end < 0:
+        header_end = size
+    header = [
+        name.strip().decode(encoding)
+        for name in data[:header_end].rstrip(b"\r").split(separator)
+    ] if header_end else []
+    builders = [_ColumnBuilder(types.get(name, "int"), encoding) for name in header]
+    width = len(header)
+    
+    def earlier(index: int, stop: int) -> Iterator[List[bytes]]:
+        # Text of a column in the chunks before the one at ``stop``
+        for _, rows in _delimited_chunks(mapped, header_end + 1, stop, separator, width, chunk_size):
+            yield [row[index] for row in rows]
+    
+    length = 0
+    for position, rows in _delimited_chunks(mapped, header_end + 1, size, separator, width, chunk_size):
+        for index, (builder, column) in enumerate(zip(builders, zip(*rows))):
+            builder.extend(column, functools.partial(earlier, index, position))
+        length += len(rows)
+    
+    return ColumnarFrame({name: builder.finish() for name, builder in zip(header, builders)}, length)
+
+def read_fixed(
+    mapped: MappedFile,
+    layout: Sequence[Tuple[str, str]],
+    byte_order: str = "<",
+    offset: int = 0,
+    encoding: str = "utf-8",
+    chunk_records: int = 65536
+) -> ColumnarFrame:
+    """
+    Read fixed-size binary records into typed columns.
+    
+    Records are packed without padding. String fields are NUL-padded and
+    dictionary-encoded. With numpy, numeric columns are views of the
+    mapping; without it they are unpacked once into typed arrays.
+    
+    Args:
+        mapped: Mapped file
+        layout: (field name, struct code) per field, with codes "b", "h",
+            "i", "q" (integers), "f", "d" (floats) or "<n>s" (strings)
+        byte_order: struct byte order character
+        offset: Size of a header to skip, in bytes
+        encoding: Text encoding of string fields
+        chunk_records: Records unpacked at a time without numpy
+    
+    Returns:
+        Frame of the record fields
+    
+    Raises:
+        ValueError: If a code is not supported or the file does not hold
+            a whole number of records
+    """
+    column_types = []
+    for name, code in layout:
+        column_type = _FIXED_TYPES.get(code[-1:])
+        if column_type is None or (column_type != "str" and len(code) != 1):
+            raise ValueError(f"Unsupported code {code!r} for field {name}")
+        column_types.append(column_type)
+    record = struct.Struct(byte_order + "".join(code for _, code in layout))
+    count, remainder = divmod(mapped.size - offset, record.size)
+    if remainder:
+        raise ValueError(f"{mapped.path} does not hold whole {record.size}-byte records")
+    
+    if np is not None and count:
+        dtype = np.dtype([
+            (name, ("S" + code[:-1]) if column_type == "str" else byte_order + _NUMPY_CODES[code])
+            for (name, code), column_type in zip(layout, column_types)
+        ])
+        records = np.frombuffer(mapped.buffer, dtype=dtype, count=count, offset=offset)
+        columns = {}
+        for (name, _), column_type in zip(layout, column_types):
+            if column_type == "str":
+                codes, values = factorize(records[name])
+                columns[name] = DictionaryColumn(codes, [value.decode(encoding) for value in values])
+            else:
+                columns[name] = records[name]
+        return ColumnarFrame(columns, count)
+    
+    builders = [_ColumnBuilder(column_type, encoding) for column_type in column_types]
+    if count:
+        with memoryview(mapped.buffer) as view:
+            for start in range(0, count, chunk_records):
+                stop = min(start + chunk_records, count)
+                rows = list(record.iter_unpack(view[offset + start * record.size:offset + stop * record.size]))
+                for builder, column in zip(builders, zip(*rows)):
+                    if builder.type == "str":
+                        builder.extend_strings([value.rstrip(b"\0") for value in column])
+                    else:
+                        builder.values.extend(column)
+    return ColumnarFrame({name: builder.finish() for (name, _), builder in zip(layout, builders)}, count)
+
+def column_types(frame: ColumnarFrame) -> Dict[str, str]:
+    """
+    Get the schema type of each column of a frame read from a file.
+    
+    Args:
+        frame: Frame returned by ``read_delimited`` or ``read_fixed``
+    
+    Returns:
+        "int", "float" or "str" per column
+    """
+    types = {}
+    for name, column in frame.columns.items():
+        if isinstance(column, DictionaryColumn):
+            types[name] = "str"
+        else:
+            typecode = column.typecode if isinstance(column, array.array) else column.dtype.kind
+            types[name] = "float" if typecode in ("d", "f") else "int"
+    return types
+
+def read_mapped(
+    path: str,
+    layout: Optional[Sequence[Tuple[str, str]]] = None,
+    **options: Any
+) -> Tuple[MappedFile, ColumnarFrame]:
+    """
+    Map a file and read its columns.
+    
+    Args:
+        path: File path
+        layout: Record layout of a fixed-size binary file; the file is read
+            as delimited text when omitted
+        options: Options of ``read_fixed`` or ``read_delimited``
+    
+    Returns:
+        Tuple of (mapped file, frame); close the mapped file once the frame
+        is no longer needed
+    """
+    mapped = MappedFile(path)
+    try:
+        if layout is not None:
+            frame = read_fixed(mapped, [tuple(field) for field in layout], **options)
+        else:
+            frame = read_delimited(mapped, **options)
+    except Exception:
+        mapped.close()
+        raise
+    logger.info("Read %d rows of %d columns from mapped file %s", len(frame), len(frame.columns), path)
+    return mapped, frame
\ No newline at end of file
@@ -0,0 +1,142 @@
+"""
+Shared connection pools for database sources.
+
+Opening a database connection per read, in every workflow, costs a
+connect each time and leaves concurrent reads of the same database
+unbounded. A ``ConnectionPool`` keeps up to ``size`` connections to one
+source open and lends them out to coroutines: when every connection is in
+use, ``acquire`` waits for one to be returned. Pools are shared per source
+through ``get_pool``.
+
+Connections are created and used in executor threads, so drivers must
+allow a connection to move between threads (e.g. ``sqlite3`` with
+``check_same_thread=False``); a pool never lends a connection to two
+borrowers at once.
+"""
+
+import asyncio
+import contextlib
+import logging
+import threading
+import weakref
+from typing import Dict, Any, AsyncIterator, Callable, List
+
+logger = logging.getLogger(__name__)
+
+class ConnectionPool:
+    """
+    Bounded pool of connections to one database.
+    """
+    
+    def __init__(self, connect: Callable[[], Any], size: int = 4, name: str = "pool"):
+        """
+        Initialize the pool; connections are opened on first use.
+        
+        Args:
+            connect: Function opening a new connection
+            size: Maximum number of open connections
+            name: Name of the pool, for logging
+        
+        Raises:
+            ValueError: If size is less than 1
+        """
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.connect = connect
+        self.size = size
+        self.name = name
+        self.created = 0
+        self.acquisitions = 0
+        self.closed = False
+        self._idle: List[Any] = []
+        self._lock = threading.Lock()
+        # asyncio semaphores belong to one event loop; each loop gets its own
+        self._semaphores: "weakref.WeakKeyDictionary[Any, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+    
+    @contextlib.asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Any]:
+        """
+        Borrow a connection, waiting while all of them are in use.
+        
+        Yields:
+            Connection, returned to the pool on exit
+        """
+        if self.closed:
+            raise RuntimeError(f"Connection pool {self.name} is closed")
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = self._semaphores[loop] = asyncio.Semaphore(self.size)
+        
+        async with semaphore:
+            with self._lock:
+                connection = self._idle.pop() if self._idle else None
+                self.acquisitions += 1
+            if connection is None:
+                connection = await loop.run_in_executor(None, self.connect)
+                with self._lock:
+                    self.created += 1
+                logger.debug("Opened connection %d of pool %s", self.created, self.name)
+            try:
+                yield connection
+            finally:
+                with self._lock:
+                    if self.closed:
+                        connection.close()
+                    else:
+                        self._idle.append(connection)
+    
+    def close(self) -> None:
+        """Close the idle connections; connections in use are closed when returned."""
+        with self._lock:
+            self.closed = True
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+        logger.info("Closed connection pool %s", self.name)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Describe the pool.
+        
+        Returns:
+            Dictionary with the size, connections opened, idle connections
+            and acquisitions
+        """
+        with self._lock:
+            return {
+                "size": self.size,
+                "created": self.created,
+                "idle": len(self._idle),
+                "acquisitions": self.acquisitions
+            }
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+def get_pool(key: str, connect: Callable[[], Any], size: int = 4) -> ConnectionPool:
+    """
+    Get the process-wide pool of a source, creating it on first use.
+    
+    Args:
+        key: Source identifier, e.g. connector name and location
+        connect: Function opening a new connection
+        size: Maximum number of open connections of a new pool
+    
+    Returns:
+        Connection pool
+    """
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool.closed:
+            pool = _pools[key] = ConnectionPool(connect, size, key)
+        return pool
+
+def close_pools() -> None:
+    """Close every shared pool."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
\ No newline at end of file
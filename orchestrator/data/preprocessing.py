@@ -0,0 +1,342 @@
+"""
+Columnar preprocessing pipeline for extracted records.
+
+The pipeline cleans a ``RecordBatch`` in configurable stages: type
+coercion, null handling, de-duplication on an id field, date parsing, text
+normalization and numeric normalization. Stages work on whole columns, and
+on dictionary-encoded columns they transform each distinct value once
+instead of every row. Stages that drop rows only narrow a shared list of
+kept row indices, so the columns are copied once, at the end, whatever the
+number of stages.
+
+A pipeline keeps its state between batches: ids seen in earlier batches
+are still duplicates, and normalization uses the statistics of every row
+processed so far. Streamed batches are therefore cleaned as one dataset.
+Time spent and rows dropped are recorded per stage.
+"""
+
+import array
+import asyncio
+import logging
+import math
+import re
+import time
+import unicodedata
+from datetime import date, datetime
+from typing import Dict, Any, AsyncIterator, Callable, Iterable, List, Optional, Sequence, Union
+
+from orchestrator.analysis.aggregation import DictionaryColumn
+from orchestrator.analysis.online import RunningStats
+from orchestrator.data.record_batch import RecordBatch, encode_column
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("coerce", "nulls", "dedup", "dates", "text", "normalize")
+
+DEFAULT_CONFIG: Dict[str, Any] = {
+    # Stages to run, in order
+    "stages": list(STAGES),
+    # Field identifying a record for de-duplication; the first record wins
+    "id_field": "id",
+    # Type ("int", "float" or "str") to coerce fields to; unconvertible values become None
+    "types": {"quantity": "int", "price": "float", "value": "float"},
+    # Rows with None in these fields are dropped
+    "drop_nulls": ["id"],
+    # None in these fields is replaced, with the defaults the analysis assumes
+    "fill_nulls": {
+        "quantity": 0,
+        "price": 0,
+        "rating": 0,
+        "product_id": "unknown",
+        "region": "unknown",
+        "date": "unknown"
+    },
+    # Fields parsed as dates and rewritten as ISO dates, and the formats
+    # tried after ISO 8601
+    "date_fields": ["date"],
+    "date_formats": ["%Y/%m/%d", "%d.%m.%Y", "%m/%d/%Y"],
+    # Free-text fields normalized to NFKC with collapsed whitespace
+    "text_fields": ["feedback"],
+    "lowercase": False,
+    # Method ("zscore" or "minmax") per numeric field; results are added as "<field>_normalized"
+    "normalize": {}
+}
+
+_WHITESPACE = re.compile(r"\s+")
+_ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}$")
+
+class _Work:
+    """
+    Columns of the batch being processed and the rows still kept.
+    """
+    
+    def __init__(self, batch: RecordBatch):
+        self.columns = dict(batch.columns)
+        self.length = len(batch)
+        self.keep: Optional[List[int]] = None
+    
+    def rows(self) -> Iterable[int]:
+        """Indices of the rows still kept."""
+        return range(self.length) if self.keep is None else self.keep
+
+def _is_null(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and value != value)
+
+def _map_values(column: Sequence, function: Callable[[Any], Any]) -> Sequence:
+    """
+    Apply a function to every value of a column.
+    
+    Dictionary-encoded columns apply it once per distinct value and keep
+    their codes unless values merge.
+    """
+    if isinstance(column, DictionaryColumn):
+        values = [function(value) for value in column.categories]
+        index: Dict[Any, int] = {}
+        mapping = [index.setdefault(value, len(index)) for value in values]
+        if len(index) == len(values):
+            return DictionaryColumn(column.codes, values)
+        return DictionaryColumn(array.array("i", [mapping[code] for code in column.codes]), list(index))
+    return encode_column([function(value) for value in column])
+
+def _to_int(value: Any) -> Optional[int]:
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return int(number) if number.is_integer() else None
+
+def _to_float(value: Any) -> Optional[float]:
+    if isinstance(value, bool) or value is None:
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if number != number else number
+
+def _to_str(value: Any) -> Optional[str]:
+    return None if _is_null(value) else str(value)
+
+_CONVERTERS = {"int": _to_int, "float": _to_float, "str": _to_str}
+
+class PreprocessingPipeline:
+    """
+    Configurable cleaning stages over record batches.
+    """
+    
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the pipeline.
+        
+        Args:
+            config: Options overriding ``DEFAULT_CONFIG``
+        
+        Raises:
+            ValueError: If an unknown stage or method is configured
+        """
+        self.config = {**DEFAULT_CONFIG, **(config or {})}
+        unknown = [stage for stage in self.config["stages"] if stage not in STAGES]
+        if unknown:
+            raise ValueError(f"Unknown preprocessing stages: {', '.join(unknown)}")
+        for field, method in self.config["normalize"].items():
+            if method not in ("zscore", "minmax"):
+                raise ValueError(f"Unknown normalization method for {field}: {method}")
+        
+        self.stats: Dict[str, Any] = {
+            "rows_in": 0,
+            "rows_out": 0,
+            "batches": 0,
+            "stages": {
+                stage: {"seconds": 0.0, "rows_dropped": 0} for stage in self.config["stages"]
+            }
+        }
+        self._seen_ids: set = set()
+        self._running = {field: RunningStats() for field in self.config["normalize"]}
+        self._parsed_dates: Dict[Any, Any] = {}
+    
+    def process(self, batch: Union[RecordBatch, Sequence[Any]]) -> RecordBatch:
+        """
+        Clean one batch.
+        
+        Args:
+            batch: Record batch, or record dictionaries
+        
+        Returns:
+            Cleaned batch
+        """
+        if not isinstance(batch, RecordBatch):
+            batch = RecordBatch.from_records(batch)
+        work = _Work(batch)
+        for stage in self.config["stages"]:
+            kept = work.length if work.keep is None else len(work.keep)
+            start = time.perf_counter()
+            getattr(self, f"_{stage}")(work)
+            stage_stats = self.stats["stages"][stage]
+            stage_stats["seconds"] += time.perf_counter() - start
+            stage_stats["rows_dropped"] += kept - (work.length if work.keep is None else len(work.keep))
+        
+        result = RecordBatch(work.columns, work.length, batch._schema)
+        if work.keep is not None:
+            result = result.take(work.keep)
+        self.stats["rows_in"] += len(batch)
+        self.stats["rows_out"] += len(result)
+        self.stats["batches"] += 1
+        return result
+    
+    async def stream(
+        self,
+        batches: Union[AsyncIterator[Any], Iterable[Any]]
+    ) -> AsyncIterator[RecordBatch]:
+        """
+        Clean batches as they arrive.
+        
+        Args:
+            batches: Async iterator (or iterable) of record batches or record lists
+        
+        Yields:
+            Cleaned batches; empty results are skipped
+        """
+        if hasattr(batches, "__aiter__"):
+            async for batch in batches:
+                cleaned = self.process(batch)
+                if len(cleaned):
+                    yield cleaned
+        else:
+            for batch in batches:
+                cleaned = self.process(batch)
+                if len(cleaned):
+                    yield cleaned
+                # Let other workflows run between batches
+                await asyncio.sleep(0)
+    
+    def _coerce(self, work: _Work) -> None:
+        for field, field_type in self.config["types"].items():
+            column = work.columns.get(field)
+            if column is None:
+                continue
+            if isinstance(column, array.array) and (column.typecode == "q") == (field_type == "int"):
+                continue
+            if isinstance(column, array.array) and field_type == "float":
+                work.columns[field] = array.array("d", column)
+                continue
+            work.columns[field] = _map_values(column, _CONVERTERS[field_type])
+    
+    def _nulls(self, work: _Work) -> None:
+        for field, fill in self.config["fill_nulls"].items():
+            column = work.columns.get(field)
+            if column is None or (isinstance(column, array.array) and column.typecode != "d"):
+                continue
+            work.columns[field] = _map_values(column, lambda value: fill if _is_null(value) else value)
+        
+        for field in self.config["drop_nulls"]:
+            column = work.columns.get(field)
+            if column is None or (isinstance(column, array.array) and column.typecode != "d"):
+                continue
+            if isinstance(column, DictionaryColumn):
+                if None not in column.categories:
+                    continue
+                null_code = column.categories.index(None)
+                codes = column.codes
+                work.keep = [i for i in work.rows() if codes[i] != null_code]
+            else:
+                work.keep = [i for i in work.rows() if not _is_null(column[i])]
+    
+    def _dedup(self, work: _Work) -> None:
+        column = work.columns.get(self.config["id_field"])
+        if column is None:
+            return
+        seen = self._seen_ids
+        keep = []
+        for i in work.rows():
+            value = column[i]
+            if value is None:
+                keep.append(i)
+            elif value not in seen:
+                seen.add(value)
+                keep.append(i)
+        work.keep = keep
+    
+    def _dates(self, work: _Work) -> None:
+        for field in self.config["date_fields"]:
+            column = work.columns.get(field)
+            if column is not None and not isinstance(column, array.array):
+                parsed = _map_values(column, self._parse_date)
+                work.columns[field] = parsed
+                unparsed = {
+                    value for value in set(parsed.categories if isinstance(parsed, DictionaryColumn) else parsed)
+                    if isinstance(value, str) and not _ISO_DATE.match(value)
+                }
+                if unparsed:
+                    counts = self.stats["stages"]["dates"].setdefault("unparsed", {})
+                    counts[field] = counts.get(field, 0) + sum(1 for i in work.rows() if parsed[i] in unparsed)
+    
+    def _parse_date(self, value: Any) -> Any:
+        """Rewrite a date as an ISO date string; unparseable values are kept."""
+        if value in self._parsed_dates:
+            return self._parsed_dates[value]
+        parsed = value
+        if isinstance(value, datetime):
+            parsed = value.date().isoformat()
+        elif isinstance(value, date):
+            parsed = value.isoformat()
+        elif isinstance(value, str):
+            text = value.strip()
+            try:
+                parsed = datetime.fromisoformat(text).date().isoformat()
+            except ValueError:
+                for date_format in self.config["date_formats"]:
+                    try:
+                        parsed = datetime.strptime(text, date_format).date().isoformat()
+                        break
+                    except ValueError:
+                        continue
+        if len(self._parsed_dates) < 100000:
+            self._parsed_dates[value] = parsed
+        return parsed
+    
+    def _text(self, work: _Work) -> None:
+        lowercase = self.config["lowercase"]
+        
+        def normalize(value):
+            if not isinstance(value, str):
+                return value
+            text = _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", value)).strip()
+            return text.lower() if lowercase else text
+        
+        for field in self.config["text_fields"]:
+            column = work.columns.get(field)
+            if column is not None and not isinstance(column, array.array):
+                work.columns[field] = _map_values(column, normalize)
+    
+    def _normalize(self, work: _Work) -> None:
+        for field, method in self.config["normalize"].items():
+            column = work.columns.get(field)
+            if column is None:
+                continue
+            running = self._running[field]
+            if isinstance(column, array.array):
+                # Typed columns are scaled in one pass; NaN stays NaN
+                values = column if work.keep is None else [column[i] for i in work.keep]
+                running.update_many([value for value in values if value == value])
+            else:
+                running.update_many([
+                    value for value in (column[i] for i in work.rows())
+                    if isinstance(value, (int, float)) and not _is_null(value)
+                ])
+            if method == "zscore":
+                center = running.mean
+                scale = math.sqrt(running.variance)
+            else:
+                center = running.minimum if running.minimum is not None else 0.0
+                scale = (running.maximum - running.minimum) if running.count else 0.0
+            scale = scale or 1.0
+            if isinstance(column, array.array):
+                work.columns[f"{field}_normalized"] = array.array("d", [(value - center) / scale for value in column])
+            else:
+                work.columns[f"{field}_normalized"] = encode_column([
+                    (value - center) / scale
+                    if isinstance(value, (int, float)) and not _is_null(value) else None
+                    for value in column
+                ])
\ No newline at end of file
@@ -0,0 +1,301 @@
+"""
+Query plans pushed from the analysis down to extraction.
+
+An analysis only reads a few fields of its source, often of a limited
+period. A ``QueryPlan`` names the columns an analysis needs (projection)
+and the conditions its rows must meet (predicates, such as a date range),
+so that sources read and agents pass on only that data. Connectors that
+can apply a plan at the source do so: database connectors select the
+columns and add the conditions to the query, and the CSV connector only
+builds the selected fields of each row. Other sources apply the plan to
+each batch as it is read.
+
+Plans are derived from the "analysis_type" of a request with
+``plan_for_request``. A plan does not change what an analysis can see of
+a source it was not meant for: when a source lacks the fields that
+identify the analysis kind (e.g. ``feedback`` for a feedback analysis),
+its columns are not projected, and conditions on fields the source lacks
+are ignored.
+"""
+
+import hashlib
+import json
+import logging
+import operator
+from typing import Dict, Any, Callable, Iterable, List, Optional, Sequence, Tuple
+
+from orchestrator.analysis.aggregation import DictionaryColumn
+from orchestrator.analysis.schema import DataSchema
+from orchestrator.data.record_batch import RecordBatch
+
+logger = logging.getLogger(__name__)
+
+# Analysis kind of each analysis type
+ANALYSIS_KINDS = {
+    "sentiment": "feedback",
+    "feedback": "feedback",
+    "customer_feedback": "feedback",
+    "sales": "sales",
+    "revenue": "sales",
+    "generic": "generic"
+}
+
+# Columns read by each analysis kind, including the fields its kind is
+# detected from and those the anomaly detector groups by
+ANALYSIS_COLUMNS = {
+    "feedback": ["id", "customer_id", "product_id", "rating", "feedback", "date"],
+    "sales": ["id", "customer_id", "product_id", "quantity", "price", "region", "date"],
+    "generic": ["id", "value", "category", "timestamp"]
+}
+
+# Fields a source must have for the columns of a kind to be projected
+REQUIRED_FIELDS = {
+    "feedback": ["feedback"],
+    "sales": ["product_id"],
+    "generic": ["value"]
+}
+
+# Field a date range of each kind applies to
+DATE_FIELDS = {
+    "feedback": "date",
+    "sales": "date",
+    "generic": "timestamp"
+}
+
+_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": lambda value, values: value in values
+}
+
+Filter = Tuple[str, str, Any]
+
+def _test(compare: Callable[[Any, Any], bool], value: Any, operand: Any) -> bool:
+    """Apply a condition to a value; None and incomparable values never match."""
+    if value is None:
+        return False
+    try:
+        return bool(compare(value, operand))
+    except TypeError:
+        return False
+
+class QueryPlan:
+    """
+    Columns and row conditions an analysis needs from its source.
+    """
+    
+    def __init__(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        filters: Iterable[Sequence[Any]] = (),
+        kind: Optional[str] = None,
+        required: Iterable[str] = ()
+    ):
+        """
+        Initialize the plan.
+        
+        Args:
+            columns: Columns to read, or None for every column; fields the
+                filters test are added
+            filters: ``(field, operator, value)`` conditions every row must
+                meet, with operators "==", "!=", "<", "<=", ">", ">=" and "in"
+            kind: Analysis kind the plan was derived for
+            required: Fields a source must have for its columns to be
+                projected
+        
+        Raises:
+            ValueError: If a filter has an unknown operator
+        """
+        self.filters: List[Filter] = []
+        for field, op, value in filters:
+            if op not in _OPERATORS:
+                raise ValueError(f"Unknown filter operator: {op}")
+            self.filters.append((field, op, list(value) if op == "in" else value))
+        self.columns: Optional[List[str]] = None
+        if columns is not None:
+            self.columns = list(dict.fromkeys([*columns, *(field for field, _, _ in self.filters)]))
+        self.kind = kind
+        self.required = list(required)
+    
+    @property
+    def is_empty(self) -> bool:
+        """Whether the plan reads every column and row."""
+        return self.columns is None and not self.filters
+    
+    def resolve(self, fields: Iterable[str]) -> "QueryPlan":
+        """
+        Fit the plan to the fields of a source.
+        
+        Args:
+            fields: Field names of the source
+        
+        Returns:
+            Plan without projection if the source lacks a required field,
+            and without the filters on fields it lacks
+        """
+        fields = set(fields)
+        columns = self.columns
+        if columns is not None:
+            if all(field in fields for field in self.required):
+                columns = [column for column in columns if column in fields]
+            else:
+                logger.debug("Source lacks %s, reading every column", self.required)
+                columns = None
+        filters = [condition for condition in self.filters if condition[0] in fields]
+        return QueryPlan(columns, filters, self.kind, self.required)
+    
+    def with_columns(self, columns: Iterable[str]) -> "QueryPlan":
+        """
+        Get the plan reading more columns.
+        
+        Args:
+            columns: Columns to add
+        
+        Returns:
+            Plan with the columns added, if it projects
+        """
+        if self.columns is None:
+            return self
+        return QueryPlan([*self.columns, *columns], self.filters, self.kind, self.required)
+    
+    def matches(self, record: Dict[str, Any]) -> bool:
+        """
+        Check a record against the filters.
+        
+        Args:
+            record: Record dictionary
+        
+        Returns:
+            True if the record meets every condition
+        """
+        return all(_test(_OPERATORS[op], record.get(field), value) for field, op, value in self.filters)
+    
+    def apply_records(self, records: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Filter and project record dictionaries.
+        
+        Args:
+            records: Records of the source
+        
+        Returns:
+            Matching records, with the planned columns only
+        """
+        if self.filters:
+            records = [record for record in records if self.matches(record)]
+        if self.columns is None:
+            return list(records)
+        columns = self.columns
+        return [{column: record[column] for column in columns if column in record} for record in records]
+    
+    def apply(self, batch: RecordBatch) -> RecordBatch:
+        """
+        Filter and project a record batch.
+        
+        Filters are tested once per distinct value of a dictionary-encoded
+        column, and projected columns are shared with the batch.
+        
+        Args:
+            batch: Batch of the source
+        
+        Returns:
+            Batch of the matching rows and planned columns, with the schema
+            narrowed to them
+        """
+        keep: Optional[List[int]] = None
+        for field, op, value in self.filters:
+            compare = _OPERATORS[op]
+            rows = keep if keep is not None else range(len(batch))
+            column = batch.columns.get(field)
+            if column is None:
+                keep = []
+            elif isinstance(column, DictionaryColumn):
+                matching = [_test(compare, category, value) for category in column.categories]
+                codes = column.codes
+                keep = [i for i in rows if matching[codes[i]]]
+            else:
+                keep = [i for i in rows if _test(compare, column[i], value)]
+        
+        columns = batch.columns
+        schema = batch._schema
+        if self.columns is not None:
+            columns = {name: columns[name] for name in self.columns if name in columns}
+            if schema is not None:
+                data = schema.to_dict()
+                schema = DataSchema.from_dict({
+                    **data, "fields": {name: kind for name, kind in data["fields"].items() if name in columns}
+                })
+        projected = RecordBatch(columns, len(batch), schema)
+        return projected if keep is None else projected.take(keep)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialize the plan.
+        
+        Returns:
+            JSON-compatible dictionary
+        """
+        return {
+            "columns": list(self.columns) if self.columns is not None else None,
+            "filters": [list(condition) for condition in self.filters],
+            "kind": self.kind,
+            "required": list(self.required)
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QueryPlan":
+        """
+        Rebuild a plan from ``to_dict()`` output.
+        
+        Args:
+            data: Serialized plan
+        
+        Returns:
+            Plan
+        """
+        return cls(data.get("columns"), data.get("filters", ()), data.get("kind"), data.get("required", ()))
+    
+    def digest(self) -> str:
+        """
+        Get a short, stable hash of the plan, to key what was extracted or analyzed with it.
+        
+        Returns:
+            Hex digest of the serialized plan
+        """
+        text = json.dumps(self.to_dict(), sort_keys=True, default=str)
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+    
+    def __repr__(self) -> str:
+        return f"QueryPlan(columns={self.columns}, filters={self.filters})"
+
+def plan_for_request(request: Dict[str, Any]) -> Optional[QueryPlan]:
+    """
+    Derive the query plan of a request from its analysis type.
+    
+    The request may add a "date_range" (a dictionary with an inclusive
+    "start" and an exclusive "end", either optional) on its "date_field",
+    other "filters" as ``[field, operator, value]`` lists and more
+    "columns" to read.
+    
+    Args:
+        request: Request with an "analysis_type"
+    
+    Returns:
+        Plan, or None if the request needs every column and row
+    """
+    kind = ANALYSIS_KINDS.get(str(request.get("analysis_type", "")).lower())
+    columns = [*ANALYSIS_COLUMNS[kind], *request.get("columns", ())] if kind is not None else None
+    
+    filters = [tuple(condition) for condition in request.get("filters", ())]
+    date_range = request.get("date_range") or {}
+    date_field = request.get("date_field") or DATE_FIELDS.get(kind, "date")
+    if date_range.get("start") is not None:
+        filters.append((date_field, ">=", date_range["start"]))
+    if date_range.get("end") is not None:
+        filters.append((date_field, "<", date_range["end"]))
+    
+    plan = QueryPlan(columns, filters, kind, REQUIRED_FIELDS.get(kind, ()))
+    return None if plan.is_empty else plan
\ No newline at end of file
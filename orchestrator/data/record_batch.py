@@ -0,0 +1,317 @@
+"""
+Columnar record batches shared by the agents.
+
+A ``RecordBatch`` holds records as one typed column per field instead of
+one dictionary per row: integers and floats in ``array.array`` buffers,
+strings (with missing values) dictionary-encoded, and any other column in
+a plain list. Typed columns may also be read-only ``memoryview`` buffers,
+as decoded from a transport frame without copying. The batch carries the
+schema of its fields.
+
+A batch is also a read-only sequence of dictionary rows, built on access,
+so code written for record lists keeps working. Code that knows the format
+reads the columns directly; the analysis layer gets them as a
+``ColumnarFrame`` without copying.
+"""
+
+import array
+import logging
+import sys
+from collections.abc import Sequence
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Union
+
+from orchestrator.analysis.aggregation import ColumnarFrame, DictionaryColumn
+from orchestrator.analysis.schema import DataSchema, infer_schema
+from orchestrator.utils.serialization import register_json_type
+
+logger = logging.getLogger(__name__)
+
+def encode_column(values: List[Any]) -> Sequence:
+    """
+    Store column values in their most compact form.
+    
+    Args:
+        values: Value per row
+    
+    Returns:
+        ``array.array`` of integers or floats (integers mixed with floats
+        are stored as floats), a ``DictionaryColumn`` for strings and None,
+        or the list itself for any other values
+    """
+    types = set(map(type, values))
+    if types <= {int}:
+        try:
+            return array.array("q", values)
+        except OverflowError:
+            return values
+    if types <= {int, float}:
+        return array.array("d", values)
+    if types <= {str, type(None)}:
+        index: Dict[Any, int] = {}
+        codes = array.array("i", [index.setdefault(value, len(index)) for value in values])
+        return DictionaryColumn(codes, list(index))
+    return values
+
+def column_nbytes(column: Sequence) -> int:
+    """
+    Approximate the memory held by a column.
+    
+    Args:
+        column: Column of a batch
+    
+    Returns:
+        Size in bytes of the buffers, and of the distinct values of a
+        dictionary-encoded or list column
+    """
+    if isinstance(column, array.array):
+        return column.itemsize * len(column)
+    if isinstance(column, memoryview):
+        return column.nbytes
+    if isinstance(column, DictionaryColumn):
+        return column_nbytes(column.codes) + sum(map(sys.getsizeof, column.categories))
+    size = sys.getsizeof(column)
+    seen = set()
+    for value in column:
+        if id(value) not in seen:
+            seen.add(id(value))
+            size += sys.getsizeof(value)
+    return size
+
+def concat_columns(parts: Sequence[Sequence]) -> Sequence:
+    """
+    Join columns of consecutive batches.
+    
+    Args:
+        parts: Columns in row order
+    
+    Returns:
+        Joined column, keeping the parts' encoding when they share it
+    """
+    typecodes = {part.typecode if isinstance(part, array.array) else None for part in parts}
+    if len(typecodes) == 1 and None not in typecodes:
+        joined = array.array(parts[0].typecode)
+        for part in parts:
+            joined.extend(part)
+        return joined
+    if parts and all(isinstance(part, DictionaryColumn) for part in parts):
+        # Merge the dictionaries; codes stay in order of first appearance
+        index: Dict[Any, int] = {}
+        codes = array.array("i")
+        for part in parts:
+            mapping = [index.setdefault(value, len(index)) for value in part.categories]
+            codes.extend([mapping[code] for code in part.codes])
+        return DictionaryColumn(codes, list(index))
+    values: List[Any] = []
+    for part in parts:
+        values.extend(part)
+    return encode_column(values)
+
+def take_column(column: Sequence, indices: Sequence[int]) -> Sequence:
+    """
+    Select rows of a column.
+    
+    Args:
+        column: Column of a batch
+        indices: Row indices to keep, in output order
+    
+    Returns:
+        Column of the selected rows, in the same encoding
+    """
+    if isinstance(column, array.array):
+        return array.array(column.typecode, [column[i] for i in indices])
+    if isinstance(column, memoryview):
+        return array.array(column.format, [column[i] for i in indices])
+    if isinstance(column, DictionaryColumn):
+        # Renumber so the codes are again in order of first appearance
+        codes = column.codes
+        remap: Dict[int, int] = {}
+        selected = array.array("i", [remap.setdefault(codes[i], len(remap)) for i in indices])
+        return DictionaryColumn(selected, [column.categories[code] for code in remap])
+    return [column[i] for i in indices]
+
+class RecordBatch(Sequence):
+    """
+    Records stored column by column, with their schema.
+    
+    Indexing returns a row dictionary and slicing a batch of the selected
+    rows. Fields missing from some of the records read as None.
+    """
+    
+    def __init__(
+        self,
+        columns: Dict[str, Sequence],
+        length: Optional[int] = None,
+        schema: Optional[DataSchema] = None
+    ):
+        """
+        Initialize the batch.
+        
+        Args:
+            columns: Column per field name, each with one value per row
+            length: Number of rows; taken from the columns by default
+            schema: Schema of the records; inferred from a sample of rows on
+                first use by default
+        
+        Raises:
+            ValueError: If a column does not have one value per row
+        """
+        self.columns = dict(columns)
+        if length is None:
+            length = len(next(iter(self.columns.values()))) if self.columns else 0
+        for name, column in self.columns.items():
+            if len(column) != length:
+                raise ValueError(f"Column {name} has {len(column)} values for {length} rows")
+        self.length = length
+        self._schema = schema
+    
+    @classmethod
+    def from_records(cls, records: Iterable[Any], schema: Optional[DataSchema] = None) -> "RecordBatch":
+        """
+        Build a batch from row dictionaries.
+        
+        Args:
+            records: Row dictionaries; non-dictionary rows count as rows with
+                every field missing
+            schema: Optional schema of the records
+        
+        Returns:
+            Batch with the fields of every record, in first-seen order
+        """
+        rows = [r if isinstance(r, dict) else {} for r in records]
+        fields: Dict[str, None] = {}
+        for row in rows:
+            if len(row) != len(fields) or not fields.keys() >= row.keys():
+                fields.update(dict.fromkeys(row))
+        columns = {field: encode_column([row.get(field) for row in rows]) for field in fields}
+        return cls(columns, len(rows), schema)
+    
+    @classmethod
+    def concat(cls, batches: Sequence["RecordBatch"]) -> "RecordBatch":
+        """
+        Join batches, in order, into one.
+        
+        Args:
+            batches: Batches to join
+        
+        Returns:
+            Batch with the fields of every batch; fields a batch lacks read
+            as None in its rows
+        """
+        fields: Dict[str, None] = {}
+        for batch in batches:
+            fields.update(dict.fromkeys(batch.columns))
+        columns = {
+            field: concat_columns([
+                batch.columns[field] if field in batch.columns else [None] * len(batch)
+                for batch in batches
+            ])
+            for field in fields
+        }
+        schemas = {id(batch._schema) for batch in batches}
+        schema = batches[0]._schema if len(schemas) == 1 and batches else None
+        return cls(columns, sum(len(batch) for batch in batches), schema)
+    
+    @classmethod
+    def from_frame(cls, frame: ColumnarFrame, schema: Optional[DataSchema] = None) -> "RecordBatch":
+        """
+        Wrap the columns of a frame, such as one read from a mapped file.
+        
+        Args:
+            frame: Columnar frame
+            schema: Optional schema of the columns
+        
+        Returns:
+            Batch sharing the frame's columns
+        """
+        return cls(frame.columns, len(frame), schema)
+    
+    @property
+    def schema(self) -> DataSchema:
+        """Schema of the records."""
+        if self._schema is None:
+            self._schema = infer_schema(self)
+        return self._schema
+    
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the columns, in bytes."""
+        return sum(column_nbytes(column) for column in self.columns.values())
+    
+    def __len__(self) -> int:
+        return self.length
+    
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.length)
+            return RecordBatch(
+                {name: column[index] for name, column in self.columns.items()},
+                len(range(start, stop, step)),
+                self._schema
+            )
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("RecordBatch index out of range")
+        return {name: column[index] for name, column in self.columns.items()}
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        names = list(self.columns)
+        if not names:
+            return iter([{} for _ in range(self.length)])
+        return (dict(zip(names, values)) for values in zip(*self.columns.values()))
+    
+    def __repr__(self) -> str:
+        return f"RecordBatch({self.length} rows, fields={list(self.columns)})"
+    
+    def has_nulls(self, name: str) -> bool:
+        """
+        Check whether a field is None (or missing) in some rows.
+        
+        Args:
+            name: Field name
+        
+        Returns:
+            True if the field has a None value; False for unknown fields
+        """
+        column = self.columns.get(name, ())
+        if isinstance(column, (array.array, memoryview)):
+            return False
+        if isinstance(column, DictionaryColumn):
+            return None in column.categories
+        return any(value is None for value in column)
+    
+    def take(self, indices: Sequence[int]) -> "RecordBatch":
+        """
+        Select rows by index.
+        
+        Args:
+            indices: Row indices to keep, in output order
+        
+        Returns:
+            Batch of the selected rows
+        """
+        return RecordBatch(
+            {name: take_column(column, indices) for name, column in self.columns.items()},
+            len(indices),
+            self._schema
+        )
+    
+    def to_records(self) -> List[Dict[str, Any]]:
+        """
+        Materialize the rows.
+        
+        Returns:
+            Row dictionaries
+        """
+        return list(self)
+    
+    def frame(self) -> ColumnarFrame:
+        """
+        Get the columns as a frame for the analysis layer.
+        
+        Returns:
+            Frame sharing the batch's column buffers
+        """
+        return ColumnarFrame(dict(self.columns), self.length)
+
+register_json_type(RecordBatch, RecordBatch.to_records)
\ No newline at end of file
@@ -0,0 +1,325 @@
+"""
+Compact transport format for record batches and agent payloads.
+
+Pickling an extraction result for another process or host serializes
+every value of every row. A record batch is already laid out as typed
+column buffers, so a batch frame writes those buffers as they are, after
+a small JSON header that describes them:
+
+    prefix   magic, codec, header and body sizes (fixed-size, little-endian)
+    header   JSON: row count, byte order, schema and one entry per column
+             with its kind, type code, offset and size in the body
+    body     column buffers, each starting at a multiple of 8 bytes,
+             compressed as a whole
+
+Integer and float columns are written as their buffer, dictionary-encoded
+columns as their codes buffer with the categories in the header, and any
+other column is pickled into the body. The body is compressed with zstd
+or LZ4 when those packages are installed, and with zlib otherwise; the
+"none" codec leaves it uncompressed.
+
+Decoding with ``copy=False`` does not copy column buffers: typed columns
+are read-only ``memoryview`` slices of the (decompressed) body, which stays
+alive as long as any of them. With the "none" codec, columns therefore
+point straight into the frame, e.g. a file mapped in memory.
+
+Agent payloads, dictionaries holding batches next to metadata, are
+pickled with each batch replaced by a reference to a batch frame stored
+after the pickle, so only the small metadata is pickled.
+"""
+
+import array
+import io
+import json
+import logging
+import pickle
+import struct
+import sys
+import zlib
+from typing import Dict, Any, List, Optional, Sequence
+
+from orchestrator.analysis.aggregation import DictionaryColumn
+from orchestrator.analysis.schema import DataSchema
+from orchestrator.data.record_batch import RecordBatch
+from orchestrator.utils.serialization import json_default
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # lz4 is an optional dependency
+    lz4_frame = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard is an optional dependency
+    zstandard = None
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency
+    np = None
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"OXT1"
+_PAYLOAD_MAGIC = b"OXP1"
+
+# magic, codec, reserved, header size, uncompressed body size
+_PREFIX = struct.Struct("<4sB3xIQ")
+# magic, batch count, pickle size
+_PAYLOAD_PREFIX = struct.Struct("<4sIQ")
+# offset and size of a batch frame in a payload
+_FRAME_ENTRY = struct.Struct("<QQ")
+
+_ALIGNMENT = 8
+
+# Codec of each identifier written in a frame
+_CODEC_IDS = {"none": 0, "zlib": 1, "lz4": 2, "zstd": 3}
+_CODEC_NAMES = {identifier: name for name, identifier in _CODEC_IDS.items()}
+
+# Buffer formats written as typed columns; each is also an ``array`` type code
+_TYPECODES = set("bBhHiIlLqQfd")
+
+def available_codecs() -> List[str]:
+    """
+    Get the codecs usable in this process.
+    
+    Returns:
+        Codec names, fastest to decode first among the compressing ones
+    """
+    codecs = ["none"]
+    if zstandard is not None:
+        codecs.append("zstd")
+    if lz4_frame is not None:
+        codecs.append("lz4")
+    codecs.append("zlib")
+    return codecs
+
+def default_codec() -> str:
+    """
+    Get the codec used when none is given: zstd, LZ4 or zlib, whichever is available first.
+    
+    Returns:
+        Codec name
+    """
+    return available_codecs()[1]
+
+def _compress(codec: str, data: bytes, level: Optional[int]) -> bytes:
+    if codec == "none":
+        return data
+    if codec == "zlib":
+        return zlib.compress(data, 1 if level is None else level)
+    if codec == "lz4" and lz4_frame is not None:
+        return lz4_frame.compress(data, compression_level=level or 0)
+    if codec == "zstd" and zstandard is not None:
+        return zstandard.ZstdCompressor(level=3 if level is None else level).compress(data)
+    raise ValueError(f"Codec {codec} is not available; available codecs: {available_codecs()}")
+
+def _decompress(codec: str, data: memoryview, size: int) -> bytes:
+    if codec == "zlib":
+        return zlib.decompress(data)
+    if codec == "lz4" and lz4_frame is not None:
+        return lz4_frame.decompress(data)
+    if codec == "zstd" and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompress(data, max_output_size=size)
+    raise ValueError(f"Codec {codec} is not available to decode the frame")
+
+def _padding(size: int) -> int:
+    return -size % _ALIGNMENT
+
+def _typed_buffer(column: Any) -> Optional[memoryview]:
+    """Get the contiguous, native typed buffer of a column, or None if it has none."""
+    if isinstance(column, (list, DictionaryColumn)):
+        return None
+    if np is not None and isinstance(column, np.ndarray):
+        column = np.ascontiguousarray(column)
+    try:
+        view = memoryview(column)
+    except (TypeError, ValueError):
+        return None
+    if view.ndim != 1 or view.format not in _TYPECODES or not view.c_contiguous:
+        return None
+    return view
+
+def _as_codes(codes: Sequence[int]) -> memoryview:
+    view = _typed_buffer(codes)
+    return view if view is not None else memoryview(array.array("q", codes))
+
+def encode_batch(batch: RecordBatch, codec: Optional[str] = None, level: Optional[int] = None) -> bytes:
+    """
+    Serialize a batch as a frame.
+    
+    Args:
+        batch: Record batch
+        codec: "zstd", "lz4", "zlib" or "none"; ``default_codec()`` by default
+        level: Compression level of the codec; a fast level by default
+    
+    Returns:
+        Frame bytes
+    
+    Raises:
+        ValueError: If the codec is unknown or not available
+    """
+    return b"".join(_frame_parts(batch, codec, level))
+
+def _frame_parts(batch: RecordBatch, codec: Optional[str], level: Optional[int]) -> List[Any]:
+    """Build the buffers of a frame, so that the frame is copied once, when they are joined."""
+    codec = codec or default_codec()
+    if codec not in _CODEC_IDS:
+        raise ValueError(f"Unknown codec: {codec}")
+    
+    columns = []
+    buffers = []
+    offset = 0
+    for name, column in batch.columns.items():
+        spec: Dict[str, Any] = {"name": name}
+        view = _typed_buffer(column)
+        if view is not None:
+            spec.update(kind="array", type=view.format)
+        elif isinstance(column, DictionaryColumn) and all(
+            value is None or isinstance(value, str) for value in column.categories
+        ):
+            view = _as_codes(column.codes)
+            spec.update(kind="dictionary", type=view.format, categories=list(column.categories))
+        else:
+            view = memoryview(pickle.dumps(column, protocol=pickle.HIGHEST_PROTOCOL))
+            spec.update(kind="pickle")
+        data = view.cast("B")
+        spec.update(offset=offset, size=len(data))
+        buffers.append(data)
+        padding = _padding(len(data))
+        if padding:
+            buffers.append(bytes(padding))
+        offset += len(data) + padding
+        columns.append(spec)
+    
+    header = json.dumps({
+        "length": len(batch),
+        "byteorder": sys.byteorder,
+        "schema": batch._schema.to_dict() if batch._schema is not None else None,
+        "columns": columns
+    }, default=json_default).encode("utf-8")
+    if codec != "none":
+        buffers = [_compress(codec, b"".join(buffers), level)]
+    prefix = _PREFIX.pack(_MAGIC, _CODEC_IDS[codec], len(header), offset)
+    return [prefix, header, bytes(_padding(len(prefix) + len(header))), *buffers]
+
+def decode_batch(frame: Any, copy: bool = False) -> RecordBatch:
+    """
+    Rebuild a batch from a frame written by ``encode_batch``.
+    
+    Args:
+        frame: Frame bytes, or any buffer holding them (e.g. a memory map)
+        copy: Copy typed columns into arrays instead of viewing the frame
+    
+    Returns:
+        Record batch; without ``copy``, typed columns are read-only views
+    
+    Raises:
+        ValueError: If the data is not a frame or its codec is not available
+    """
+    view = memoryview(frame).cast("B")
+    if len(view) < _PREFIX.size or view[:len(_MAGIC)] != _MAGIC:
+        raise ValueError("Not an encoded record batch")
+    _, codec_id, header_size, body_size = _PREFIX.unpack_from(view)
+    header = json.loads(bytes(view[_PREFIX.size:_PREFIX.size + header_size]))
+    start = _PREFIX.size + header_size
+    body = view[start + _padding(start):]
+    codec = _CODEC_NAMES.get(codec_id)
+    if codec is None:
+        raise ValueError(f"Unknown codec identifier: {codec_id}")
+    if codec != "none":
+        body = memoryview(_decompress(codec, body, body_size))
+    
+    swap = header["byteorder"] != sys.byteorder
+    columns = {}
+    for spec in header["columns"]:
+        data = body[spec["offset"]:spec["offset"] + spec["size"]]
+        if spec["kind"] == "pickle":
+            columns[spec["name"]] = pickle.loads(data)
+            continue
+        if copy or swap:
+            values = array.array(spec["type"])
+            values.frombytes(data)
+            if swap:
+                values.byteswap()
+        else:
+            values = data.cast(spec["type"])
+        columns[spec["name"]] = values if spec["kind"] == "array" else DictionaryColumn(values, spec["categories"])
+    
+    schema = DataSchema.from_dict(header["schema"]) if header["schema"] is not None else None
+    return RecordBatch(columns, header["length"], schema)
+
+def encode_payload(payload: Any, codec: Optional[str] = None, level: Optional[int] = None) -> bytes:
+    """
+    Serialize an agent payload, storing its record batches as frames.
+    
+    Args:
+        payload: Picklable payload, e.g. an extraction result
+        codec: Codec of the batch frames; ``default_codec()`` by default
+        level: Compression level of the codec
+    
+    Returns:
+        Payload bytes
+    """
+    frames: List[List[Any]] = []
+    # A batch referenced more than once is stored once
+    indices: Dict[int, int] = {}
+    
+    class Pickler(pickle.Pickler):
+        def persistent_id(self, obj: Any) -> Optional[int]:
+            if not isinstance(obj, RecordBatch):
+                return None
+            if id(obj) not in indices:
+                indices[id(obj)] = len(frames)
+                frames.append(_frame_parts(obj, codec, level))
+            return indices[id(obj)]
+    
+    output = io.BytesIO()
+    Pickler(output, protocol=pickle.HIGHEST_PROTOCOL).dump(payload)
+    envelope = output.getvalue()
+    
+    position = _PAYLOAD_PREFIX.size + _FRAME_ENTRY.size * len(frames) + len(envelope)
+    entries = []
+    parts = [envelope]
+    for frame in frames:
+        padding = _padding(position)
+        size = sum(len(part) for part in frame)
+        parts.extend([bytes(padding), *frame])
+        entries.append(_FRAME_ENTRY.pack(position + padding, size))
+        position += padding + size
+    return b"".join([_PAYLOAD_PREFIX.pack(_PAYLOAD_MAGIC, len(frames), len(envelope)), *entries, *parts])
+
+def decode_payload(data: Any, copy: bool = False) -> Any:
+    """
+    Rebuild a payload written by ``encode_payload``.
+    
+    Args:
+        data: Payload bytes, or any buffer holding them
+        copy: Copy typed columns of the batches instead of viewing the data
+    
+    Returns:
+        Payload
+    
+    Raises:
+        ValueError: If the data is not an encoded payload
+    """
+    view = memoryview(data).cast("B")
+    if len(view) < _PAYLOAD_PREFIX.size or view[:len(_PAYLOAD_MAGIC)] != _PAYLOAD_MAGIC:
+        raise ValueError("Not an encoded payload")
+    _, count, envelope_size = _PAYLOAD_PREFIX.unpack_from(view)
+    entries = [
+        _FRAME_ENTRY.unpack_from(view, _PAYLOAD_PREFIX.size + _FRAME_ENTRY.size * index)
+        for index in range(count)
+    ]
+    start = _PAYLOAD_PREFIX.size + _FRAME_ENTRY.size * count
+    
+    batches: Dict[int, RecordBatch] = {}
+    
+    class Unpickler(pickle.Unpickler):
+        def persistent_load(self, index: int) -> RecordBatch:
+            if index not in batches:
+                offset, size = entries[index]
+                batches[index] = decode_batch(view[offset:offset + size], copy)
+            return batches[index]
+    
+    return Unpickler(io.BytesIO(view[start:start + envelope_size])).load()
\ No newline at end of file
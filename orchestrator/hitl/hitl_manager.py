@@ -6,6 +6,7 @@ import logging
 import asyncio
 from typing import Dict, Any, Optional, Callable
 
+from orchestrator.data.record_batch import RecordBatch
 from orchestrator.state.context_store import ContextStore
 from orchestrator.state.history_manager import HistoryManager
 
@@ -179,6 +180,10 @@ class HITLManager:
         # Simulate human corrections
         if "data" in updated_output:
             data = updated_output["data"]
+            # Record batches are corrected as rows and rebuilt
+            columnar = isinstance(data, RecordBatch)
+            if columnar:
+                data = data.to_records()
             
             # If data is a list, simulate corrections to the first few items
             if isinstance(data, list) and data:
@@ -193,6 +198,9 @@ class HITLManager:
                             # Simulate correcting a mistakenly low rating
                             data[i]["rating"] = 2
                             data[i]["feedback"] += " [Rating corrected by human]"
+            
+            if columnar:
+                updated_output["data"] = RecordBatch.from_records(data)
         
         # Add HITL metadata
         if "metadata" not in updated_output:
@@ -6,6 +6,8 @@ import logging
 import asyncio
 from typing import Dict, Any, Optional, Callable, List
 
+from orchestrator.data.record_batch import RecordBatch
+
 logger = logging.getLogger(__name__)
 
 class UserInteractionTool:
@@ -159,7 +161,9 @@ class UserInteractionTool:
         
         # Make a copy of the data to simulate edits
         import copy
-        edited_data = copy.deepcopy(data)
+        # Record batches are edited as rows and rebuilt
+        columnar = isinstance(data, RecordBatch)
+        edited_data = data.to_records() if columnar else copy.deepcopy(data)
         
         # Simulate some edits based on the data type
         if isinstance(edited_data, dict):
@@ -173,6 +177,8 @@ class UserInteractionTool:
             # Add a review note to the first item if it's a dict
             if isinstance(edited_data[0], dict):
                 edited_data[0]["human_review_note"] = "Reviewed and approved"
+        if columnar:
+            edited_data = RecordBatch.from_records(edited_data)
         
         response = {
             "edited_data": edited_data,
@@ -4,12 +4,16 @@ Main Orchestrator module that coordinates the entire system.
 
 import logging
 import asyncio
+import sys
+import time
 from typing import Dict, List, Any, Optional, Union
 
 from orchestrator.agents.base_agent import Agent
 from orchestrator.agents.data_extraction_agent import DataExtractionAgent
 from orchestrator.agents.statistical_analysis_agent import StatisticalAnalysisAgent
 from orchestrator.agents.visualization_agent import VisualizationAgent
+from orchestrator.data.channel import BatchChannel
+from orchestrator.data.query_plan import plan_for_request
 from orchestrator.validation.confidence_evaluator import ConfidenceEvaluator
 from orchestrator.hitl.hitl_manager import HITLManager
 from orchestrator.state.workflow_state_manager import WorkflowStateManager
@@ -17,15 +21,50 @@ from orchestrator.state.context_store import ContextStore
 from orchestrator.state.history_manager import HistoryManager
 from orchestrator.utils.logging_tool import setup_logging
 
+try:
+    import resource
+except ImportError:  # resource is only available on Unix
+    resource = None
+
 # Set up logging
 logger = logging.getLogger(__name__)
 setup_logging()
 
+# Extraction result fields holding live objects rather than data
+_HANDLE_FIELDS = ("batches", "connector", "mapped_file")
+
+# Extraction result fields that only exist while its batches are streamed
+_STREAMED_FIELDS = (*_HANDLE_FIELDS, "data")
+
+def _without_handles(output: Dict[str, Any]) -> Dict[str, Any]:
+    """Get a step output without the live objects a checkpoint cannot restore."""
+    return {key: value for key, value in output.items() if key not in _HANDLE_FIELDS}
+
+def _peak_rss_bytes() -> Optional[int]:
+    """
+    Get the peak resident memory of the whole process since it started, or
+    None where it is not reported.
+    
+    The peak covers every workflow the process ran, not only the current one.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in kilobytes, except on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
 class Orchestrator:
     """
     Master controller that coordinates the workflow and manages agent interactions.
     """
     
+    # Workflow steps in execution order: (step name, agent name, task name)
+    WORKFLOW_STEPS = [
+        ("extraction_result", "data_extraction", "extract_data"),
+        ("analysis_result", "statistical_analysis", "analyze_data"),
+        ("visualization_result", "visualization", "create_visualizations")
+    ]
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """
         Initialize the Orchestrator with configuration settings.
@@ -40,8 +79,11 @@ class Orchestrator:
         
         # Initialize state management components
         self.context_store = ContextStore()
-        self.history_manager = HistoryManager()
-        self.workflow_state_manager = WorkflowStateManager(self.context_store)
+        self.history_manager = HistoryManager({"journal_dir": self.config.get("history_journal_dir")})
+        self.workflow_state_manager = WorkflowStateManager(
+            self.context_store, 
+            {"checkpoint_dir": self.config.get("checkpoint_dir")}
+        )
         
         # Initialize validation components
         self.confidence_evaluator = ConfidenceEvaluator(self.confidence_threshold)
@@ -74,40 +116,116 @@ class Orchestrator:
         workflow_id = self.workflow_state_manager.create_workflow(request)
         self.context_store.set(f"workflow:{workflow_id}:request", request)
         
-        try:
-            # Step 1: Extract data
-            extraction_result = await self._execute_agent_task(
-                "data_extraction", 
-                "extract_data", 
-                request
-            )
+        return await self._run_workflow(workflow_id, request)
+    
+    async def resume_workflow(self, workflow_id: str) -> Dict[str, Any]:
+        """
+        Resume a workflow, skipping the steps that already have a checkpoint.
+        
+        Args:
+            workflow_id: ID of the workflow to resume
             
-            # Step 2: Analyze data
-            analysis_result = await self._execute_agent_task(
-                "statistical_analysis", 
-                "analyze_data", 
-                extraction_result
-            )
+        Returns:
+            The processed result
             
-            # Step 3: Generate visualizations
-            visualization_result = await self._execute_agent_task(
-                "visualization", 
-                "create_visualizations", 
-                analysis_result
-            )
+        Raises:
+            ValueError: If no state exists for the workflow
+        """
+        workflow = self.workflow_state_manager.load_workflow(workflow_id)
+        if not workflow:
+            raise ValueError(f"Workflow {workflow_id} not found")
+        
+        if workflow.get("status") == "completed":
+            return workflow["result"]
+        
+        request = workflow.get("request", {})
+        logger.info(
+            "Resuming workflow %s with %d completed steps", 
+            workflow_id, len(workflow.get("checkpoints", {}))
+        )
+        self.context_store.set(f"workflow:{workflow_id}:request", request)
+        
+        return await self._run_workflow(workflow_id, request)
+    
+    def shutdown(self) -> None:
+        """Stop the worker processes of the agents."""
+        for agent in self.agents.values():
+            agent.shutdown()
+        logger.info("Orchestrator shut down")
+    
+    async def _run_workflow(self, workflow_id: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run the workflow steps, reusing checkpointed outputs of completed steps.
+        
+        Checkpoints leave out live objects such as connectors. Streamed
+        batches can only be read once, so an extraction that streams its
+        batches is checkpointed only after the analysis consumed them; a
+        workflow resumed before that extracts again.
+        
+        With "streaming" set in the request (or "streaming_execution" in the
+        configuration), extraction and analysis run together; see
+        ``_run_streaming_steps``. A resumed workflow whose extraction was
+        checkpointed analyzes the checkpointed data instead.
+        
+        Args:
+            workflow_id: ID of the workflow
+            request: The user request that started the workflow
+            
+        Returns:
+            The processed result
+        """
+        checkpoints = self.workflow_state_manager.get_checkpoints(workflow_id)
+        results = {}
+        # Streamed output of the previous step, checkpointed once it was consumed
+        consumed = None
+        
+        try:
+            # Each step consumes the output of the previous one, starting with the request
+            step_input = self._plan_extraction(request)
+            if (
+                request.get("streaming", self.config.get("streaming_execution", False))
+                and "extraction_result" not in checkpoints
+                and "analysis_result" not in checkpoints
+            ):
+                results.update(await self._run_streaming_steps(workflow_id, step_input))
+                step_input = results["analysis_result"]
+            for step_name, agent_name, task_name in self.WORKFLOW_STEPS:
+                if step_name in results:
+                    continue
+                if step_name in checkpoints:
+                    logger.info("Skipping completed step %s of workflow %s", step_name, workflow_id)
+                    step_output = checkpoints[step_name]
+                else:
+                    step_output = await self._execute_agent_task(agent_name, task_name, step_input)
+                    if step_output.get("batches") is not None:
+                        # The batches can only be read once, by the next step
+                        consumed = (step_name, step_output)
+                    else:
+                        self.workflow_state_manager.checkpoint_step(
+                            workflow_id, step_name, _without_handles(step_output)
+                        )
+                        if consumed is not None:
+                            self.workflow_state_manager.checkpoint_step(
+                                workflow_id, consumed[0], _without_handles(consumed[1])
+                            )
+                            consumed = None
+                
+                results[step_name] = step_output
+                step_input = step_output
             
             # Combine results
             final_result = {
                 "request_id": request.get("request_id"),
-                "extraction_result": extraction_result,
-                "analysis_result": analysis_result,
-                "visualization_result": visualization_result,
+                **results,
                 "workflow_id": workflow_id,
                 "status": "completed"
             }
             
-            # Update workflow state
-            self.workflow_state_manager.complete_workflow(workflow_id, final_result)
+            # Update workflow state; the stored result leaves out live objects
+            self.workflow_state_manager.complete_workflow(workflow_id, {
+                **final_result,
+                **{step_name: _without_handles(output) for step_name, output in results.items()}
+            })
             
             logger.info("Request %s processed successfully", request.get("request_id", "unknown"))
             return final_result
@@ -116,6 +234,135 @@ class Orchestrator:
             logger.error("Error processing request: %s", str(e), exc_info=True)
             self.workflow_state_manager.fail_workflow(workflow_id, str(e))
             raise
+        finally:
+            # Files mapped by the extraction live as long as the workflow
+            for step_output in results.values():
+                if isinstance(step_output, dict):
+                    self._close_mapped_file(step_output)
+    
+    async def _run_streaming_steps(self, workflow_id: str, extraction_input: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run extraction and analysis together, passing batches through a bounded channel.
+        
+        A producer task puts the extracted batches in a ``BatchChannel`` of
+        "stream_queue_size" batches (4 by default) while the analysis
+        consumes them, so reading the source overlaps with analyzing it and
+        a source faster than the analysis waits instead of filling memory.
+        Sources that are not streamed are passed on in slices of the batch
+        size.
+        
+        The extraction is reviewed before its first batch reaches the
+        analysis, so a human correction is what gets analyzed: when the
+        review returns corrected "data", that data is streamed instead of
+        the source's batches.
+        
+        The analysis publishes partial results to the context store under
+        ``workflow:<id>:partial_result``. The extraction result keeps the
+        metadata only, with a "pipeline" entry reporting the channel stats,
+        the seconds to the first partial result and the peak memory of the
+        whole process ("process_peak_rss_bytes").
+        
+        Args:
+            workflow_id: ID of the workflow
+            extraction_input: Extraction request
+            
+        Returns:
+            The checkpointed "extraction_result" and "analysis_result"
+        """
+        start = time.perf_counter()
+        extraction_input = {**extraction_input, "materialize": False}
+        logger.info("Streaming extraction into analysis for workflow %s", workflow_id)
+        
+        extraction = await self.agents["data_extraction"].execute_task("extract_data", extraction_input)
+        try:
+            extraction = await self._review_result("data_extraction", "extract_data", extraction_input, extraction)
+        except BaseException:
+            self._close_mapped_file(extraction)
+            raise
+        
+        batches = extraction.get("batches") if extraction.get("data") is None else None
+        if batches is None:
+            data = extraction.get("data") or []
+            size = extraction_input.get("batch_size", 10000)
+            batches = (data[offset:offset + size] for offset in range(0, len(data), size))
+        
+        channel = BatchChannel(self.config.get("stream_queue_size", 4), f"workflow {workflow_id}")
+        first_result: List[float] = []
+        
+        def publish(partial: Dict[str, Any]) -> None:
+            if not first_result:
+                first_result.append(time.perf_counter() - start)
+            self.context_store.set(f"workflow:{workflow_id}:partial_result", partial)
+        
+        producer = asyncio.ensure_future(channel.fill(batches))
+        try:
+            analysis = await self._execute_agent_task(
+                "statistical_analysis", "analyze_data",
+                {**extraction, "batches": channel, "on_partial_result": publish}
+            )
+            await producer
+        finally:
+            # Stop reading the source if the analysis failed
+            if not producer.done():
+                producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+            self._close_mapped_file(extraction)
+        
+        pipeline = {
+            **channel.to_dict(),
+            "time_to_first_result_seconds": first_result[0] if first_result else None,
+            "elapsed_seconds": time.perf_counter() - start,
+            "process_peak_rss_bytes": _peak_rss_bytes()
+        }
+        logger.info(
+            "Streamed %d records in %d batches for workflow %s: first result after %s s, max depth %d of %d",
+            channel.rows, channel.batches, workflow_id, pipeline["time_to_first_result_seconds"],
+            channel.max_depth, channel.maxsize
+        )
+        
+        metadata = {**extraction.get("metadata", {}), "record_count": channel.rows, "pipeline": pipeline}
+        connector = extraction.get("connector")
+        if connector is not None:
+            metadata["throughput"] = connector.stats.to_dict()
+        outputs = {
+            "extraction_result": {
+                **{key: value for key, value in extraction.items() if key not in _STREAMED_FIELDS},
+                "metadata": metadata
+            },
+            "analysis_result": analysis
+        }
+        for step_name, step_output in outputs.items():
+            self.workflow_state_manager.checkpoint_step(workflow_id, step_name, step_output)
+        return outputs
+    
+    @staticmethod
+    def _close_mapped_file(extraction: Dict[str, Any]) -> None:
+        """Close the file an extraction mapped, if any."""
+        mapped_file = extraction.get("mapped_file")
+        if mapped_file is not None and hasattr(mapped_file, "close"):
+            mapped_file.close()
+    
+    def _plan_extraction(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Add the query plan of the requested analysis to the extraction request.
+        
+        The plan (see ``plan_for_request``) lets the extraction read only
+        the columns and rows the analysis uses. Disable with "query_planning"
+        in the configuration.
+        
+        Args:
+            request: The user request
+            
+        Returns:
+            The request, with a "query_plan" unless it needs every column and row
+        """
+        if not self.config.get("query_planning", True) or "query_plan" in request:
+            return request
+        plan = plan_for_request(request)
+        if plan is None:
+            return request
+        logger.info("Planned extraction of columns %s with filters %s", plan.columns, plan.filters)
+        return {**request, "query_plan": plan.to_dict()}
     
     async def _execute_agent_task(
         self, 
@@ -143,6 +390,27 @@ class Orchestrator:
         # Execute the task
         result = await agent.execute_task(task_name, task_input)
         
+        return await self._review_result(agent_name, task_name, task_input, result)
+    
+    async def _review_result(
+        self, 
+        agent_name: str, 
+        task_name: str, 
+        task_input: Dict[str, Any], 
+        result: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Evaluate the confidence in a task result, with HITL intervention below the threshold.
+        
+        Args:
+            agent_name: Name of the agent that executed the task
+            task_name: Name of the task
+            task_input: Input data of the task
+            result: Result of the task
+            
+        Returns:
+            The result, possibly corrected by a human, with its confidence score
+        """
         # Evaluate confidence
         confidence_score = await self.confidence_evaluator.evaluate(
             agent_name, task_name, task_input, result
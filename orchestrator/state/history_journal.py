@@ -0,0 +1,352 @@
+"""
+History Journal for persisting interaction history across restarts.
+"""
+
+import atexit
+import glob
+import gzip
+import itertools
+import json
+import logging
+import math
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Iterator
+
+from orchestrator.utils.clock import Timestamp
+
+logger = logging.getLogger(__name__)
+
+_FILE_PREFIX = "history-"
+
+# Shared by every journal in the process, so journals opening files in the
+# same second still get distinct names
+_FILE_COUNTER = itertools.count()
+
+# Epoch range of a closed file's entries, e.g. "history-...-000003.t1700000000_1700003601.jsonl.gz";
+# "tnone" marks a file without timestamped entries
+_RANGE_PATTERN = re.compile(r"\.t(?:(-?\d+)_(-?\d+)|none)\.jsonl(?:\.gz)?$")
+
+class HistoryJournal:
+    """
+    Append-only JSONL journal of history entries.
+    
+    ``append`` only enqueues the entry; a background thread writes entries
+    in batches and rotates the current file once it exceeds a size limit or
+    has been open for too long. Rotated files are renamed to carry the
+    epoch range of their entries, which lets readers skip files outside a
+    time window, and are optionally gzip-compressed.
+    """
+    
+    def __init__(self, directory: str, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the History Journal and start its writer thread.
+        
+        Args:
+            directory: Directory where journal files are written
+            config: Configuration dictionary
+        """
+        self.directory = directory
+        self.config = config or {}
+        self.max_file_size = self.config.get("max_file_size", 64 * 1024 * 1024)
+        self.rotate_interval = self.config.get("rotate_interval", 3600.0)
+        self.batch_size = self.config.get("batch_size", 512)
+        self.flush_interval = self.config.get("flush_interval", 1.0)
+        self.compress_rotated = self.config.get("compress_rotated", True)
+        
+        os.makedirs(self.directory, exist_ok=True)
+        
+        self._queue = queue.Queue()
+        self._file = None
+        self._file_path = None
+        self._file_opened_at = 0.0
+        # [earliest, latest] epoch timestamp of the current file's entries
+        self._file_range: Optional[List[float]] = None
+        self._closed = False
+        
+        self._thread = threading.Thread(target=self._run, name="history-journal", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+        
+        logger.info("HistoryJournal writing to %s", self.directory)
+    
+    def append(self, entry: Dict[str, Any]) -> None:
+        """
+        Queue an entry for writing without blocking.
+        
+        Args:
+            entry: History entry to persist
+        """
+        if not self._closed:
+            self._queue.put_nowait(entry)
+    
+    def flush(self) -> None:
+        """Block until every queued entry has been written."""
+        self._queue.join()
+    
+    def close(self) -> None:
+        """Write any queued entries, stop the writer thread and close the current file."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        atexit.unregister(self.close)
+        logger.info("HistoryJournal closed")
+    
+    def _run(self) -> None:
+        """Writer thread loop: drain the queue in batches and write them."""
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._maybe_rotate()
+                continue
+            
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            stop = None in batch
+            entries = [entry for entry in batch if entry is not None]
+            try:
+                if entries:
+                    self._write_batch(entries)
+            except Exception as e:
+                logger.error("Failed to write %d history entries: %s", len(entries), str(e))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            
+            if stop:
+                self._close_file()
+                return
+    
+    def _write_batch(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        Write a batch of entries to the current journal file.
+        
+        Args:
+            entries: History entries to write
+        """
+        self._maybe_rotate()
+        if self._file is None:
+            self._open_file()
+        
+        lines = "".join(
+            json.dumps(entry, separators=(",", ":"), default=str) + "\n" for entry in entries
+        )
+        self._file.write(lines)
+        self._file.flush()
+        
+        epochs = [epoch for epoch in map(_entry_epoch, entries) if epoch is not None]
+        if epochs:
+            earliest, latest = min(epochs), max(epochs)
+            if self._file_range is None:
+                self._file_range = [earliest, latest]
+            else:
+                self._file_range[0] = min(self._file_range[0], earliest)
+                self._file_range[1] = max(self._file_range[1], latest)
+    
+    def _maybe_rotate(self) -> None:
+        """Close the current file if it is too large or too old."""
+        if self._file is None:
+            return
+        too_large = self._file.tell() >= self.max_file_size
+        too_old = time.time() - self._file_opened_at >= self.rotate_interval
+        if too_large or too_old:
+            self._close_file()
+    
+    def _open_file(self) -> None:
+        """Open a new journal file named after the current time."""
+        self._file_opened_at = time.time()
+        stamp = datetime.fromtimestamp(self._file_opened_at).strftime("%Y%m%d-%H%M%S")
+        self._file_path = os.path.join(
+            self.directory, f"{_FILE_PREFIX}{stamp}-{os.getpid()}-{next(_FILE_COUNTER):06d}.jsonl"
+        )
+        self._file_range = None
+        self._file = open(self._file_path, "a", encoding="utf-8")
+    
+    def _close_file(self) -> None:
+        """Close the current file, name it after its time range and compress it if configured."""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        
+        if self._file_range is None:
+            time_range = "tnone"
+        else:
+            time_range = f"t{math.floor(self._file_range[0])}_{math.floor(self._file_range[1]) + 1}"
+        path = f"{self._file_path[:-len('.jsonl')]}.{time_range}.jsonl"
+        
+        if self.compress_rotated:
+            with open(self._file_path, "rb") as src, gzip.open(f"{path}.gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(self._file_path)
+        else:
+            os.replace(self._file_path, path)
+
+def list_journal_files(directory: str) -> List[str]:
+    """
+    List journal files in chronological order.
+    
+    Args:
+        directory: Journal directory
+    
+    Returns:
+        Sorted list of journal file paths
+    """
+    paths = glob.glob(os.path.join(directory, f"{_FILE_PREFIX}*.jsonl"))
+    paths += glob.glob(os.path.join(directory, f"{_FILE_PREFIX}*.jsonl.gz"))
+    return sorted(paths, key=os.path.basename)
+
+def iter_journal(
+    directory: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream entries from journal files one line at a time.
+    
+    With a time window, rotated files whose names show that none of their
+    entries fall inside it are not opened.
+    
+    Args:
+        directory: Journal directory
+        start: Optional inclusive start of the window (epoch seconds)
+        end: Optional exclusive end of the window (epoch seconds)
+    
+    Returns:
+        Iterator over history entries within the window
+    """
+    windowed = start is not None or end is not None
+    for path in list_journal_files(directory):
+        if windowed and not _file_in_window(path, start, end):
+            continue
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    logger.warning("Skipping malformed journal line in %s", path)
+                    continue
+                
+                if start is not None or end is not None:
+                    timestamp = _entry_epoch(entry)
+                    if timestamp is None:
+                        continue
+                    if start is not None and timestamp < start:
+                        continue
+                    if end is not None and timestamp >= end:
+                        continue
+                yield entry
+
+def aggregate_journal(
+    directory: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None
+) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    Aggregate daily HITL rate and mean confidence per agent from journal files.
+    
+    Entries are streamed, so memory use depends on the number of days and
+    agents rather than on the number of entries.
+    
+    Args:
+        directory: Journal directory
+        start: Optional inclusive start of the window (epoch seconds)
+        end: Optional exclusive end of the window (epoch seconds)
+    
+    Returns:
+        Dictionary mapping day (YYYY-MM-DD) to per-agent count, HITL rate and
+        mean confidence
+    """
+    # day -> agent -> [count, hitl_known, hitl_sum, conf_known, conf_sum]
+    totals = defaultdict(lambda: defaultdict(lambda: [0, 0, 0, 0, 0.0]))
+    
+    for entry in iter_journal(directory, start, end):
+        timestamp = _entry_epoch(entry)
+        if timestamp is None:
+            continue
+        day = datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d")
+        counters = totals[day][entry.get("agent", "unknown")]
+        counters[0] += 1
+        if entry.get("hitl_triggered") is not None:
+            counters[1] += 1
+            counters[2] += int(bool(entry["hitl_triggered"]))
+        if isinstance(entry.get("confidence_score"), (int, float)):
+            counters[3] += 1
+            counters[4] += entry["confidence_score"]
+    
+    return {
+        day: {
+            agent: {
+                "count": count,
+                "hitl_rate": hitl_sum / hitl_known if hitl_known else None,
+                "mean_confidence": conf_sum / conf_known if conf_known else None
+            }
+            for agent, (count, hitl_known, hitl_sum, conf_known, conf_sum) in agents.items()
+        }
+        for day, agents in sorted(totals.items())
+    }
+
+def _file_in_window(path: str, start: Optional[float], end: Optional[float]) -> bool:
+    """
+    Check whether a journal file may hold entries in a time window.
+    
+    Args:
+        path: Journal file path
+        start: Optional inclusive start of the window (epoch seconds)
+        end: Optional exclusive end of the window (epoch seconds)
+    
+    Returns:
+        False if the file's name shows it has no entries in the window;
+        True otherwise, including for files still being written
+    """
+    match = _RANGE_PATTERN.search(os.path.basename(path))
+    if match is None:
+        return True
+    if match.group(1) is None:
+        return False
+    # The range is [floor(earliest), floor(latest) + 1)
+    earliest, after_latest = int(match.group(1)), int(match.group(2))
+    if start is not None and after_latest <= start:
+        return False
+    if end is not None and earliest >= end:
+        return False
+    return True
+
+def _entry_epoch(entry: Dict[str, Any]) -> Optional[float]:
+    """
+    Get the epoch timestamp of a journal entry.
+    
+    Args:
+        entry: History entry
+    
+    Returns:
+        Epoch seconds, or None if the entry has no usable timestamp
+    """
+    timestamp = entry.get("timestamp")
+    if isinstance(timestamp, (int, float, Timestamp)):
+        timestamp = float(timestamp)
+        return timestamp if math.isfinite(timestamp) else None
+    if isinstance(timestamp, str):
+        try:
+            return datetime.fromisoformat(timestamp).timestamp()
+        except ValueError:
+            return None
+    return None
\ No newline at end of file
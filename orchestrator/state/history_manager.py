@@ -3,13 +3,131 @@ History Manager for tracking interaction history.
 """
 
 import logging
-from typing import Dict, Any, Optional, List
+import math
+from array import array
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Iterator, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency
+    np = None
+
+from orchestrator.state.history_journal import HistoryJournal
+from orchestrator.utils import clock
 
 logger = logging.getLogger(__name__)
 
+# Entry fields stored in dedicated columns; anything else goes to the per-slot extras
+_COLUMN_FIELDS = ("type", "agent", "task", "confidence_score", "hitl_triggered", "timestamp")
+
+class StringInterner:
+    """
+    Maps repeated strings (agent, task and type names) to small integer codes.
+    """
+    
+    def __init__(self):
+        """Initialize an empty interner."""
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+    
+    def intern(self, value: Optional[str]) -> int:
+        """
+        Get the code for a string, assigning a new one if needed.
+        
+        Args:
+            value: String to intern, or None
+        
+        Returns:
+            Integer code, or -1 for None
+        """
+        if value is None:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+    
+    def lookup(self, value: Optional[str]) -> Optional[int]:
+        """
+        Get the code for a string without assigning one.
+        
+        Args:
+            value: String to look up
+        
+        Returns:
+            Integer code, or None if the string was never interned
+        """
+        if value is None:
+            return -1
+        return self.codes.get(value)
+    
+    def value(self, code: int) -> Optional[str]:
+        """
+        Get the string for a code.
+        
+        Args:
+            code: Integer code
+        
+        Returns:
+            Interned string, or None for -1
+        """
+        return self.values[code] if code >= 0 else None
+
+class HistoryView:
+    """
+    Read-only, zero-copy view over the live entries of a HistoryManager.
+    
+    Indexing is oldest-first, like the list the history used to be. Each
+    access rebuilds the entry, so changing it does not change the history.
+    """
+    
+    def __init__(self, manager: "HistoryManager"):
+        """
+        Initialize the view.
+        
+        Args:
+            manager: History manager to view
+        """
+        self._manager = manager
+    
+    def __len__(self) -> int:
+        return self._manager.get_history_size()
+    
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("history index out of range")
+        return self._manager._get_by_seq(self._manager._first_seq() + index)
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self._manager.iter_entries(reverse=False)
+    
+    def __reversed__(self) -> Iterator[Dict[str, Any]]:
+        return self._manager.iter_entries(reverse=True)
+
 class HistoryManager:
     """
     Tracks interaction history.
+    
+    Entries live in a fixed-capacity ring buffer, so adding an entry is O(1)
+    even once the history is full. Each entry type has a secondary ring of
+    sequence numbers, which makes ``get_entries(entry_type, limit)`` O(limit)
+    instead of a scan over the whole history.
+    
+    The ring is columnar: epoch timestamps and confidence scores are packed
+    float arrays, and type, agent and task names are interned integer codes.
+    Entries are rebuilt as dictionaries only when they are read, so every
+    read returns a copy: changing it does not change the history. Values
+    are returned as they were added, except that timestamps come back as
+    ``Timestamp`` strings. Time-range queries binary-search the timestamps
+    while they are non-decreasing, and check every live entry after the
+    clock has gone backwards or an entry had no usable timestamp, until
+    that entry leaves the ring.
     """
     
     def __init__(self, config: Optional[Dict[str, Any]] = None):
@@ -18,12 +136,45 @@ class HistoryManager:
         
         Args:
             config: Configuration dictionary
+        
+        Raises:
+            ValueError: If max_history_size is less than 1
         """
         self.config = config or {}
-        self.history = []
         self.max_history_size = self.config.get("max_history_size", 1000)
+        if self.max_history_size < 1:
+            raise ValueError("History size must be at least 1")
+        self._reset()
+        
+        # Optional append-only journal so history survives process exit
+        self.journal = None
+        if self.config.get("journal_dir"):
+            self.journal = HistoryJournal(self.config["journal_dir"], self.config.get("journal"))
         logger.info("HistoryManager initialized with max size: %d", self.max_history_size)
     
+    def _reset(self) -> None:
+        """Allocate empty ring buffers."""
+        size = self.max_history_size
+        self._timestamps = array("d", bytes(8 * size))
+        self._confidence = array("d", [math.nan]) * size
+        self._type_codes = array("i", [-1]) * size
+        self._agent_codes = array("i", [-1]) * size
+        self._task_codes = array("i", [-1]) * size
+        # -1 when the entry does not record whether HITL was triggered
+        self._hitl = array("b", [-1]) * size
+        self._extras: List[Optional[Dict[str, Any]]] = [None] * size
+        self._names = StringInterner()
+        # Total number of entries ever added; also the sequence number of the next entry
+        self._next_seq = 0
+        # Time windows can be binary-searched once this sequence number is the oldest live one
+        self._sorted_from_seq = 0
+        self._type_rings: Dict[int, deque] = {}
+    
+    @property
+    def history(self) -> HistoryView:
+        """Zero-copy view over the live history entries, oldest first."""
+        return HistoryView(self)
+    
     def add_entry(self, entry: Dict[str, Any]) -> None:
         """
         Add an entry to the history.
@@ -35,53 +186,221 @@ class HistoryManager:
         if "timestamp" not in entry:
             entry["timestamp"] = self.get_timestamp()
         
-        # Add the entry
-        self.history.append(entry)
+        seq = self._next_seq
+        if seq == self.max_history_size:
+            logger.info("History reached max size, overwriting oldest entries")
+        
+        # Overwrite the oldest slot once the ring is full
+        slot = seq % self.max_history_size
+        extras = {k: v for k, v in entry.items() if k not in _COLUMN_FIELDS}
+        
+        timestamp = self._to_epoch(entry["timestamp"])
+        if timestamp is None or timestamp != timestamp:
+            # Outside every time window; the entry keeps the value it was given
+            extras["timestamp"] = entry["timestamp"]
+            timestamp = math.nan
+            self._sorted_from_seq = seq + 1
+        elif seq and timestamp < self._timestamps[(seq - 1) % self.max_history_size]:
+            self._sorted_from_seq = seq
+        self._timestamps[slot] = timestamp
+        
+        confidence = entry.get("confidence_score")
+        if confidence is None or type(confidence) is float:
+            self._confidence[slot] = math.nan if confidence is None else confidence
+        elif isinstance(confidence, (int, float)):
+            # Aggregated as a float, returned as given
+            extras["confidence_score"] = confidence
+            self._confidence[slot] = confidence
+        else:
+            extras["confidence_score"] = confidence
+            self._confidence[slot] = math.nan
+        
+        hitl_triggered = entry.get("hitl_triggered")
+        self._hitl[slot] = -1 if hitl_triggered is None else int(bool(hitl_triggered))
+        
+        type_code = self._names.intern(entry.get("type"))
+        self._type_codes[slot] = type_code
+        self._agent_codes[slot] = self._names.intern(entry.get("agent"))
+        self._task_codes[slot] = self._names.intern(entry.get("task"))
+        self._extras[slot] = extras or None
+        self._next_seq = seq + 1
+        
+        # Index typed entries; untyped ones are only reachable through the main ring
+        if type_code >= 0:
+            type_ring = self._type_rings.get(type_code)
+            if type_ring is None:
+                type_ring = self._type_rings[type_code] = deque(maxlen=self.max_history_size)
+            type_ring.append(seq)
         
-        # Trim history if needed
-        if len(self.history) > self.max_history_size:
-            self.history = self.history[-self.max_history_size:]
-            logger.info("History trimmed to max size")
+        if self.journal is not None:
+            self.journal.append(dict(entry))
         
         logger.debug("Added history entry: %s", entry.get("type", "unknown"))
     
     def get_entries(
-        self, 
-        entry_type: Optional[str] = None, 
-        limit: Optional[int] = None, 
+        self,
+        entry_type: Optional[str] = None,
+        limit: Optional[int] = None,
         reverse: bool = True
     ) -> List[Dict[str, Any]]:
         """
         Get history entries, optionally filtered by type.
         
+        The entries are rebuilt copies; changing them does not change the
+        history.
+        
         Args:
             entry_type: Optional entry type filter
             limit: Optional limit on number of entries
             reverse: Whether to return entries in reverse order (newest first)
-            
+        
         Returns:
             List of matching history entries
         """
-        # Filter by type if specified
-        if entry_type:
-
-            entries = [e for e in self.history if e.get("type") == entry_type]
-        else:
-            entries = self.history.copy()
+        entries = []
+        if limit is not None and limit <= 0:
+            return entries
+        
+        for entry in self.iter_entries(entry_type, reverse):
+            entries.append(entry)
+            if limit is not None and len(entries) >= limit:
+                break
+        
+        return entries
+    
+    def iter_entries(
+        self,
+        entry_type: Optional[str] = None,
+        reverse: bool = True
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over history entries without copying the history.
+        
+        Each entry is rebuilt as it is reached, so changing it does not
+        change the history.
+        
+        Args:
+            entry_type: Optional entry type filter
+            reverse: Whether to iterate newest first
+        
+        Returns:
+            Iterator over matching history entries
+        """
+        first_seq = self._first_seq()
+        
+        if not entry_type:
+            seqs = range(first_seq, self._next_seq)
+            for seq in (reversed(seqs) if reverse else seqs):
+                yield self._get_by_seq(seq)
+            return
+        
+        type_ring = self._type_rings.get(self._names.lookup(entry_type))
+        if not type_ring:
+            return
+        
+        # Drop sequence numbers whose slots have been overwritten
+        while type_ring and type_ring[0] < first_seq:
+            type_ring.popleft()
+        
+        for seq in (reversed(type_ring) if reverse else iter(type_ring)):
+            if seq < first_seq:
+                break
+            yield self._get_by_seq(seq)
+    
+    def query(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        agent: Optional[str] = None,
+        task: Optional[str] = None,
+        entry_type: Optional[str] = None,
+        limit: Optional[int] = None,
+        reverse: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Get entries in a time range, optionally filtered by agent, task and type.
         
-        # Reverse if requested
-        if reverse:
-            entries = entries[::-1]
+        Args:
+            start: Optional inclusive start of the window (epoch seconds or ISO string)
+            end: Optional exclusive end of the window (epoch seconds or ISO string)
+            agent: Optional agent name filter
+            task: Optional task name filter
+            entry_type: Optional entry type filter
+            limit: Optional limit on number of entries
+            reverse: Whether to return entries newest first
         
-        # Apply limit if specified
-        if limit is not None:
-            entries = entries[:limit]
+        Returns:
+            List of matching history entries
+        """
+        filters = []
+        for codes, name in ((self._agent_codes, agent), (self._task_codes, task), (self._type_codes, entry_type)):
+            if name is None:
+                continue
+            code = self._names.lookup(name)
+            if code is None:
+                return []
+            filters.append((codes, code))
         
+        lo, hi, bounds = self._seq_window(start, end)
+        seqs = range(lo, hi)
+        entries = []
+        for seq in (reversed(seqs) if reverse else seqs):
+            slot = seq % self.max_history_size
+            if bounds is not None and not bounds[0] <= self._timestamps[slot] < bounds[1]:
+                continue
+            if all(codes[slot] == code for codes, code in filters):
+                entries.append(self._get_by_seq(seq))
+                if limit is not None and len(entries) >= limit:
+                    break
         return entries
     
+    def aggregate_by_agent(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        task: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Compute per-agent HITL rate and mean confidence over a time window.
+        
+        Args:
+            start: Optional inclusive start of the window (epoch seconds or ISO string)
+            end: Optional exclusive end of the window (epoch seconds or ISO string)
+            task: Optional task name filter
+        
+        Returns:
+            Dictionary mapping agent names to their entry count, HITL rate and
+            mean confidence (None when no entry recorded the value)
+        """
+        task_code = None
+        if task is not None:
+            task_code = self._names.lookup(task)
+            if task_code is None:
+                return {}
+        
+        lo, hi, bounds = self._seq_window(start, end)
+        num_codes = len(self._names.values) + 1
+        
+        if np is not None:
+            totals = self._aggregate_vectorized(lo, hi, task_code, num_codes, bounds)
+        else:
+            totals = self._aggregate_scalar(lo, hi, task_code, num_codes, bounds)
+        
+        count, hitl_known, hitl_sum, conf_known, conf_sum = totals
+        result = {}
+        for shifted_code in range(1, num_codes):
+            if not count[shifted_code]:
+                continue
+            result[self._names.value(shifted_code - 1)] = {
+                "count": int(count[shifted_code]),
+                "hitl_rate": hitl_sum[shifted_code] / hitl_known[shifted_code] if hitl_known[shifted_code] else None,
+                "mean_confidence": conf_sum[shifted_code] / conf_known[shifted_code] if conf_known[shifted_code] else None
+            }
+        return result
+    
     def clear_history(self) -> None:
         """Clear the entire history."""
-        self.history = []
+        self._reset()
         logger.info("History cleared")
     
     def get_history_size(self) -> int:
@@ -91,14 +410,245 @@ class HistoryManager:
         Returns:
             Number of entries in the history
         """
-        return len(self.history)
+        return min(self._next_seq, self.max_history_size)
+    
+    def get_timestamp(self) -> clock.Timestamp:
+        """
+        Get the current timestamp.
+        
+        Returns:
+            Current timestamp, an ISO 8601 string that also carries epoch seconds
+        """
+        return clock.now()
     
-    def get_timestamp(self) -> str:
+    def _first_seq(self) -> int:
         """
-        Get the current timestamp as a string.
+        Get the sequence number of the oldest live entry.
+        
+        Returns:
+            Oldest live sequence number
+        """
+        return max(0, self._next_seq - self.max_history_size)
+    
+    def _get_by_seq(self, seq: int) -> Dict[str, Any]:
+        """
+        Rebuild a live entry from the columns by its sequence number.
+        
+        Args:
+            seq: Sequence number of the entry
+        
+        Returns:
+            History entry
+        """
+        slot = seq % self.max_history_size
+        entry = {}
+        
+        for key, codes in (("type", self._type_codes), ("agent", self._agent_codes), ("task", self._task_codes)):
+            if codes[slot] >= 0:
+                entry[key] = self._names.values[codes[slot]]
+        
+        confidence = self._confidence[slot]
+        if not math.isnan(confidence):
+            entry["confidence_score"] = confidence
+        if self._hitl[slot] >= 0:
+            entry["hitl_triggered"] = bool(self._hitl[slot])
+        
+        # Entries without a usable timestamp get theirs back from the extras
+        timestamp = self._timestamps[slot]
+        if timestamp == timestamp:
+            entry["timestamp"] = clock.Timestamp(timestamp)
+        
+        extras = self._extras[slot]
+        if extras:
+            entry.update(extras)
+        return entry
+    
+    def _seq_window(
+        self,
+        start: Optional[Any],
+        end: Optional[Any]
+    ) -> Tuple[int, int, Optional[Tuple[float, float]]]:
+        """
+        Find the sequence range of entries with start <= timestamp < end.
+        
+        While the live timestamps are non-decreasing the range is found by
+        binary search and holds exactly the window. Otherwise it is the
+        whole history, and each entry must be checked against the bounds.
+        
+        Args:
+            start: Optional inclusive start of the window
+            end: Optional exclusive end of the window
+        
+        Returns:
+            Tuple of (first sequence number, one past the last sequence
+            number, (start, end) epoch bounds to check each entry against or
+            None if every entry in the range is in the window)
+        """
+        lo, hi = self._first_seq(), self._next_seq
+        if start is None and end is None:
+            return lo, hi, None
+        
+        start_epoch = -math.inf if start is None else self._to_epoch(start)
+        end_epoch = math.inf if end is None else self._to_epoch(end)
+        if self._sorted_from_seq > lo:
+            # The clock went backwards, or an entry had no usable timestamp
+            return lo, hi, (start_epoch, end_epoch)
+        
+        if start is not None:
+            lo = self._bisect(start_epoch, lo, hi)
+        if end is not None:
+            hi = self._bisect(end_epoch, lo, hi)
+        return lo, hi, None
+    
+    def _bisect(self, timestamp: float, lo: int, hi: int) -> int:
+        """
+        Find the first sequence number in [lo, hi) whose timestamp is >= timestamp.
+        
+        Args:
+            timestamp: Epoch timestamp to search for
+            lo: First sequence number to consider
+            hi: One past the last sequence number to consider
+        
+        Returns:
+            Insertion point as a sequence number
+        """
+        size = self.max_history_size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._timestamps[mid % size] < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+    
+    def _physical_ranges(self, lo: int, hi: int) -> List[Tuple[int, int]]:
+        """
+        Split a sequence range into contiguous slot ranges of the ring.
+        
+        Args:
+            lo: First sequence number
+            hi: One past the last sequence number
+        
+        Returns:
+            List of (start slot, stop slot) pairs
+        """
+        if lo >= hi:
+            return []
+        size = self.max_history_size
+        start, stop = lo % size, (hi - 1) % size + 1
+        if start < stop:
+            return [(start, stop)]
+        return [(start, size), (0, stop)]
+    
+    def _aggregate_vectorized(
+        self,
+        lo: int,
+        hi: int,
+        task_code: Optional[int],
+        num_codes: int,
+        bounds: Optional[Tuple[float, float]] = None
+    ) -> Tuple:
+        """
+        Sum per-agent counters over a sequence range with numpy.
+        
+        Args:
+            lo: First sequence number
+            hi: One past the last sequence number
+            task_code: Optional task code filter
+            num_codes: Number of agent codes, shifted so that -1 maps to 0
+            bounds: Optional (start, end) epoch bounds each entry must be within
+        
+        Returns:
+            Tuple of per-agent arrays (count, hitl_known, hitl_sum, conf_known, conf_sum)
+        """
+        totals = [np.zeros(num_codes) for _ in range(5)]
+        agent_codes = np.frombuffer(self._agent_codes, dtype=np.intc)
+        task_codes = np.frombuffer(self._task_codes, dtype=np.intc)
+        hitl = np.frombuffer(self._hitl, dtype=np.int8)
+        confidence = np.frombuffer(self._confidence, dtype=np.float64)
+        timestamps = np.frombuffer(self._timestamps, dtype=np.float64)
+        
+        for start, stop in self._physical_ranges(lo, hi):
+            agents = agent_codes[start:stop] + 1
+            hitl_window = hitl[start:stop]
+            conf_window = confidence[start:stop]
+            mask = None
+            if task_code is not None:
+                mask = task_codes[start:stop] == task_code
+            if bounds is not None:
+                in_window = (timestamps[start:stop] >= bounds[0]) & (timestamps[start:stop] < bounds[1])
+                mask = in_window if mask is None else mask & in_window
+            if mask is not None:
+                agents, hitl_window, conf_window = agents[mask], hitl_window[mask], conf_window[mask]
+            
+            hitl_known = hitl_window >= 0
+            conf_known = ~np.isnan(conf_window)
+            totals[0] += np.bincount(agents, minlength=num_codes)
+            totals[1] += np.bincount(agents, weights=hitl_known, minlength=num_codes)
+            totals[2] += np.bincount(agents, weights=hitl_window * hitl_known, minlength=num_codes)
+            totals[3] += np.bincount(agents, weights=conf_known, minlength=num_codes)
+            totals[4] += np.bincount(agents, weights=np.where(conf_known, conf_window, 0.0), minlength=num_codes)
+        
+        return tuple(totals)
+    
+    def _aggregate_scalar(
+        self,
+        lo: int,
+        hi: int,
+        task_code: Optional[int],
+        num_codes: int,
+        bounds: Optional[Tuple[float, float]] = None
+    ) -> Tuple:
+        """
+        Sum per-agent counters over a sequence range without numpy.
+        
+        Args:
+            lo: First sequence number
+            hi: One past the last sequence number
+            task_code: Optional task code filter
+            num_codes: Number of agent codes, shifted so that -1 maps to 0
+            bounds: Optional (start, end) epoch bounds each entry must be within
+        
+        Returns:
+            Tuple of per-agent lists (count, hitl_known, hitl_sum, conf_known, conf_sum)
+        """
+        count, hitl_known, hitl_sum, conf_known, conf_sum = ([0] * num_codes for _ in range(5))
+        
+        for start, stop in self._physical_ranges(lo, hi):
+            for slot in range(start, stop):
+                if task_code is not None and self._task_codes[slot] != task_code:
+                    continue
+                if bounds is not None and not bounds[0] <= self._timestamps[slot] < bounds[1]:
+                    continue
+                agent = self._agent_codes[slot] + 1
+                count[agent] += 1
+                if self._hitl[slot] >= 0:
+                    hitl_known[agent] += 1
+                    hitl_sum[agent] += self._hitl[slot]
+                confidence = self._confidence[slot]
+                if confidence == confidence:
+                    conf_known[agent] += 1
+                    conf_sum[agent] += confidence
+        
+        return count, hitl_known, hitl_sum, conf_known, conf_sum
+    
+    def _to_epoch(self, timestamp: Any) -> Optional[float]:
+        """
+        Convert a timestamp to epoch seconds.
+        
+        Args:
+            timestamp: Epoch number, Timestamp, datetime or ISO 8601 string
         
         Returns:
-            Current timestamp string
+            Epoch seconds, or None if the value cannot be interpreted
         """
-        from datetime import datetime
-        return datetime.now().isoformat()
\ No newline at end of file
+        if isinstance(timestamp, (int, float, clock.Timestamp)):
+            return float(timestamp)
+        if isinstance(timestamp, datetime):
+            return timestamp.timestamp()
+        if isinstance(timestamp, str):
+            try:
+                return datetime.fromisoformat(timestamp).timestamp()
+            except ValueError:
+                return None
+        return None
\ No newline at end of file
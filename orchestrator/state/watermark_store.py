@@ -0,0 +1,180 @@
+"""
+Watermark Store for incremental extraction.
+
+For every data source the store keeps a high-water mark, the largest value
+of an ordering field (such as ``date``) extracted so far, together with the
+records extracted up to it. An incremental extraction fetches only the rows
+at or above the mark and merges them into the cached records.
+
+Marks and extracts are kept in memory and, when a directory is configured,
+persisted so that a refresh in a new process still only reads new rows: the
+marks in one JSON file, and each source's extract as a record batch frame
+of the transport format (see ``orchestrator.data.transport``). A mark whose
+extract is missing or unreadable is ignored.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, Any, Optional
+
+from orchestrator.data.record_batch import RecordBatch
+from orchestrator.data.transport import decode_batch, encode_batch
+
+logger = logging.getLogger(__name__)
+
+class Watermark:
+    """
+    High-water mark of a source and the records extracted up to it.
+    """
+    
+    def __init__(
+        self,
+        field: str,
+        value: Any,
+        extract: RecordBatch,
+        partitions: Optional[Dict[str, str]] = None
+    ):
+        """
+        Initialize the Watermark.
+        
+        Args:
+            field: Ordering field of the source
+            value: Largest value of the field extracted so far
+            extract: Records extracted so far
+            partitions: Fingerprint per day of the field, changed whenever
+                rows are added to that day
+        """
+        self.field = field
+        self.value = value
+        self.extract = extract
+        self.partitions = partitions or {}
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialize the mark, without the extract.
+        
+        Returns:
+            Dictionary with the field, value, row count and partition fingerprints
+        """
+        return {
+            "field": self.field,
+            "value": self.value,
+            "rows": len(self.extract),
+            "partitions": self.partitions
+        }
+
+class WatermarkStore:
+    """
+    High-water marks and cached extracts per data source.
+    """
+    
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Initialize the Watermark Store.
+        
+        Args:
+            directory: Optional directory for persisted marks and extracts
+        """
+        self.directory = directory
+        self._marks: Dict[str, Watermark] = {}
+        self._persisted: Dict[str, Dict[str, Any]] = {}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._persisted = self._read_marks()
+        logger.info("WatermarkStore initialized with %d persisted marks", len(self._persisted))
+    
+    def get(self, source: str) -> Optional[Watermark]:
+        """
+        Get the mark of a source.
+        
+        Args:
+            source: Data source name
+        
+        Returns:
+            Watermark, or None if the source was never extracted incrementally
+        """
+        mark = self._marks.get(source)
+        if mark is None and source in self._persisted:
+            extract = self._read_extract(source)
+            if extract is not None:
+                stored = self._persisted[source]
+                mark = self._marks[source] = Watermark(
+                    stored["field"], stored["value"], extract, stored.get("partitions")
+                )
+        return mark
+    
+    def put(self, source: str, mark: Watermark) -> None:
+        """
+        Store the mark of a source, replacing the previous one.
+        
+        Args:
+            source: Data source name
+            mark: New watermark
+        """
+        self._marks[source] = mark
+        if not self.directory:
+            return
+        self._write_extract(source, mark.extract)
+        self._persisted[source] = mark.to_dict()
+        self._write_marks()
+        logger.debug("Persisted watermark %s=%s of %s", mark.field, mark.value, source)
+    
+    def reset(self, source: Optional[str] = None) -> None:
+        """
+        Drop marks, so the next extraction is a full reload.
+        
+        Args:
+            source: Source to reset; every source by default
+        """
+        sources = list(set(self._marks) | set(self._persisted)) if source is None else [source]
+        for name in sources:
+            self._marks.pop(name, None)
+            if self._persisted.pop(name, None) is not None:
+                try:
+                    os.remove(self._extract_file(name))
+                except FileNotFoundError:
+                    pass
+        if self.directory:
+            self._write_marks()
+    
+    def _extract_file(self, source: str) -> str:
+        digest = hashlib.sha256(source.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.directory, f"extract-{digest}.frame")
+    
+    def _read_marks(self) -> Dict[str, Dict[str, Any]]:
+        path = os.path.join(self.directory, "watermarks.json")
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable watermarks %s: %s", path, str(e))
+            return {}
+    
+    def _write_marks(self) -> None:
+        path = os.path.join(self.directory, "watermarks.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._persisted, f, default=str)
+        os.replace(tmp_path, path)
+    
+    def _read_extract(self, source: str) -> Optional[RecordBatch]:
+        path = self._extract_file(source)
+        try:
+            with open(path, "rb") as f:
+                return decode_batch(f.read(), copy=True)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable extract %s: %s", path, str(e))
+            return None
+    
+    def _write_extract(self, source: str, extract: RecordBatch) -> None:
+        path = self._extract_file(source)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(encode_batch(extract))
+        os.replace(tmp_path, path)
\ No newline at end of file
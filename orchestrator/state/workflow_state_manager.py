@@ -3,9 +3,17 @@ Workflow State Manager for managing workflow state and transitions.
 """
 
 import logging
+import asyncio
+import json
+import os
+import threading
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, List
 
+from orchestrator.utils import clock
+from orchestrator.utils.serialization import strict_json_default
+
 logger = logging.getLogger(__name__)
 
 class WorkflowStateManager:
@@ -24,6 +32,18 @@ class WorkflowStateManager:
         self.context_store = context_store
         self.config = config or {}
         self.workflows = {}
+        
+        # Optional on-disk checkpoint location; checkpoints stay in memory only if unset
+        self.checkpoint_dir = self.config.get("checkpoint_dir")
+        # Futures are discarded by the writer thread as they complete
+        self._pending_writes = set()
+        self._pending_lock = threading.Lock()
+        self._writer = None
+        if self.checkpoint_dir:
+            os.makedirs(self.checkpoint_dir, exist_ok=True)
+            # A single writer thread keeps checkpoint writes in submission order
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="checkpoint-writer")
+        
         logger.info("WorkflowStateManager initialized")
     
     def create_workflow(self, request: Dict[str, Any]) -> str:
@@ -40,13 +60,15 @@ class WorkflowStateManager:
         workflow_id = str(uuid.uuid4())
         
         # Create workflow state
+        now = self._get_timestamp()
         workflow = {
             "id": workflow_id,
             "status": "created",
             "request": request,
             "steps": [],
-            "created_at": self._get_timestamp(),
-            "updated_at": self._get_timestamp()
+            "checkpoints": {},
+            "created_at": now,
+            "updated_at": now
         }
         
         # Store the workflow
@@ -55,6 +77,13 @@ class WorkflowStateManager:
         # Store in context
         self.context_store.set(f"workflow:{workflow_id}", workflow)
         
+        # Persist the request so the workflow can be resumed by another process
+        self._schedule_write(workflow_id, "workflow", {
+            "id": workflow_id,
+            "request": request,
+            "created_at": workflow["created_at"]
+        })
+        
         logger.info("Created workflow %s", workflow_id)
         return workflow_id
     
@@ -116,17 +145,18 @@ class WorkflowStateManager:
         workflow = self.workflows[workflow_id]
         
         # Create the step
+        now = self._get_timestamp()
         step = {
             "type": step_type,
             "data": step_data,
-            "timestamp": self._get_timestamp()
+            "timestamp": now
         }
         
         # Add the step
         workflow["steps"].append(step)
         
         # Update timestamp
-        workflow["updated_at"] = self._get_timestamp()
+        workflow["updated_at"] = now
         
         # Store the updated workflow
         self.workflows[workflow_id] = workflow
@@ -137,13 +167,174 @@ class WorkflowStateManager:
         logger.info("Added %s step to workflow %s", step_type, workflow_id)
         return workflow
     
+    def checkpoint_step(self, workflow_id: str, step_name: str, output: Dict[str, Any]) -> None:
+        """
+        Record the validated output of a workflow step.
+        
+        The checkpoint is available in memory immediately. It is serialized
+        before this returns, so later changes to ``output`` are not written;
+        writing it to the checkpoint directory happens in the background.
+        
+        Args:
+            workflow_id: ID of the workflow
+            step_name: Name of the completed step
+            output: Validated output of the step
+        """
+        if workflow_id not in self.workflows:
+            raise ValueError(f"Workflow {workflow_id} not found")
+        
+        workflow = self.workflows[workflow_id]
+        workflow.setdefault("checkpoints", {})[step_name] = output
+        workflow["updated_at"] = self._get_timestamp()
+        
+        self._schedule_write(workflow_id, f"step-{step_name}", {
+            "step": step_name,
+            "output": output
+        })
+        
+        logger.info("Checkpointed step %s of workflow %s", step_name, workflow_id)
+    
+    def get_checkpoints(self, workflow_id: str) -> Dict[str, Any]:
+        """
+        Get the checkpointed step outputs of a workflow.
+        
+        Args:
+            workflow_id: ID of the workflow
+            
+        Returns:
+            Dictionary mapping completed step names to their outputs
+        """
+        workflow = self.workflows.get(workflow_id)
+        if not workflow:
+            return {}
+        return workflow.get("checkpoints", {})
+    
+    def load_workflow(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a workflow, restoring it from the checkpoint directory if it is not in memory.
+        
+        Args:
+            workflow_id: ID of the workflow
+            
+        Returns:
+            Workflow or None if no state exists for it
+        """
+        if workflow_id in self.workflows:
+            return self.workflows[workflow_id]
+        
+        if not self.checkpoint_dir:
+            return None
+        
+        workflow_dir = os.path.join(self.checkpoint_dir, workflow_id)
+        workflow_file = os.path.join(workflow_dir, "workflow.json")
+        if not os.path.exists(workflow_file):
+            return None
+        
+        with open(workflow_file, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        
+        checkpoints = {}
+        for file_name in sorted(os.listdir(workflow_dir)):
+            if not (file_name.startswith("step-") and file_name.endswith(".json")):
+                continue
+            with open(os.path.join(workflow_dir, file_name), "r", encoding="utf-8") as f:
+                step = json.load(f)
+            checkpoints[step["step"]] = step["output"]
+        
+        workflow = {
+            "id": workflow_id,
+            "status": "resumed",
+            "request": saved.get("request", {}),
+            "steps": [],
+            "checkpoints": checkpoints,
+            "created_at": clock.Timestamp.fromisoformat(saved["created_at"]),
+            "updated_at": self._get_timestamp()
+        }
+        if saved.get("status") == "completed":
+            workflow["status"] = "completed"
+            workflow["result"] = saved["result"]
+            workflow["completed_at"] = clock.Timestamp.fromisoformat(saved["completed_at"])
+        
+        self.workflows[workflow_id] = workflow
+        self.context_store.set(f"workflow:{workflow_id}", workflow)
+        
+        logger.info("Restored workflow %s with %d checkpointed steps", workflow_id, len(checkpoints))
+        return workflow
+    
+    async def flush_checkpoints(self) -> None:
+        """Wait for all pending checkpoint writes to reach disk."""
+        with self._pending_lock:
+            pending = list(self._pending_writes)
+        if pending:
+            await asyncio.gather(*(asyncio.wrap_future(future) for future in pending))
+    
+    def _schedule_write(self, workflow_id: str, name: str, payload: Dict[str, Any]) -> None:
+        """
+        Serialize a checkpoint file and write it in the background.
+        
+        The payload is serialized on the calling thread, which may go on
+        changing it; the writer thread only gets the bytes. A payload
+        holding values JSON cannot restore is not written; the error is
+        logged and the previous file, if any, is kept.
+        
+        Args:
+            workflow_id: ID of the workflow
+            name: File name (without extension) inside the workflow directory
+            payload: JSON-serializable payload to write
+        """
+        if not self._writer:
+            return
+        
+        try:
+            data = json.dumps(payload, default=strict_json_default).encode("utf-8")
+        except (TypeError, ValueError) as e:
+            logger.error("Failed to write checkpoint %s for workflow %s: %s", name, workflow_id, str(e))
+            return
+        
+        with self._pending_lock:
+            future = self._writer.submit(self._write_checkpoint, workflow_id, name, data)
+            self._pending_writes.add(future)
+        future.add_done_callback(self._write_done)
+    
+    def _write_done(self, future) -> None:
+        """Forget a completed checkpoint write."""
+        with self._pending_lock:
+            self._pending_writes.discard(future)
+    
+    def _write_checkpoint(self, workflow_id: str, name: str, data: bytes) -> None:
+        """
+        Atomically write a checkpoint file.
+        
+        Args:
+            workflow_id: ID of the workflow
+            name: File name (without extension) inside the workflow directory
+            data: Serialized JSON payload
+        """
+        workflow_dir = os.path.join(self.checkpoint_dir, workflow_id)
+        os.makedirs(workflow_dir, exist_ok=True)
+        
+        path = os.path.join(workflow_dir, f"{name}.json")
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error("Failed to write checkpoint %s for workflow %s: %s", name, workflow_id, str(e))
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
     def complete_workflow(self, workflow_id: str, result: Dict[str, Any]) -> Dict[str, Any]:
         """
         Mark a workflow as completed.
         
+        The status and result are also written to the checkpoint directory,
+        so resuming the workflow in another process returns the result.
+        
         Args:
             workflow_id: ID of the workflow
-            result: Final result of the workflow
+            result: Final result of the workflow, JSON-serializable to be
+                written
             
         Returns:
             Updated workflow
@@ -157,8 +348,7 @@ class WorkflowStateManager:
         # Update status and add result
         workflow["status"] = "completed"
         workflow["result"] = result
-        workflow["completed_at"] = self._get_timestamp()
-        workflow["updated_at"] = self._get_timestamp()
+        workflow["completed_at"] = workflow["updated_at"] = self._get_timestamp()
         
         # Store the updated workflow
         self.workflows[workflow_id] = workflow
@@ -166,6 +356,15 @@ class WorkflowStateManager:
         # Update in context
         self.context_store.set(f"workflow:{workflow_id}", workflow)
         
+        self._schedule_write(workflow_id, "workflow", {
+            "id": workflow_id,
+            "request": workflow["request"],
+            "created_at": workflow["created_at"],
+            "status": "completed",
+            "completed_at": workflow["completed_at"],
+            "result": result
+        })
+        
         logger.info("Completed workflow %s", workflow_id)
         return workflow
     
@@ -189,8 +388,7 @@ class WorkflowStateManager:
         # Update status and add error
         workflow["status"] = "failed"
         workflow["error"] = error
-        workflow["failed_at"] = self._get_timestamp()
-        workflow["updated_at"] = self._get_timestamp()
+        workflow["failed_at"] = workflow["updated_at"] = self._get_timestamp()
         
         # Store the updated workflow
         self.workflows[workflow_id] = workflow
@@ -228,12 +426,11 @@ class WorkflowStateManager:
         else:
             return list(self.workflows.values())
     
-    def _get_timestamp(self) -> str:
+    def _get_timestamp(self) -> clock.Timestamp:
         """
-        Get the current timestamp as a string.
+        Get the current timestamp.
         
         Returns:
-            Current timestamp string
+            Current timestamp, an ISO 8601 string that also carries epoch seconds
         """
-        from datetime import datetime
-        return datetime.now().isoformat()
\ No newline at end of file
+        return clock.now()
\ No newline at end of file
@@ -0,0 +1,251 @@
+"""
+Clock service for cheap, freezable timestamps.
+"""
+
+import math
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Optional, Iterator, Tuple
+
+class Timestamp(str):
+    """
+    Wall-clock time as a local ISO 8601 string, with its epoch seconds and a monotonic reading.
+    
+    A Timestamp is the ISO string the orchestrator's outputs have always
+    carried, so it serializes to JSON without a ``default`` and compares
+    with ISO strings like one; equality and hashing are the string's.
+    Against other timestamps and numbers it orders by its epoch seconds,
+    and adding or subtracting seconds works on those.
+    
+    Taking a timestamp stays cheap: the date and time of day are formatted
+    once per second and only the microseconds per call.
+    """
+    
+    wall: float
+    monotonic: Optional[float]
+    
+    def __new__(cls, wall: float, monotonic: Optional[float] = None, iso: Optional[str] = None) -> "Timestamp":
+        wall = float(wall)
+        timestamp = str.__new__(cls, _format_wall(wall) if iso is None else iso)
+        timestamp.wall = wall
+        timestamp.monotonic = monotonic
+        return timestamp
+    
+    @classmethod
+    def fromisoformat(cls, text: str) -> "Timestamp":
+        """
+        Parse a local ISO 8601 string, e.g. a serialized timestamp.
+        
+        Args:
+            text: ISO 8601 timestamp string
+        
+        Returns:
+            Timestamp without a monotonic reading
+        """
+        return cls(datetime.fromisoformat(text).timestamp(), iso=text)
+    
+    def isoformat(self) -> str:
+        """
+        Get the timestamp as a plain ISO 8601 string.
+        
+        Returns:
+            ISO 8601 timestamp string
+        """
+        return str.__str__(self)
+    
+    def __float__(self) -> float:
+        return self.wall
+    
+    def __lt__(self, other: Any) -> bool:
+        wall = _wall_of(other)
+        return str.__lt__(self, other) if wall is None else self.wall < wall
+    
+    def __le__(self, other: Any) -> bool:
+        wall = _wall_of(other)
+        return str.__le__(self, other) if wall is None else self.wall <= wall
+    
+    def __gt__(self, other: Any) -> bool:
+        wall = _wall_of(other)
+        return str.__gt__(self, other) if wall is None else self.wall > wall
+    
+    def __ge__(self, other: Any) -> bool:
+        wall = _wall_of(other)
+        return str.__ge__(self, other) if wall is None else self.wall >= wall
+    
+    def __add__(self, seconds: Any) -> Any:
+        if isinstance(seconds, (int, float)):
+            return Timestamp(self.wall + seconds, None if self.monotonic is None else self.monotonic + seconds)
+        return str.__add__(self, seconds)
+    
+    def __radd__(self, seconds: Any) -> Any:
+        if isinstance(seconds, (int, float)):
+            return self + seconds
+        return NotImplemented
+    
+    def __sub__(self, other: Any) -> Any:
+        # The difference of two timestamps is a duration in seconds
+        if isinstance(other, Timestamp):
+            return self.wall - other.wall
+        if isinstance(other, (int, float)):
+            return self + -other
+        return NotImplemented
+    
+    def __rsub__(self, other: Any) -> Any:
+        if isinstance(other, (int, float)):
+            return other - self.wall
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return f"Timestamp({self.isoformat()!r})"
+    
+    def __reduce__(self):
+        return (Timestamp, (self.wall, self.monotonic, self.isoformat()))
+
+def _wall_of(value: Any) -> Optional[float]:
+    """
+    Get the epoch seconds of a timestamp or number, or None for anything else.
+    
+    Args:
+        value: Value compared with a timestamp
+    
+    Returns:
+        Epoch seconds or None
+    """
+    if isinstance(value, Timestamp):
+        return value.wall
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return None
+
+# Local ISO 8601 date and time of the last whole second formatted
+_last_second: Tuple[Optional[float], str] = (None, "")
+
+def _format_wall(wall: float) -> str:
+    """
+    Format epoch seconds like ``datetime.fromtimestamp(wall).isoformat()``.
+    
+    Args:
+        wall: Epoch seconds
+    
+    Returns:
+        Local ISO 8601 timestamp string
+    """
+    global _last_second
+    # Split and round the microseconds as datetime.fromtimestamp does
+    fraction, second = math.modf(wall)
+    microseconds = round(fraction * 1e6)
+    if not 0 <= microseconds < 1000000:
+        return datetime.fromtimestamp(wall).isoformat()
+    cached, prefix = _last_second
+    if cached != second:
+        prefix = datetime.fromtimestamp(second).isoformat()
+        _last_second = (second, prefix)
+    return f"{prefix}.{microseconds:06d}" if microseconds else prefix
+
+class Clock:
+    """
+    Source of timestamps for the state layer and agents.
+    """
+    
+    def now(self) -> Timestamp:
+        """
+        Get the current time.
+        
+        Returns:
+            Current timestamp
+        """
+        return Timestamp(time.time(), time.monotonic())
+    
+    def monotonic(self) -> float:
+        """
+        Get a monotonic reading for measuring durations.
+        
+        Returns:
+            Monotonic clock value in seconds
+        """
+        return time.monotonic()
+
+class FrozenClock(Clock):
+    """
+    Clock that only moves when told to, for deterministic tests.
+    """
+    
+    def __init__(self, wall: float = 0.0, monotonic: float = 0.0):
+        """
+        Initialize the Frozen Clock.
+        
+        Args:
+            wall: Initial wall-clock time in epoch seconds
+            monotonic: Initial monotonic reading
+        """
+        self.wall = wall
+        self._monotonic = monotonic
+    
+    def now(self) -> Timestamp:
+        return Timestamp(self.wall, self._monotonic)
+    
+    def monotonic(self) -> float:
+        return self._monotonic
+    
+    def advance(self, seconds: float) -> None:
+        """
+        Move the clock forward.
+        
+        Args:
+            seconds: Number of seconds to advance
+        """
+        self.wall += seconds
+        self._monotonic += seconds
+
+_clock = Clock()
+
+def get_clock() -> Clock:
+    """
+    Get the process-wide clock.
+    
+    Returns:
+        Current clock
+    """
+    return _clock
+
+def set_clock(clock: Clock) -> Clock:
+    """
+    Replace the process-wide clock.
+    
+    Args:
+        clock: Clock to install
+    
+    Returns:
+        Previously installed clock
+    """
+    global _clock
+    previous, _clock = _clock, clock
+    return previous
+
+def now() -> Timestamp:
+    """
+    Get the current time from the process-wide clock.
+    
+    Returns:
+        Current timestamp
+    """
+    return _clock.now()
+
+@contextmanager
+def frozen_clock(wall: Optional[float] = None) -> Iterator[FrozenClock]:
+    """
+    Freeze the process-wide clock for the duration of a block.
+    
+    Args:
+        wall: Wall-clock time to freeze at; defaults to the current time
+    
+    Returns:
+        Context manager yielding the frozen clock
+    """
+    clock = FrozenClock(time.time() if wall is None else wall)
+    previous = set_clock(clock)
+    try:
+        yield clock
+    finally:
+        set_clock(previous)
\ No newline at end of file
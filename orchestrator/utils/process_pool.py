@@ -0,0 +1,406 @@
+"""
+Process pool for CPU-bound agent tasks, with shared-memory array passing.
+
+Agent tasks run as coroutines on the event loop, so a CPU-bound task
+blocks every other workflow in the process until it finishes. Tasks an
+agent declares CPU-bound can instead run in a ``ProcessPool`` worker,
+which executes the same task on its own copy of the agent. Large typed
+arrays in the task input (``array.array`` or numpy arrays) are copied once
+into shared memory and reach the worker as views over that memory rather
+than being pickled. Long record lists are pickled into shared memory in
+chunks, so the event loop is never held up by one large pickling call.
+Large record batches are written to shared memory as transport frames
+(see ``orchestrator.data.transport``), whose columns the worker reads in
+place.
+"""
+
+import array
+import asyncio
+import logging
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Any, List, Optional, Tuple
+
+from orchestrator.data.record_batch import RecordBatch
+from orchestrator.data.transport import decode_batch, encode_batch
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency
+    np = None
+
+logger = logging.getLogger(__name__)
+
+class SharedArray:
+    """
+    Picklable handle to a typed array stored in shared memory.
+    """
+    
+    def __init__(self, name: str, typecode: str, length: int, shape: Optional[Tuple[int, ...]] = None):
+        """
+        Initialize the handle.
+        
+        Args:
+            name: Name of the shared memory segment
+            typecode: ``array`` typecode, or numpy dtype string when ``shape`` is set
+            length: Number of elements
+            shape: Shape of a numpy array; None for ``array.array``
+        """
+        self.name = name
+        self.typecode = typecode
+        self.length = length
+        self.shape = shape
+    
+    @classmethod
+    def create(cls, values: Any) -> Tuple["SharedArray", shared_memory.SharedMemory]:
+        """
+        Copy an array into a new shared memory segment.
+        
+        Args:
+            values: ``array.array`` or numpy array
+        
+        Returns:
+            Tuple of (handle, segment); the caller owns the segment and must
+            close and unlink it once the workers are done
+        """
+        if isinstance(values, array.array):
+            data = memoryview(values).cast("B")
+            handle_args = (values.typecode, len(values), None)
+        else:
+            values = np.ascontiguousarray(values)
+            data = memoryview(values).cast("B")
+            handle_args = (values.dtype.str, values.size, values.shape)
+        segment = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+        segment.buf[:len(data)] = data
+        return cls(segment.name, *handle_args), segment
+    
+    def attach(self) -> Tuple[Any, shared_memory.SharedMemory]:
+        """
+        Map the array without copying it.
+        
+        Returns:
+            Tuple of (view, segment): a typed ``memoryview`` for arrays
+            shared from ``array.array``, a numpy array otherwise
+        """
+        segment = shared_memory.SharedMemory(name=self.name)
+        if self.shape is None:
+            itemsize = array.array(self.typecode).itemsize
+            view = segment.buf[:self.length * itemsize].cast(self.typecode)
+        else:
+            view = np.ndarray(self.shape, dtype=np.dtype(self.typecode), buffer=segment.buf)
+        return view, segment
+
+class SharedRecords:
+    """
+    Picklable handle to a list of records pickled into shared memory.
+    
+    The records are pickled in chunks by the event loop, yielding between
+    chunks, instead of in one call on the executor's queue thread, which
+    would hold the GIL (and stall the loop) for the whole list.
+    """
+    
+    def __init__(self, name: str, offsets: List[int]):
+        """
+        Initialize the handle.
+        
+        Args:
+            name: Name of the shared memory segment
+            offsets: Start offset of each pickled chunk, plus the end offset
+        """
+        self.name = name
+        self.offsets = offsets
+    
+    @classmethod
+    async def create(
+        cls,
+        records: List[Any],
+        chunk_size: int = 10000
+    ) -> Tuple["SharedRecords", shared_memory.SharedMemory]:
+        """
+        Pickle records into a new shared memory segment.
+        
+        Args:
+            records: Records to share
+            chunk_size: Records pickled between yields to the event loop
+        
+        Returns:
+            Tuple of (handle, segment); the caller owns the segment
+        """
+        chunks = []
+        for start in range(0, len(records), chunk_size):
+            chunks.append(pickle.dumps(records[start:start + chunk_size], protocol=pickle.HIGHEST_PROTOCOL))
+            await asyncio.sleep(0)
+        
+        offsets = [0]
+        for chunk in chunks:
+            offsets.append(offsets[-1] + len(chunk))
+        segment = shared_memory.SharedMemory(create=True, size=max(offsets[-1], 1))
+        for start, chunk in zip(offsets, chunks):
+            segment.buf[start:start + len(chunk)] = chunk
+        return cls(segment.name, offsets), segment
+    
+    def load(self) -> List[Any]:
+        """
+        Unpickle the records.
+        
+        Returns:
+            Records
+        """
+        segment = shared_memory.SharedMemory(name=self.name)
+        records = []
+        try:
+            for start, end in zip(self.offsets, self.offsets[1:]):
+                with segment.buf[start:end] as chunk:
+                    records.extend(pickle.loads(chunk))
+        finally:
+            segment.close()
+        return records
+
+class SharedBatch:
+    """
+    Picklable handle to a record batch stored in shared memory as a transport frame.
+    """
+    
+    def __init__(self, name: str, size: int):
+        """
+        Initialize the handle.
+        
+        Args:
+            name: Name of the shared memory segment
+            size: Size of the frame in bytes
+        """
+        self.name = name
+        self.size = size
+    
+    @classmethod
+    def create(cls, batch: RecordBatch, codec: str = "none") -> Tuple["SharedBatch", shared_memory.SharedMemory]:
+        """
+        Encode a batch into a new shared memory segment.
+        
+        Args:
+            batch: Batch to share
+            codec: Transport codec; uncompressed frames are read in place
+        
+        Returns:
+            Tuple of (handle, segment); the caller owns the segment
+        """
+        frame = encode_batch(batch, codec)
+        segment = shared_memory.SharedMemory(create=True, size=max(len(frame), 1))
+        segment.buf[:len(frame)] = frame
+        return cls(segment.name, len(frame)), segment
+    
+    def attach(self) -> Tuple[RecordBatch, shared_memory.SharedMemory]:
+        """
+        Decode the batch without copying its typed columns.
+        
+        Returns:
+            Tuple of (batch viewing the segment, segment)
+        """
+        segment = shared_memory.SharedMemory(name=self.name)
+        return decode_batch(segment.buf[:self.size]), segment
+
+def _is_large_array(value: Any, min_bytes: int) -> bool:
+    if isinstance(value, array.array):
+        return len(value) * value.itemsize >= min_bytes
+    return np is not None and isinstance(value, np.ndarray) and value.nbytes >= min_bytes
+
+def share_arrays(
+    task_input: Dict[str, Any],
+    min_bytes: int = 1 << 20
+) -> Tuple[Dict[str, Any], List[shared_memory.SharedMemory]]:
+    """
+    Replace large arrays in a task input with shared-memory handles.
+    
+    Dictionaries are searched recursively; other containers are left as is.
+    
+    Args:
+        task_input: Task input
+        min_bytes: Arrays smaller than this are pickled as usual
+    
+    Returns:
+        Tuple of (input with handles, segments to release after the task)
+    """
+    segments = []
+    
+    def convert(value):
+        if isinstance(value, dict):
+            return {key: convert(item) for key, item in value.items()}
+        if _is_large_array(value, min_bytes):
+            handle, segment = SharedArray.create(value)
+            segments.append(segment)
+            return handle
+        return value
+    
+    return convert(task_input), segments
+
+def attach_arrays(task_input: Dict[str, Any]) -> Tuple[Dict[str, Any], List[shared_memory.SharedMemory]]:
+    """
+    Replace shared-memory handles in a task input with views of the arrays.
+    
+    Args:
+        task_input: Task input produced by ``share_arrays``
+    
+    Returns:
+        Tuple of (input with array views, attached segments)
+    """
+    segments = []
+    
+    def convert(value):
+        if isinstance(value, dict):
+            return {key: convert(item) for key, item in value.items()}
+        if isinstance(value, SharedArray):
+            view, segment = value.attach()
+            segments.append(segment)
+            return view
+        if isinstance(value, SharedRecords):
+            return value.load()
+        if isinstance(value, SharedBatch):
+            batch, segment = value.attach()
+            segments.append(segment)
+            return batch
+        return value
+    
+    return convert(task_input), segments
+
+def release_segments(segments: List[shared_memory.SharedMemory], unlink: bool = False) -> None:
+    """
+    Close shared memory segments, and unlink those the caller owns.
+    
+    Args:
+        segments: Segments to release
+        unlink: Whether to free the memory (owner side)
+    """
+    for segment in segments:
+        try:
+            segment.close()
+        except BufferError:
+            # A view is still alive; the mapping is freed with it
+            logger.debug("Shared memory segment %s still in use", segment.name)
+        if unlink:
+            try:
+                segment.unlink()
+            except FileNotFoundError:
+                pass
+
+# Agents created in this worker process, by class and configuration
+_worker_agents: Dict[Tuple[type, str], Any] = {}
+
+def run_agent_task(agent_class: type, config: Dict[str, Any], task_name: str, task_input: Dict[str, Any]) -> Any:
+    """
+    Execute an agent task inside a pool worker.
+    
+    The worker keeps one agent per class and configuration, created with
+    the process pool disabled so the task runs in the worker itself. The
+    state of that agent, e.g. an in-memory cache, is not shared with the
+    agent that offloaded the task or with other workers.
+    
+    Args:
+        agent_class: Agent class
+        config: Agent configuration
+        task_name: Task to execute
+        task_input: Task input, possibly holding shared-memory handles
+    
+    Returns:
+        Task result
+    """
+    key = (agent_class, repr(sorted(config.items(), key=lambda item: item[0])))
+    agent = _worker_agents.get(key)
+    if agent is None:
+        agent = _worker_agents[key] = agent_class({**config, "task_processes": 0})
+    task_input, segments = attach_arrays(task_input)
+    try:
+        return asyncio.run(agent.execute_task(task_name, task_input))
+    finally:
+        del task_input
+        release_segments(segments)
+
+class ProcessPool:
+    """
+    Lazily started process pool for CPU-bound agent tasks.
+    """
+    
+    def __init__(
+        self,
+        max_workers: int = 1,
+        shared_memory_min_bytes: int = 1 << 20,
+        shared_records_min_count: int = 10000,
+        transport_codec: str = "none"
+    ):
+        """
+        Initialize the Process Pool.
+        
+        Args:
+            max_workers: Number of worker processes
+            shared_memory_min_bytes: Arrays at least this large are passed
+                through shared memory
+            shared_records_min_count: ``data`` record lists and batches at
+                least this long are passed through shared memory
+            transport_codec: Codec of the batches passed through shared memory
+        """
+        self.max_workers = max_workers
+        self.shared_memory_min_bytes = shared_memory_min_bytes
+        self.shared_records_min_count = shared_records_min_count
+        self.transport_codec = transport_codec
+        self._executor: Optional[ProcessPoolExecutor] = None
+    
+    def executor(self) -> ProcessPoolExecutor:
+        """
+        Get the executor of the pool, starting its workers on first use.
+        
+        Work submitted directly (e.g. analysis partitions) shares the
+        workers with agent tasks and lives as long as the pool.
+        
+        Returns:
+            Process pool executor
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            logger.info("Started process pool with %d workers", self.max_workers)
+        return self._executor
+    
+    async def run_task(
+        self,
+        agent_class: type,
+        config: Dict[str, Any],
+        task_name: str,
+        task_input: Dict[str, Any]
+    ) -> Any:
+        """
+        Run an agent task in a worker without blocking the event loop.
+        
+        Args:
+            agent_class: Agent class
+            config: Agent configuration
+            task_name: Task to execute
+            task_input: Task input
+        
+        Returns:
+            Task result
+        """
+        executor = self.executor()
+        task_input, segments = share_arrays(task_input, self.shared_memory_min_bytes)
+        try:
+            # Record lists are the bulk of most task inputs
+            records = task_input.get("data")
+            if isinstance(records, list) and len(records) >= self.shared_records_min_count:
+                handle, segment = await SharedRecords.create(records)
+                segments.append(segment)
+                task_input = {**task_input, "data": handle}
+            elif isinstance(records, RecordBatch) and len(records) >= self.shared_records_min_count:
+                handle, segment = SharedBatch.create(records, self.transport_codec)
+                segments.append(segment)
+                task_input = {**task_input, "data": handle}
+            
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                executor, run_agent_task, agent_class, config, task_name, task_input
+            )
+        finally:
+            release_segments(segments, unlink=True)
+    
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
\ No newline at end of file
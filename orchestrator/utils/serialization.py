@@ -0,0 +1,56 @@
+"""
+JSON fallbacks for values the json module does not support.
+
+Modules that define such values register an encoder for their type, so
+code that serializes them (checkpoints, caches, validation prompts) does
+not import the layer that defines them. Timestamps are ISO 8601 strings
+and need no encoder.
+"""
+
+from typing import Any, Callable, Dict
+
+_ENCODERS: Dict[type, Callable[[Any], Any]] = {}
+
+def register_json_type(cls: type, encode: Callable[[Any], Any]) -> None:
+    """
+    Register the JSON form of a type and its subclasses.
+    
+    Args:
+        cls: Type to encode
+        encode: Function returning a JSON-serializable form of a value
+    """
+    _ENCODERS[cls] = encode
+
+def strict_json_default(value: Any) -> Any:
+    """
+    Serialize values that JSON does not support, for ``json.dump(default=...)``, refusing any it cannot restore.
+    
+    Args:
+        value: Value to serialize
+    
+    Returns:
+        The registered JSON form of the value, e.g. the rows of a record batch
+    
+    Raises:
+        TypeError: If the value has no JSON form
+    """
+    for cls in type(value).__mro__:
+        encode = _ENCODERS.get(cls)
+        if encode is not None:
+            return encode(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def json_default(value: Any) -> Any:
+    """
+    Serialize values that JSON does not support, for ``json.dump(default=...)``.
+    
+    Args:
+        value: Value to serialize
+    
+    Returns:
+        The registered JSON form of the value; the text of any other value
+    """
+    try:
+        return strict_json_default(value)
+    except TypeError:
+        return str(value)
\ No newline at end of file
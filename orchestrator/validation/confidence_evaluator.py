@@ -131,10 +131,11 @@ class ConfidenceEvaluator:
         
         # Apply agent-specific rules
         if agent_name == "DataExtractionAgent":
-            # Check if data is present
-            if "data" not in task_output:
+            # Check if data is present; streamed batches cannot be inspected
+            streamed = task_output.get("batches") is not None
+            if "data" not in task_output and not streamed:
                 score -= 40.0
-            elif not task_output.get("data"):
+            elif not task_output.get("data") and not streamed:
                 score -= 30.0
             
             # Check if metadata is present
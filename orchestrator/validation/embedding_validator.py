@@ -7,6 +7,8 @@ import asyncio
 import random
 from typing import Dict, Any, List, Optional, Tuple
 
+from orchestrator.utils.serialization import json_default
+
 logger = logging.getLogger(__name__)
 
 class EmbeddingValidator:
@@ -98,7 +100,7 @@ class EmbeddingValidator:
         import hashlib
         import json
         
-        data_str = json.dumps(data, sort_keys=True)
+        data_str = json.dumps(data, sort_keys=True, default=json_default)
         cache_key = hashlib.md5(data_str.encode()).hexdigest()
         
         # Check if we have a cached embedding
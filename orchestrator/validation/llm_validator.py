@@ -7,6 +7,8 @@ import asyncio
 import json
 from typing import Dict, Any, List, Optional
 
+from orchestrator.utils.serialization import json_default
+
 logger = logging.getLogger(__name__)
 
 class LLMValidator:
@@ -83,8 +85,8 @@ class LLMValidator:
             Prompt string for the LLM
         """
         # Convert input and output to formatted JSON strings
-        input_json = json.dumps(task_input, indent=2)
-        output_json = json.dumps(task_output, indent=2)
+        input_json = json.dumps(task_input, indent=2, default=json_default)
+        output_json = json.dumps(task_output, indent=2, default=json_default)
         
         # Construct the prompt
         prompt = f"""
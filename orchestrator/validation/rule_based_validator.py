@@ -6,8 +6,18 @@ import logging
 import asyncio
 from typing import Dict, Any, List, Optional, Callable
 
+from orchestrator.analysis.schema import get_schema_registry, sample_records
+from orchestrator.data.record_batch import RecordBatch
+
 logger = logging.getLogger(__name__)
 
+# Result fields every analysis of a kind produces
+EXPECTED_ANALYSIS_FIELDS = {
+    "feedback": ("sentiment_distribution", "average_rating"),
+    "sales": ("total_sales", "sales_by_product"),
+    "generic": ("average_value", "category_statistics")
+}
+
 class RuleBasedValidator:
     """
     Applies predefined rules to validate agent outputs.
@@ -22,6 +32,7 @@ class RuleBasedValidator:
         """
         self.config = config or {}
         self.rules = {}
+        self.schemas = get_schema_registry()
         self._register_default_rules()
         logger.info("RuleBasedValidator initialized with %d rules", len(self.rules))
     
@@ -108,6 +119,12 @@ class RuleBasedValidator:
         Returns:
             Tuple of (is_valid, confidence_score, message)
         """
+        # Streamed batches are validated as they are consumed downstream
+        if task_output.get("batches") is not None:
+            if "metadata" not in task_output:
+                return True, 70.0, "Data streamed but missing metadata"
+            return True, 90.0, "Extraction result is streamed"
+        
         # Check if data is present
         if "data" not in task_output:
             return False, 0.0, "Missing 'data' field in extraction result"
@@ -130,6 +147,21 @@ class RuleBasedValidator:
         if missing_fields:
             return True, 80.0, f"Metadata missing fields: {', '.join(missing_fields)}"
         
+        # Check a sample of the records against a declared schema
+        schema = self.schemas.resolve(data, metadata)
+        if schema.declared and isinstance(data, RecordBatch):
+            # A batch's columns show missing fields without sampling rows
+            missing_fields = [
+                field for field in schema.fields
+                if field not in schema.nullable and (field not in data.columns or data.has_nulls(field))
+            ]
+            if missing_fields:
+                return True, 75.0, f"Records missing declared fields: {', '.join(missing_fields)}"
+        elif schema.declared:
+            missing_fields = schema.missing_fields(sample_records(data, self.schemas.sample_size))
+            if missing_fields:
+                return True, 75.0, f"Records missing declared fields: {', '.join(missing_fields)}"
+        
         # All checks passed
         return True, 95.0, "Extraction result is valid"
     
@@ -170,6 +202,16 @@ class RuleBasedValidator:
         if missing_fields:
             return True, 80.0, f"Metadata missing fields: {', '.join(missing_fields)}"
         
+        # Check that the results match the kind of data that was analyzed
+        schema = self.schemas.for_result(metadata)
+        if schema is not None:
+            expected = EXPECTED_ANALYSIS_FIELDS.get(schema.kind, ())
+            missing_fields = [field for field in expected if field not in analysis_results]
+            if missing_fields:
+                return True, 75.0, (
+                    f"Results for {schema.kind} data missing fields: {', '.join(missing_fields)}"
+                )
+        
         # All checks passed
         return True, 95.0, "Analysis result is valid"
     
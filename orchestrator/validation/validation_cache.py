@@ -7,6 +7,8 @@ import json
 import hashlib
 from typing import Dict, Any, Optional, Tuple
 
+from orchestrator.utils.serialization import json_default
+
 logger = logging.getLogger(__name__)
 
 class ValidationCache:
@@ -116,8 +118,8 @@ class ValidationCache:
         key_parts = [
             f"agent={agent_name}",
             f"task={task_name}",
-            f"input={json.dumps(task_input, sort_keys=True)}",
-            f"output={json.dumps(task_output, sort_keys=True)}"
+            f"input={json.dumps(task_input, sort_keys=True, default=json_default)}",
+            f"output={json.dumps(task_output, sort_keys=True, default=json_default)}"
         ]
         key_string = "|".join(key_parts)
         
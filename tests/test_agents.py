@@ -8,12 +8,18 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 import unittest
 import asyncio
+import array
+import json
+import tempfile
 from typing import Dict, Any
 
 from orchestrator.agents.base_agent import Agent
 from orchestrator.agents.data_extraction_agent import DataExtractionAgent
 from orchestrator.agents.statistical_analysis_agent import StatisticalAnalysisAgent
 from orchestrator.agents.visualization_agent import VisualizationAgent
+from orchestrator.analysis.online import SalesAnalysis
+from orchestrator.data.record_batch import RecordBatch
+from orchestrator.utils.process_pool import SharedBatch, attach_arrays, release_segments, share_arrays
 
 class TestDataExtractionAgent(unittest.TestCase):
     """Test cases for the Data Extraction Agent."""
@@ -45,6 +51,33 @@ class TestDataExtractionAgent(unittest.TestCase):
         self.assertTrue(len(result["data"]) > 0)
         self.assertEqual(result["metadata"]["source"], "customer_feedback")
 
+    def test_extract_without_source(self):
+        """Test that requests without a source get the generic sample data."""
+        for request in ({}, {"data_source": ""}):
+            result = asyncio.run(self.agent.extract_data(request))
+            self.assertEqual(len(result["data"]), 10)
+
+    def test_extract_with_connector(self):
+        """Test that file sources are streamed through a connector."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sales.jsonl")
+            with open(path, "w") as f:
+                for i in range(30):
+                    f.write(json.dumps({"id": i, "product_id": "P1", "quantity": 1, "price": 2.0, "region": "North", "date": "2023-01-01"}) + "\n")
+            
+            result = asyncio.run(self.agent.extract_data({"data_source": path, "batch_size": 8}))
+            self.assertNotIn("data", result)
+            self.assertTrue(result["metadata"]["streaming"])
+            
+            analysis = asyncio.run(StatisticalAnalysisAgent().analyze_data(result))
+            self.assertEqual(analysis["analysis_results"]["total_sales"], 60.0)
+            self.assertEqual(analysis["metadata"]["batches_processed"], 4)
+            self.assertEqual(result["connector"].stats.rows, 30)
+            
+            materialized = asyncio.run(self.agent.extract_data({"data_source": path, "materialize": True}))
+            self.assertEqual(len(materialized["data"]), 30)
+            self.assertEqual(materialized["metadata"]["throughput"]["rows"], 30)
+
 class TestStatisticalAnalysisAgent(unittest.TestCase):
     """Test cases for the Statistical Analysis Agent."""
     
@@ -80,6 +113,167 @@ class TestStatisticalAnalysisAgent(unittest.TestCase):
         self.assertIn("analysis_results", result)
         self.assertIn("metadata", result)
         self.assertIn("sentiment_distribution", result["analysis_results"])
+        self.assertEqual(result["metadata"]["schema"]["kind"], "feedback")
+    
+    def test_analyze_sales_data(self):
+        """Test single-pass sales aggregation."""
+        data = [
+            {"id": 1, "product_id": "P2", "quantity": 2, "price": 10.0, "date": "2023-01-01", "region": "North"},
+            {"id": 2, "product_id": "P1", "quantity": 1, "price": 5.0, "date": "2023-01-01", "region": "South"},
+            {"id": 3, "product_id": "P2", "quantity": 3, "price": 10.0, "date": "2023-01-02", "region": "North"}
+        ]
+        
+        results = asyncio.run(self.agent._analyze_sales_data(data))
+        
+        self.assertEqual(results["total_sales"], 55.0)
+        self.assertEqual(list(results["sales_by_product"]), ["P2", "P1"])
+        self.assertEqual(results["sales_by_product"]["P2"], 50.0)
+        self.assertEqual(results["sales_by_region"], {"North": 50.0, "South": 5.0})
+        self.assertEqual(results["sales_trend"], {"2023-01-01": 25.0, "2023-01-02": 30.0})
+    
+    def test_analyze_generic_data(self):
+        """Test generic statistics and per-category aggregates."""
+        data = [{"id": i, "value": i * 10, "category": ["A", "B"][i % 2]} for i in range(4)]
+        
+        results = asyncio.run(self.agent._analyze_generic_data(data))
+        
+        self.assertEqual(results["average_value"], 15.0)
+        self.assertEqual(results["value_range"], 30)
+        self.assertEqual(results["category_statistics"]["B"]["count"], 2)
+        self.assertEqual(results["category_statistics"]["B"]["avg_value"], 20.0)
+        self.assertEqual(results["category_statistics"]["A"]["max_value"], 20)
+    
+    def test_analyze_stream_matches_batch_analysis(self):
+        """Test that streaming analysis produces the batch analysis schema and values."""
+        data = [
+            {"id": i, "customer_id": 100 + i, "rating": i % 5 + 1, "feedback": "ok", "date": f"2023-01-{i % 3 + 1:02d}"}
+            for i in range(20)
+        ]
+        
+        async def batches():
+            for start in range(0, len(data), 6):
+                yield data[start:start + 6]
+        
+        streamed = asyncio.run(self.agent.analyze_data({"batches": batches(), "metadata": {}}))
+        batch = asyncio.run(self.agent._analyze_feedback_data(data))
+        
+        results = streamed["analysis_results"]
+        self.assertEqual(set(results), set(batch))
+        self.assertEqual(results["sentiment_distribution"], batch["sentiment_distribution"])
+        self.assertAlmostEqual(results["average_rating"], batch["average_rating"])
+        self.assertEqual(results["rating_trend"].keys(), batch["rating_trend"].keys())
+        self.assertEqual(streamed["metadata"]["batches_processed"], 4)
+    
+    def test_incremental_analysis(self):
+        """Test that a repeated analysis of a source reuses unchanged partitions."""
+        agent = StatisticalAnalysisAgent({"incremental_analysis": True})
+        data = [
+            {"id": i, "product_id": f"P{i % 3}", "quantity": 1, "price": 2.0, "region": "North", "date": f"2023-01-0{i % 4 + 1}"}
+            for i in range(12)
+        ]
+        metadata = {"source": "sales_data"}
+        
+        first = asyncio.run(agent.analyze_data({"data": data, "metadata": metadata}))
+        data.append({"id": 12, "product_id": "P0", "quantity": 1, "price": 2.0, "region": "North", "date": "2023-01-05"})
+        second = asyncio.run(agent.analyze_data({"data": data, "metadata": metadata}))
+        
+        self.assertEqual(first["metadata"]["incremental"]["recomputed"], 4)
+        self.assertEqual(second["metadata"]["incremental"], {"partitions": 5, "reused": 4, "recomputed": 1})
+        self.assertEqual(second["analysis_results"]["total_sales"], 26.0)
+        
+        # An extract made with another query plan does not reuse the cached partitions
+        planned = {"source": "sales_data", "query_plan": {"filters": [["region", "==", "North"]]}}
+        third = asyncio.run(agent.analyze_data({"data": data, "metadata": planned}))
+        self.assertEqual(third["metadata"]["incremental"]["recomputed"], 5)
+        
+        # Worker processes analyze with their own agents, so they need a shared cache
+        with self.assertRaises(ValueError):
+            StatisticalAnalysisAgent({"incremental_analysis": True, "task_processes": 1})
+    
+    def test_parallel_analysis_matches_single_process(self):
+        """Test that analyzing in several processes gives the single-process results."""
+        single = StatisticalAnalysisAgent({"analysis_processes": 1})
+        parallel = StatisticalAnalysisAgent({"analysis_processes": 2, "parallel_min_records": 10})
+        self.addCleanup(parallel.shutdown)
+        datasets = {
+            "sales": [
+                {"id": i, "product_id": f"P{i % 7}", "quantity": i % 3 + 1, "price": 0.1 + i % 11 * 0.7,
+                 "region": ["North", "South"][i % 2], "date": f"2023-01-{i % 5 + 1:02d}", "customer_id": i % 13}
+                for i in range(300)
+            ],
+            "feedback": [
+                {"id": i, "customer_id": i % 17, "rating": i % 5 + 1, "feedback": ["Great", "Poor", "ok"][i % 3],
+                 "date": f"2023-01-{i % 4 + 1:02d}", "product_id": f"P{i % 3}"}
+                for i in range(300)
+            ],
+            "generic": [
+                {"id": i, "value": 0.1 * (i % 23), "category": ["A", "B", "C"][i % 3]} for i in range(300)
+            ]
+        }
+        
+        for kind, data in datasets.items():
+            with self.subTest(kind=kind):
+                extraction_result = {"data": data, "metadata": {"record_count": len(data)}}
+                expected = asyncio.run(single.analyze_data(extraction_result))
+                result = asyncio.run(parallel.analyze_data(extraction_result))
+                self.assertEqual(result["metadata"]["schema"]["kind"], kind)
+                self.assertEqual(result["analysis_results"], expected["analysis_results"])
+    
+    def test_approximate_statistics_opt_in(self):
+        """Test that sketch statistics are only computed when configured."""
+        data = [
+            {"id": i, "customer_id": i % 4, "rating": i % 5 + 1, "feedback": "ok", "date": "2023-01-01"}
+            for i in range(20)
+        ]
+        extraction_result = {"data": data, "metadata": {}}
+        
+        result = asyncio.run(self.agent.analyze_data(extraction_result))
+        self.assertNotIn("approximate_statistics", result["analysis_results"])
+        
+        agent = StatisticalAnalysisAgent({"approximate_statistics": True})
+        approximate = asyncio.run(agent.analyze_data(extraction_result))["analysis_results"]["approximate_statistics"]
+        self.assertEqual(approximate["distinct_customers"], 4)
+        streamed = asyncio.run(agent.analyze_data({"batches": [data[:10], data[10:]], "metadata": {}}))
+        self.assertEqual(streamed["analysis_results"]["approximate_statistics"]["distinct_customers"], 4)
+    
+    def test_online_analysis_intermediate_results(self):
+        """Test reading intermediate results while batches are consumed."""
+        analysis = SalesAnalysis()
+        analysis.update([{"product_id": "P1", "quantity": 2, "price": 5.0, "region": "North", "date": "d1"}])
+        self.assertEqual(analysis.result()["total_sales"], 10.0)
+        
+        analysis.update([{"product_id": "P2", "quantity": 1, "price": 3.0, "region": "North", "date": "d2"}])
+        result = analysis.result()
+        self.assertEqual(result["sales_by_region"], {"North": 13.0})
+        self.assertEqual(result["sample_size"], 2)
+        self.assertAlmostEqual(analysis.revenue.variance, 12.25)
+    
+    def test_detect_anomalies(self):
+        """Test anomaly detection on generic data."""
+        data = [{"id": i, "value": 50.0 + i % 7, "category": "A"} for i in range(100)]
+        data[42]["value"] = 1000.0
+        
+        result = asyncio.run(self.agent.detect_anomalies({"data": data}))
+        
+        self.assertEqual(result["anomaly_count"], 1)
+        self.assertEqual(result["anomalies"][0]["item"]["id"], 42)
+        self.assertEqual(result["total_items"], 100)
+        self.assertAlmostEqual(result["anomaly_percentage"], 0.01)
+    
+    def test_cluster_topics(self):
+        """Test topic discovery and keyword matching keep the same output shape."""
+        data = [{"feedback": text} for text in ["slow delivery", "late delivery", "high price", "price too high"]]
+        
+        clustered = asyncio.run(self.agent.cluster_topics({"data": data, "n_clusters": 2}))
+        matched = asyncio.run(self.agent.cluster_topics({"data": data, "method": "keywords"}))
+        
+        for result in (clustered, matched):
+            self.assertEqual(set(result), {"topics", "assignments", "topic_distribution"})
+            self.assertEqual(len(result["assignments"]), 4)
+            self.assertEqual(sum(result["topic_distribution"].values()), 4)
+        self.assertEqual(len(clustered["topics"]), 2)
+        self.assertEqual(clustered["assignments"][0]["assigned_topic"], clustered["assignments"][1]["assigned_topic"])
+        self.assertEqual(matched["assignments"][2]["assigned_topic"], "Pricing")
 
 class TestVisualizationAgent(unittest.TestCase):
     """Test cases for the Visualization Agent."""
@@ -122,5 +316,74 @@ class TestVisualizationAgent(unittest.TestCase):
         self.assertIn("metadata", result)
         self.assertTrue(len(result["visualizations"]) > 0)
 
+class ArraySumAgent(Agent):
+    """Agent with a CPU-bound task over a typed array."""
+    
+    def _get_supported_tasks(self):
+        return ["sum_values"]
+    
+    def _get_cpu_bound_tasks(self):
+        return ["sum_values"]
+    
+    async def sum_values(self, task_input):
+        values = task_input["values"]
+        return {"total": sum(values), "pid": os.getpid(), "shared": isinstance(values, memoryview)}
+
+class TestProcessPoolOffload(unittest.TestCase):
+    """Test cases for running CPU-bound tasks in worker processes."""
+    
+    def test_shared_arrays(self):
+        """Test that large arrays round-trip through shared memory."""
+        values = array.array("d", range(1000))
+        shared, owned = share_arrays({"nested": {"values": values}, "small": array.array("d", [1.0])}, 1024)
+        self.assertEqual(len(owned), 1)
+        self.assertIsInstance(shared["small"], array.array)
+        
+        attached, segments = attach_arrays(shared)
+        view = attached["nested"]["values"]
+        self.assertEqual(view.tolist(), values.tolist())
+        del attached, view
+        release_segments(segments)
+        release_segments(owned, unlink=True)
+    
+    def test_shared_batches(self):
+        """Test that a batch reaches the worker side as views of shared memory."""
+        records = [{"id": i, "value": i * 0.5, "category": "AB"[i % 2]} for i in range(1000)]
+        handle, owned = SharedBatch.create(RecordBatch.from_records(records))
+        attached, segments = attach_arrays({"data": handle})
+        batch = attached["data"]
+        self.assertIsInstance(batch.columns["value"], memoryview)
+        self.assertEqual(batch.to_records(), records)
+        del attached, batch
+        release_segments(segments)
+        release_segments([owned], unlink=True)
+    
+    def test_execute_task_in_worker(self):
+        """Test that declared CPU-bound tasks run in a worker with shared arrays."""
+        agent = ArraySumAgent(config={"task_processes": 1, "process_min_records": 0, "shared_memory_min_bytes": 1024})
+        values = array.array("q", range(100000))
+        try:
+            result = asyncio.run(agent.execute_task("sum_values", {"values": values}))
+        finally:
+            agent.process_pool.shutdown()
+        self.assertEqual(result["total"], sum(values))
+        self.assertNotEqual(result["pid"], os.getpid())
+        self.assertTrue(result["shared"])
+        
+        in_process = asyncio.run(ArraySumAgent().execute_task("sum_values", {"values": values}))
+        self.assertEqual(in_process["pid"], os.getpid())
+    
+    def test_analysis_task_in_worker(self):
+        """Test that an offloaded analysis task matches the in-process result."""
+        data = [{"id": i, "value": 50.0 + i % 7, "category": "A"} for i in range(200)]
+        data[42]["value"] = 1000.0
+        agent = StatisticalAnalysisAgent({"task_processes": 1, "process_min_records": 100})
+        try:
+            offloaded = asyncio.run(agent.execute_task("detect_anomalies", {"data": data}))
+        finally:
+            agent.process_pool.shutdown()
+        in_process = asyncio.run(StatisticalAnalysisAgent().execute_task("detect_anomalies", {"data": data}))
+        self.assertEqual(offloaded, in_process)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,533 @@
+"""
+Tests for the analysis components.
+"""
+import sys
+import os
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import datetime
+import json
+import math
+import random
+import tempfile
+import unittest
+from array import array
+
+from orchestrator.analysis.aggregation import factorize
+from orchestrator.analysis.anomaly import (
+    AnomalyDetector, StreamingAnomalyDetector, quantiles, robust_scale, rolling_deviation
+)
+from orchestrator.analysis.incremental import (
+    AnalysisCache, analyze_incremental, fingerprint_records, partition_records
+)
+from orchestrator.analysis.online import ExactSum, analysis_from_state, create_online_analysis
+from orchestrator.analysis.parallel import analyze_partitioned, partition
+from orchestrator.analysis.schema import DataSchema, SchemaRegistry, infer_schema, sample_records
+from orchestrator.analysis.sketches import CountMinSketch, HyperLogLog, KLLSketch, TopK
+from orchestrator.analysis.text_clustering import (
+    CorpusCache, MiniBatchKMeans, TextCorpus, cluster_texts, tokenize
+)
+from orchestrator.analysis.topic_matcher import KeywordMatcher
+
+def make_sales(count, seed=7):
+    rng = random.Random(seed)
+    return [
+        {
+            "product_id": f"P{rng.randrange(20)}",
+            "quantity": rng.randrange(1, 10),
+            "price": rng.uniform(0.01, 1000.0),
+            "region": rng.choice(["North", "South", "East", "West"]),
+            "date": f"2023-01-{rng.randrange(1, 29):02d}"
+        }
+        for _ in range(count)
+    ]
+
+def exact_results(analysis):
+    """Analysis results without the sketch-based outputs, which depend on the partitioning."""
+    result = analysis.result()
+    result.pop("approximate_statistics")
+    return result
+
+class TestAggregation(unittest.TestCase):
+    """Test cases for the columnar aggregation helpers."""
+    
+    def test_factorize_keeps_key_types(self):
+        """Test that group keys keep their values and types, with or without numpy."""
+        cases = [
+            ([101, "unknown", 101], [0, 1, 0], [101, "unknown"]),
+            ([1, 2.5, 1], [0, 1, 0], [1, 2.5]),
+            ([True, "x"], [0, 1], [True, "x"]),
+            ([-1, 2 ** 63, -1], [0, 1, 0], [-1, 2 ** 63]),
+            (["b\0", "b"], [0, 1], ["b\0", "b"]),
+            (["b", "a", "b"], [0, 1, 0], ["b", "a"])
+        ]
+        for values, codes, keys in cases:
+            found_codes, found_keys = factorize(values)
+            self.assertEqual(list(found_codes), codes, values)
+            self.assertEqual(found_keys, keys, values)
+            self.assertEqual([type(key) for key in found_keys], [type(key) for key in keys], values)
+
+class TestMergeableAnalysis(unittest.TestCase):
+    """Test cases for mergeable aggregate states."""
+    
+    def test_exact_sum_is_order_independent(self):
+        """Test that exact sums do not depend on addition order."""
+        values = [1e16, 1.0, -1e16, 0.1, 0.2, 0.3] * 50
+        forward, backward = ExactSum(), ExactSum()
+        forward.add_many(values)
+        backward.add_many(values[::-1])
+        self.assertEqual(forward.value, backward.value)
+        self.assertEqual(forward.value, math.fsum(values))
+    
+    def test_partition(self):
+        """Test that partitions are contiguous and cover every record."""
+        parts = partition(list(range(10)), 3)
+        self.assertEqual(parts, [[0, 1, 2, 3], [4, 5, 6], [7, 8, 9]])
+        self.assertEqual(partition([1, 2], 5), [[1], [2]])
+    
+    def test_partitioned_matches_single_pass(self):
+        """Test that merged partition results are identical to a single pass."""
+        data = make_sales(2000)
+        single = create_online_analysis("sales")
+        single.update(data)
+        expected = exact_results(single)
+        
+        for partitions in (2, 7, 16):
+            merged = analyze_partitioned(data, kind="sales", partitions=partitions)
+            self.assertEqual(exact_results(merged), expected)
+            self.assertEqual(list(merged.result()["sales_by_product"]), list(expected["sales_by_product"]))
+            self.assertEqual(
+                merged.result()["approximate_statistics"]["distinct_products"],
+                single.result()["approximate_statistics"]["distinct_products"]
+            )
+    
+    def test_state_round_trips_through_json(self):
+        """Test that serialized states can be restored and merged."""
+        data = [
+            {"category": "a" if i % 3 else 1, "value": i * 0.1 if i % 5 else None}
+            for i in range(300)
+        ]
+        single = create_online_analysis("generic")
+        single.update(data)
+        
+        merged = create_online_analysis("generic")
+        for part in partition(data, 4):
+            analysis = create_online_analysis("generic")
+            analysis.update(part)
+            merged.merge(analysis_from_state(json.loads(json.dumps(analysis.get_state()))))
+        
+        self.assertEqual(exact_results(merged), exact_results(single))
+        self.assertEqual(merged.record_count, 300)
+    
+    def test_merge_rejects_other_kind(self):
+        """Test that analyses of different kinds cannot be merged."""
+        with self.assertRaises(ValueError):
+            create_online_analysis("sales").merge(create_online_analysis("feedback"))
+    
+    def test_process_pool(self):
+        """Test analysis across worker processes."""
+        data = make_sales(500)
+        single = analyze_partitioned(data)
+        pooled = analyze_partitioned(data, processes=2)
+        self.assertEqual(exact_results(pooled), exact_results(single))
+
+class TestAnomalyDetection(unittest.TestCase):
+    """Test cases for the anomaly detectors."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.data = make_sales(1000)
+        for item in self.data:
+            item["price"] = 10.0 + item["quantity"]
+        self.data[123]["price"] = 900.0
+    
+    def test_quantiles_and_robust_scale(self):
+        """Test quantiles with linear interpolation and the MAD scale."""
+        self.assertEqual(quantiles([4, 1, 3, 2], [0.0, 0.5, 1.0]), [1, 2.5, 4])
+        center, scale = robust_scale([1, 2, 3, 4, 100])
+        self.assertEqual(center, 3)
+        self.assertAlmostEqual(scale, 1.4826)
+    
+    def test_rolling_deviation(self):
+        """Test that a spike in the daily series is flagged."""
+        totals = {f"2023-01-{day:02d}": 100.0 + day % 3 for day in range(1, 21)}
+        totals["2023-01-15"] = 500.0
+        periods = rolling_deviation(totals)
+        self.assertEqual([p["period"] for p in periods], ["2023-01-15"])
+        self.assertGreater(periods[0]["zscore"], 3)
+    
+    def test_rolling_deviation_large_totals(self):
+        """Test that small deviations on large totals keep their precision."""
+        totals = {f"2023-01-{day:02d}": 1e9 + day % 3 for day in range(1, 21)}
+        totals["2023-01-15"] = 1e9 + 10
+        periods = rolling_deviation(totals)
+        self.assertEqual([p["period"] for p in periods], ["2023-01-15"])
+        self.assertGreater(periods[0]["zscore"], 3)
+    
+    def test_detect_outlier(self):
+        """Test that an injected outlier is the only anomaly found."""
+        result = AnomalyDetector().detect(self.data)
+        self.assertEqual(result["value_field"], "revenue")
+        self.assertEqual([a["item"] for a in result["anomalies"]], [self.data[123]])
+        self.assertIn("Outlier value detected", result["anomalies"][0]["reason"])
+        self.assertGreater(result["anomalies"][0]["anomaly_score"], 0.9)
+        self.assertEqual(result["total_items"], 1000)
+    
+    def test_group_outlier(self):
+        """Test values that are only unusual within their group."""
+        data = [
+            {"region": "North", "value": 98.0 + i % 5} if i % 4 == 0 else {"region": "South", "value": 60.0 + i % 81}
+            for i in range(400)
+        ]
+        data[8]["value"] = 130.0
+        result = AnomalyDetector().detect(data)
+        self.assertEqual([a["item"] for a in result["anomalies"]], [data[8]])
+        self.assertIn("Unusual for region North", result["anomalies"][0]["reason"])
+        self.assertEqual(result["detector_counts"]["robust_zscore"], 0)
+    
+    def test_streaming_detector(self):
+        """Test that the streaming detector finds the outlier batch by batch."""
+        detector = StreamingAnomalyDetector(sample_size=500)
+        found = []
+        for start in range(0, len(self.data), 100):
+            found.extend(detector.update(self.data[start:start + 100]))
+        self.assertEqual([a["item"] for a in found], [self.data[123]])
+        summary = detector.summary()
+        self.assertEqual(summary["total_items"], 1000)
+        self.assertEqual(summary["anomaly_count"], 1)
+
+class TestKeywordMatcher(unittest.TestCase):
+    """Test cases for the compiled keyword matcher."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.topics = [
+            {"name": "Quality", "keywords": ["quality", "good", "Great", "good"]},
+            {"name": "Service", "keywords": ["customer service", "help"]},
+            {"name": "Apps", "keywords": ["app", "e-mail"]},
+            {"name": "Quality", "keywords": ["poor"]}
+        ]
+        self.texts = [
+            "Great quality, good value",
+            "The CUSTOMER SERVICE team helped me",
+            "Happy with the apple; e-mail was late",
+            "poor",
+            "",
+            "nothing relevant here"
+        ]
+    
+    def test_scores_match_substring_rule(self):
+        """Test that scores equal counting keywords found with a substring test."""
+        matcher = KeywordMatcher(self.topics)
+        for text in self.texts:
+            expected = [
+                sum(1 for keyword in topic["keywords"] if keyword.lower() in text.lower())
+                for topic in self.topics
+            ]
+            self.assertEqual(matcher.scores(text), expected, text)
+    
+    def test_assign_and_distribution(self):
+        """Test tie-breaking and the per-name distribution."""
+        matcher = KeywordMatcher(self.topics)
+        assigned = matcher.assign_all(self.texts)
+        self.assertEqual(assigned, [0, 1, 2, 3, 0, 0])
+        self.assertEqual(matcher.distribution(assigned), {"Quality": 4, "Service": 1, "Apps": 1})
+        self.assertEqual(KeywordMatcher([]).assign("anything"), -1)
+
+def make_feedback_texts(count, seed=0):
+    rng = random.Random(seed)
+    themes = [
+        ["delivery", "late", "shipping", "package", "courier"],
+        ["price", "expensive", "cost", "discount", "value"],
+        ["app", "crash", "login", "screen", "update"]
+    ]
+    return [" ".join(rng.choice(themes[i % 3]) for _ in range(6)) + " for the product" for i in range(count)]
+
+class TestTextClustering(unittest.TestCase):
+    """Test cases for TF-IDF clustering."""
+    
+    def test_corpus_vocabulary_grows_incrementally(self):
+        """Test tokenization, CSR term counts and vocabulary growth."""
+        self.assertEqual(tokenize("The app crashed 3 times, app!"), ["app", "crashed", "times", "app"])
+        corpus = TextCorpus()
+        corpus.add(["late late delivery"])
+        corpus.add(["delivery price"])
+        self.assertEqual(len(corpus), 2)
+        self.assertEqual(corpus.terms, ["late", "delivery", "price"])
+        self.assertEqual(list(corpus.document_frequency), [1, 2, 1])
+        self.assertEqual(list(corpus.counts[corpus.indptr[0]:corpus.indptr[1]]), [2, 1])
+        
+        features, weights = corpus.vector(0, corpus.idf(), corpus.select_features())
+        self.assertEqual(features, [0, 1])
+        self.assertAlmostEqual(sum(w * w for w in weights), 1.0)
+    
+    def test_cluster_texts_separates_themes(self):
+        """Test that documents on distinct themes land in distinct topics."""
+        texts = make_feedback_texts(300)
+        result = cluster_texts(texts, n_clusters=3)
+        self.assertEqual(len(result["topics"]), 3)
+        for theme in range(3):
+            labels = set(result["labels"][theme::3])
+            self.assertEqual(len(labels), 1)
+        self.assertEqual(len(set(result["labels"])), 3)
+        self.assertTrue(all(0 < s <= 1.0 + 1e-9 for s in result["similarities"]))
+    
+    def test_mini_batch_assigned_before_update(self):
+        """Test that a mini-batch is assigned to the centers as they were before the batch."""
+        kmeans = MiniBatchKMeans(2, 2)
+        kmeans.centers = [array("d", [1.0, 0.0]), array("d", [0.0, 1.0])]
+        kmeans.scales = [1.0, 1.0]
+        kmeans.counts = [1, 1]
+        # Moving the second center toward the first vector would also win it the second
+        kmeans.partial_fit([([0, 1], [0.6, 0.8]), ([0, 1], [0.72, 0.69])])
+        self.assertEqual(kmeans.counts, [2, 2])
+    
+    def test_corpus_cache_extends_cached_prefix(self):
+        """Test that a cached corpus is reused and only new documents are added."""
+        texts = make_feedback_texts(50)
+        with tempfile.TemporaryDirectory() as directory:
+            cache = CorpusCache(directory)
+            first = cache.load("feedback", texts[:30])
+            self.assertEqual(len(first), 30)
+            
+            extended = cache.load("feedback", texts)
+            fresh = TextCorpus()
+            fresh.add(texts)
+            self.assertEqual(len(extended), 50)
+            self.assertEqual(extended.fingerprint, fresh.fingerprint)
+            self.assertEqual(list(extended.indices), list(fresh.indices))
+            
+            # The stored corpus is read back as it was written
+            stored = TextCorpus.from_bytes(extended.to_bytes())
+            for name in ("terms", "document_frequency", "indptr", "indices", "counts", "fingerprint"):
+                self.assertEqual(getattr(stored, name), getattr(fresh, name))
+            self.assertEqual(stored.term_ids, fresh.term_ids)
+            with self.assertRaises(ValueError):
+                TextCorpus.from_bytes(extended.to_bytes()[:-4])
+            
+            # A different corpus under the same key is rebuilt
+            rebuilt = cache.load("feedback", texts[5:])
+            self.assertEqual(len(rebuilt), 45)
+
+class TestSketches(unittest.TestCase):
+    """Test cases for the mergeable sketches."""
+    
+    def test_kll_quantiles(self):
+        """Test quantile estimates stay within the rank error bound after merging."""
+        values = list(range(20000))
+        random.Random(3).shuffle(values)
+        left, right = KLLSketch(), KLLSketch(seed=1)
+        left.update_many(values[:12000])
+        right.update_many(values[12000:])
+        left.merge(KLLSketch.from_state(json.loads(json.dumps(right.get_state()))))
+        
+        self.assertEqual(left.count, 20000)
+        self.assertLess(sum(len(level) for level in left.levels), 2000)
+        for q in (0.1, 0.5, 0.9):
+            self.assertAlmostEqual(left.quantile(q), q * 20000, delta=20000 * 0.03)
+        self.assertEqual(left.quantiles([0, 1]), [0, 19999])
+        self.assertEqual(KLLSketch().quantile(0.5), None)
+    
+    def test_hyperloglog_distinct_count(self):
+        """Test distinct counts for small and large cardinalities and merge exactness."""
+        small = HyperLogLog()
+        small.add_many(["a", "b", "a", 1, "1"])
+        self.assertEqual(small.count(), 4)
+        
+        left, right, whole = HyperLogLog(), HyperLogLog(), HyperLogLog()
+        left.add_many(range(0, 60000))
+        right.add_many(range(40000, 100000))
+        whole.add_many(range(100000))
+        left.merge(right)
+        self.assertEqual(left.registers, whole.registers)
+        self.assertAlmostEqual(left.count(), 100000, delta=100000 * 0.05)
+        
+        with self.assertRaises(ValueError):
+            left.merge(HyperLogLog(precision=10))
+    
+    def test_numbers_hash_by_value(self):
+        """Test that equal numbers of different types are one sketch item."""
+        distinct = HyperLogLog()
+        distinct.add_many([1, 1.0, True, 2.5, "1"])
+        self.assertEqual(distinct.count(), 3)
+        
+        sketch = CountMinSketch(width=256)
+        sketch.add(7)
+        sketch.add(7.0)
+        self.assertEqual(sketch.estimate(7), 2)
+    
+    def test_count_min_and_top_k(self):
+        """Test that estimates never undercount and heavy hitters are found."""
+        items = [f"P{i}" for i in range(1000)] + ["hot"] * 500 + ["warm"] * 200
+        random.Random(5).shuffle(items)
+        
+        sketch = CountMinSketch(width=256)
+        for item in items:
+            sketch.add(item)
+        self.assertGreaterEqual(sketch.estimate("hot"), 500)
+        self.assertGreaterEqual(sketch.estimate("P1"), 1)
+        
+        left, right = TopK(k=2, width=256), TopK(k=2, width=256)
+        left.add_many(items[:800])
+        right.add_many(items[800:])
+        left.merge(TopK.from_state(json.loads(json.dumps(right.get_state()))))
+        self.assertEqual([item for item, _ in left.top()], ["hot", "warm"])
+    
+    def test_analysis_outputs(self):
+        """Test that analyses expose the sketch outputs."""
+        analysis = create_online_analysis("sales")
+        data = make_sales(300)
+        for item in data:
+            item["customer_id"] = item["quantity"]
+        analysis.update(data)
+        approximate = analysis.result()["approximate_statistics"]
+        
+        self.assertEqual(approximate["distinct_products"], 20)
+        self.assertEqual(approximate["distinct_customers"], 9)
+        self.assertEqual(set(approximate["revenue_quantiles"]), {"p25", "p50", "p75", "p90", "p99"})
+        self.assertEqual(len(approximate["top_products"]), 10)
+        self.assertIn("estimated_count", approximate["top_products"][0])
+
+    def test_analysis_without_sketches(self):
+        """Test that analyses without sketches omit their outputs and keep the exact ones."""
+        data = make_sales(300)
+        with_sketches = create_online_analysis("sales")
+        with_sketches.update(data)
+        analysis = create_online_analysis("sales", sketches=False)
+        analysis.update(data)
+        
+        self.assertEqual(analysis.result(), exact_results(with_sketches))
+        restored = analysis_from_state(json.loads(json.dumps(analysis.get_state())))
+        self.assertNotIn("approximate_statistics", restored.result())
+        self.assertNotIn("approximate_statistics", with_sketches.merge(restored).result())
+
+class TestIncrementalAnalysis(unittest.TestCase):
+    """Test cases for the incremental re-analysis cache."""
+    
+    def test_partition_records(self):
+        """Test partitioning by date bucket."""
+        data = make_sales(200)
+        days = partition_records(data)
+        months = partition_records(data, bucket="month")
+        self.assertEqual(sum(len(part) for part in days.values()), 200)
+        self.assertEqual(list(months), ["2023-01"])
+    
+    def test_only_changed_partitions_recomputed(self):
+        """Test that appends and edits only recompute their partitions."""
+        data = make_sales(2000)
+        cache = AnalysisCache()
+        
+        first, counts = analyze_incremental(cache, "sales.csv", data)
+        self.assertEqual(counts["reused"], 0)
+        self.assertEqual(counts["recomputed"], counts["partitions"])
+        
+        appended = data + [dict(item, date="2023-02-01") for item in make_sales(100, seed=8)]
+        analysis, counts = analyze_incremental(cache, "sales.csv", appended)
+        self.assertEqual(counts["recomputed"], 1)
+        self.assertEqual(counts["reused"], counts["partitions"] - 1)
+        full = create_online_analysis("sales")
+        full.update(appended)
+        self.assertEqual(exact_results(analysis), exact_results(full))
+        
+        edited = [dict(item) for item in appended]
+        edited[0]["price"] += 1.0
+        _, counts = analyze_incremental(cache, "sales.csv", edited)
+        self.assertEqual(counts["recomputed"], 1)
+        
+        # Sources are cached independently
+        _, counts = analyze_incremental(cache, "other.csv", data)
+        self.assertEqual(counts["reused"], 0)
+        self.assertEqual(exact_results(first), exact_results(analyze_incremental(cache, "other.csv", data)[0]))
+    
+    def test_persisted_cache(self):
+        """Test that partition states survive a restart and can be invalidated."""
+        data = make_sales(500)
+        with tempfile.TemporaryDirectory() as directory:
+            first, _ = analyze_incremental(AnalysisCache(directory), "sales.csv", data)
+            
+            cache = AnalysisCache(directory)
+            second, counts = analyze_incremental(cache, "sales.csv", data)
+            self.assertEqual(counts["recomputed"], 0)
+            self.assertEqual(exact_results(second), exact_results(first))
+            
+            cache.invalidate("sales.csv", "2023-01-05")
+            _, counts = analyze_incremental(AnalysisCache(directory), "sales.csv", data)
+            self.assertEqual(counts["recomputed"], 1)
+    
+    def test_fingerprints_and_persistence_are_exact(self):
+        """Test that fingerprints depend only on content and that states JSON cannot restore stay in memory."""
+        # Equal records hash alike whether or not they share their strings
+        shared = "2023-01-01"
+        copies = ["".join(["2023-", "01-01"]), "".join(["2023-01", "-01"])]
+        self.assertEqual(
+            fingerprint_records([{"date": shared}, {"date": shared}]),
+            fingerprint_records([{"date": copies[0]}, {"date": copies[1]}])
+        )
+        self.assertNotEqual(fingerprint_records([{"price": 1}]), fingerprint_records([{"price": 1.0}]))
+        self.assertNotEqual(
+            fingerprint_records([{"date": datetime.date(2023, 1, 1)}]), fingerprint_records([{"date": "2023-01-01"}])
+        )
+        
+        data = [{"product_id": datetime.date(2023, 1, 1), "quantity": 1, "price": 2.0, "date": "2023-01-01"}]
+        with tempfile.TemporaryDirectory() as directory:
+            cache = AnalysisCache(directory)
+            analyze_incremental(cache, "sales.csv", data, "sales")
+            _, counts = analyze_incremental(cache, "sales.csv", data, "sales")
+            self.assertEqual(counts["recomputed"], 0)
+            _, counts = analyze_incremental(AnalysisCache(directory), "sales.csv", data, "sales")
+            self.assertEqual(counts["recomputed"], 1)
+
+class TestSchemaInference(unittest.TestCase):
+    """Test cases for sampled schema inference and the schema registry."""
+    
+    def test_infer_schema(self):
+        """Test field types, nullable fields and the analysis kind."""
+        data = make_sales(5000)
+        for i, item in enumerate(data):
+            item["quantity"] = float(item["quantity"]) if i % 3 == 1 else item["quantity"]
+            item["note"] = None if i % 3 else "gift"
+        
+        schema = infer_schema(data, sample_size=500)
+        self.assertEqual(schema.kind, "sales")
+        self.assertEqual(schema.sample_size, 500)
+        self.assertEqual(schema.fields["quantity"], "float")
+        self.assertEqual(schema.fields["date"], "date")
+        self.assertEqual(schema.fields["product_id"], "str")
+        self.assertEqual(schema.nullable, {"note"})
+        self.assertEqual(schema.fields_of_type("int", "float"), ["quantity", "price"])
+        
+        self.assertEqual(infer_schema([{"id": 1, "feedback": "ok"}]).kind, "feedback")
+        self.assertEqual(infer_schema([{"id": 1, "value": 2}]).kind, "generic")
+        self.assertEqual(infer_schema([]).kind, "generic")
+    
+    def test_sample_records(self):
+        """Test that samples span the whole sequence."""
+        sample = sample_records(list(range(1000)), 10)
+        self.assertEqual(sample, list(range(0, 1000, 100)))
+        self.assertEqual(sample_records(iter(range(1000)), 3), [0, 1, 2])
+    
+    def test_registry(self):
+        """Test per-source caching and declared schemas."""
+        registry = SchemaRegistry()
+        data = make_sales(100)
+        schema = registry.resolve(data, {"source": "sales.csv"})
+        self.assertIs(registry.resolve(data, {"source": "sales.csv"}), schema)
+        self.assertIs(registry.for_result({"source_metadata": {"source": "sales.csv"}}), schema)
+        
+        # A source whose data changes kind is inferred again
+        feedback = [{"id": 1, "feedback": "ok", "rating": 4}]
+        self.assertEqual(registry.resolve(feedback, {"source": "sales.csv"}).kind, "feedback")
+        
+        declared = {"fields": ["id", "rating"], "kind": "feedback"}
+        schema = registry.resolve(data, {"source": "reviews", "schema": declared})
+        self.assertTrue(schema.declared)
+        self.assertEqual(schema.kind, "feedback")
+        self.assertIs(registry.resolve(data, {"source": "reviews", "schema": declared}), schema)
+        self.assertEqual(DataSchema.from_dict(schema.to_dict()).to_dict(), schema.to_dict())
+        
+        registry.invalidate("reviews")
+        self.assertIsNone(registry.get("reviews"))
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,602 @@
+"""
+Tests for the data-plane components.
+"""
+import sys
+import os
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import csv
+import json
+import sqlite3
+import struct
+import tempfile
+import unittest
+
+from orchestrator.data.channel import BatchChannel
+from orchestrator.data.connectors import (
+    CONNECTORS, CSVConnector, Connector, JSONLConnector, SQLiteConnector, create_connector, pq,
+    register_connector, resolve_connector_name
+)
+from orchestrator.data.extract_cache import ExtractCache
+from orchestrator.data.mmap_reader import column_types, read_mapped
+from orchestrator.data.preprocessing import PreprocessingPipeline
+from orchestrator.data.query_plan import QueryPlan, plan_for_request
+from orchestrator.data.record_batch import RecordBatch
+from orchestrator.data.transport import (
+    available_codecs, decode_batch, decode_payload, encode_batch, encode_payload, lz4_frame
+)
+from orchestrator.agents.data_extraction_agent import DataExtractionAgent
+from orchestrator.agents.statistical_analysis_agent import StatisticalAnalysisAgent
+from orchestrator.utils.clock import frozen_clock
+from orchestrator.utils.serialization import json_default
+
+RECORDS = [
+    {"id": i, "product_id": f"P{i % 3}", "price": i * 1.5, "region": ["North", "South"][i % 2], "date": "2023-01-01"}
+    for i in range(25)
+]
+
+def collect(connector):
+    async def run():
+        return [batch async for batch in connector.batches()]
+    return asyncio.run(run())
+
+class TestConnectors(unittest.TestCase):
+    """Test cases for the streaming data-source connectors."""
+    
+    def setUp(self):
+        """Write the test records in every supported format."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.directory.name, "sales.csv")
+        with open(self.csv_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(RECORDS[0]))
+            writer.writeheader()
+            writer.writerows(RECORDS)
+        
+        self.jsonl_path = os.path.join(self.directory.name, "sales.jsonl")
+        with open(self.jsonl_path, "w") as f:
+            f.writelines(json.dumps(record) + "\n" for record in RECORDS)
+        
+        self.sqlite_path = os.path.join(self.directory.name, "sales.db")
+        connection = sqlite3.connect(self.sqlite_path)
+        connection.execute("CREATE TABLE sales (id INTEGER, product_id TEXT, price REAL, region TEXT, date TEXT)")
+        connection.executemany(
+            "INSERT INTO sales VALUES (:id, :product_id, :price, :region, :date)", RECORDS
+        )
+        connection.commit()
+        connection.close()
+    
+    def tearDown(self):
+        """Remove the test files."""
+        self.directory.cleanup()
+    
+    def test_batches_and_stats(self):
+        """Test that every connector streams the same records in bounded batches."""
+        connectors = [
+            CSVConnector(self.csv_path, batch_size=10),
+            JSONLConnector(self.jsonl_path, batch_size=10),
+            SQLiteConnector(self.sqlite_path, batch_size=10, table="sales")
+        ]
+        for connector in connectors:
+            batches = collect(connector)
+            self.assertEqual([len(batch) for batch in batches], [10, 10, 5], connector.name)
+            self.assertEqual([record for batch in batches for record in batch], RECORDS, connector.name)
+            self.assertEqual(connector.stats.rows, 25)
+            self.assertEqual(connector.stats.batches, 3)
+            self.assertGreater(connector.stats.bytes, 0)
+            self.assertGreater(connector.describe()["throughput"]["rows_per_second"], 0)
+        
+        # File connectors count every byte of the file
+        self.assertEqual(connectors[1].stats.bytes, os.path.getsize(self.jsonl_path))
+    
+    def test_registry(self):
+        """Test connector lookup by extension, scheme and explicit type."""
+        self.assertEqual(resolve_connector_name("data/sales.CSV"), "csv")
+        self.assertEqual(resolve_connector_name("events.ndjson"), "jsonl")
+        self.assertEqual(resolve_connector_name("sqlite:///tmp/app.db"), "sqlite")
+        self.assertIsNone(resolve_connector_name("customer feedback"))
+        
+        connector = create_connector({"location": f"sqlite:///{self.sqlite_path}", "query": "SELECT id FROM sales WHERE id < ?", "parameters": (3,)})
+        self.assertEqual(asyncio.run(connector.read_all()), [{"id": 0}, {"id": 1}, {"id": 2}])
+        with self.assertRaises(ValueError):
+            create_connector("report.xlsx")
+        
+        class ListConnector(Connector):
+            name = "list"
+            
+            def _read_batches(self):
+                yield [{"id": 1}], 0
+        
+        register_connector("list", ListConnector, (".list",))
+        self.addCleanup(CONNECTORS.pop, "list")
+        self.assertIsInstance(create_connector("numbers.list"), ListConnector)
+    
+    def test_partitioned_reads(self):
+        """Test concurrent range-partitioned reads through a shared connection pool."""
+        by_id = sorted(RECORDS, key=lambda record: record["id"])
+        for column, ordered in (("id", True), ("id", False), ("region", True)):
+            connector = SQLiteConnector(
+                self.sqlite_path, batch_size=4, table="sales", partition_column=column,
+                partitions=3, ordered=ordered, pool_size=2
+            )
+            records = [record for batch in collect(connector) for record in batch]
+            self.assertEqual(sorted(records, key=lambda record: record["id"]), by_id, (column, ordered))
+            self.assertEqual(connector.stats.rows, 25)
+            if ordered:
+                self.assertEqual(records, sorted(records, key=lambda record: record[column]))
+        
+        pool = connector.pool
+        self.assertIs(SQLiteConnector(self.sqlite_path, table="sales").pool, pool)
+        self.assertEqual(pool.to_dict()["created"], 2)
+        self.assertEqual(pool.to_dict()["idle"], 2)
+        
+        async def borrow():
+            async with pool.acquire() as first, pool.acquire() as second:
+                self.assertIsNot(first, second)
+                # Both connections are in use, so a third borrower waits
+                with self.assertRaises(asyncio.TimeoutError):
+                    await asyncio.wait_for(pool.acquire().__aenter__(), 0.05)
+        
+        asyncio.run(borrow())
+        pool.close()
+        with self.assertRaises(RuntimeError):
+            asyncio.run(borrow())
+    
+    def test_incremental_extraction(self):
+        """Test that a refresh fetches only rows from the high-water mark on and merges them."""
+        new_rows = [dict(RECORDS[0], id=25 + i, date=f"2023-01-0{1 + i}") for i in range(3)]
+        watermark_dir = os.path.join(self.directory.name, "watermarks")
+        
+        def append_sqlite(rows):
+            connection = sqlite3.connect(self.sqlite_path)
+            connection.executemany("INSERT INTO sales VALUES (:id, :product_id, :price, :region, :date)", rows)
+            connection.commit()
+            connection.close()
+        
+        def append_jsonl(rows):
+            with open(self.jsonl_path, "a") as f:
+                f.writelines(json.dumps(row) + "\n" for row in rows)
+        
+        sources = [
+            ({"connector": {"location": self.sqlite_path, "table": "sales"}}, append_sqlite),
+            ({"data_source": self.jsonl_path}, append_jsonl)
+        ]
+        for request, append in sources:
+            request = {**request, "incremental": True}
+            first = asyncio.run(DataExtractionAgent({"watermark_dir": watermark_dir}).extract_data(request))
+            self.assertEqual(first["metadata"]["incremental"]["mark"], "2023-01-01")
+            self.assertTrue(first["metadata"]["incremental"]["full_reload"])
+            
+            append(new_rows)
+            # A new agent picks up the persisted mark and extract
+            refreshed = asyncio.run(DataExtractionAgent({"watermark_dir": watermark_dir}).extract_data(request))
+            incremental = refreshed["metadata"]["incremental"]
+            self.assertEqual((incremental["previous_mark"], incremental["mark"]), ("2023-01-01", "2023-01-03"))
+            self.assertEqual((incremental["rows_fetched"], incremental["rows_cached"]), (28, 0))
+            self.assertEqual(sorted(row["id"] for row in refreshed["data"]), list(range(28)))
+            self.assertEqual(set(refreshed["metadata"]["partition_fingerprints"]), {"2023-01-01", "2023-01-02", "2023-01-03"})
+            
+            again = asyncio.run(DataExtractionAgent({"watermark_dir": watermark_dir}).extract_data(request))
+            self.assertEqual(again["metadata"]["incremental"]["rows_fetched"], 1)
+            self.assertEqual(again["data"].to_records(), refreshed["data"].to_records())
+            self.assertEqual(
+                again["metadata"]["partition_fingerprints"], refreshed["metadata"]["partition_fingerprints"]
+            )
+    
+    def test_query_plan_pushdown(self):
+        """Test that every connector returns only the planned columns and rows."""
+        plan = QueryPlan(["id", "price"], [("region", "==", "North"), ("price", ">=", 15), ("product_id", "in", ["P0", "P1"])])
+        expected = [
+            {"id": record["id"], "price": record["price"], "region": "North", "product_id": record["product_id"]}
+            for record in RECORDS
+            if record["region"] == "North" and record["price"] >= 15 and record["product_id"] != "P2"
+        ]
+        connectors = [
+            CSVConnector(self.csv_path, batch_size=4, plan=plan),
+            JSONLConnector(self.jsonl_path, batch_size=4, plan=plan.to_dict()),
+            SQLiteConnector(self.sqlite_path, batch_size=4, table="sales", plan=plan),
+            SQLiteConnector(self.sqlite_path, batch_size=4, table="sales", plan=plan, partition_column="id", partitions=3)
+        ]
+        for connector in connectors:
+            records = [record for batch in collect(connector) for record in batch]
+            self.assertEqual(records, expected, connector.name)
+        
+        # A plan for other data leaves the columns alone but still filters
+        foreign = QueryPlan(["id", "rating", "feedback"], [("region", "==", "South"), ("rating", ">", 3)], required=["feedback"])
+        records = asyncio.run(SQLiteConnector(self.sqlite_path, table="sales", plan=foreign).read_all())
+        self.assertEqual(records, [record for record in RECORDS if record["region"] == "South"])
+    
+    @unittest.skipIf(pq is not None, "pyarrow is installed")
+    def test_parquet_requires_pyarrow(self):
+        """Test that reading Parquet without pyarrow fails clearly."""
+        with self.assertRaises(ImportError):
+            collect(create_connector("sales.parquet"))
+
+class TestRecordBatch(unittest.TestCase):
+    """Test cases for the columnar record batch."""
+    
+    def test_columns_and_row_views(self):
+        """Test column encodings and the dictionary rows read back from them."""
+        records = RECORDS + [{"id": 25, "product_id": None, "note": ["x"]}, "not a record"]
+        batch = RecordBatch.from_records(records)
+        self.assertEqual(len(batch), 27)
+        self.assertEqual(list(batch.columns), ["id", "product_id", "price", "region", "date", "note"])
+        self.assertIsInstance(batch.columns["price"], list)
+        self.assertEqual(RecordBatch.from_records(RECORDS).columns["price"].typecode, "d")
+        self.assertEqual(batch.columns["product_id"].categories, ["P0", "P1", "P2", None])
+        self.assertIsInstance(batch.columns["id"], list)
+        self.assertEqual(batch[3], {**RECORDS[3], "note": None})
+        self.assertEqual(batch[-2]["note"], ["x"])
+        self.assertEqual(batch.to_records()[:25], [{**record, "note": None} for record in RECORDS])
+        self.assertTrue(batch.has_nulls("product_id"))
+        self.assertFalse(batch.has_nulls("region") and batch.has_nulls("unknown"))
+        self.assertGreater(batch.nbytes, 0)
+        
+        # Slices are batches whose string codes restart at zero
+        part = RecordBatch.from_records(RECORDS)[4:7]
+        self.assertEqual(part.to_records(), RECORDS[4:7])
+        self.assertEqual(part.columns["product_id"].categories, ["P1", "P2", "P0"])
+        self.assertEqual(part.frame().group_sum("product_id", [1, 1, 1]), {"P1": 1, "P2": 1, "P0": 1})
+        
+        joined = RecordBatch.concat([RecordBatch.from_records(RECORDS[:10]), RecordBatch.from_records(RECORDS[10:])])
+        self.assertEqual(joined.to_records(), RECORDS)
+        self.assertEqual(joined.columns["product_id"].categories, ["P0", "P1", "P2"])
+        self.assertEqual(joined.columns["id"].typecode, "q")
+        
+        self.assertEqual(RecordBatch.from_records(RECORDS).schema.kind, "sales")
+        self.assertEqual(json.loads(json.dumps({"data": part}, default=json_default))["data"], RECORDS[4:7])
+        with self.assertRaises(ValueError):
+            RecordBatch({"a": [1, 2], "b": [1]})
+    
+    def test_agents_use_batches(self):
+        """Test that extraction produces batches analyzed like the records they hold."""
+        async def run():
+            extraction_agent = DataExtractionAgent()
+            analysis_agent = StatisticalAnalysisAgent()
+            results = []
+            for source, method in [
+                ("customer feedback", analysis_agent._analyze_feedback_data),
+                ("sales", analysis_agent._analyze_sales_data),
+                ("inventory", analysis_agent._analyze_generic_data)
+            ]:
+                batch = (await extraction_agent.extract_data({"data_source": source}))["data"]
+                results.append((batch, await method(batch), await method(batch.to_records())))
+            return results
+        
+        for batch, from_batch, from_records in asyncio.run(run()):
+            self.assertIsInstance(batch, RecordBatch)
+            self.assertEqual(from_batch, from_records)
+
+class TestMmapReader(unittest.TestCase):
+    """Test cases for the memory-mapped columnar readers."""
+    
+    def setUp(self):
+        """Create a directory for the test files."""
+        self.directory = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        """Remove the test files."""
+        self.directory.cleanup()
+    
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+    
+    def test_delimited_columns(self):
+        """Test type detection, widening and dictionary encoding across chunks."""
+        lines = [b"id;amount;code;region"]
+        for i in range(40):
+            amount = b"" if i == 30 else str(i * 0.5 if i >= 20 else i).encode()
+            code = b"X9" if i == 35 else str(i).encode()
+            lines.append(b";".join([str(i).encode(), amount, code, [b"North", b"South"][i % 2]]))
+        path = self.write("sales.txt", b"\r\n".join(lines) + b"\r\n")
+        
+        mapped, frame = read_mapped(path, delimiter=";", types={"id": "str"}, chunk_size=64)
+        self.assertEqual(len(frame), 40)
+        self.assertEqual(column_types(frame), {"id": "str", "amount": "float", "code": "str", "region": "str"})
+        self.assertEqual(list(frame.columns["id"])[:3], ["0", "1", "2"])
+        self.assertEqual(list(frame.columns["amount"])[19:22], [19.0, 10.0, 10.5])
+        self.assertNotEqual(frame.columns["amount"][30], frame.columns["amount"][30])
+        self.assertEqual(list(frame.columns["code"])[34:36], ["34", "X9"])
+        self.assertEqual(frame.columns["region"].categories, ["North", "South"])
+        self.assertEqual(frame.group_sum("region", [1] * 40), {"North": 20, "South": 20})
+        mapped.close()
+        self.assertTrue(mapped.closed)
+        
+        with self.assertRaises(ValueError):
+            read_mapped(self.write("ragged.csv", b"a,b\n1,2\n3\n"))
+    
+    def test_widened_column_keeps_text(self):
+        """Test that a column widened to strings in a later chunk keeps the text of earlier values."""
+        path = self.write("zips.csv", b"zip,n\n007,1\n01.50,2\n,3\nA12,4\n")
+        
+        for chunk_size in (1, 8, 1 << 20):
+            mapped, frame = read_mapped(path, chunk_size=chunk_size)
+            self.assertEqual(list(frame.columns["zip"]), ["007", "01.50", "", "A12"])
+            self.assertEqual(list(frame.columns["n"]), [1, 2, 3, 4])
+            mapped.close()
+    
+    def test_fixed_records(self):
+        """Test reading fixed-size binary records."""
+        layout = [("id", "q"), ("value", "d"), ("category", "4s")]
+        data = b"".join(struct.pack("<qd4s", i, i * 1.5, [b"a", b"bc"][i % 2]) for i in range(5))
+        mapped, frame = read_mapped(self.write("values.bin", data), layout)
+        self.assertEqual(list(frame.columns["id"]), [0, 1, 2, 3, 4])
+        self.assertEqual(list(frame.columns["value"]), [0.0, 1.5, 3.0, 4.5, 6.0])
+        self.assertEqual(list(frame.columns["category"]), ["a", "bc", "a", "bc", "a"])
+        mapped.close()
+        
+        with self.assertRaises(ValueError):
+            read_mapped(self.write("short.bin", data[:-1]), layout)
+    
+    def test_mapped_extraction_matches_records(self):
+        """Test that analysis of mapped columns equals analysis of the same records."""
+        path = os.path.join(self.directory.name, "sales.csv")
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(RECORDS[0]))
+            writer.writeheader()
+            writer.writerows(RECORDS)
+        
+        async def run():
+            extraction = await DataExtractionAgent().extract_data({"data_source": path, "mmap": True})
+            agent = StatisticalAnalysisAgent()
+            return extraction, await agent._analyze_sales_data(extraction["data"]), await agent._analyze_sales_data(RECORDS)
+        
+        extraction, mapped_results, record_results = asyncio.run(run())
+        self.assertEqual(extraction["metadata"]["record_count"], 25)
+        self.assertEqual(extraction["metadata"]["schema"]["fields"]["price"], "float")
+        self.assertEqual(mapped_results, record_results)
+        extraction["mapped_file"].close()
+
+class TestPreprocessing(unittest.TestCase):
+    """Test cases for the preprocessing pipeline."""
+    
+    RAW = [
+        {"id": 1, "quantity": "3", "price": "2.5", "date": "2023/01/05", "feedback": "  Great\u00a0 product\n"},
+        {"id": 2, "quantity": None, "price": 4, "date": "05.02.2023", "feedback": "Too  slow"},
+        {"id": 1, "quantity": 9, "price": 9.0, "date": "2023-03-01", "feedback": "duplicate"},
+        {"id": None, "quantity": 1, "price": 1.0, "date": "2023-03-02", "feedback": "no id"},
+        {"id": 3, "quantity": "x", "price": None, "date": "someday", "feedback": None}
+    ]
+    
+    def test_stages(self):
+        """Test de-duplication, null handling, coercion, dates and text."""
+        pipeline = PreprocessingPipeline({"normalize": {"price": "minmax"}})
+        batch = pipeline.process(self.RAW)
+        self.assertIsInstance(batch, RecordBatch)
+        self.assertEqual(list(batch.columns["id"]), [1, 2, 3])
+        self.assertEqual(list(batch.columns["quantity"]), [3, 0, 0])
+        self.assertEqual(list(batch.columns["price"]), [2.5, 4.0, 0.0])
+        self.assertEqual(list(batch.columns["date"]), ["2023-01-05", "2023-02-05", "someday"])
+        self.assertEqual(list(batch.columns["feedback"]), ["Great product", "Too slow", None])
+        self.assertEqual(list(batch.columns["price_normalized"]), [0.625, 1.0, 0.0])
+        
+        stats = pipeline.stats
+        self.assertEqual((stats["rows_in"], stats["rows_out"]), (5, 3))
+        self.assertEqual(stats["stages"]["nulls"]["rows_dropped"], 1)
+        self.assertEqual(stats["stages"]["dedup"]["rows_dropped"], 1)
+        self.assertEqual(stats["stages"]["dates"]["unparsed"], {"date": 1})
+        self.assertTrue(all(stage["seconds"] >= 0 for stage in stats["stages"].values()))
+        
+        with self.assertRaises(ValueError):
+            PreprocessingPipeline({"stages": ["dedup", "sort"]})
+    
+    def test_streaming_matches_whole(self):
+        """Test that streamed batches are cleaned as one dataset."""
+        records = RECORDS + [dict(record, date=record["date"].replace("-", "/")) for record in RECORDS]
+        whole = PreprocessingPipeline().process(records)
+        
+        async def run():
+            pipeline = PreprocessingPipeline()
+            batches = [records[i:i + 10] for i in range(0, len(records), 10)]
+            return [batch async for batch in pipeline.stream(batches)], pipeline.stats
+        
+        streamed, stats = asyncio.run(run())
+        self.assertEqual(RecordBatch.concat(streamed).to_records(), whole.to_records())
+        self.assertEqual(stats["batches"], 5)
+        self.assertEqual(stats["stages"]["dedup"]["rows_dropped"], 25)
+    
+    def test_agent_preprocessing(self):
+        """Test preprocessing through the extraction agent, with streamed batches."""
+        agent = DataExtractionAgent({"preprocessing": {"stages": ["dedup", "dates"]}})
+        
+        async def run():
+            extracted = await agent.extract_data({"data_source": "sales"})
+            processed = await agent.preprocess_data(extracted)
+            streamed = await agent.preprocess_data({"batches": [RECORDS, RECORDS]})
+            return processed, [batch async for batch in streamed["batches"]], streamed["metadata"]
+        
+        processed, batches, metadata = asyncio.run(run())
+        self.assertEqual(processed["metadata"]["preprocessing_applied"], ["dedup", "dates"])
+        self.assertEqual(processed["metadata"]["record_count"], 10)
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(metadata["preprocessing"]["rows_out"], 25)
+
+class TestExtractCache(unittest.TestCase):
+    """Test cases for the extraction cache."""
+    
+    def setUp(self):
+        """Create a cache directory."""
+        self.directory = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        """Remove the cache directory."""
+        self.directory.cleanup()
+    
+    def test_ttl_and_invalidation(self):
+        """Test expiry, invalidation hooks and content-addressed blobs on disk."""
+        invalidated = []
+        with frozen_clock(1700000000.0) as clock:
+            cache = ExtractCache(self.directory.name, ttl=60)
+            cache.add_invalidation_hook(invalidated.append)
+            first = cache.put("a", "sales", {"data": RECORDS, "metadata": {"record_count": 25}})
+            clock.advance(30)
+            second = cache.put("b", "sales", {"data": RecordBatch.from_records(RECORDS), "metadata": {}})
+            self.assertEqual(first, second)
+            self.assertEqual(len([name for name in os.listdir(self.directory.name) if name.endswith(".blob")]), 1)
+            
+            # A new cache reads the persisted index
+            restored = ExtractCache(self.directory.name, ttl=60).get("a")
+            self.assertEqual(restored["data"].to_records(), RECORDS)
+            self.assertEqual(restored["metadata"], {"record_count": 25})
+            
+            clock.advance(31)
+            self.assertIsNone(cache.get("a"))
+            self.assertIsNotNone(cache.get("b")["data"])
+            cache.invalidate("sales")
+            self.assertIsNone(cache.get("b"))
+            self.assertEqual(invalidated, ["sales"])
+            self.assertFalse(any(name.endswith(".blob") for name in os.listdir(self.directory.name)))
+    
+    def test_agent_shares_loads(self):
+        """Test that concurrent extractions share one load and a changed source is reloaded."""
+        path = os.path.join(self.directory.name, "sales.csv")
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(RECORDS[0]))
+            writer.writeheader()
+            writer.writerows(RECORDS)
+        agent = DataExtractionAgent({"extract_cache_dir": os.path.join(self.directory.name, "cache")})
+        request = {"data_source": path, "materialize": True}
+        
+        async def run():
+            return await asyncio.gather(*[agent.extract_data(request) for _ in range(3)])
+        
+        results = asyncio.run(run())
+        self.assertEqual((agent.extract_cache.misses, agent.extract_cache.shared_loads), (1, 2))
+        self.assertTrue(all(result["data"] is results[0]["data"] for result in results))
+        
+        cached = asyncio.run(agent.extract_data(request))
+        self.assertTrue(cached["metadata"]["cached"])
+        self.assertEqual(cached["data"].to_records(), RECORDS)
+        
+        with open(path, "a", newline="") as f:
+            csv.DictWriter(f, fieldnames=list(RECORDS[0])).writerow(dict(RECORDS[0], id=25))
+        reloaded = asyncio.run(agent.extract_data(request))
+        self.assertFalse(reloaded["metadata"]["cached"])
+        self.assertEqual(len(reloaded["data"]), 26)
+
+class TestTransport(unittest.TestCase):
+    """Test cases for the batch and payload transport format."""
+    
+    def test_batch_frames(self):
+        """Test that a batch survives every codec, with or without copying its columns."""
+        batch = RecordBatch.from_records(RECORDS + [{"id": 25, "tags": ["a", "b"]}])
+        for codec in available_codecs():
+            frame = encode_batch(batch, codec)
+            viewed = decode_batch(frame)
+            copied = decode_batch(frame, copy=True)
+            self.assertEqual(viewed.to_records(), batch.to_records(), codec)
+            self.assertEqual(copied.to_records(), batch.to_records(), codec)
+            self.assertIsInstance(viewed.columns["id"], memoryview)
+            self.assertEqual(copied.columns["id"].typecode, "q")
+            self.assertEqual(viewed.columns["region"].categories, batch.columns["region"].categories)
+            self.assertEqual(viewed.take([1, 2]).to_records(), batch[1:3].to_records())
+        
+        # Uncompressed columns are views of the frame itself
+        frame = bytearray(encode_batch(batch, "none"))
+        viewed = decode_batch(frame)
+        self.assertIs(viewed.columns["id"].obj, frame)
+        with self.assertRaises(ValueError):
+            decode_batch(b"not a frame")
+        if lz4_frame is None:
+            with self.assertRaises(ValueError):
+                encode_batch(batch, "lz4")
+    
+    def test_payloads(self):
+        """Test that payloads keep their metadata and store each batch once."""
+        batch = RecordBatch.from_records(RECORDS)
+        payload = {"data": batch, "metadata": {"source": "sales", "record_count": 25}, "samples": [batch, batch[:5]]}
+        data = encode_payload(payload)
+        restored = decode_payload(data)
+        self.assertEqual(restored["metadata"], payload["metadata"])
+        self.assertEqual(restored["data"].to_records(), RECORDS)
+        self.assertIs(restored["samples"][0], restored["data"])
+        self.assertEqual(restored["samples"][1].to_records(), RECORDS[:5])
+        self.assertLess(len(data), len(encode_payload({**payload, "samples": [batch.to_records()]})))
+        with self.assertRaises(ValueError):
+            decode_payload(encode_batch(batch))
+
+class TestBatchChannel(unittest.TestCase):
+    """Test cases for bounded batch channels."""
+    
+    def test_backpressure(self):
+        """Test that a fast producer stays at most the channel size ahead of a slow consumer."""
+        async def run():
+            channel = BatchChannel(2)
+            producer = asyncio.ensure_future(channel.fill(RECORDS[i:i + 5] for i in range(0, 25, 5)))
+            received = []
+            async for batch in channel:
+                await asyncio.sleep(0.01)
+                received.extend(batch)
+            await producer
+            return channel, received
+        
+        channel, received = asyncio.run(run())
+        self.assertEqual(received, RECORDS)
+        self.assertEqual((channel.batches, channel.rows), (5, 25))
+        self.assertLessEqual(channel.max_depth, 2)
+        self.assertGreater(channel.producer_wait, 0)
+        self.assertGreater(channel.peak_buffered_bytes, 0)
+        with self.assertRaises(ValueError):
+            BatchChannel(0)
+    
+    def test_producer_error(self):
+        """Test that an error of the source reaches the consumer."""
+        async def source():
+            yield RECORDS[:5]
+            raise IOError("connection lost")
+        
+        async def run():
+            channel = BatchChannel(2)
+            producer = asyncio.ensure_future(channel.fill(source()))
+            received = []
+            try:
+                async for batch in channel:
+                    received.extend(batch)
+            finally:
+                await producer
+        
+        with self.assertRaises(IOError):
+            asyncio.run(run())
+
+class TestQueryPlan(unittest.TestCase):
+    """Test cases for query plans."""
+    
+    def test_plan_for_request(self):
+        """Test plans derived from the analysis type, date range and filters."""
+        plan = plan_for_request({"analysis_type": "sentiment", "date_range": {"start": "2023-02-01"}})
+        self.assertEqual(plan.columns, ["id", "customer_id", "product_id", "rating", "feedback", "date"])
+        self.assertEqual(plan.filters, [("date", ">=", "2023-02-01")])
+        
+        plan = plan_for_request({
+            "analysis_type": "other", "filters": [["region", "in", ["North"]]], "date_range": {"end": "2023-02-01"}
+        })
+        self.assertIsNone(plan.columns)
+        self.assertEqual(plan.filters, [("region", "in", ["North"]), ("date", "<", "2023-02-01")])
+        self.assertEqual(QueryPlan.from_dict(plan.to_dict()).filters, plan.filters)
+        self.assertIsNone(plan_for_request({"analysis_type": "other"}))
+        with self.assertRaises(ValueError):
+            QueryPlan(filters=[("date", "~", "2023")])
+    
+    def test_batch_and_agent_extraction(self):
+        """Test filtering and projecting a batch, and planned sample extraction."""
+        batch = RecordBatch.from_records(RECORDS + [{"id": 25, "product_id": "P1", "price": None, "region": None, "date": "2023-01-02"}])
+        planned = QueryPlan(["id", "price"], [("region", "!=", "South")]).apply(batch)
+        self.assertEqual(list(planned.columns), ["id", "price", "region"])
+        self.assertEqual(list(planned.schema.fields), ["id", "price", "region"])
+        self.assertEqual(planned.to_records(), [
+            {"id": record["id"], "price": record["price"], "region": "North"} for record in RECORDS if record["region"] == "North"
+        ])
+        
+        agent = DataExtractionAgent({"extract_cache": False})
+        plan = plan_for_request({"analysis_type": "sales", "date_range": {"start": "2023-02-01", "end": "2023-02-16"}})
+        result = asyncio.run(agent.extract_data({"data_source": "sales_data", "query_plan": plan.to_dict()}))
+        self.assertEqual([record["id"] for record in result["data"]], [6, 7, 8, 9])
+        self.assertEqual(result["metadata"]["record_count"], 4)
+        self.assertEqual(result["metadata"]["query_plan"], plan.to_dict())
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
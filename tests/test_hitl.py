@@ -10,6 +10,7 @@ import unittest
 import asyncio
 from typing import Dict, Any
 
+from orchestrator.data.record_batch import RecordBatch
 from orchestrator.hitl.hitl_manager import HITLManager
 from orchestrator.hitl.user_interaction_tool import UserInteractionTool
 from orchestrator.hitl.feedback_processor import FeedbackProcessor
@@ -50,6 +51,24 @@ class TestHITLManager(unittest.TestCase):
         self.assertIn("hitl_verified", updated_output)
         self.assertTrue(updated_output["hitl_verified"])
 
+    def test_extraction_corrections_on_batches(self):
+        """Test that extraction corrections apply to record batches."""
+        records = [{"id": i, "rating": 1 if i == 0 else 4, "feedback": "ok"} for i in range(5)]
+        task_output = {"data": RecordBatch.from_records(records), "metadata": {}}
+        
+        updated_output = asyncio.run(self.hitl_manager.process(
+            "DataExtractionAgent", "extract_data", {}, task_output, 70.0
+        ))
+        
+        corrected = updated_output["data"]
+        self.assertIsInstance(corrected, RecordBatch)
+        self.assertEqual([row["human_verified"] for row in corrected], [True, True, True, None, None])
+        self.assertEqual(corrected[0]["rating"], 2)
+        self.assertTrue(corrected[0]["feedback"].endswith("[Rating corrected by human]"))
+        self.assertTrue(updated_output["metadata"]["hitl_applied"])
+        # The extracted batch itself is left as it was
+        self.assertNotIn("human_verified", task_output["data"].columns)
+
 class TestUserInteractionTool(unittest.TestCase):
     """Test cases for the User Interaction Tool."""
     
@@ -79,6 +98,16 @@ class TestUserInteractionTool(unittest.TestCase):
         self.assertIn("selected_option", response)
         self.assertIn(response["selected_option"], options)
 
+    def test_review_batch(self):
+        """Test that reviewed record batches come back as batches."""
+        batch = RecordBatch.from_records([{"id": 1}, {"id": 2}])
+        response = asyncio.run(self.interaction_tool.present_data_for_review(batch, "Check the rows"))
+        
+        edited = response["edited_data"]
+        self.assertIsInstance(edited, RecordBatch)
+        self.assertEqual(edited[0]["human_review_note"], "Reviewed and approved")
+        self.assertEqual(len(edited), 2)
+
 class TestFeedbackProcessor(unittest.TestCase):
     """Test cases for the Feedback Processor."""
     
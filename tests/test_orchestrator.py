@@ -4,13 +4,16 @@ Tests for the Orchestrator.
 
 import unittest
 import asyncio
+import tempfile
 from typing import Dict, Any
+from unittest import mock
 import sys
 import os
 # Add the parent directory to sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 
+from orchestrator.agents.statistical_analysis_agent import StatisticalAnalysisAgent
 from orchestrator.main import Orchestrator
 
 class TestOrchestrator(unittest.TestCase):
@@ -27,6 +30,20 @@ class TestOrchestrator(unittest.TestCase):
         self.assertIsNotNone(self.orchestrator.confidence_evaluator)
         self.assertIsNotNone(self.orchestrator.hitl_manager)
     
+    def test_shutdown_stops_workers(self):
+        """Test that shutting down the orchestrator stops the agents' worker processes."""
+        agent = StatisticalAnalysisAgent({"task_processes": 1, "process_min_records": 100})
+        self.orchestrator.agents["statistical_analysis"] = agent
+        data = [{"id": i, "value": 50.0 + i % 7, "category": "A"} for i in range(200)]
+        asyncio.run(agent.execute_task("detect_anomalies", {"data": data}))
+        workers = list(agent.process_pool._executor._processes.values())
+        
+        self.orchestrator.shutdown()
+        
+        self.assertIsNone(agent.process_pool._executor)
+        self.assertTrue(workers)
+        self.assertFalse(any(worker.is_alive() for worker in workers))
+    
     def test_process_request(self):
         """Test processing a request."""
         # Create a test request
@@ -46,6 +63,170 @@ class TestOrchestrator(unittest.TestCase):
         self.assertIn("analysis_result", result)
         self.assertIn("visualization_result", result)
         self.assertEqual(result["status"], "completed")
+    
+    def test_query_plan(self):
+        """Test that the extraction reads only what the requested analysis needs."""
+        request = {
+            "request_id": "test-plan",
+            "data_source": "sales_data",
+            "analysis_type": "sales",
+            "date_range": {"start": "2023-02-01"}
+        }
+        result = asyncio.run(self.orchestrator.process_request(request))
+        
+        metadata = result["extraction_result"]["metadata"]
+        self.assertEqual(metadata["query_plan"]["filters"], [["date", ">=", "2023-02-01"]])
+        self.assertEqual(metadata["record_count"], 5)
+        self.assertEqual(result["analysis_result"]["analysis_results"]["sample_size"], 5)
+        self.assertNotIn("query_plan", Orchestrator({"query_planning": False})._plan_extraction(request))
+    
+    def test_resume_streamed_extraction(self):
+        """Test resuming a workflow whose analysis of a streamed source failed."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sales.csv")
+            with open(path, "w") as f:
+                f.write("id,product_id,quantity,price,region,date\n")
+                for i in range(60):
+                    f.write(f"{i},P{i % 7},{i % 5 + 1},{i % 40 + 0.5},{['North', 'South'][i % 2]},2023-01-{i % 28 + 1:02d}\n")
+            checkpoint_dir = os.path.join(directory, "checkpoints")
+            orchestrator = Orchestrator({"checkpoint_dir": checkpoint_dir})
+            request = {"request_id": "test-resume-stream", "data_source": path, "analysis_type": "sales"}
+            
+            failing_task = mock.AsyncMock(side_effect=RuntimeError("worker died"))
+            with mock.patch.object(orchestrator.agents["statistical_analysis"], "execute_task", failing_task):
+                with self.assertRaises(RuntimeError):
+                    asyncio.run(orchestrator.process_request(request))
+            workflow_id = orchestrator.workflow_state_manager.list_workflows("failed")[0]["id"]
+            asyncio.run(orchestrator.workflow_state_manager.flush_checkpoints())
+            # The batches were never consumed, so nothing could be checkpointed
+            self.assertEqual(orchestrator.workflow_state_manager.get_checkpoints(workflow_id), {})
+            
+            resumed = Orchestrator({"checkpoint_dir": checkpoint_dir})
+            result = asyncio.run(resumed.resume_workflow(workflow_id))
+            asyncio.run(resumed.workflow_state_manager.flush_checkpoints())
+            expected = asyncio.run(self.orchestrator.process_request(request))
+            
+            self.assertEqual(
+                result["analysis_result"]["analysis_results"], expected["analysis_result"]["analysis_results"]
+            )
+            self.assertEqual(result["analysis_result"]["metadata"]["batches_processed"], 1)
+            
+            # The extraction is checkpointed after the analysis, without its batches
+            restored = Orchestrator({"checkpoint_dir": checkpoint_dir}).workflow_state_manager.load_workflow(workflow_id)
+            extraction = restored["checkpoints"]["extraction_result"]
+            self.assertNotIn("batches", extraction)
+            self.assertNotIn("connector", extraction)
+            self.assertEqual(extraction["metadata"]["connector"], "csv")
+    
+    def test_streaming_execution(self):
+        """Test that analysis consumes extracted batches through a bounded channel."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sales.csv")
+            with open(path, "w") as f:
+                f.write("id,product_id,quantity,price,region,date\n")
+                for i in range(200):
+                    f.write(f"{i},P{i % 7},{i % 5 + 1},{i % 40 + 0.5},{['North', 'South'][i % 2]},2023-01-{i % 28 + 1:02d}\n")
+            request = {"request_id": "test-stream", "data_source": path, "analysis_type": "sales", "batch_size": 10}
+            
+            orchestrator = Orchestrator({"stream_queue_size": 2})
+            streamed = asyncio.run(orchestrator.process_request({**request, "streaming": True}))
+            sequential = asyncio.run(self.orchestrator.process_request(request))
+        
+        pipeline = streamed["extraction_result"]["metadata"]["pipeline"]
+        self.assertEqual((pipeline["batches"], pipeline["rows"]), (20, 200))
+        self.assertLessEqual(pipeline["max_depth"], 2)
+        self.assertIsNotNone(pipeline["time_to_first_result_seconds"])
+        self.assertLess(pipeline["time_to_first_result_seconds"], pipeline["elapsed_seconds"])
+        self.assertNotIn("batches", streamed["extraction_result"])
+        self.assertEqual(
+            streamed["analysis_result"]["analysis_results"], sequential["analysis_result"]["analysis_results"]
+        )
+        self.assertIn("confidence_score", streamed["extraction_result"])
+        self.assertIn("visualization_result", streamed)
+        partial = orchestrator.context_store.get(f"workflow:{streamed['workflow_id']}:partial_result")
+        self.assertEqual(partial["batches"] % 10, 1)
+        self.assertIn("process_peak_rss_bytes", pipeline)
+    
+    def test_streaming_analyzes_reviewed_extraction(self):
+        """Test that a human correction of a streamed extraction is what gets analyzed."""
+        corrected = [
+            {"id": i, "product_id": "P1", "quantity": 1, "price": 10.0, "region": "North", "date": "2023-01-01"}
+            for i in range(5)
+        ]
+        
+        async def review(agent_name, task_name, task_input, task_output, confidence_score):
+            if agent_name == "data_extraction":
+                return {**task_output, "data": corrected}
+            return task_output
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sales.csv")
+            with open(path, "w") as f:
+                f.write("id,product_id,quantity,price,region,date\n")
+                for i in range(50):
+                    f.write(f"{i},P{i % 7},{i % 5 + 1},{i % 40 + 0.5},North,2023-01-{i % 28 + 1:02d}\n")
+            request = {"request_id": "test-stream-review", "data_source": path, "analysis_type": "sales", "streaming": True}
+            
+            orchestrator = Orchestrator({"confidence_threshold": 101})
+            with mock.patch.object(orchestrator.hitl_manager, "process", side_effect=review):
+                result = asyncio.run(orchestrator.process_request(request))
+        
+        self.assertEqual(result["extraction_result"]["metadata"]["pipeline"]["rows"], 5)
+        self.assertEqual(result["analysis_result"]["analysis_results"]["sample_size"], 5)
+    
+    def test_resume_workflow(self):
+        """Test resuming a failed workflow from its checkpoints."""
+        with tempfile.TemporaryDirectory() as checkpoint_dir:
+            orchestrator = Orchestrator({"checkpoint_dir": checkpoint_dir})
+            request = {
+                "request_id": "test-resume",
+                "data_source": "sales_data",
+                "analysis_type": "sales"
+            }
+            
+            # Make the last step fail after the first two were checkpointed
+            failing_task = mock.AsyncMock(side_effect=RuntimeError("worker died"))
+            with mock.patch.object(orchestrator.agents["visualization"], "execute_task", failing_task):
+                with self.assertRaises(RuntimeError):
+                    asyncio.run(orchestrator.process_request(request))
+            
+            workflow_id = orchestrator.workflow_state_manager.list_workflows("failed")[0]["id"]
+            asyncio.run(orchestrator.workflow_state_manager.flush_checkpoints())
+            
+            # Resume in a fresh orchestrator, as a restarted worker would
+            resumed = Orchestrator({"checkpoint_dir": checkpoint_dir})
+            extraction_task = mock.AsyncMock()
+            with mock.patch.object(resumed.agents["data_extraction"], "execute_task", extraction_task):
+                result = asyncio.run(resumed.resume_workflow(workflow_id))
+            asyncio.run(resumed.workflow_state_manager.flush_checkpoints())
+            
+            extraction_task.assert_not_called()
+            self.assertEqual(result["status"], "completed")
+            self.assertEqual(result["workflow_id"], workflow_id)
+            self.assertIn("visualization_result", result)
+
+    def test_resume_streaming_with_extraction_checkpoint(self):
+        """Test that a resumed streaming workflow analyzes its checkpointed extraction."""
+        with tempfile.TemporaryDirectory() as checkpoint_dir:
+            orchestrator = Orchestrator({"checkpoint_dir": checkpoint_dir})
+            request = {"request_id": "test-resume-checkpoint", "data_source": "sales_data", "analysis_type": "sales"}
+            
+            failing_task = mock.AsyncMock(side_effect=RuntimeError("worker died"))
+            with mock.patch.object(orchestrator.agents["statistical_analysis"], "execute_task", failing_task):
+                with self.assertRaises(RuntimeError):
+                    asyncio.run(orchestrator.process_request(request))
+            workflow_id = orchestrator.workflow_state_manager.list_workflows("failed")[0]["id"]
+            asyncio.run(orchestrator.workflow_state_manager.flush_checkpoints())
+            
+            resumed = Orchestrator({"checkpoint_dir": checkpoint_dir, "streaming_execution": True})
+            extraction_task = mock.AsyncMock()
+            with mock.patch.object(resumed.agents["data_extraction"], "execute_task", extraction_task):
+                result = asyncio.run(resumed.resume_workflow(workflow_id))
+            asyncio.run(resumed.workflow_state_manager.flush_checkpoints())
+            
+            extraction_task.assert_not_called()
+            self.assertEqual(result["status"], "completed")
+            self.assertNotIn("pipeline", result["extraction_result"]["metadata"])
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
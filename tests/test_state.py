@@ -0,0 +1,360 @@
+"""
+Tests for the State Management components.
+"""
+import sys
+import os
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import asyncio
+import json
+import pickle
+import tempfile
+from datetime import datetime
+from typing import Dict, Any
+
+from orchestrator.state.context_store import ContextStore
+from orchestrator.state.history_manager import HistoryManager
+from orchestrator.utils.clock import frozen_clock, Timestamp
+from orchestrator.state.history_journal import HistoryJournal, iter_journal, aggregate_journal, list_journal_files
+from orchestrator.state.workflow_state_manager import WorkflowStateManager
+from orchestrator.state.watermark_store import Watermark, WatermarkStore
+from orchestrator.data.record_batch import RecordBatch
+
+class TestWorkflowStateManager(unittest.TestCase):
+    """Test cases for the Workflow State Manager."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.manager = WorkflowStateManager(ContextStore(), {"checkpoint_dir": self.temp_dir.name})
+    
+    def tearDown(self):
+        """Clean up test environment."""
+        self.temp_dir.cleanup()
+    
+    def test_frozen_clock_timestamps(self):
+        """Test that workflow timestamps come from the shared clock."""
+        with frozen_clock(1700000000.0) as clock:
+            workflow_id = self.manager.create_workflow({"request_id": "test-clock"})
+            clock.advance(5.0)
+            workflow = self.manager.add_workflow_step(workflow_id, "extract", {})
+        
+        self.assertEqual(workflow["created_at"].wall, 1700000000.0)
+        self.assertEqual(workflow["updated_at"] - workflow["created_at"], 5.0)
+        self.assertIsInstance(workflow["updated_at"], Timestamp)
+        self.assertGreater(workflow["updated_at"], workflow["created_at"])
+        self.assertGreater(workflow["updated_at"], 1700000000.0)
+    
+    def test_timestamp_formats_like_datetime(self):
+        """Test that timestamps hold the ISO string datetime would format."""
+        for wall in (1700000000.0, 1700000000.5, 1700000000.9999996, 1700000001.25e-6, -0.5):
+            self.assertEqual(Timestamp(wall), datetime.fromtimestamp(wall).isoformat())
+        
+        timestamp = Timestamp(1700000000.25, 3.0)
+        restored = pickle.loads(pickle.dumps(timestamp))
+        self.assertEqual((restored, restored.wall, restored.monotonic), (timestamp, timestamp.wall, 3.0))
+        self.assertEqual(Timestamp.fromisoformat(timestamp.isoformat()), timestamp)
+        self.assertEqual(json.dumps([timestamp]), json.dumps([timestamp.isoformat()]))
+    
+    def test_timestamps_serialize_as_iso(self):
+        """Test that timestamps are written to JSON and checkpoints as ISO 8601 strings."""
+        async def run():
+            workflow_id = self.manager.create_workflow({"request_id": "test-iso"})
+            self.manager.checkpoint_step(workflow_id, "analysis_result", {"metadata": {"analysis_timestamp": clock.now()}})
+            await self.manager.flush_checkpoints()
+            return workflow_id
+        
+        with frozen_clock(1700000000.0) as clock:
+            workflow_id = asyncio.run(run())
+            created = clock.now()
+        
+        # Timestamps are ISO strings, so no default is needed
+        workflow = json.loads(json.dumps(self.manager.get_workflow(workflow_id)))
+        self.assertEqual(workflow["created_at"], created.isoformat())
+        self.assertEqual(self.manager.get_workflow(workflow_id)["created_at"], workflow["created_at"])
+        self.assertLess(self.manager.get_workflow(workflow_id)["created_at"], "2100-01-01T00:00:00")
+        self.assertEqual(workflow["checkpoints"]["analysis_result"]["metadata"]["analysis_timestamp"], created.isoformat())
+        
+        # A fresh manager restores the timestamps written to disk
+        restored = WorkflowStateManager(ContextStore(), {"checkpoint_dir": self.temp_dir.name}).load_workflow(workflow_id)
+        self.assertEqual(restored["created_at"], created)
+        self.assertEqual(restored["checkpoints"]["analysis_result"]["metadata"]["analysis_timestamp"], created.isoformat())
+    
+    def test_checkpoint_step(self):
+        """Test that checkpoints are recorded in memory."""
+        workflow_id = self.manager.create_workflow({"request_id": "test-1"})
+        self.manager.checkpoint_step(workflow_id, "extraction_result", {"data": [1, 2, 3]})
+        
+        checkpoints = self.manager.get_checkpoints(workflow_id)
+        self.assertEqual(checkpoints["extraction_result"], {"data": [1, 2, 3]})
+    
+    def test_load_workflow_from_disk(self):
+        """Test restoring a workflow from asynchronously written checkpoints."""
+        async def run():
+            workflow_id = self.manager.create_workflow({"request_id": "test-2"})
+            self.manager.checkpoint_step(workflow_id, "extraction_result", {"data": [1]})
+            await self.manager.flush_checkpoints()
+            return workflow_id
+        
+        workflow_id = asyncio.run(run())
+        
+        # A fresh manager simulates a restarted worker
+        restored_manager = WorkflowStateManager(ContextStore(), {"checkpoint_dir": self.temp_dir.name})
+        workflow = restored_manager.load_workflow(workflow_id)
+        
+        self.assertIsNotNone(workflow)
+        self.assertEqual(workflow["request"]["request_id"], "test-2")
+        self.assertEqual(workflow["checkpoints"]["extraction_result"], {"data": [1]})
+        self.assertIsNone(restored_manager.load_workflow("missing"))
+    
+    def test_checkpoint_serialized_when_taken(self):
+        """Test that changes made to an output after checkpointing it are not written."""
+        async def run():
+            workflow_id = self.manager.create_workflow({"request_id": "test-4"})
+            output = {"data": [1]}
+            self.manager.checkpoint_step(workflow_id, "extraction_result", output)
+            output["data"].append(2)
+            await self.manager.flush_checkpoints()
+            return workflow_id
+        
+        workflow_id = asyncio.run(run())
+        restored_manager = WorkflowStateManager(ContextStore(), {"checkpoint_dir": self.temp_dir.name})
+        self.assertEqual(restored_manager.load_workflow(workflow_id)["checkpoints"]["extraction_result"], {"data": [1]})
+    
+    def test_completed_workflow_persisted(self):
+        """Test that a restored workflow keeps its completed status and result."""
+        async def run():
+            workflow_id = self.manager.create_workflow({"request_id": "test-5"})
+            self.manager.complete_workflow(workflow_id, {"status": "completed", "total": 3})
+            await self.manager.flush_checkpoints()
+            return workflow_id
+        
+        workflow_id = asyncio.run(run())
+        restored_manager = WorkflowStateManager(ContextStore(), {"checkpoint_dir": self.temp_dir.name})
+        workflow = restored_manager.load_workflow(workflow_id)
+        self.assertEqual(workflow["status"], "completed")
+        self.assertEqual(workflow["result"], {"status": "completed", "total": 3})
+        self.assertEqual(
+            workflow["completed_at"].isoformat(), self.manager.get_workflow(workflow_id)["completed_at"].isoformat()
+        )
+
+    def test_unserializable_checkpoint_skipped(self):
+        """Test that a checkpoint JSON cannot restore is not written."""
+        async def run():
+            workflow_id = self.manager.create_workflow({"request_id": "test-3"})
+            self.manager.checkpoint_step(workflow_id, "extraction_result", {"data": [1]})
+            self.manager.checkpoint_step(workflow_id, "analysis_result", {"handle": object()})
+            await self.manager.flush_checkpoints()
+            return workflow_id
+        
+        with self.assertLogs("orchestrator.state.workflow_state_manager", "ERROR"):
+            workflow_id = asyncio.run(run())
+        
+        restored_manager = WorkflowStateManager(ContextStore(), {"checkpoint_dir": self.temp_dir.name})
+        checkpoints = restored_manager.load_workflow(workflow_id)["checkpoints"]
+        self.assertEqual(checkpoints, {"extraction_result": {"data": [1]}})
+        self.assertNotIn("step-analysis_result.json.tmp", os.listdir(os.path.join(self.temp_dir.name, workflow_id)))
+
+class TestHistoryManager(unittest.TestCase):
+    """Test cases for the History Manager."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.manager = HistoryManager({"max_history_size": 5})
+    
+    def test_ring_buffer_eviction(self):
+        """Test that the oldest entries are overwritten once the history is full."""
+        for i in range(8):
+            self.manager.add_entry({"type": "a" if i % 2 else "b", "index": i})
+        
+        self.assertEqual(self.manager.get_history_size(), 5)
+        self.assertEqual([e["index"] for e in self.manager.history], [3, 4, 5, 6, 7])
+        self.assertEqual(self.manager.history[-1]["index"], 7)
+        
+        with self.assertRaises(ValueError):
+            HistoryManager({"max_history_size": 0})
+    
+    def test_get_entries_by_type(self):
+        """Test type-filtered queries against the secondary rings."""
+        for i in range(8):
+            self.manager.add_entry({"type": "a" if i % 2 else "b", "index": i})
+        
+        self.assertEqual([e["index"] for e in self.manager.get_entries("a")], [7, 5, 3])
+        self.assertEqual([e["index"] for e in self.manager.get_entries("b", limit=1)], [6])
+        self.assertEqual([e["index"] for e in self.manager.get_entries("b", reverse=False)], [4, 6])
+        self.assertEqual(self.manager.get_entries("missing"), [])
+    
+    def test_time_range_query(self):
+        """Test time-range and agent filters on the columnar history."""
+        manager = HistoryManager({"max_history_size": 100})
+        for i in range(10):
+            manager.add_entry({
+                "agent": "extraction" if i % 2 else "analysis",
+                "task": "run",
+                "confidence_score": 80.0 + i,
+                "hitl_triggered": i < 4,
+                "timestamp": 1000.0 + i,
+                "workflow_id": f"wf-{i}"
+            })
+        
+        entries = manager.query(start=1002.0, end=1006.0, agent="extraction")
+        self.assertEqual([e["workflow_id"] for e in entries], ["wf-3", "wf-5"])
+        self.assertEqual(entries[0]["confidence_score"], 83.0)
+        self.assertTrue(entries[0]["hitl_triggered"])
+        self.assertEqual(manager.query(agent="unknown"), [])
+    
+    def test_entries_are_copies_with_original_values(self):
+        """Test that read entries are copies that keep confidence types and unusable timestamps."""
+        manager = HistoryManager({"max_history_size": 10})
+        manager.add_entry({"type": "validation", "confidence_score": 83, "timestamp": 1000.0})
+        manager.add_entry({"type": "validation", "confidence_score": 82.5, "timestamp": "not a time"})
+        
+        newest, oldest = manager.get_entries("validation")
+        self.assertEqual(type(oldest["confidence_score"]), int)
+        self.assertEqual(type(newest["confidence_score"]), float)
+        self.assertEqual(newest["timestamp"], "not a time")
+        self.assertEqual(manager.query(start=999.0), [oldest])
+        
+        oldest["confidence_score"] = 0
+        self.assertEqual(manager.get_entries("validation")[1]["confidence_score"], 83)
+    
+    def test_time_range_after_clock_goes_back(self):
+        """Test that time windows stay exact when timestamps are out of order."""
+        manager = HistoryManager({"max_history_size": 4})
+        for i, timestamp in enumerate([1000.0, 1010.0, 1005.0, 1020.0]):
+            manager.add_entry({"agent": "analysis", "confidence_score": 80.0, "timestamp": timestamp, "index": i})
+        
+        self.assertEqual([e["index"] for e in manager.query(start=1004.0, end=1015.0)], [1, 2])
+        self.assertEqual(manager.aggregate_by_agent(start=1004.0, end=1015.0)["analysis"]["count"], 2)
+        
+        # Once the out-of-order entry leaves the ring, windows are binary-searched again
+        for timestamp in (1030.0, 1040.0, 1050.0):
+            manager.add_entry({"agent": "analysis", "timestamp": timestamp})
+        self.assertEqual(len(manager.query(start=1020.0, end=1045.0)), 3)
+    
+    def test_aggregate_by_agent(self):
+        """Test per-agent HITL rate and mean confidence over a window."""
+        manager = HistoryManager({"max_history_size": 4})
+        for i in range(6):
+            manager.add_entry({
+                "agent": "analysis",
+                "confidence_score": 70.0 + 10 * (i % 2),
+                "hitl_triggered": i % 2 == 0,
+                "timestamp": 2000.0 + i
+            })
+        manager.add_entry({"type": "hitl_request", "agent": "analysis", "timestamp": 2006.0})
+        
+        stats = manager.aggregate_by_agent(start=2003.0)
+        self.assertEqual(stats["analysis"]["count"], 4)
+        self.assertAlmostEqual(stats["analysis"]["hitl_rate"], 1 / 3)
+        self.assertAlmostEqual(stats["analysis"]["mean_confidence"], 230.0 / 3)
+    
+    def test_clear_history(self):
+        """Test clearing the history."""
+        self.manager.add_entry({"type": "a"})
+        self.manager.clear_history()
+        self.assertEqual(self.manager.get_history_size(), 0)
+        self.assertEqual(self.manager.get_entries("a"), [])
+
+class TestHistoryJournal(unittest.TestCase):
+    """Test cases for the History Journal."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        """Clean up test environment."""
+        self.temp_dir.cleanup()
+    
+    def test_history_manager_journals_entries(self):
+        """Test that entries added to the history reach the journal."""
+        manager = HistoryManager({"journal_dir": self.temp_dir.name})
+        for i in range(5):
+            manager.add_entry({
+                "agent": "analysis",
+                "confidence_score": 80.0 + i,
+                "hitl_triggered": i == 0,
+                "timestamp": "2023-03-01T12:00:00"
+            })
+        manager.journal.close()
+        
+        entries = list(iter_journal(self.temp_dir.name))
+        self.assertEqual(len(entries), 5)
+        self.assertEqual(entries[-1]["confidence_score"], 84.0)
+        
+        daily = aggregate_journal(self.temp_dir.name)
+        self.assertEqual(daily["2023-03-01"]["analysis"]["count"], 5)
+        self.assertAlmostEqual(daily["2023-03-01"]["analysis"]["hitl_rate"], 0.2)
+        self.assertAlmostEqual(daily["2023-03-01"]["analysis"]["mean_confidence"], 82.0)
+    
+    def test_size_rotation(self):
+        """Test that the journal rotates files once they exceed the size limit."""
+        journal = HistoryJournal(self.temp_dir.name, {"max_file_size": 200, "batch_size": 2})
+        for i in range(20):
+            journal.append({"agent": "analysis", "index": i, "timestamp": 1000.0 + i})
+        journal.close()
+        
+        self.assertGreater(len(list_journal_files(self.temp_dir.name)), 1)
+        entries = list(iter_journal(self.temp_dir.name, start=1005.0, end=1010.0))
+        self.assertEqual([e["index"] for e in entries], [5, 6, 7, 8, 9])
+    
+    def test_window_skips_files_by_name(self):
+        """Test that files named outside a time window are not read and names never collide."""
+        first = HistoryJournal(self.temp_dir.name, {"batch_size": 1, "compress_rotated": False})
+        second = HistoryJournal(self.temp_dir.name, {"batch_size": 1, "compress_rotated": False})
+        first.append({"agent": "analysis", "timestamp": 1000.0})
+        second.append({"agent": "analysis", "timestamp": 2000.5})
+        first.close()
+        second.close()
+        
+        names = {os.path.basename(path).split(".")[1]: path for path in list_journal_files(self.temp_dir.name)}
+        self.assertEqual(sorted(names), ["t1000_1001", "t2000_2001"])
+        
+        # A late entry in the earlier file is only seen when its name is not used to skip it
+        with open(names["t1000_1001"], "a", encoding="utf-8") as f:
+            f.write('{"agent": "late", "timestamp": 2000.0}\n')
+        self.assertEqual([e["agent"] for e in iter_journal(self.temp_dir.name, start=1500.0)], ["analysis"])
+        self.assertEqual(len(list(iter_journal(self.temp_dir.name))), 3)
+
+class TestWatermarkStore(unittest.TestCase):
+    """Test cases for the Watermark Store."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        """Clean up test environment."""
+        self.temp_dir.cleanup()
+    
+    def test_persisted_marks(self):
+        """Test that marks and extracts survive a new store and can be reset."""
+        extract = RecordBatch.from_records([{"id": 1, "date": "2023-01-01"}, {"id": 2, "date": "2023-01-02"}])
+        store = WatermarkStore(self.temp_dir.name)
+        self.assertIsNone(store.get("sales"))
+        store.put("sales", Watermark("date", "2023-01-02", extract, {"2023-01-02": "a"}))
+        
+        restored = WatermarkStore(self.temp_dir.name).get("sales")
+        self.assertEqual((restored.field, restored.value), ("date", "2023-01-02"))
+        self.assertEqual(restored.extract.to_records(), extract.to_records())
+        self.assertEqual(restored.to_dict()["rows"], 2)
+        
+        # An unreadable extract invalidates its mark
+        with open(store._extract_file("sales"), "wb") as f:
+            f.write(b"not a frame")
+        self.assertIsNone(WatermarkStore(self.temp_dir.name).get("sales"))
+        
+        store.reset("sales")
+        self.assertIsNone(store.get("sales"))
+        self.assertIsNone(WatermarkStore(self.temp_dir.name).get("sales"))
+        
+        # Without a directory marks are kept in memory only
+        memory = WatermarkStore()
+        memory.put("sales", Watermark("date", "2023-01-02", extract))
+        self.assertIs(memory.get("sales").extract, extract)
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -10,6 +10,7 @@ import unittest
 import asyncio
 from typing import Dict, Any
 
+from orchestrator.data.record_batch import RecordBatch
 from orchestrator.validation.confidence_evaluator import ConfidenceEvaluator
 from orchestrator.validation.rule_based_validator import RuleBasedValidator
 from orchestrator.validation.embedding_validator import EmbeddingValidator
@@ -80,6 +81,41 @@ class TestRuleBasedValidator(unittest.TestCase):
         self.assertIn("confidence", result)
         self.assertIn("message", result)
         self.assertTrue(result["is_valid"])
+    
+    def test_validate_against_schema(self):
+        """Test that declared schemas and analysis kinds are checked."""
+        metadata = {
+            "source": "test_declared",
+            "record_count": 2,
+            "extraction_timestamp": "2023-01-01T00:00:00",
+            "schema": {"fields": {"id": "int", "rating": "int"}}
+        }
+        task_output = {"data": [{"id": 1, "rating": 4}, {"id": 2}], "metadata": metadata}
+        result = asyncio.run(self.validator.validate("DataExtractionAgent", "extract_data", {}, task_output))
+        self.assertTrue(result["is_valid"])
+        self.assertEqual(result["confidence"], 75.0)
+        self.assertIn("rating", result["message"])
+        
+        # Record batches are checked column by column
+        task_output["data"] = RecordBatch.from_records(task_output["data"])
+        result = asyncio.run(self.validator.validate("DataExtractionAgent", "extract_data", {}, task_output))
+        self.assertEqual(result["confidence"], 75.0)
+        self.assertIn("rating", result["message"])
+        task_output["data"] = RecordBatch.from_records([{"id": 1, "rating": 4}, {"id": 2, "rating": 5}])
+        result = asyncio.run(self.validator.validate("DataExtractionAgent", "extract_data", {}, task_output))
+        self.assertEqual(result["confidence"], 95.0)
+        
+        analysis_output = {
+            "analysis_results": {"average_value": 1.0},
+            "metadata": {
+                "analysis_timestamp": "2023-01-01T00:00:00",
+                "analysis_methods": ["descriptive_statistics"],
+                "schema": {"fields": {"feedback": "str"}, "declared": False}
+            }
+        }
+        result = asyncio.run(self.validator.validate("StatisticalAnalysisAgent", "analyze_data", {}, analysis_output))
+        self.assertEqual(result["confidence"], 75.0)
+        self.assertIn("sentiment_distribution", result["message"])
 
 class TestValidationCache(unittest.TestCase):
     """Test cases for the Validation Cache."""